@@ -0,0 +1,12 @@
+from .batching import MicroBatcher
+from .singleflight import SingleFlight
+from .ratelimit import TokenBucket, RateLimiter, RateLimitExceeded, get_rate_limiter
+
+__all__ = [
+    "MicroBatcher",
+    "SingleFlight",
+    "TokenBucket",
+    "RateLimiter",
+    "RateLimitExceeded",
+    "get_rate_limiter",
+]
@@ -0,0 +1,177 @@
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from queue import Queue, Empty
+from threading import Thread, Lock
+from typing import Callable, Dict, Generic, List, Optional, Tuple, TypeVar
+import time
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Agrupa llamadas concurrentes en lotes (dynamic micro-batching).
+    
+    Cada submit() encola un item y bloquea al caller. Un hilo de fondo toma
+    el primer item pendiente, espera hasta `max_wait_ms` (o hasta juntar
+    `max_batch_size` items), ejecuta `handler` una sola vez con el lote y
+    reparte cada resultado a su caller. Con tráfico bajo el lote es de un
+    solo item y el costo extra es como mucho max_wait_ms.
+    
+    Un error del handler (cualquier BaseException) falla a todo el lote y el
+    hilo sigue atendiendo los siguientes. Si el hilo terminara por otro
+    motivo, el batcher queda cerrado y los items pendientes fallan con
+    RuntimeError en lugar de esperar para siempre.
+    """
+    
+    def __init__(
+        self,
+        handler: Callable[[List[T]], List[R]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 2.0,
+        name: str = "micro-batcher"
+    ):
+        """
+        Args:
+            handler: Función que procesa un lote y retorna un resultado por item (mismo orden)
+            max_batch_size: Máximo de items por lote
+            max_wait_ms: Máximo de milisegundos que espera el primer item del lote
+            name: Nombre del hilo de fondo
+            
+        Raises:
+            ValueError: Si max_batch_size no es positivo o max_wait_ms es negativo
+        """
+        if max_batch_size <= 0:
+            raise ValueError(f"max_batch_size debe ser mayor a 0, recibido: {max_batch_size}")
+        if max_wait_ms < 0:
+            raise ValueError(f"max_wait_ms no puede ser negativo, recibido: {max_wait_ms}")
+        
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: "Queue[Optional[Tuple[T, Future]]]" = Queue()
+        self._closed = False
+        self._lock = Lock()
+        self._batches = 0
+        self._items = 0
+        self._thread = Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+    
+    def submit(self, item: T, timeout: Optional[float] = None) -> R:
+        """
+        Encola un item y espera su resultado.
+        
+        Args:
+            item: Item a procesar
+            timeout: Segundos máximos de espera (None = sin límite)
+            
+        Returns:
+            El resultado del handler para este item
+            
+        Raises:
+            RuntimeError: Si el batcher está cerrado
+            TimeoutError: Si se agota el timeout (el item se descarta si el
+                          lote todavía no empezó)
+            Exception: La excepción lanzada por el handler para el lote
+        """
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("El MicroBatcher está cerrado")
+            self._queue.put((item, future))
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            # Cancelado, _run lo descarta en lugar de procesarlo sin nadie esperando
+            future.cancel()
+            raise
+    
+    def _collect(self) -> List[Tuple[T, Future]]:
+        """Bloquea hasta el primer item y junta el resto del lote."""
+        first = self._queue.get()
+        if first is None:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except Empty:
+                break
+            if entry is None:
+                # Re-encolar la señal de cierre para terminar después de este lote
+                self._queue.put(None)
+                break
+            batch.append(entry)
+        return batch
+    
+    def _run(self) -> None:
+        try:
+            self._loop()
+        finally:
+            self._fail_pending()
+    
+    def _loop(self) -> None:
+        while True:
+            batch = self._collect()
+            if not batch:
+                return
+            
+            # Descartar items cuyos callers ya no esperan (cancelados)
+            batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            
+            try:
+                results = self.handler([item for item, _ in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(
+                        f"El handler retornó {len(results)} resultados para {len(batch)} items"
+                    )
+            except BaseException as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+            with self._lock:
+                self._batches += 1
+                self._items += len(batch)
+    
+    def _fail_pending(self) -> None:
+        """Cierra el batcher y falla los items que quedaron en la cola."""
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                entry = self._queue.get_nowait()
+            except Empty:
+                return
+            if entry is not None and entry[1].set_running_or_notify_cancel():
+                entry[1].set_exception(RuntimeError("El MicroBatcher está cerrado"))
+    
+    def stats(self) -> Dict[str, float]:
+        """
+        Retorna métricas del batcher.
+        
+        Returns:
+            Diccionario con batches, items y avg_batch_size
+        """
+        with self._lock:
+            return {
+                "batches": self._batches,
+                "items": self._items,
+                "avg_batch_size": self._items / self._batches if self._batches else 0.0,
+            }
+    
+    def close(self) -> None:
+        """Procesa los items pendientes y detiene el hilo de fondo."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join()
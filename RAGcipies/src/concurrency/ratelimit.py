@@ -0,0 +1,507 @@
+from contextlib import contextmanager
+from threading import BoundedSemaphore, Lock
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple, TypeVar
+import hashlib
+import os
+import random
+import time
+from ..metrics.backends import rate_limiter_metrics
+
+
+R = TypeVar("R")
+
+
+class TokenBucket:
+    """
+    Token bucket thread-safe con recarga continua.
+    
+    Se recarga a `rate_per_minute / 60` tokens por segundo hasta `capacity`
+    (por defecto, un minuto de cuota). acquire() bloquea hasta que haya
+    tokens suficientes, así el ritmo se ajusta a la cuota en lugar de
+    dispararla y recibir 429.
+    """
+    
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate_per_minute: Tokens que se recargan por minuto
+            capacity: Máximo de tokens acumulables (default: rate_per_minute)
+            
+        Raises:
+            ValueError: Si rate_per_minute no es positivo
+        """
+        if rate_per_minute <= 0:
+            raise ValueError(f"rate_per_minute debe ser mayor a 0, recibido: {rate_per_minute}")
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(capacity if capacity is not None else rate_per_minute)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = Lock()
+    
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    def acquire(self, amount: float = 1.0, timeout: Optional[float] = None) -> float:
+        """
+        Consume `amount` tokens, esperando la recarga si hace falta.
+        Un pedido mayor que la capacidad se recorta a la capacidad (si no,
+        nunca podría pasar).
+        
+        Args:
+            amount: Tokens a consumir
+            timeout: Segundos máximos de espera (None = sin límite)
+            
+        Returns:
+            Segundos que se esperó
+            
+        Raises:
+            TimeoutError: Si no hubo tokens suficientes dentro del timeout
+        """
+        amount = min(amount, self.capacity)
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return now - started
+                wait = (amount - self._tokens) / self.rate
+            
+            if timeout is not None:
+                remaining = started + timeout - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"Timeout esperando {amount:.0f} tokens del rate limiter")
+                wait = min(wait, remaining)
+            time.sleep(wait)
+    
+    def debit(self, amount: float) -> None:
+        """
+        Descuenta tokens sin esperar (el saldo puede quedar negativo).
+        Sirve para corregir una estimación con el consumo real reportado por la API.
+        
+        Args:
+            amount: Tokens a descontar (negativo para devolver)
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.capacity, self._tokens - amount)
+    
+    def available(self) -> float:
+        """Retorna los tokens disponibles en este momento."""
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+
+class RateLimitExceeded(RuntimeError):
+    """
+    Error de cuota (HTTP 429) que agotó los reintentos.
+    
+    Attributes:
+        retry_after: Segundos sugeridos por el servidor antes de reintentar (si los informó)
+    """
+    
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """
+    Limitador del lado del cliente para una cuota (API key + modelo).
+    
+    Combina tres controles:
+    - requests/min y tokens/min con token buckets (ritmo sostenido)
+    - un tope de requests concurrentes
+    - backoff adaptativo ante 429: pausa a todos los callers durante el
+      retry-after informado por el servidor o, si no lo hay, con backoff
+      exponencial con jitter que se reinicia con la primera respuesta exitosa
+      
+    Los errores transitorios (5xx, 408, 409, timeouts y errores de conexión)
+    también se reintentan, con backoff por llamada y sin pausar a los demás:
+    cumplen el rol de los reintentos del SDK, que se desactivan para que los
+    429 pasen solo por el limitador.
+    
+    Cualquier límite en None queda desactivado.
+    """
+    
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        base_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        name: str = "default"
+    ):
+        """
+        Args:
+            requests_per_minute: Máximo de requests por minuto
+            tokens_per_minute: Máximo de tokens (prompt + respuesta) por minuto
+            max_concurrency: Máximo de requests en curso a la vez
+            base_backoff: Espera inicial tras un 429 sin retry-after (segundos)
+            max_backoff: Espera máxima del backoff exponencial (segundos)
+            name: Label `limiter` de las métricas ratelimit_* (ej: el modelo)
+            
+        Raises:
+            ValueError: Si max_concurrency no es positivo
+        """
+        if max_concurrency is not None and max_concurrency <= 0:
+            raise ValueError(f"max_concurrency debe ser mayor a 0, recibido: {max_concurrency}")
+        
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_concurrency = max_concurrency
+        self._semaphore = BoundedSemaphore(max_concurrency) if max_concurrency else None
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        
+        self._lock = Lock()
+        self._paused_until = 0.0
+        self._consecutive_429 = 0
+        self._stats = {
+            "requests": 0, "rate_limited": 0, "transient_errors": 0, "retries": 0,
+            "throttled_seconds": 0.0, "in_flight": 0,
+        }
+        self.name = name
+        self._series = rate_limiter_metrics(name)
+    
+    def _record(self, key: str, amount: float = 1) -> None:
+        """Suma a stats() y a la serie ratelimit_* de la cuota (con el lock tomado)."""
+        self._stats[key] += amount
+        self._series[key].inc(amount)
+    
+    def _wait_for_pause(self) -> float:
+        """Espera a que termine la pausa global impuesta por un 429."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                remaining = self._paused_until - time.monotonic()
+            if remaining <= 0:
+                return waited
+            time.sleep(remaining)
+            waited += remaining
+    
+    @contextmanager
+    def slot(self, tokens: float = 0.0) -> Iterator[None]:
+        """
+        Reserva capacidad para una request: una request del bucket de
+        requests/min, `tokens` del de tokens/min y un lugar de concurrencia.
+        
+        La pausa de un 429 y los buckets se esperan antes de tomar el lugar
+        de concurrencia, así una request demorada no lo ocupa sin usarlo.
+        
+        Args:
+            tokens: Tokens estimados de la request (prompt + respuesta máxima)
+        """
+        waited = self._wait_for_pause()
+        if self.requests is not None:
+            waited += self.requests.acquire(1)
+        if self.tokens is not None and tokens > 0:
+            waited += self.tokens.acquire(tokens)
+        if self._semaphore is not None:
+            self._semaphore.acquire()
+        try:
+            with self._lock:
+                self._record("requests")
+                self._record("throttled_seconds", waited)
+                self._record("in_flight")
+            try:
+                yield
+            finally:
+                with self._lock:
+                    self._stats["in_flight"] -= 1
+                    self._series["in_flight"].dec()
+        finally:
+            if self._semaphore is not None:
+                self._semaphore.release()
+    
+    def record_tokens(self, estimated: float, actual: float) -> None:
+        """
+        Corrige el bucket de tokens/min con el consumo real de una request.
+        
+        Args:
+            estimated: Tokens reservados en slot()
+            actual: Tokens reportados por la API (ej: usage.total_tokens)
+        """
+        if self.tokens is not None:
+            self.tokens.debit(actual - estimated)
+    
+    def record_success(self) -> None:
+        """Reinicia el backoff exponencial tras una respuesta exitosa."""
+        with self._lock:
+            self._consecutive_429 = 0
+    
+    def record_rate_limited(self, retry_after: Optional[float] = None) -> float:
+        """
+        Registra un 429 y pausa a todos los callers de esta cuota.
+        
+        Args:
+            retry_after: Segundos informados por el servidor (None = backoff exponencial)
+            
+        Returns:
+            Segundos de pausa aplicados
+        """
+        with self._lock:
+            self._consecutive_429 += 1
+            self._record("rate_limited")
+            if retry_after is None:
+                backoff = min(self.max_backoff, self.base_backoff * 2 ** (self._consecutive_429 - 1))
+                retry_after = backoff * random.uniform(0.5, 1.0)
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            return retry_after
+    
+    def _retrying(
+        self,
+        fn: Callable[[], R],
+        tokens: float,
+        max_retries: int,
+        retry_after_of: Optional[Callable[[BaseException], Tuple[bool, Optional[float]]]],
+        transient_retries: int,
+        is_transient: Optional[Callable[[BaseException], bool]]
+    ) -> Iterator[R]:
+        """
+        Ejecuta fn() con reintentos y produce su resultado una sola vez,
+        todavía dentro del slot: el lugar de concurrencia se libera recién al
+        cerrar el generador. Los tokens estimados se reservan solo en el
+        primer intento (una vez por request lógica).
+        """
+        classify = retry_after_of or rate_limit_retry_after
+        transient = is_transient or transient_error
+        rate_limited_attempts = transient_attempts = 0
+        charge = tokens
+        while True:
+            with self.slot(charge):
+                charge = 0.0
+                try:
+                    result = fn()
+                except Exception as e:
+                    is_rate_limited, retry_after = classify(e)
+                    if not is_rate_limited and not transient(e):
+                        raise
+                    error = e
+                else:
+                    self.record_success()
+                    yield result
+                    return
+            
+            # El slot ya se liberó: la pausa no ocupa un lugar de concurrencia
+            if is_rate_limited:
+                pause = self.record_rate_limited(retry_after)
+                if rate_limited_attempts >= max_retries:
+                    raise RateLimitExceeded(
+                        f"Límite de la API alcanzado tras {max_retries} reintentos: {error}",
+                        retry_after=pause
+                    )
+                rate_limited_attempts += 1
+            else:
+                with self._lock:
+                    self._record("transient_errors")
+                if transient_attempts >= transient_retries:
+                    raise error
+                transient_attempts += 1
+                backoff = min(self.max_backoff, self.base_backoff * 2 ** (transient_attempts - 1))
+                time.sleep(backoff * random.uniform(0.5, 1.0))
+            with self._lock:
+                self._record("retries")
+    
+    def call(
+        self,
+        fn: Callable[[], R],
+        tokens: float = 0.0,
+        max_retries: int = 5,
+        retry_after_of: Optional[Callable[[BaseException], Tuple[bool, Optional[float]]]] = None,
+        transient_retries: int = 2,
+        is_transient: Optional[Callable[[BaseException], bool]] = None
+    ) -> R:
+        """
+        Ejecuta fn() dentro de un slot, reintentando los 429 con backoff
+        global y los errores transitorios con backoff por llamada.
+        
+        Args:
+            fn: Llamada a la API
+            tokens: Tokens estimados de la request (se reservan una sola vez)
+            max_retries: Reintentos máximos ante 429
+            retry_after_of: Clasifica una excepción: (es_429, retry_after).
+                            Default: rate_limit_retry_after
+            transient_retries: Reintentos máximos ante errores transitorios
+            is_transient: Indica si una excepción es transitoria.
+                          Default: transient_error
+                          
+        Returns:
+            El resultado de fn()
+            
+        Raises:
+            RateLimitExceeded: Si se agotaron los reintentos ante 429
+            Exception: El error transitorio si se agotaron sus reintentos, o
+                       cualquier otro error de fn() sin reintentar
+        """
+        attempts = self._retrying(fn, tokens, max_retries, retry_after_of, transient_retries, is_transient)
+        try:
+            return next(attempts)
+        finally:
+            attempts.close()
+    
+    def stream(
+        self,
+        fn: Callable[[], Iterable[R]],
+        tokens: float = 0.0,
+        max_retries: int = 5,
+        retry_after_of: Optional[Callable[[BaseException], Tuple[bool, Optional[float]]]] = None,
+        transient_retries: int = 2,
+        is_transient: Optional[Callable[[BaseException], bool]] = None
+    ) -> Iterator[R]:
+        """
+        Como call(), para una fn() que abre un stream: los reintentos cubren
+        la apertura y el lugar de concurrencia queda ocupado hasta que el
+        stream se consume o se cierra el generador (que también cierra el
+        stream, si tiene close()).
+        
+        Args:
+            fn: Llamada a la API que retorna un iterable de eventos
+            tokens: Tokens estimados de la request (se reservan una sola vez)
+            max_retries: Reintentos máximos ante 429 al abrir el stream
+            retry_after_of: Clasifica una excepción (ver call)
+            transient_retries: Reintentos máximos ante errores transitorios
+            is_transient: Indica si una excepción es transitoria (ver call)
+            
+        Yields:
+            Los eventos del stream
+            
+        Raises:
+            RateLimitExceeded: Si se agotaron los reintentos ante 429
+            Exception: Igual que call()
+        """
+        attempts = self._retrying(fn, tokens, max_retries, retry_after_of, transient_retries, is_transient)
+        events = None
+        try:
+            events = next(attempts)
+            yield from events
+        finally:
+            close = getattr(events, "close", None)
+            if close is not None:
+                close()
+            attempts.close()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna métricas del limitador.
+        
+        Returns:
+            Diccionario con requests, rate_limited (429), transient_errors,
+            retries, throttled_seconds (espera acumulada por el ritmo) e in_flight.
+            También se publican en el REGISTRY como ratelimit_*{limiter=name}
+        """
+        with self._lock:
+            return dict(self._stats)
+
+
+def rate_limit_retry_after(error: BaseException) -> Tuple[bool, Optional[float]]:
+    """
+    Reconoce un 429 en excepciones de clientes HTTP (openai, requests, httpx)
+    sin depender de ninguno: busca `status_code` en la excepción o en su
+    `response`, y lee los headers retry-after-ms / retry-after.
+    
+    Args:
+        error: Excepción lanzada por la llamada
+        
+    Returns:
+        Tupla (es_429, retry_after en segundos o None)
+    """
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+    if status != 429:
+        return False, None
+    
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms") is not None:
+            return True, float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after") is not None:
+            return True, float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass
+    return True, None
+
+
+# Status HTTP que se reintentan como transitorios (los mismos que el SDK de OpenAI)
+TRANSIENT_STATUS = frozenset({408, 409})
+
+
+def transient_error(error: BaseException) -> bool:
+    """
+    Reconoce errores transitorios en excepciones de clientes HTTP (openai,
+    requests, httpx) sin depender de ninguno: status 408, 409 o 5xx, o una
+    clase de timeout o de conexión (ej: APITimeoutError, APIConnectionError,
+    requests.ConnectionError, httpx.ConnectTimeout).
+    
+    Args:
+        error: Excepción lanzada por la llamada
+        
+    Returns:
+        True si vale la pena reintentar la request
+    """
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+    if isinstance(status, int):
+        return status in TRANSIENT_STATUS or status >= 500
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    return any("Timeout" in cls.__name__ or "Connect" in cls.__name__ for cls in type(error).__mro__)
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimación rápida de tokens (~4 caracteres por token) para reservar cuota."""
+    return len(text) // 4 + 1
+
+
+# Limitadores compartidos del proceso: (hash de API key, modelo) -> RateLimiter
+_LIMITERS: Dict[Tuple[str, str], RateLimiter] = {}
+_LIMITERS_LOCK = Lock()
+
+
+def get_rate_limiter(api_key: str, model: str, **kwargs) -> RateLimiter:
+    """
+    Retorna el limitador compartido de una cuota, creándolo la primera vez.
+    Todos los clientes con la misma API key y modelo comparten ritmo,
+    tope de concurrencia y pausas por 429.
+    
+    Args:
+        api_key: API key (solo se guarda su hash)
+        model: Modelo al que aplica la cuota
+        **kwargs: Argumentos de RateLimiter (solo se usan al crearlo)
+        
+    Returns:
+        El RateLimiter de esa cuota
+    """
+    key = (hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16], model)
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(key)
+        if limiter is None:
+            limiter = RateLimiter(name=model, **kwargs)
+            _LIMITERS[key] = limiter
+        return limiter
+
+
+def rate_limits_from_env(prefix: str) -> Dict[str, Any]:
+    """
+    Lee los límites de una cuota desde variables de entorno:
+    {prefix}_RPM, {prefix}_TPM y {prefix}_MAX_CONCURRENCY.
+    
+    Args:
+        prefix: Prefijo de las variables (ej: "OPENAI", "OPENAI_EMBEDDING")
+        
+    Returns:
+        Argumentos para RateLimiter (None para los límites no configurados)
+    """
+    def read(name: str, cast: Callable[[str], Any]) -> Optional[Any]:
+        value = os.getenv(f"{prefix}_{name}")
+        return cast(value) if value else None
+    
+    return {
+        "requests_per_minute": read("RPM", float),
+        "tokens_per_minute": read("TPM", float),
+        "max_concurrency": read("MAX_CONCURRENCY", int),
+    }
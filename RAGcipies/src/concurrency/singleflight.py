@@ -0,0 +1,116 @@
+from threading import Event, Lock
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+
+R = TypeVar("R")
+
+
+class _Call(Generic[R]):
+    """Llamada en curso para una clave: resultado compartido por el líder y sus seguidores."""
+    
+    __slots__ = ("done", "result", "error", "waiters")
+    
+    def __init__(self) -> None:
+        self.done = Event()
+        self.result: Optional[R] = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight(Generic[R]):
+    """
+    Coalescing de llamadas idénticas en curso (patrón "single flight").
+    
+    La primera llamada con una clave (el líder) ejecuta la función; las
+    llamadas concurrentes con la misma clave esperan y reciben el mismo
+    resultado, o la misma excepción. Apenas termina el líder la clave se
+    libera, así que no es un cache: la siguiente llamada vuelve a ejecutar.
+    
+    Referencias:
+    - golang.org/x/sync/singleflight: https://pkg.go.dev/golang.org/x/sync/singleflight
+    """
+    
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, _Call[R]] = {}
+        self._lock = Lock()
+        self._executions = 0
+        self._shared = 0
+        self._timeouts = 0
+    
+    def do(self, key: Hashable, fn: Callable[[], R], timeout: Optional[float] = None) -> Tuple[R, bool]:
+        """
+        Ejecuta fn() o se une a la ejecución en curso con la misma clave.
+        
+        Args:
+            key: Clave que identifica llamadas equivalentes
+            fn: Función a ejecutar si no hay una llamada en curso
+            timeout: Segundos máximos que un seguidor espera al líder (None = sin límite).
+                     No aplica al líder, que ejecuta fn() en su propio hilo
+                     
+        Returns:
+            Tupla (resultado, shared). shared es True si el resultado vino de
+            la llamada de otro hilo
+            
+        Raises:
+            TimeoutError: Si un seguidor supera el timeout esperando al líder
+            Exception: La excepción que lanzó fn() (se propaga a todos los que esperaban)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+                self._executions += 1
+            else:
+                call.waiters += 1
+                leader = False
+        
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+                raise
+            finally:
+                # Liberar la clave antes de despertar a los seguidores: las llamadas
+                # que lleguen después ejecutan de nuevo en lugar de ver un resultado viejo
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+            return call.result, False
+        
+        finished = call.done.wait(timeout)
+        with self._lock:
+            call.waiters -= 1
+            if finished:
+                self._shared += 1
+            else:
+                self._timeouts += 1
+        if not finished:
+            raise TimeoutError(f"Timeout esperando la llamada en curso después de {timeout}s")
+        if call.error is not None:
+            raise call.error
+        return call.result, True
+    
+    def in_flight(self) -> int:
+        """Retorna el número de claves con una llamada en curso."""
+        with self._lock:
+            return len(self._calls)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna métricas del coalescing.
+        
+        Returns:
+            Diccionario con executions (llamadas reales), shared (llamadas que
+            reutilizaron otra en curso), timeouts, waiting e in_flight
+        """
+        with self._lock:
+            return {
+                "executions": self._executions,
+                "shared": self._shared,
+                "timeouts": self._timeouts,
+                "waiting": sum(call.waiters for call in self._calls.values()),
+                "in_flight": len(self._calls),
+            }
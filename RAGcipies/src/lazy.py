@@ -0,0 +1,115 @@
+from importlib import import_module
+from threading import Lock
+from typing import Any, Callable, Dict, Generic, Hashable, Iterator, MutableMapping, Optional, TypeVar, Union
+
+
+T = TypeVar("T")
+
+
+def load_object(path: str, package: Optional[str] = None) -> Any:
+    """
+    Importa un objeto a partir de una ruta "modulo:Nombre".
+    
+    Args:
+        path: Ruta del objeto (ej: ".openai:OpenAILLM" o "chromadb:Client")
+        package: Paquete base para resolver módulos relativos
+        
+    Returns:
+        El objeto importado
+        
+    Raises:
+        ImportError: Si el módulo (o alguna de sus dependencias) no está instalado
+        AttributeError: Si el módulo no define ese nombre
+    """
+    module_name, _, attr = path.partition(":")
+    return getattr(import_module(module_name, package), attr)
+
+
+class LazyRegistry(Generic[T]):
+    """
+    Registry de backends que importa cada implementación recién al usarla.
+    
+    Los valores se registran como "modulo:Clase" (o directamente como clase)
+    y se resuelven en el primer get(): un proceso que solo usa FAKE/DUMMY/
+    IN_MEMORY no paga la importación de openai, requests ni chromadb, y
+    tampoco falla si no están instalados.
+    """
+    
+    def __init__(self, package: str, entries: Dict[Hashable, Union[str, T]]):
+        """
+        Args:
+            package: Paquete base para las rutas relativas (normalmente __package__)
+            entries: Backend -> "modulo:Clase" o clase ya importada
+        """
+        self.package = package
+        self._entries: MutableMapping[Hashable, Union[str, T]] = dict(entries)
+        self._lock = Lock()
+    
+    def get(self, backend: Hashable) -> Optional[T]:
+        """
+        Retorna la clase del backend, importándola la primera vez.
+        
+        Args:
+            backend: Backend a resolver
+            
+        Returns:
+            La clase registrada o None si el backend no está registrado
+            
+        Raises:
+            ImportError: Si la dependencia del backend no está instalada
+        """
+        entry = self._entries.get(backend)
+        if not isinstance(entry, str):
+            return entry
+        
+        with self._lock:
+            entry = self._entries[backend]
+            if isinstance(entry, str):
+                entry = load_object(entry, self.package)
+                self._entries[backend] = entry
+        return entry
+    
+    def __setitem__(self, backend: Hashable, value: Union[str, T]) -> None:
+        self._entries[backend] = value
+    
+    def __contains__(self, backend: Hashable) -> bool:
+        return backend in self._entries
+    
+    def keys(self) -> Iterator[Hashable]:
+        """Retorna los backends registrados (sin importarlos)."""
+        return iter(list(self._entries))
+    
+    def is_loaded(self, backend: Hashable) -> bool:
+        """Indica si la clase del backend ya fue importada."""
+        return backend in self._entries and not isinstance(self._entries[backend], str)
+
+
+def lazy_exports(namespace: Dict[str, Any], exports: Dict[str, str]) -> Callable[[str], Any]:
+    """
+    Crea el __getattr__ de un paquete (PEP 562) que importa sus exports
+    opcionales recién cuando se acceden.
+    
+    Si la dependencia no está instalada, el nombre vale None (igual que las
+    importaciones opcionales con try/except que reemplaza).
+    
+    Args:
+        namespace: globals() del paquete (se cachea ahí el valor resuelto)
+        exports: Nombre -> "modulo:Nombre" relativo al paquete
+        
+    Returns:
+        Función __getattr__ para el módulo
+    """
+    package = namespace["__name__"]
+    
+    def __getattr__(name: str) -> Any:
+        path = exports.get(name)
+        if path is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        try:
+            value = load_object(path, package)
+        except ImportError:
+            value = None
+        namespace[name] = value
+        return value
+    
+    return __getattr__
@@ -1,23 +1,16 @@
 from .base import LLMClient, LLMBase
 from .dummy import DummyLLM
+from .hedged import HedgedLLM
+from .coalescing import SingleFlightLLM
+from .factory import create_llm_client, parse_hedged_backends, LLMBackend
+from ..lazy import lazy_exports
 
-# Importación opcional de OpenAI (puede no estar instalado)
-try:
-    from .openai import OpenAILLM
-    _OPENAI_AVAILABLE = True
-except ImportError:
-    OpenAILLM = None  # type: ignore
-    _OPENAI_AVAILABLE = False
-
-# Importación opcional de Ollama (puede no estar instalado)
-try:
-    from .ollama import OllamaLLM
-    _OLLAMA_AVAILABLE = True
-except ImportError:
-    OllamaLLM = None  # type: ignore
-    _OLLAMA_AVAILABLE = False
-
-from .factory import create_llm_client, LLMBackend
+# Importación diferida de los backends con dependencias opcionales (openai,
+# requests): se importan al acceder al nombre (valen None si no están instalados)
+__getattr__ = lazy_exports(globals(), {
+    "OpenAILLM": ".openai:OpenAILLM",
+    "OllamaLLM": ".ollama:OllamaLLM",
+})
 
 __all__ = [
     "LLMClient",
@@ -25,6 +18,9 @@ __all__ = [
     "DummyLLM",
     "OpenAILLM",
     "OllamaLLM",
+    "HedgedLLM",
+    "SingleFlightLLM",
     "create_llm_client",
+    "parse_hedged_backends",
     "LLMBackend",
 ]
\ No newline at end of file
@@ -1,12 +1,19 @@
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator
 
 class LLMBase(ABC):
     """
     Clase base abstracta para clientes de LLM.
     Define la interfaz común para generar respuestas.
+    
+    Attributes:
+        supports_system_prompt: Si es True, generate/generate_stream aceptan
+                                `system` (system prompt estático que se envía
+                                separado del prompt) y RAGPipeline se lo pasa
     """
     
+    supports_system_prompt = False
+    
     @abstractmethod
     def generate(
         self, 
@@ -29,6 +36,39 @@ class LLMBase(ABC):
         """
         pass
     
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        """
+        Genera una respuesta de forma incremental (streaming).
+        
+        La implementación por defecto no hace streaming real: llama a
+        generate() y emite la respuesta completa como un único fragmento.
+        Los backends que lo soportan la sobreescriben.
+        
+        Args:
+            prompt: El prompt completo con contexto y pregunta del usuario
+            **kwargs: Argumentos adicionales específicos del backend
+            
+        Yields:
+            Fragmentos de la respuesta en orden
+            
+        Raises:
+            ValueError: Si el prompt está vacío
+            RuntimeError: Si hay un error al llamar al LLM
+        """
+        yield self.generate(prompt, **kwargs)
+    
+    def warmup(self) -> None:
+        """
+        Precarga el modelo para que la primera consulta no pague el tiempo de carga.
+        
+        La implementación por defecto no hace nada (APIs remotas o dummy);
+        los backends con modelos locales la sobreescriben.
+        
+        Raises:
+            RuntimeError: Si el backend no pudo precargar el modelo
+        """
+        pass
+    
     def __call__(self, prompt: str, **kwargs) -> str:
         """
         Permite llamar al LLM como función: llm(prompt)
@@ -0,0 +1,67 @@
+from typing import Any, Dict, Iterator, Optional
+from ..concurrency.singleflight import SingleFlight
+from .base import LLMClient
+
+
+class SingleFlightLLM(LLMClient):
+    """
+    Wrapper que une llamadas concurrentes a generate() con el mismo prompt
+    (y los mismos argumentos) en una sola generación (ver SingleFlight).
+    
+    Todas las llamadas unidas reciben exactamente la misma respuesta, aun
+    con temperature > 0. generate_stream() no se une: cada stream necesita
+    su propia conexión con el backend.
+    """
+    
+    def __init__(self, llm: LLMClient, timeout: Optional[float] = None):
+        """
+        Args:
+            llm: Cliente LLM a envolver
+            timeout: Segundos máximos que una llamada espera a otra idéntica en curso
+                     (None = sin límite)
+        """
+        self.inner = llm
+        self.model = getattr(llm, "model", "unknown")
+        self.supports_system_prompt = getattr(llm, "supports_system_prompt", False)
+        self.timeout = timeout
+        self._flight: SingleFlight[str] = SingleFlight()
+    
+    def generate(self, prompt: str, **kwargs) -> str:
+        """
+        Genera una respuesta, compartiendo la llamada si ya hay una idéntica en curso.
+        
+        Args:
+            prompt: El prompt completo con contexto y pregunta
+            **kwargs: Argumentos del backend (forman parte de la clave; si
+                      alguno no es hasheable, ej: una lista, la llamada no se une)
+            
+        Returns:
+            La respuesta generada por el LLM
+            
+        Raises:
+            TimeoutError: Si se supera el timeout esperando la llamada en curso
+            RuntimeError: Si la llamada al LLM falla (se propaga a todos los que esperaban)
+        """
+        key = (prompt, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return self.inner.generate(prompt, **kwargs)
+        response, _ = self._flight.do(key, lambda: self.inner.generate(prompt, **kwargs), timeout=self.timeout)
+        return response
+    
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        """Delega en el cliente envuelto (el streaming no se une)."""
+        return self.inner.generate_stream(prompt, **kwargs)
+    
+    def warmup(self) -> None:
+        """Precarga el modelo envuelto."""
+        self.inner.warmup()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Retorna las métricas del coalescing (ver SingleFlight.stats)."""
+        return self._flight.stats()
+    
+    def get_model_info(self) -> Dict[str, Any]:
+        """Retorna la información del cliente envuelto."""
+        return self.inner.get_model_info()
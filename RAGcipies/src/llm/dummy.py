@@ -1,3 +1,5 @@
+from typing import Optional
+from ..metrics.backends import llm_metrics
 from .base import LLMClient
 
 
@@ -8,12 +10,18 @@ class DummyLLM(LLMClient):
     Útil para probar el pipeline RAG sin consumir tokens.
     """
     
-    def generate(self, prompt: str) -> str:
+    supports_system_prompt = True
+    
+    def __init__(self):
+        self._metrics = llm_metrics(self)
+    
+    def generate(self, prompt: str, system: Optional[str] = None) -> str:
         """
         Genera una respuesta dummy basada en el prompt.
         
         Args:
             prompt: El prompt completo
+            system: System prompt opcional (se antepone al prompt)
             
         Returns:
             Una respuesta placeholder
@@ -21,10 +29,14 @@ class DummyLLM(LLMClient):
         if not prompt or not prompt.strip():
             raise ValueError("El prompt no puede estar vacío")
         
+        if system:
+            prompt = f"{system}\n\n{prompt}"
+        
         # Respuesta dummy que indica que recibió el prompt
-        return (
-            "[Dummy LLM Response]\n\n"
-            "Este es un placeholder. El prompt recibido fue:\n\n"
-            f"{prompt[:200]}...\n\n"
-            "(En producción, aquí aparecería la respuesta real del LLM)"
-        )
\ No newline at end of file
+        with self._metrics.call():
+            return (
+                "[Dummy LLM Response]\n\n"
+                "Este es un placeholder. El prompt recibido fue:\n\n"
+                f"{prompt[:200]}...\n\n"
+                "(En producción, aquí aparecería la respuesta real del LLM)"
+            )
\ No newline at end of file
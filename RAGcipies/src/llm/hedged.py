@@ -0,0 +1,355 @@
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, Optional
+import queue
+import threading
+import time
+from ..metrics.backends import hedged_metrics
+from .base import LLMClient
+
+
+# Marca de fin de stream en la cola de fragmentos de un intento
+_END = object()
+
+
+class _Attempt:
+    """
+    Un intento de generación contra un backend, ejecutado en su propio hilo.
+    
+    Consume generate_stream() del backend y publica los fragmentos en
+    `pieces`. Los eventos ("first", "done", "error") se notifican en la cola
+    compartida `signals` para que HedgedLLM elija al ganador.
+    
+    La cancelación es cooperativa (best-effort): el hilo la ve recién al
+    recibir el siguiente fragmento y ahí cierra el stream del backend. Con
+    streaming real (Ollama, OpenAI) eso cierra la conexión HTTP y el
+    servidor deja de generar tras un token más. Con backends sin streaming
+    (el generate_stream por defecto envuelve generate()) no hay nada que
+    cortar: el intento perdedor corre hasta el final.
+    """
+    
+    def __init__(self, index: int, backend: LLMClient, prompt: str, kwargs: Dict[str, Any], signals: "queue.Queue"):
+        self.index = index
+        self.backend = backend
+        self.pieces: "queue.Queue" = queue.Queue()
+        self.error: Optional[Exception] = None
+        self._cancelled = threading.Event()
+        self._signals = signals
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(prompt, kwargs),
+            name=f"hedged-llm-{index}",
+            daemon=True
+        )
+        self._thread.start()
+    
+    def cancel(self) -> None:
+        """Pide al intento que deje de consumir el stream en el próximo fragmento."""
+        self._cancelled.set()
+    
+    def _run(self, prompt: str, kwargs: Dict[str, Any]) -> None:
+        stream = None
+        try:
+            stream = self.backend.generate_stream(prompt, **kwargs)
+            first = True
+            for piece in stream:
+                if self._cancelled.is_set():
+                    return
+                self.pieces.put(piece)
+                if first:
+                    self._signals.put((self, "first"))
+                    first = False
+        except Exception as e:
+            self.error = e
+            self.pieces.put(e)
+            if not self._cancelled.is_set():
+                self._signals.put((self, "error"))
+            return
+        finally:
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+        
+        self.pieces.put(_END)
+        if not self._cancelled.is_set():
+            self._signals.put((self, "done"))
+
+
+class HedgedLLM(LLMClient):
+    """
+    Cliente LLM compuesto con requests "hedged" y cadena de fallback.
+    
+    Envía cada prompt al primer backend. Si no respondió dentro del percentil
+    `hedge_percentile` de las latencias recientes, lanza una copia contra el
+    siguiente backend y usa la primera respuesta exitosa; el perdedor se
+    cancela (best-effort, ver _Attempt: solo los backends con streaming real
+    dejan de generar). Si un backend falla, se pasa inmediatamente al
+    siguiente. Toda la request está acotada por `deadline` segundos.
+    
+    Ejemplo: dos hosts de Ollama y OpenAI como último recurso.
+        >>> llm = HedgedLLM([
+        ...     OllamaLLM(base_url="http://gpu-1:11434"),
+        ...     OllamaLLM(base_url="http://gpu-2:11434"),
+        ...     OpenAILLM(),
+        ... ])
+        
+    Referencias:
+    - The Tail at Scale (Dean & Barroso): https://research.google/pubs/the-tail-at-scale/
+    """
+    
+    def __init__(
+        self,
+        backends: List[LLMClient],
+        hedge_percentile: float = 95.0,
+        initial_hedge_delay: float = 2.0,
+        min_hedge_delay: float = 0.05,
+        min_samples: int = 20,
+        deadline: float = 120.0,
+        window: int = 512
+    ):
+        """
+        Args:
+            backends: Backends en orden de preferencia (el primero es el primario)
+            hedge_percentile: Percentil (0-100) de la latencia observada a partir
+                              del cual se lanza la request duplicada
+            initial_hedge_delay: Segundos de espera antes de duplicar mientras
+                                 no haya suficientes muestras de latencia
+            min_hedge_delay: Espera mínima antes de duplicar (evita duplicar
+                             todas las requests cuando la latencia es muy baja)
+            min_samples: Muestras necesarias para usar el percentil observado
+            deadline: Tiempo máximo en segundos por request
+            window: Cantidad de latencias recientes a conservar por modo
+            
+        Raises:
+            ValueError: Si no hay backends o algún parámetro es inválido
+        """
+        if not backends:
+            raise ValueError("HedgedLLM necesita al menos un backend")
+        if not 0 < hedge_percentile <= 100:
+            raise ValueError(f"hedge_percentile debe estar entre 0 y 100, recibido: {hedge_percentile}")
+        if deadline <= 0:
+            raise ValueError(f"deadline debe ser mayor a 0, recibido: {deadline}")
+        
+        self.backends = list(backends)
+        # `system` solo se acepta si cualquier backend de la cadena puede recibirlo
+        self.supports_system_prompt = all(
+            getattr(backend, "supports_system_prompt", False) for backend in self.backends
+        )
+        self.hedge_percentile = hedge_percentile
+        self.initial_hedge_delay = initial_hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.min_samples = min_samples
+        self.deadline = deadline
+        
+        # Latencias hasta la respuesta completa (generate) y hasta el primer fragmento (stream)
+        self._latencies: Dict[str, Deque[float]] = {
+            "done": deque(maxlen=window),
+            "first": deque(maxlen=window),
+        }
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "hedges": 0, "fallbacks": 0, "deadline_exceeded": 0, "failures": 0}
+        self._wins = [0] * len(self.backends)
+        # Los mismos eventos, publicados en /metrics (ver metrics.backends)
+        self._events, self._win_series, self._error_series = hedged_metrics(self.backends)
+    
+    def hedge_delay(self, mode: str = "done") -> float:
+        """
+        Segundos que se espera al backend en curso antes de duplicar la request.
+        
+        Args:
+            mode: "done" para generate(), "first" para generate_stream()
+            
+        Returns:
+            El percentil configurado de las latencias recientes (o
+            initial_hedge_delay si todavía no hay suficientes muestras)
+        """
+        with self._lock:
+            samples = sorted(self._latencies[mode])
+        if len(samples) < self.min_samples:
+            return self.initial_hedge_delay
+        index = min(len(samples) - 1, max(0, int(round(self.hedge_percentile / 100.0 * len(samples))) - 1))
+        return max(self.min_hedge_delay, samples[index])
+    
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+        self._events[key].inc()
+    
+    def _race(self, prompt: str, kwargs: Dict[str, Any], mode: str, deadline_at: float) -> _Attempt:
+        """
+        Ejecuta la carrera entre backends hasta que un intento alcanza `mode`
+        ("done" = respuesta completa, "first" = primer fragmento).
+        
+        Returns:
+            El intento ganador (los demás ya fueron cancelados)
+            
+        Raises:
+            RuntimeError: Si todos los backends fallan o se vence el deadline
+        """
+        if not prompt or not prompt.strip():
+            raise ValueError("El prompt no puede estar vacío")
+        
+        self._count("requests")
+        signals: "queue.Queue" = queue.Queue()
+        attempts: List[_Attempt] = []
+        errors: List[str] = []
+        delay = self.hedge_delay(mode)
+        
+        def launch() -> None:
+            index = len(attempts)
+            attempts.append(_Attempt(index, self.backends[index], prompt, kwargs, signals))
+        
+        def cancel_all(winner: Optional[_Attempt] = None) -> None:
+            for attempt in attempts:
+                if attempt is not winner:
+                    attempt.cancel()
+        
+        launch()
+        hedge_at = time.monotonic() + delay
+        active = 1
+        while True:
+            now = time.monotonic()
+            if now >= deadline_at:
+                cancel_all()
+                self._count("deadline_exceeded")
+                raise RuntimeError(
+                    f"HedgedLLM: se venció el deadline de {self.deadline:.1f}s "
+                    f"({len(attempts)} backend(s) intentados)"
+                )
+            
+            can_hedge = len(attempts) < len(self.backends)
+            timeout = min(deadline_at, hedge_at) - now if can_hedge else deadline_at - now
+            try:
+                attempt, event = signals.get(timeout=max(0.0, timeout))
+            except queue.Empty:
+                if can_hedge and time.monotonic() >= hedge_at:
+                    # El backend en curso está tardando más que el percentil: duplicar
+                    launch()
+                    active += 1
+                    hedge_at = time.monotonic() + delay
+                    self._count("hedges")
+                continue
+            
+            if event == "error":
+                active -= 1
+                errors.append(f"{attempt.backend.__class__.__name__}[{attempt.index}]: {attempt.error}")
+                self._error_series[attempt.index].inc()
+                if len(attempts) < len(self.backends):
+                    launch()
+                    active += 1
+                    hedge_at = time.monotonic() + delay
+                    self._count("fallbacks")
+                elif active == 0:
+                    self._count("failures")
+                    raise RuntimeError(f"HedgedLLM: fallaron todos los backends: {'; '.join(errors)}")
+                continue
+            
+            if event == mode or event == "done":
+                cancel_all(winner=attempt)
+                with self._lock:
+                    self._wins[attempt.index] += 1
+                self._win_series[attempt.index].inc()
+                return attempt
+    
+    def generate(self, prompt: str, **kwargs) -> str:
+        """
+        Genera una respuesta con hedging y fallback entre los backends.
+        
+        Args:
+            prompt: El prompt completo con contexto y pregunta
+            **kwargs: Argumentos que se pasan a cada backend (ej: system)
+            
+        Returns:
+            La primera respuesta completa exitosa
+            
+        Raises:
+            ValueError: Si el prompt está vacío
+            RuntimeError: Si todos los backends fallan o se vence el deadline
+        """
+        started = time.monotonic()
+        winner = self._race(prompt, kwargs, "done", started + self.deadline)
+        with self._lock:
+            self._latencies["done"].append(time.monotonic() - started)
+        
+        pieces = []
+        while True:
+            piece = winner.pieces.get()
+            if piece is _END:
+                break
+            pieces.append(piece)
+        return "".join(pieces).strip()
+    
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        """
+        Genera una respuesta en streaming. El hedging se decide por el tiempo
+        hasta el primer fragmento; una vez elegido el ganador, un error a
+        mitad de la respuesta se propaga (no se puede cambiar de backend sin
+        repetir texto ya emitido).
+        
+        Args:
+            prompt: El prompt completo con contexto y pregunta
+            **kwargs: Argumentos que se pasan a cada backend (ej: system)
+            
+        Yields:
+            Fragmentos de la respuesta del backend ganador
+            
+        Raises:
+            ValueError: Si el prompt está vacío
+            RuntimeError: Si todos los backends fallan o se vence el deadline
+        """
+        started = time.monotonic()
+        deadline_at = started + self.deadline
+        winner = self._race(prompt, kwargs, "first", deadline_at)
+        with self._lock:
+            self._latencies["first"].append(time.monotonic() - started)
+        
+        try:
+            while True:
+                try:
+                    piece = winner.pieces.get(timeout=max(0.0, deadline_at - time.monotonic()))
+                except queue.Empty:
+                    self._count("deadline_exceeded")
+                    raise RuntimeError(f"HedgedLLM: se venció el deadline de {self.deadline:.1f}s")
+                if piece is _END:
+                    return
+                if isinstance(piece, Exception):
+                    raise RuntimeError(f"HedgedLLM: el backend falló a mitad de la respuesta: {piece}")
+                yield piece
+        finally:
+            # Si el consumidor cierra el stream antes de tiempo, cortar también al backend
+            winner.cancel()
+    
+    def warmup(self) -> None:
+        """Precarga todos los backends configurados."""
+        for backend in self.backends:
+            backend.warmup()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna métricas de hedging.
+        
+        Returns:
+            Diccionario con requests, hedges, fallbacks, deadline_exceeded,
+            failures, wins (por backend) y el hedge_delay actual. Salvo
+            hedge_delay, también se publican en el REGISTRY
+            (llm_hedged_events_total, llm_hedged_wins_total,
+            llm_hedged_attempt_errors_total)
+        """
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["wins"] = list(self._wins)
+        stats["hedge_delay"] = self.hedge_delay("done")
+        return stats
+    
+    def get_model_info(self) -> Dict[str, Any]:
+        """
+        Retorna información del cliente compuesto y de cada backend.
+        
+        Returns:
+            Diccionario con el backend, los modelos encadenados y el percentil de hedging
+        """
+        return {
+            "backend": self.__class__.__name__,
+            "model": [backend.get_model_info() for backend in self.backends],
+            "hedge_percentile": self.hedge_percentile,
+            "deadline": self.deadline,
+        }
@@ -1,9 +1,16 @@
-from typing import Optional
+from typing import Optional, Iterator, Dict, Any, Union
 import os
+import json
 import requests
+from ..metrics.backends import llm_metrics
 from .base import LLMClient
 
 
+# keep_alive del warm-up si no hay uno configurado: con el default del servidor
+# (~5 minutos) un servidor sin tráfico descarga el modelo recién precargado
+WARMUP_KEEP_ALIVE = "24h"
+
+
 class OllamaLLM(LLMClient):
     """
     Cliente LLM usando Ollama (modelos locales).
@@ -14,12 +21,16 @@ class OllamaLLM(LLMClient):
     - https://github.com/ollama/ollama
     """
     
+    supports_system_prompt = True
+    
     def __init__(
         self,
         model: str = "llama2",
         base_url: str = "http://localhost:11434",
         temperature: float = 0.7,
-        timeout: int = 300
+        timeout: int = 300,
+        keep_alive: Optional[Union[str, int]] = None,
+        num_ctx: Optional[int] = None
     ):
         """
         Args:
@@ -27,18 +38,77 @@ class OllamaLLM(LLMClient):
             base_url: URL base de la API de Ollama
             temperature: Controla la aleatoriedad (0.0 = determinista, 1.0 = muy creativo)
             timeout: Timeout en segundos para las peticiones HTTP (default: 300 = 5 minutos)
+            keep_alive: Cuánto tiempo mantiene Ollama el modelo cargado tras cada request
+                        (ej: "30m", 3600, -1 = siempre). None usa el default del servidor
+            num_ctx: Tamaño de la ventana de contexto. Debe ser fijo entre requests:
+                     si cambia, Ollama recarga el modelo y pierde el cache KV
         """
         self.model = model
         self.base_url = base_url.rstrip("/")
         self.temperature = temperature
         self.timeout = timeout
+        self.keep_alive = keep_alive
+        self.num_ctx = num_ctx
+        self._metrics = llm_metrics(self)
+    
+    def _payload(self, prompt: str, system: Optional[str], stream: bool) -> Dict[str, Any]:
+        """
+        Arma el body de /api/generate.
+        
+        El system prompt va en su propio campo: Ollama lo coloca siempre al
+        principio del prompt renderizado, así el prefijo es idéntico entre
+        requests y el cache KV del servidor lo reutiliza sin volver a
+        procesarlo (solo se procesa la parte variable en cada consulta).
+        """
+        options: Dict[str, Any] = {"temperature": self.temperature}
+        if self.num_ctx is not None:
+            options["num_ctx"] = self.num_ctx
+        
+        payload: Dict[str, Any] = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": stream,
+            "options": options
+        }
+        if system:
+            payload["system"] = system
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        return payload
+    
+    def warmup(self) -> None:
+        """
+        Carga el modelo en Ollama sin generar texto (request sin prompt a
+        /api/generate). Usa el mismo num_ctx que las consultas para que
+        Ollama no tenga que recargar el modelo en la primera request, y el
+        keep_alive configurado o, si no hay, WARMUP_KEEP_ALIVE.
+        
+        Raises:
+            RuntimeError: Si Ollama no está disponible o el modelo no está descargado
+        """
+        payload = self._payload("", None, stream=False)
+        del payload["prompt"]
+        payload.setdefault("keep_alive", WARMUP_KEEP_ALIVE)
+        try:
+            response = requests.post(
+                f"{self.base_url}/api/generate",
+                json=payload,
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            raise RuntimeError(
+                f"Error al precargar el modelo {self.model} en Ollama: {e}. "
+                f"Asegúrate de que Ollama esté corriendo en {self.base_url}"
+            )
     
-    def generate(self, prompt: str) -> str:
+    def generate(self, prompt: str, system: Optional[str] = None) -> str:
         """
         Genera una respuesta usando la API de Ollama.
         
         Args:
             prompt: El prompt completo con contexto y pregunta
+            system: System prompt estático opcional (ver _payload)
             
         Returns:
             La respuesta generada por el LLM
@@ -50,28 +120,72 @@ class OllamaLLM(LLMClient):
         if not prompt or not prompt.strip():
             raise ValueError("El prompt no puede estar vacío")
         
-        try:
-            response = requests.post(
-                f"{self.base_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": self.temperature
-                    }
-                },
-                timeout=self.timeout
-            )
+        with self._metrics.call():
+            try:
+                response = requests.post(
+                    f"{self.base_url}/api/generate",
+                    json=self._payload(prompt, system, stream=False),
+                    timeout=self.timeout
+                )
+                
+                response.raise_for_status()
+                result = response.json()
+                
+                return result.get("response", "").strip()
+            except requests.exceptions.RequestException as e:
+                raise RuntimeError(
+                    f"Error al generar respuesta con Ollama: {e}. "
+                    f"Asegúrate de que Ollama esté corriendo en {self.base_url}"
+                )
+            except Exception as e:
+                raise RuntimeError(f"Error inesperado al usar Ollama: {e}")
+    
+    def generate_stream(self, prompt: str, system: Optional[str] = None) -> Iterator[str]:
+        """
+        Genera una respuesta en streaming usando la API de Ollama (stream=True).
+        
+        Args:
+            prompt: El prompt completo con contexto y pregunta
+            system: System prompt estático opcional (ver _payload)
             
-            response.raise_for_status()
-            result = response.json()
+        Yields:
+            Fragmentos de la respuesta a medida que Ollama los produce
             
-            return result.get("response", "").strip()
-        except requests.exceptions.RequestException as e:
-            raise RuntimeError(
-                f"Error al generar respuesta con Ollama: {e}. "
-                f"Asegúrate de que Ollama esté corriendo en {self.base_url}"
-            )
-        except Exception as e:
-            raise RuntimeError(f"Error inesperado al usar Ollama: {e}")
\ No newline at end of file
+        Raises:
+            ValueError: Si el prompt está vacío
+            RuntimeError: Si hay un error al llamar a la API o Ollama no está disponible
+        """
+        if not prompt or not prompt.strip():
+            raise ValueError("El prompt no puede estar vacío")
+        
+        with self._metrics.call():
+            try:
+                with requests.post(
+                    f"{self.base_url}/api/generate",
+                    json=self._payload(prompt, system, stream=True),
+                    timeout=self.timeout,
+                    stream=True
+                ) as response:
+                    response.raise_for_status()
+                    
+                    # Ollama emite un objeto JSON por línea hasta "done": true
+                    for line in response.iter_lines():
+                        if not line:
+                            continue
+                        event = json.loads(line)
+                        if event.get("error"):
+                            raise RuntimeError(event["error"])
+                        piece = event.get("response", "")
+                        if piece:
+                            yield piece
+                        if event.get("done"):
+                            break
+            except requests.exceptions.RequestException as e:
+                raise RuntimeError(
+                    f"Error al generar respuesta con Ollama: {e}. "
+                    f"Asegúrate de que Ollama esté corriendo en {self.base_url}"
+                )
+            except RuntimeError:
+                raise
+            except Exception as e:
+                raise RuntimeError(f"Error inesperado al usar Ollama: {e}")
\ No newline at end of file
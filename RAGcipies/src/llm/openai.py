@@ -1,6 +1,8 @@
-from typing import Optional
+from typing import Optional, Iterator, List, Dict
 import os
 from openai import OpenAI
+from ..concurrency.ratelimit import RateLimiter, RateLimitExceeded, estimate_tokens, get_rate_limiter, rate_limits_from_env
+from ..metrics.backends import llm_metrics
 from .base import LLMClient
 
 
@@ -9,16 +11,26 @@ class OpenAILLM(LLMClient):
     Cliente LLM usando la API de OpenAI.
     Requiere OPENAI_API_KEY en las variables de entorno.
     
+    Las requests pasan por un RateLimiter compartido por API key y modelo
+    (requests/min, tokens/min y concurrencia máxima, configurables con
+    OPENAI_RPM, OPENAI_TPM y OPENAI_MAX_CONCURRENCY) que reintenta los 429
+    respetando el retry-after del servidor.
+    
     Referencias:
     - https://platform.openai.com/docs/api-reference/chat
+    - https://platform.openai.com/docs/guides/rate-limits
     - https://platform.openai.com/docs/guides/text-generation
     """
     
+    supports_system_prompt = True
+    
     def __init__(
         self, 
         model: str = "gpt-4o-mini",
         temperature: float = 0.7,
-        max_tokens: Optional[int] = None
+        max_tokens: Optional[int] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_retries: int = 5
     ):
         """
         Args:
@@ -26,6 +38,9 @@ class OpenAILLM(LLMClient):
                    Opciones: "gpt-4o-mini, "gpt-4", "gpt-4-turbo", etc.
             temperature: Controla la aleatoriedad (0.0 = determinista, 1.0 = muy creativo)
             max_tokens: Máximo número de tokens en la respuesta (None = sin límite)
+            rate_limiter: Limitador a usar (default: el compartido de la API key y
+                          el modelo, con límites leídos de OPENAI_RPM/TPM/MAX_CONCURRENCY)
+            max_retries: Reintentos máximos ante 429
         """
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
@@ -34,41 +49,118 @@ class OpenAILLM(LLMClient):
                 "Configúrala en las variables de entorno o en el archivo .env"
             )
         
-        self.client = OpenAI(api_key=api_key)
+        # El RateLimiter reintenta los 429 (coordinado entre todos los clientes) y
+        # los errores transitorios (5xx, timeouts, conexión), en lugar del SDK
+        self.client = OpenAI(api_key=api_key, max_retries=0)
         self.model = model
         self.temperature = temperature
         self.max_tokens = max_tokens
+        self.max_retries = max_retries
+        self.rate_limiter = rate_limiter or get_rate_limiter(api_key, model, **rate_limits_from_env("OPENAI"))
+        self._metrics = llm_metrics(self)
+    
+    def _estimate_tokens(self, prompt: str, system: Optional[str]) -> int:
+        """Tokens a reservar: prompt estimado más la respuesta máxima."""
+        return estimate_tokens(prompt) + estimate_tokens(system or "") + (self.max_tokens or 0)
+    
+    def _messages(self, prompt: str, system: Optional[str]) -> List[Dict[str, str]]:
+        """
+        Arma la lista de mensajes del chat.
+        El system prompt va primero para que el prefijo sea estable entre
+        requests y aproveche el prompt caching de la API.
+        """
+        messages = []
+        if system:
+            messages.append({"role": "system", "content": system})
+        messages.append({"role": "user", "content": prompt})
+        return messages
     
-    def generate(self, prompt: str) -> str:
+    def generate(self, prompt: str, system: Optional[str] = None) -> str:
         """
         Genera una respuesta usando la API de OpenAI.
         
         Args:
             prompt: El prompt completo con contexto y pregunta
+            system: System prompt estático opcional
             
         Returns:
             La respuesta generada por el LLM
             
         Raises:
             ValueError: Si el prompt está vacío
+            RateLimitExceeded: Si la API sigue respondiendo 429 tras los reintentos
             RuntimeError: Si hay un error al llamar a la API
         """
         if not prompt or not prompt.strip():
             raise ValueError("El prompt no puede estar vacío")
         
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=self.temperature,
-                max_tokens=self.max_tokens
-            )
+        with self._metrics.call():
+            tokens = self._estimate_tokens(prompt, system)
+            try:
+                response = self.rate_limiter.call(
+                    lambda: self.client.chat.completions.create(
+                        model=self.model,
+                        messages=self._messages(prompt, system),
+                        temperature=self.temperature,
+                        max_tokens=self.max_tokens
+                    ),
+                    tokens=tokens,
+                    max_retries=self.max_retries
+                )
+                usage = getattr(response, "usage", None)
+                if usage is not None and getattr(usage, "total_tokens", None):
+                    self.rate_limiter.record_tokens(tokens, usage.total_tokens)
+                
+                return response.choices[0].message.content.strip()
+            except RateLimitExceeded:
+                raise
+            except Exception as e:
+                raise RuntimeError(f"Error al generar respuesta con OpenAI: {e}")
+    
+    def generate_stream(self, prompt: str, system: Optional[str] = None) -> Iterator[str]:
+        """
+        Genera una respuesta en streaming usando la API de OpenAI (stream=True).
+        
+        Args:
+            prompt: El prompt completo con contexto y pregunta
+            system: System prompt estático opcional
+            
+        Yields:
+            Fragmentos de la respuesta a medida que llegan
             
-            return response.choices[0].message.content.strip()
-        except Exception as e:
-            raise RuntimeError(f"Error al generar respuesta con OpenAI: {e}")
\ No newline at end of file
+        Raises:
+            ValueError: Si el prompt está vacío
+            RateLimitExceeded: Si la API sigue respondiendo 429 tras los reintentos
+            RuntimeError: Si hay un error al llamar a la API
+        """
+        if not prompt or not prompt.strip():
+            raise ValueError("El prompt no puede estar vacío")
+        
+        with self._metrics.call():
+            try:
+                # Los reintentos cubren la apertura del stream; el lugar de
+                # concurrencia queda ocupado hasta que el stream se consume o se cierra
+                stream = self.rate_limiter.stream(
+                    lambda: self.client.chat.completions.create(
+                        model=self.model,
+                        messages=self._messages(prompt, system),
+                        temperature=self.temperature,
+                        max_tokens=self.max_tokens,
+                        stream=True
+                    ),
+                    tokens=self._estimate_tokens(prompt, system),
+                    max_retries=self.max_retries
+                )
+                try:
+                    for event in stream:
+                        if not event.choices:
+                            continue
+                        piece = event.choices[0].delta.content
+                        if piece:
+                            yield piece
+                finally:
+                    stream.close()
+            except RateLimitExceeded:
+                raise
+            except Exception as e:
+                raise RuntimeError(f"Error al generar respuesta con OpenAI: {e}")
\ No newline at end of file
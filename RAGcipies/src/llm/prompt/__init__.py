@@ -1,3 +1,14 @@
-from .builder import PromptBuilder, build_prompt
+from .builder import PromptBuilder, PromptParts, build_prompt
+from .tokens import TokenEstimator, CharRatioTokenEstimator, TiktokenTokenEstimator
+from .budget import PackedContext, pack_context
 
-__all__ = ["PromptBuilder", "build_prompt"]
\ No newline at end of file
+__all__ = [
+    "PromptBuilder",
+    "PromptParts",
+    "build_prompt",
+    "TokenEstimator",
+    "CharRatioTokenEstimator",
+    "TiktokenTokenEstimator",
+    "PackedContext",
+    "pack_context",
+]
\ No newline at end of file
@@ -0,0 +1,115 @@
+from dataclasses import dataclass, field
+from typing import List
+import re
+from RAGcipies.src.rag.models import Chunk
+from RAGcipies.src.rag.vector_store import ScoredChunk
+from .tokens import TokenEstimator
+
+
+# Fin de oración (. ! ? …) o salto de línea: puntos de corte seguros para truncar
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+|\n+")
+
+
+@dataclass
+class PackedContext:
+    """
+    Resultado de empaquetar chunks dentro de un presupuesto de tokens.
+    
+    Attributes:
+        scored_chunks: Chunks seleccionados (los truncados son copias)
+        tokens_used: Tokens estimados del texto de los chunks seleccionados
+        tokens_saved: Tokens de contexto que se dejaron fuera
+        duplicates_dropped: Chunks descartados por repetir document_id
+        truncated_ids: IDs de los chunks que se truncaron
+    """
+    scored_chunks: List[ScoredChunk]
+    tokens_used: int = 0
+    tokens_saved: int = 0
+    duplicates_dropped: int = 0
+    truncated_ids: List[str] = field(default_factory=list)
+
+
+def _truncate_sentences(text: str, budget: int, estimator: TokenEstimator) -> str:
+    """Retorna el prefijo más largo de oraciones completas que entra en el presupuesto."""
+    kept = ""
+    for match in _SENTENCE_END.finditer(text):
+        candidate = text[:match.start()]
+        if estimator.count(candidate) > budget:
+            break
+        kept = candidate
+    return kept.rstrip()
+
+
+def pack_context(
+    scored_chunks: List[ScoredChunk],
+    max_tokens: int,
+    estimator: TokenEstimator,
+    min_chunk_tokens: int = 16
+) -> PackedContext:
+    """
+    Selecciona chunks por score hasta agotar un presupuesto de tokens.
+    
+    - Los chunks con un document_id ya incluido se descartan (queda el de mayor score).
+    - Los chunks que entran completos se incluyen tal cual.
+    - Los que no entran se truncan en un límite de oración si quedan al
+      menos `min_chunk_tokens`; si no se pueden truncar se saltean y se
+      sigue con los siguientes, que pueden entrar en lo que queda.
+      
+    Args:
+        scored_chunks: Chunks recuperados
+        max_tokens: Presupuesto de tokens para el texto del contexto
+        estimator: Estimador de tokens
+        min_chunk_tokens: Mínimo de tokens para que valga la pena truncar un chunk
+        
+    Returns:
+        PackedContext con los chunks seleccionados y las métricas del empaquetado
+        
+    Raises:
+        ValueError: Si max_tokens no es positivo
+    """
+    if max_tokens <= 0:
+        raise ValueError(f"max_tokens debe ser mayor a 0, recibido: {max_tokens}")
+    
+    ordered = sorted(scored_chunks, key=lambda sc: sc.score, reverse=True)
+    packed = PackedContext(scored_chunks=[])
+    seen_documents = set()
+    total_tokens = 0
+    remaining = max_tokens
+    
+    for scored_chunk in ordered:
+        chunk = scored_chunk.chunk
+        tokens = estimator.count(chunk.text)
+        total_tokens += tokens
+        
+        if chunk.document_id in seen_documents:
+            packed.duplicates_dropped += 1
+            continue
+        seen_documents.add(chunk.document_id)
+        
+        if remaining <= 0:
+            continue
+        
+        if tokens <= remaining:
+            packed.scored_chunks.append(scored_chunk)
+            packed.tokens_used += tokens
+            remaining -= tokens
+            continue
+        
+        if remaining >= min_chunk_tokens:
+            text = _truncate_sentences(chunk.text, remaining, estimator)
+            if text:
+                truncated = Chunk(
+                    id=chunk.id,
+                    document_id=chunk.document_id,
+                    text=text,
+                    embedding=chunk.embedding,
+                    metadata={**(chunk.metadata or {}), "truncated": True}
+                )
+                used = estimator.count(text)
+                packed.scored_chunks.append(ScoredChunk(chunk=truncated, score=scored_chunk.score))
+                packed.truncated_ids.append(chunk.id)
+                packed.tokens_used += used
+                remaining -= used
+    
+    packed.tokens_saved = total_tokens - packed.tokens_used
+    return packed
@@ -1,41 +1,237 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+from dataclasses import dataclass
 from pathlib import Path
+from threading import Lock
+from functools import lru_cache
+import os
+import time
 import yaml
 from RAGcipies.src.rag.vector_store import ScoredChunk
+from .tokens import TokenEstimator, CharRatioTokenEstimator
+from .budget import PackedContext, pack_context
+
+
+# Ruta por defecto: mismo directorio que este archivo
+DEFAULT_TEMPLATE_PATH = Path(__file__).parent / "prompt.yaml"
+
+
+@dataclass(frozen=True)
+class PromptParts:
+    """
+    Prompt separado en parte estática (system) y parte variable (user).
+    
+    El system prompt es idéntico en todas las requests que usan el mismo
+    template, por lo que los servidores con cache de prompt/KV (Ollama,
+    llama.cpp, OpenAI) solo procesan esa parte una vez.
+    
+    Attributes:
+        system: Instrucción de sistema + instrucciones del template
+        user: Contexto recuperado + pregunta del usuario
+    """
+    system: str
+    user: str
+
+
+class CompiledTemplate:
+    """
+    Template de prompt precompilado.
+    
+    Todas las partes estáticas (instrucción de sistema, headers,
+    instrucciones) se renderizan una sola vez al compilar; en cada
+    request solo se arma el contexto y se inserta la query.
+    
+    Layout del prompt plano (idéntico al de las versiones anteriores):
+        prefix + context_section + middle + query + suffix
+        
+    Layout separado (ver PromptParts):
+        system = system_prompt
+        user   = context_section + question_prefix + query + suffix
+    """
+    
+    def __init__(self, template: Dict[str, Any]):
+        """
+        Args:
+            template: Diccionario leído del archivo YAML
+        """
+        self.raw = template
+        self.include_scores = template.get("include_scores", False)
+        self.chunk_separator = template.get("chunk_separator", "\n\n---\n\n")
+        self.context_header = template.get("context_header", "CONTEXTO:") + "\n\n"
+        self.no_context_section = template.get("no_context_message", "")
+        
+        system_instruction = template.get("system_instruction", "")
+        instructions = template.get("instructions", "")
+        instructions_header = template.get("instructions_header", "INSTRUCCIONES:")
+        question_header = template.get("question_header", "PREGUNTA DEL USUARIO:")
+        response_header = template.get("response_header", "RESPUESTA:")
+        
+        self.prefix = f"{system_instruction}\n\n"
+        self.middle = f"\n\n{instructions_header}\n{instructions}\n\n{question_header}\n"
+        self.suffix = f"\n\n{response_header}"
+        
+        # Partes estáticas primero, para que el prefijo cacheable sea lo más largo posible
+        self.system_prompt = f"{system_instruction}\n\n{instructions_header}\n{instructions}".rstrip()
+        self.question_prefix = f"\n\n{question_header}\n"
+    
+    def render_context(self, scored_chunks: List[ScoredChunk], include_scores: bool) -> str:
+        """
+        Arma la sección de contexto con los chunks recuperados.
+        
+        Args:
+            scored_chunks: Chunks recuperados con sus scores
+            include_scores: Si True, antepone la relevancia a cada receta
+            
+        Returns:
+            La sección de contexto (o el mensaje sin contexto)
+        """
+        if not scored_chunks:
+            return self.no_context_section
+        
+        if include_scores:
+            parts = [
+                f"[Relevancia: {sc.score:.2f}]\nReceta {i}:\n{sc.chunk.text}"
+                for i, sc in enumerate(scored_chunks, 1)
+            ]
+        else:
+            parts = [
+                f"Receta {i}:\n{sc.chunk.text}"
+                for i, sc in enumerate(scored_chunks, 1)
+            ]
+        return self.context_header + self.chunk_separator.join(parts)
+    
+    def render(self, query: str, scored_chunks: List[ScoredChunk], include_scores: bool) -> str:
+        """
+        Renderiza el prompt completo.
+        
+        Args:
+            query: La pregunta del usuario
+            scored_chunks: Chunks recuperados con sus scores
+            include_scores: Si True, incluye los scores en el contexto
+            
+        Returns:
+            El prompt completo formateado
+        """
+        context_section = self.render_context(scored_chunks, include_scores)
+        return "".join((self.prefix, context_section, self.middle, query, self.suffix))
+    
+    def render_parts(self, query: str, scored_chunks: List[ScoredChunk], include_scores: bool) -> PromptParts:
+        """
+        Renderiza el prompt separado en system (estático) y user (variable).
+        
+        Args:
+            query: La pregunta del usuario
+            scored_chunks: Chunks recuperados con sus scores
+            include_scores: Si True, incluye los scores en el contexto
+            
+        Returns:
+            PromptParts con el system prompt compartido y el mensaje del usuario
+        """
+        context_section = self.render_context(scored_chunks, include_scores)
+        user = "".join((context_section, self.question_prefix, query, self.suffix))
+        return PromptParts(system=self.system_prompt, user=user)
+
+
+# Cache de templates compilados del proceso: ruta -> (mtime_ns, size, template)
+_TEMPLATE_CACHE: Dict[str, Tuple[int, int, CompiledTemplate]] = {}
+_TEMPLATE_CACHE_LOCK = Lock()
+
+
+def load_template(template_path: Path) -> CompiledTemplate:
+    """
+    Retorna el template compilado para una ruta, usando el cache del proceso.
+    El YAML solo se vuelve a parsear si cambió el mtime o el tamaño del archivo.
+    
+    Args:
+        template_path: Ruta al archivo YAML
+        
+    Returns:
+        El template compilado
+        
+    Raises:
+        FileNotFoundError: Si el archivo no existe
+    """
+    try:
+        stat = os.stat(template_path)
+    except FileNotFoundError:
+        raise FileNotFoundError(
+            f"Template no encontrado: {template_path}. "
+            "Asegúrate de que el archivo YAML existe."
+        )
+    
+    key = str(template_path)
+    cached = _TEMPLATE_CACHE.get(key)
+    if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+    
+    with open(template_path, "r", encoding="utf-8") as f:
+        compiled = CompiledTemplate(yaml.safe_load(f) or {})
+    
+    with _TEMPLATE_CACHE_LOCK:
+        _TEMPLATE_CACHE[key] = (stat.st_mtime_ns, stat.st_size, compiled)
+    return compiled
+
+
+def clear_template_cache() -> None:
+    """Vacía el cache de templates compilados (útil en tests)."""
+    with _TEMPLATE_CACHE_LOCK:
+        _TEMPLATE_CACHE.clear()
 
 
 class PromptBuilder:
     """
     Constructor de prompts que lee templates desde archivos YAML.
     Permite personalizar el formato del prompt sin modificar código.
+    
+    Los templates se compilan una vez por proceso (ver load_template) y se
+    recargan automáticamente cuando el archivo cambia en disco.
     """
     
-    def __init__(self, template_path: Optional[str] = None):
+    def __init__(
+        self,
+        template_path: Optional[str] = None,
+        reload_interval: Optional[float] = 1.0,
+        max_context_tokens: Optional[int] = None,
+        token_estimator: Optional[TokenEstimator] = None
+    ):
         """
         Inicializa el PromptBuilder.
         
         Args:
             template_path: Ruta al archivo YAML con el template.
                           Si es None, usa el template por defecto.
+            reload_interval: Cada cuántos segundos como máximo se verifica si el
+                             archivo cambió (0 = en cada build, None = nunca)
+            max_context_tokens: Presupuesto de tokens para el texto de las recetas
+                                del contexto (None = sin límite, ver pack_context)
+            token_estimator: Estimador usado para el presupuesto
+                             (default: CharRatioTokenEstimator)
         """
         if template_path is None:
-            # Ruta por defecto: mismo directorio que este archivo
-            default_path = Path(__file__).parent / "prompt.yaml"
-            template_path = str(default_path)
+            template_path = str(DEFAULT_TEMPLATE_PATH)
         
-        self.template_path = Path(template_path)
+        self.template_path = Path(template_path).resolve()
+        self.reload_interval = reload_interval
+        self.max_context_tokens = max_context_tokens
+        self.token_estimator = token_estimator or CharRatioTokenEstimator()
         self._load_template()
     
     def _load_template(self) -> None:
-        """Carga el template desde el archivo YAML."""
-        if not self.template_path.exists():
-            raise FileNotFoundError(
-                f"Template no encontrado: {self.template_path}. "
-                "Asegúrate de que el archivo YAML existe."
-            )
-        
-        with open(self.template_path, "r", encoding="utf-8") as f:
-            self.template = yaml.safe_load(f)
+        """Carga el template compilado (desde el cache si está vigente)."""
+        self._compiled = load_template(self.template_path)
+        self._checked_at = time.monotonic()
+    
+    def _refresh(self) -> CompiledTemplate:
+        """Retorna el template vigente, recargándolo si el archivo cambió."""
+        if self.reload_interval is not None and (
+            time.monotonic() - self._checked_at >= self.reload_interval
+        ):
+            self._load_template()
+        return self._compiled
+    
+    @property
+    def template(self) -> Dict[str, Any]:
+        """Diccionario del template tal como se leyó del YAML."""
+        return self._compiled.raw
     
     def build(
         self,
@@ -54,53 +250,73 @@ class PromptBuilder:
         Returns:
             El prompt completo formateado
         """
-        if include_scores is None:
-            include_scores = self.template.get("include_scores", False)
+        prompt, _ = self.build_with_report(query, scored_chunks, include_scores)
+        return prompt
+    
+    def build_with_report(
+        self,
+        query: str,
+        scored_chunks: List[ScoredChunk],
+        include_scores: Optional[bool] = None
+    ) -> Tuple[str, Optional[PackedContext]]:
+        """
+        Igual que build(), pero aplica el presupuesto de tokens (si hay uno)
+        y retorna también el reporte del empaquetado del contexto.
         
-        # Construir el contexto
-        if not scored_chunks:
-            context_section = self.template.get("no_context_message", "")
-        else:
-            context_parts = []
-            for i, scored_chunk in enumerate(scored_chunks, 1):
-                chunk = scored_chunk.chunk
-                score = scored_chunk.score
-                
-                chunk_text = f"Receta {i}:\n{chunk.text}"
-                
-                if include_scores:
-                    chunk_text = f"[Relevancia: {score:.2f}]\n{chunk_text}"
-                
-                context_parts.append(chunk_text)
+        Args:
+            query: La pregunta original del usuario
+            scored_chunks: Lista de chunks recuperados con sus scores
+            include_scores: Si True, incluye scores. Si None, usa el valor del template
             
-            separator = self.template.get("chunk_separator", "\n\n---\n\n")
-            context = separator.join(context_parts)
+        Returns:
+            Tupla (prompt, packed) donde packed es None si no hay presupuesto
+        """
+        compiled, scored_chunks, include_scores, packed = self._prepare(scored_chunks, include_scores)
+        return compiled.render(query, scored_chunks, include_scores), packed
+    
+    def build_parts(
+        self,
+        query: str,
+        scored_chunks: List[ScoredChunk],
+        include_scores: Optional[bool] = None
+    ) -> Tuple[PromptParts, Optional[PackedContext]]:
+        """
+        Construye el prompt separado en system prompt estático y mensaje del
+        usuario (ver PromptParts), aplicando el presupuesto de tokens si hay uno.
+        
+        Args:
+            query: La pregunta original del usuario
+            scored_chunks: Lista de chunks recuperados con sus scores
+            include_scores: Si True, incluye scores. Si None, usa el valor del template
             
-            context_header = self.template.get("context_header", "CONTEXTO:")
-            context_section = f"{context_header}\n\n{context}"
-        
-        # Construir el prompt completo
-        system_instruction = self.template.get("system_instruction", "")
-        instructions = self.template.get("instructions", "")
-        instructions_header = self.template.get("instructions_header", "INSTRUCCIONES:")
-        question_header = self.template.get("question_header", "PREGUNTA DEL USUARIO:")
-        response_header = self.template.get("response_header", "RESPUESTA:")
-        
-        prompt_parts = [
-            system_instruction,
-            "",
-            context_section,
-            "",
-            f"{instructions_header}",
-            instructions,
-            "",
-            f"{question_header}",
-            query,
-            "",
-            f"{response_header}"
-        ]
-        
-        return "\n".join(prompt_parts)
+        Returns:
+            Tupla (parts, packed) donde packed es None si no hay presupuesto
+        """
+        compiled, scored_chunks, include_scores, packed = self._prepare(scored_chunks, include_scores)
+        return compiled.render_parts(query, scored_chunks, include_scores), packed
+    
+    def _prepare(
+        self,
+        scored_chunks: List[ScoredChunk],
+        include_scores: Optional[bool]
+    ) -> Tuple[CompiledTemplate, List[ScoredChunk], bool, Optional[PackedContext]]:
+        """Resuelve el template vigente, include_scores y el empaquetado del contexto."""
+        compiled = self._refresh()
+        if include_scores is None:
+            include_scores = compiled.include_scores
+        
+        packed = None
+        if self.max_context_tokens is not None and scored_chunks:
+            packed = pack_context(scored_chunks, self.max_context_tokens, self.token_estimator)
+            scored_chunks = packed.scored_chunks
+        
+        return compiled, scored_chunks, include_scores, packed
+
+
+@lru_cache(maxsize=32)
+def _shared_builder(template_path: Optional[str]) -> PromptBuilder:
+    """Builder compartido por ruta para build_prompt."""
+    return PromptBuilder(template_path=template_path)
 
 
 # Función de conveniencia (backward compatibility)
@@ -122,5 +338,5 @@ def build_prompt(
     Returns:
         El prompt formateado
     """
-    builder = PromptBuilder(template_path=template_path)
-    return builder.build(query, scored_chunks, include_scores)
\ No newline at end of file
+    builder = _shared_builder(template_path)
+    return builder.build(query, scored_chunks, include_scores)
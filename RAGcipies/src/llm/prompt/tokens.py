@@ -0,0 +1,82 @@
+from abc import ABC, abstractmethod
+import math
+
+
+class TokenEstimator(ABC):
+    """
+    Clase base abstracta para estimadores de tokens.
+    Permite medir prompts sin depender del tokenizer exacto de cada LLM.
+    """
+    
+    @abstractmethod
+    def count(self, text: str) -> int:
+        """
+        Estima la cantidad de tokens de un texto.
+        
+        Args:
+            text: Texto a medir
+            
+        Returns:
+            Número estimado de tokens
+        """
+        pass
+    
+    def __call__(self, text: str) -> int:
+        """Permite usar el estimador como función: estimator(text)"""
+        return self.count(text)
+
+
+class CharRatioTokenEstimator(TokenEstimator):
+    """
+    Estimador heurístico basado en caracteres por token.
+    ~4 caracteres por token es la aproximación habitual para tokenizers BPE
+    (OpenAI, Llama) en texto en español/inglés.
+    """
+    
+    def __init__(self, chars_per_token: float = 4.0):
+        """
+        Args:
+            chars_per_token: Caracteres promedio por token
+            
+        Raises:
+            ValueError: Si chars_per_token no es positivo
+        """
+        if chars_per_token <= 0:
+            raise ValueError(
+                f"chars_per_token debe ser mayor a 0, recibido: {chars_per_token}"
+            )
+        self.chars_per_token = chars_per_token
+    
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        return math.ceil(len(text) / self.chars_per_token)
+
+
+class TiktokenTokenEstimator(TokenEstimator):
+    """
+    Conteo exacto de tokens con tiktoken (tokenizers de OpenAI).
+    Requiere el paquete opcional `tiktoken`.
+    """
+    
+    def __init__(self, encoding_name: str = "cl100k_base"):
+        """
+        Args:
+            encoding_name: Encoding de tiktoken a usar (ej: "cl100k_base", "o200k_base")
+            
+        Raises:
+            ImportError: Si tiktoken no está instalado
+        """
+        try:
+            import tiktoken
+        except ImportError:
+            raise ImportError(
+                "TiktokenTokenEstimator requiere el paquete 'tiktoken'. "
+                "Instálalo con: pip install tiktoken"
+            )
+        self.encoding = tiktoken.get_encoding(encoding_name)
+    
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        return len(self.encoding.encode(text))
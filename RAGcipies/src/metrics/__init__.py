@@ -0,0 +1,25 @@
+from .registry import (
+    MetricsRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    DEFAULT_BUCKETS,
+)
+from .exposition import render, CONTENT_TYPE
+from .server import start_metrics_server
+from .pipeline import PipelineMetricsHook, instrument_pipeline
+
+__all__ = [
+    "MetricsRegistry",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "REGISTRY",
+    "DEFAULT_BUCKETS",
+    "render",
+    "CONTENT_TYPE",
+    "start_metrics_server",
+    "PipelineMetricsHook",
+    "instrument_pipeline",
+]
@@ -0,0 +1,130 @@
+"""
+Métricas de los backends: llamadas reales a LLMs y modelos de embeddings,
+eventos de HedgedLLM y del RateLimiter.
+
+A diferencia de PipelineMetricsHook (que cuenta consultas), estas series se
+registran donde se llama al backend, así reflejan lo que pasa con
+micro-batching, single-flight, hedging y reintentos. Se publican en el
+REGISTRY global del proceso, el que expone el servidor en /metrics.
+"""
+import time
+from contextlib import contextmanager
+from typing import Iterator
+from .registry import MetricsRegistry, REGISTRY
+
+
+class CallMetrics:
+    """
+    Series de un backend concreto (labels backend y model) resueltas una
+    sola vez: llamadas, errores y latencia por llamada.
+    """
+    
+    def __init__(self, kind: str, backend: str, model: str, registry: MetricsRegistry = REGISTRY):
+        """
+        Args:
+            kind: "llm" o "embedding" (prefijo de las métricas)
+            backend: Clase del cliente (ej: "OllamaLLM")
+            model: Modelo configurado
+            registry: Registro donde publicar las métricas
+        """
+        labels = {"backend": backend, "model": str(model)}
+        self._calls = registry.counter(
+            f"{kind}_requests_total", "Llamadas al backend", ["backend", "model"]
+        ).labels(**labels)
+        self._errors = registry.counter(
+            f"{kind}_request_errors_total", "Llamadas al backend que fallaron", ["backend", "model"]
+        ).labels(**labels)
+        self._duration = registry.histogram(
+            f"{kind}_request_duration_seconds", "Latencia de las llamadas al backend", ["backend", "model"]
+        ).labels(**labels)
+        self._items = None
+        if kind == "embedding":
+            self._items = registry.counter(
+                "embedding_texts_total", "Textos enviados al backend de embeddings", ["backend", "model"]
+            ).labels(**labels)
+    
+    @contextmanager
+    def call(self, items: int = 0) -> Iterator[None]:
+        """
+        Mide una llamada al backend. Un error (Exception) la cuenta como
+        fallida; cerrar un stream antes de terminar no es un error.
+
+        Args:
+            items: Textos de la llamada (solo embeddings)
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self._errors.inc()
+            raise
+        finally:
+            self._calls.inc()
+            self._duration.observe(time.perf_counter() - started)
+            if self._items is not None and items:
+                self._items.inc(items)
+
+
+def llm_metrics(client, registry: MetricsRegistry = REGISTRY) -> CallMetrics:
+    """Series llm_request* del cliente (backend = nombre de su clase)."""
+    return CallMetrics("llm", client.__class__.__name__, getattr(client, "model", "unknown"), registry)
+
+
+def embedding_metrics(model, registry: MetricsRegistry = REGISTRY) -> CallMetrics:
+    """Series embedding_request* del modelo (backend = nombre de su clase)."""
+    return CallMetrics("embedding", model.__class__.__name__, getattr(model, "model", "unknown"), registry)
+
+
+def hedged_metrics(backends, registry: MetricsRegistry = REGISTRY):
+    """
+    Series de HedgedLLM: eventos de la carrera (requests, hedges, fallbacks,
+    deadline_exceeded, failures) y, por backend de la cadena, intentos
+    ganados y fallidos.
+    
+    Returns:
+        Tupla (eventos por nombre, victorias por índice, errores por índice)
+    """
+    events = registry.counter(
+        "llm_hedged_events_total", "Eventos de HedgedLLM (requests, hedges, fallbacks, ...)", ["event"]
+    )
+    wins = registry.counter(
+        "llm_hedged_wins_total", "Intentos de HedgedLLM ganados por backend", ["backend", "model"]
+    )
+    errors = registry.counter(
+        "llm_hedged_attempt_errors_total", "Intentos de HedgedLLM fallidos por backend", ["backend", "model"]
+    )
+    labels = [
+        {"backend": backend.__class__.__name__, "model": str(getattr(backend, "model", "unknown"))}
+        for backend in backends
+    ]
+    return (
+        {event: events.labels(event=event)
+         for event in ("requests", "hedges", "fallbacks", "deadline_exceeded", "failures")},
+        [wins.labels(**label) for label in labels],
+        [errors.labels(**label) for label in labels],
+    )
+
+
+def rate_limiter_metrics(name: str, registry: MetricsRegistry = REGISTRY):
+    """
+    Series ratelimit_* de una cuota (label limiter = modelo): los contadores
+    de RateLimiter.stats() y el gauge de requests en curso.
+    
+    Returns:
+        Diccionario clave de stats() -> serie
+    """
+    counters = {
+        "requests": ("ratelimit_requests_total", "Requests que pasaron por el limitador"),
+        "rate_limited": ("ratelimit_rate_limited_total", "Respuestas 429 recibidas"),
+        "transient_errors": ("ratelimit_transient_errors_total", "Errores transitorios (5xx, timeouts, conexión)"),
+        "retries": ("ratelimit_retries_total", "Reintentos (429 y transitorios)"),
+        "throttled_seconds": ("ratelimit_throttled_seconds_total", "Segundos de espera por el ritmo y las pausas"),
+    }
+    series = {
+        key: registry.counter(metric, documentation, ["limiter"]).labels(limiter=name)
+        for key, (metric, documentation) in counters.items()
+    }
+    series["in_flight"] = registry.gauge(
+        "ratelimit_in_flight", "Requests en curso por cuota", ["limiter"]
+    ).labels(limiter=name)
+    return series
@@ -0,0 +1,58 @@
+from typing import Dict, List
+from .registry import MetricsRegistry, Metric, REGISTRY
+
+
+# Content-Type del formato de texto de Prometheus
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+    return "{" + inner + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _render_metric(metric: Metric) -> List[str]:
+    lines = [
+        f"# HELP {metric.name} {_escape(metric.documentation)}",
+        f"# TYPE {metric.name} {metric.kind}",
+    ]
+    for labels, value in metric.series():
+        if metric.kind == "histogram":
+            for bound, count in value["buckets"]:
+                bucket_labels = {**labels, "le": _format_value(bound)}
+                lines.append(f"{metric.name}_bucket{_format_labels(bucket_labels)} {_format_value(count)}")
+            lines.append(f"{metric.name}_sum{_format_labels(labels)} {_format_value(value['sum'])}")
+            lines.append(f"{metric.name}_count{_format_labels(labels)} {_format_value(value['count'])}")
+        else:
+            lines.append(f"{metric.name}{_format_labels(labels)} {_format_value(value)}")
+    return lines
+
+
+def render(registry: MetricsRegistry = REGISTRY) -> str:
+    """
+    Serializa el registro en el formato de texto de Prometheus (0.0.4).
+    
+    Args:
+        registry: Registro a serializar (default: registro global)
+        
+    Returns:
+        Texto listo para servir en /metrics
+    """
+    lines: List[str] = []
+    for metric in registry.collect():
+        lines.extend(_render_metric(metric))
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,105 @@
+from ..rag.tracing import PipelineHook, QueryTrace, STAGES
+from .registry import MetricsRegistry, REGISTRY
+
+
+class PipelineMetricsHook(PipelineHook):
+    """
+    Hook que traduce las trazas de RAGPipeline a métricas agregadas
+    (counters, gauges e histogramas) en un MetricsRegistry.
+    """
+    
+    def __init__(self, llm_backend: str, registry: MetricsRegistry = REGISTRY):
+        """
+        Args:
+            llm_backend: Nombre del backend de LLM (label de las métricas rag_generation*)
+            registry: Registro donde publicar las métricas
+        """
+        self.llm_backend = llm_backend
+        self.queries = registry.counter("rag_queries_total", "Consultas procesadas por el pipeline")
+        self.query_errors = registry.counter(
+            "rag_query_errors_total", "Consultas fallidas por etapa", ["stage"]
+        )
+        self.in_flight = registry.gauge("rag_queries_in_flight", "Consultas en curso")
+        self.query_duration = registry.histogram(
+            "rag_query_duration_seconds", "Latencia total de las consultas"
+        )
+        self.stage_duration = registry.histogram(
+            "rag_stage_duration_seconds", "Latencia por etapa del pipeline", ["stage"]
+        )
+        # Las llamadas reales al modelo (con micro-batching o single-flight
+        # varias consultas comparten una) son embedding_requests_total
+        self.cache_misses = registry.counter(
+            "rag_embedding_cache_misses_total", "Consultas cuyo embedding no estaba en el cache"
+        )
+        self.cache_hits = registry.counter(
+            "rag_embedding_cache_hits_total", "Embeddings de queries servidos desde el cache"
+        )
+        self.chunks_retrieved = registry.counter(
+            "rag_chunks_retrieved_total", "Chunks recuperados del vector store"
+        )
+        # Solo cuentan las generaciones de las consultas del pipeline (no los
+        # intentos de HedgedLLM ni el warm-up), de ahí el prefijo rag_
+        self.generations = registry.counter(
+            "rag_generations_total", "Generaciones de consultas completadas por backend de LLM", ["backend"]
+        )
+        self.generation_errors = registry.counter(
+            "rag_generation_errors_total", "Consultas fallidas en la generación por backend de LLM", ["backend"]
+        )
+        
+        # Resolver las series con labels una sola vez (camino caliente sin dicts)
+        self._stage_series = {stage: self.stage_duration.labels(stage=stage) for stage in STAGES}
+        self._generations = self.generations.labels(backend=llm_backend)
+        self._generation_errors = self.generation_errors.labels(backend=llm_backend)
+    
+    def on_query_start(self, trace: QueryTrace) -> None:
+        self.in_flight.inc()
+    
+    def on_stage_end(self, stage: str, seconds: float, trace: QueryTrace) -> None:
+        self._stage_series[stage].observe(seconds)
+        if stage == "embedding":
+            if trace.cache_hit:
+                self.cache_hits.inc()
+            else:
+                self.cache_misses.inc()
+        elif stage == "search":
+            self.chunks_retrieved.inc(trace.chunks_retrieved)
+        elif stage == "generation":
+            self._generations.inc()
+    
+    def on_query_end(self, trace: QueryTrace) -> None:
+        self.in_flight.dec()
+        self.queries.inc()
+        self.query_duration.observe(trace.total_seconds)
+    
+    def on_query_error(self, stage: str, error: Exception, trace: QueryTrace) -> None:
+        self.in_flight.dec()
+        self.queries.inc()
+        self.query_errors.labels(stage=stage).inc()
+        if stage == "generation":
+            self._generation_errors.inc()
+
+
+def instrument_pipeline(pipeline, registry: MetricsRegistry = REGISTRY) -> PipelineMetricsHook:
+    """
+    Conecta un RAGPipeline al registro de métricas: instala el hook y
+    publica el tamaño del vector store como gauge (len(vector_store)).
+    
+    Args:
+        pipeline: Pipeline a instrumentar
+        registry: Registro donde publicar las métricas
+        
+    Returns:
+        El hook instalado
+    """
+    hook = PipelineMetricsHook(
+        llm_backend=pipeline.llm.get_model_info()["backend"],
+        registry=registry
+    )
+    pipeline.add_hook(hook)
+    
+    store_size = registry.gauge(
+        "rag_vector_store_chunks", "Chunks almacenados en el vector store", ["store"]
+    )
+    store = pipeline.vector_store
+    store_size.labels(store=store.__class__.__name__).set_function(lambda: len(store))
+    return hook
@@ -0,0 +1,314 @@
+from abc import ABC, abstractmethod
+from threading import Lock, local, current_thread
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import bisect
+import weakref
+
+
+# Buckets por defecto (segundos), pensados para latencias de embedding/LLM
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class _ShardedCells:
+    """
+    Celdas por hilo para acumular valores sin locks en el camino caliente.
+    
+    Cada hilo escribe solo en su propia celda (una lista de floats), por lo
+    que un incremento es una suma local sin contención. Al leer se suman
+    todas las celdas; las de hilos ya terminados se pliegan en `_base` para
+    que la lista no crezca sin límite con servidores de un hilo por request.
+    """
+    
+    def __init__(self, width: int = 1):
+        self._width = width
+        self._local = local()
+        self._cells: List[Tuple[weakref.ref, List[float]]] = []
+        self._base = [0.0] * width
+        self._lock = Lock()
+    
+    def cell(self) -> List[float]:
+        """Retorna la celda del hilo actual (la crea en el primer uso)."""
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = [0.0] * self._width
+            with self._lock:
+                self._cells.append((weakref.ref(current_thread()), cell))
+            self._local.cell = cell
+            return cell
+    
+    def totals(self) -> List[float]:
+        """Suma todas las celdas, plegando las de hilos muertos."""
+        with self._lock:
+            alive = []
+            totals = list(self._base)
+            for ref, cell in self._cells:
+                thread = ref()
+                for i, value in enumerate(cell):
+                    totals[i] += value
+                if thread is not None and thread.is_alive():
+                    alive.append((ref, cell))
+                else:
+                    for i, value in enumerate(cell):
+                        self._base[i] += value
+            self._cells = alive
+        return totals
+
+
+class _CounterChild:
+    """Serie de un Counter para una combinación de labels."""
+    
+    def __init__(self):
+        self._cells = _ShardedCells()
+    
+    def inc(self, amount: float = 1.0) -> None:
+        """
+        Incrementa el contador.
+        
+        Raises:
+            ValueError: Si amount es negativo
+        """
+        if amount < 0:
+            raise ValueError("Un counter solo puede incrementarse")
+        self._cells.cell()[0] += amount
+    
+    def get(self) -> float:
+        return self._cells.totals()[0]
+
+
+class _GaugeChild:
+    """Serie de un Gauge: inc/dec sin locks, set() absoluto o callback."""
+    
+    def __init__(self):
+        self._cells = _ShardedCells()
+        self._offset = 0.0
+        self._function: Optional[Callable[[], float]] = None
+        self._lock = Lock()
+    
+    def inc(self, amount: float = 1.0) -> None:
+        self._cells.cell()[0] += amount
+    
+    def dec(self, amount: float = 1.0) -> None:
+        self._cells.cell()[0] -= amount
+    
+    def set(self, value: float) -> None:
+        with self._lock:
+            self._offset = value - self._cells.totals()[0]
+    
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Calcula el valor en cada lectura (ej: lambda: len(vector_store))."""
+        self._function = function
+    
+    def get(self) -> float:
+        if self._function is not None:
+            return float(self._function())
+        return self._offset + self._cells.totals()[0]
+
+
+class _HistogramChild:
+    """Serie de un Histogram: cuenta por bucket, suma y total por hilo."""
+    
+    def __init__(self, buckets: Sequence[float]):
+        self._buckets = tuple(buckets)
+        # Layout de la celda: [bucket_0, ..., bucket_n, +Inf, sum]
+        self._cells = _ShardedCells(width=len(self._buckets) + 2)
+    
+    def observe(self, value: float) -> None:
+        cell = self._cells.cell()
+        cell[bisect.bisect_left(self._buckets, value)] += 1
+        cell[-1] += value
+    
+    def get(self) -> Dict[str, object]:
+        totals = self._cells.totals()
+        cumulative = []
+        running = 0.0
+        for count in totals[:-1]:
+            running += count
+            cumulative.append(running)
+        return {
+            "buckets": list(zip((*self._buckets, float("inf")), cumulative)),
+            "sum": totals[-1],
+            "count": running,
+        }
+
+
+class Metric(ABC):
+    """
+    Familia de métricas con nombre, ayuda, tipo y labels.
+    Cada combinación de valores de labels es una serie independiente.
+    """
+    
+    kind = "untyped"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = Lock()
+        if not self.labelnames:
+            self._default = self._new_child()
+            self._children[()] = self._default
+    
+    @abstractmethod
+    def _new_child(self):
+        """Crea la serie de una combinación de labels."""
+        pass
+    
+    def labels(self, *values: str, **labelvalues: str):
+        """
+        Retorna la serie para los valores de labels dados (la crea si no existe).
+        
+        Raises:
+            ValueError: Si los labels no coinciden con los declarados
+        """
+        if labelvalues:
+            if set(labelvalues) != set(self.labelnames):
+                raise ValueError(
+                    f"Labels inválidos para {self.name}: {sorted(labelvalues)}. "
+                    f"Esperados: {list(self.labelnames)}"
+                )
+            values = tuple(str(labelvalues[name]) for name in self.labelnames)
+        else:
+            values = tuple(str(v) for v in values)
+            if len(values) != len(self.labelnames):
+                raise ValueError(
+                    f"{self.name} espera {len(self.labelnames)} labels, recibidos: {len(values)}"
+                )
+        
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+    
+    def series(self) -> List[Tuple[Dict[str, str], object]]:
+        """Retorna [(labels, valor)] de todas las series de la familia."""
+        with self._lock:
+            children = list(self._children.items())
+        return [(dict(zip(self.labelnames, key)), child.get()) for key, child in children]
+    
+    def _unlabeled(self):
+        if self.labelnames:
+            raise ValueError(f"{self.name} tiene labels: usar .labels(...) primero")
+        return self._default
+
+
+class Counter(Metric):
+    """Contador monotónico (ej: queries totales, errores)."""
+    
+    kind = "counter"
+    
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+    
+    def inc(self, amount: float = 1.0) -> None:
+        self._unlabeled().inc(amount)
+    
+    def get(self) -> float:
+        return self._unlabeled().get()
+
+
+class Gauge(Metric):
+    """Valor que sube y baja (ej: requests en curso, tamaño del store)."""
+    
+    kind = "gauge"
+    
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+    
+    def inc(self, amount: float = 1.0) -> None:
+        self._unlabeled().inc(amount)
+    
+    def dec(self, amount: float = 1.0) -> None:
+        self._unlabeled().dec(amount)
+    
+    def set(self, value: float) -> None:
+        self._unlabeled().set(value)
+    
+    def set_function(self, function: Callable[[], float]) -> None:
+        self._unlabeled().set_function(function)
+    
+    def get(self) -> float:
+        return self._unlabeled().get()
+
+
+class Histogram(Metric):
+    """Histograma acumulativo con buckets fijos (ej: latencias)."""
+    
+    kind = "histogram"
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+    
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+    
+    def observe(self, value: float) -> None:
+        self._unlabeled().observe(value)
+    
+    def get(self) -> Dict[str, object]:
+        return self._unlabeled().get()
+
+
+class MetricsRegistry:
+    """
+    Registro de métricas del proceso.
+    
+    counter()/gauge()/histogram() son idempotentes: si la métrica ya existe
+    con el mismo tipo se retorna la existente, así cada módulo puede declarar
+    las métricas que usa sin coordinarse con los demás.
+    """
+    
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = Lock()
+    
+    def _get_or_create(self, cls, name: str, documentation: str, **kwargs) -> Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, documentation, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls):
+                raise ValueError(
+                    f"La métrica {name} ya está registrada como {metric.kind}"
+                )
+            return metric
+    
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames=labelnames)
+    
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames=labelnames)
+    
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._get_or_create(
+            Histogram, name, documentation, labelnames=labelnames, buckets=buckets
+        )
+    
+    def get(self, name: str) -> Optional[Metric]:
+        """Retorna la métrica registrada con ese nombre (o None)."""
+        return self._metrics.get(name)
+    
+    def collect(self) -> List[Metric]:
+        """Retorna todas las métricas registradas, ordenadas por nombre."""
+        with self._lock:
+            return [self._metrics[name] for name in sorted(self._metrics)]
+
+
+# Registro global del proceso (usado por defecto por instrument_pipeline y el servidor)
+REGISTRY = MetricsRegistry()
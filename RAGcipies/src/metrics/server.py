@@ -0,0 +1,44 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from .registry import MetricsRegistry, REGISTRY
+from .exposition import render, CONTENT_TYPE
+
+
+def start_metrics_server(
+    port: int = 9100,
+    addr: str = "127.0.0.1",
+    registry: MetricsRegistry = REGISTRY
+) -> ThreadingHTTPServer:
+    """
+    Levanta un endpoint HTTP local que expone GET /metrics en formato Prometheus.
+    Corre en un hilo daemon; llamar a server.shutdown() para detenerlo.
+    
+    Args:
+        port: Puerto a escuchar (0 = puerto libre asignado por el SO)
+        addr: Dirección a escuchar (default: solo localhost)
+        registry: Registro a exponer
+        
+    Returns:
+        El servidor HTTP en ejecución (server.server_address tiene el puerto real)
+    """
+    
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render(registry).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            # Los scrapes periódicos no deben ensuciar la salida del proceso
+            pass
+    
+    server = ThreadingHTTPServer((addr, port), MetricsHandler)
+    server.daemon_threads = True
+    Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
@@ -0,0 +1,387 @@
+"""
+Perfilado opt-in de la ingesta y las consultas.
+
+Se activa con variables de entorno (o con configure_profiling, ej: desde
+`serve.py --profile`):
+
+    RAG_PROFILE=cprofile,tracemalloc,stacks   # modos ("all" = todos)
+    RAG_PROFILE_DIR=./profiles                # directorio de salida
+    RAG_PROFILE_EVERY=1                       # perfilar 1 de cada N llamadas por etapa
+    RAG_PROFILE_INTERVAL_MS=5                 # intervalo del muestreo de stacks
+    
+Etapas perfiladas y qué cubre cada una:
+- recipes_to_chunks / recipes_to_multi_vector_chunks: chunking y embedding
+  de las recetas durante la ingesta
+- add_chunks: la carga en el vector store (in_memory, chromadb)
+- query: RAGPipeline.query/query_detailed completo en el hilo que consulta.
+  Con micro-batching, embedding y búsqueda corren en el hilo del batcher y
+  aparecen en "batch"; en "query" solo queda la espera del lote
+- query_stream: RAGPipeline.query_stream desde el primer fragmento pedido
+  hasta agotar o cerrar el generador, incluido el tiempo que el consumidor
+  pasa entre fragmentos (ej: escribiendo al socket)
+- batch: un lote del micro-batcher (embed_batch + search_batch) en su hilo
+
+Cada llamada perfilada deja en el directorio:
+- <etapa>-<id>.pstats / .txt: dump de cProfile y resumen por tiempo acumulado
+- <etapa>-<id>.tracemalloc / -alloc.txt: snapshot de tracemalloc y el top de
+  asignaciones nuevas durante la llamada
+- <etapa>-<id>.folded: stacks muestreados por tiempo de pared en formato
+  "frame;frame;frame N" (flamegraph.pl, speedscope, inferno), con la etapa
+  del pipeline (embedding, search, ...) como raíz de cada stack
+  
+Un valor inválido en RAG_PROFILE* deja el perfilado desactivado con un
+warning en el log. Desactivado, el costo es una lectura de variable global
+por llamada.
+"""
+import cProfile
+import functools
+import inspect
+import io
+import itertools
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, Optional, TypeVar
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+logger = logging.getLogger(__name__)
+
+MODES = frozenset({"cprofile", "tracemalloc", "stacks"})
+
+
+class StackSampler:
+    """
+    Muestrea periódicamente el stack de un hilo (tiempo de pared, incluye
+    esperas de red) y acumula stacks colapsados para flame graphs.
+    """
+    
+    def __init__(self, thread_id: int, interval: float, labels: Dict[int, str]):
+        """
+        Args:
+            thread_id: Hilo a muestrear
+            interval: Segundos entre muestras
+            labels: Etapa actual por hilo (raíz de cada stack muestreado)
+        """
+        self.thread_id = thread_id
+        self.interval = interval
+        self.labels = labels
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rag-stack-sampler", daemon=True)
+    
+    def start(self) -> "StackSampler":
+        self._thread.start()
+        return self
+    
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+    
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})")
+                frame = frame.f_back
+            label = self.labels.get(self.thread_id)
+            if label:
+                stack.append(label)
+            self.samples[";".join(reversed(stack))] += 1
+    
+    def folded(self) -> str:
+        """Stacks en formato colapsado: una línea "a;b;c N" por stack distinto."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+class Profiler:
+    """
+    Perfila llamadas por etapa y escribe los resultados en output_dir.
+    
+    cProfile y tracemalloc son globales al proceso, así que una sola llamada
+    se perfila completa a la vez. Las concurrentes de otros hilos (ej: el
+    micro-batcher o el modo servidor) solo muestrean su stack si "stacks"
+    está activo (stats()["stacks_only"]); el resto, y las llamadas anidadas
+    en el mismo hilo, corren sin perfilar y se cuentan en stats()["skipped"].
+    """
+    
+    def __init__(
+        self,
+        output_dir: str = "profiles",
+        modes: Iterable[str] = MODES,
+        every: int = 1,
+        sample_interval: float = 0.005,
+        tracemalloc_frames: int = 25
+    ):
+        """
+        Args:
+            output_dir: Directorio donde escribir los perfiles (se crea si no existe)
+            modes: Subconjunto de MODES a capturar
+            every: Perfilar 1 de cada N llamadas de cada etapa
+            sample_interval: Segundos entre muestras del stack
+            tracemalloc_frames: Frames guardados por asignación
+            
+        Raises:
+            ValueError: Si algún modo no existe o every/sample_interval no son positivos
+        """
+        modes = frozenset(modes)
+        unknown = modes - MODES
+        if unknown or not modes:
+            raise ValueError(
+                f"Modos de perfilado inválidos: {', '.join(sorted(unknown)) or '(ninguno)'}. "
+                f"Opciones: {', '.join(sorted(MODES))}"
+            )
+        if every <= 0:
+            raise ValueError(f"every debe ser mayor a 0, recibido: {every}")
+        if sample_interval <= 0:
+            raise ValueError(f"sample_interval debe ser mayor a 0, recibido: {sample_interval}")
+        
+        self.output_dir = Path(output_dir)
+        self.modes: FrozenSet[str] = modes
+        self.every = every
+        self.sample_interval = sample_interval
+        self.tracemalloc_frames = tracemalloc_frames
+        self._busy = threading.Lock()
+        self._lock = threading.Lock()
+        self._calls: Counter = Counter()
+        self._profiled: Counter = Counter()
+        self._skipped = 0
+        self._stacks_only = 0
+        self._owner: Optional[int] = None
+        self._sequence = itertools.count(1)
+        self._labels: Dict[int, str] = {}
+    
+    @classmethod
+    def from_env(cls, environ: Optional[Dict[str, str]] = None) -> Optional["Profiler"]:
+        """
+        Crea un Profiler a partir de RAG_PROFILE* (None si RAG_PROFILE no está definida).
+        
+        Args:
+            environ: Variables a leer (default: os.environ)
+            
+        Returns:
+            El Profiler configurado o None
+        """
+        environ = os.environ if environ is None else environ
+        spec = environ.get("RAG_PROFILE", "").strip().lower()
+        if not spec or spec in ("0", "false", "off"):
+            return None
+        modes = MODES if spec in ("1", "true", "on", "all") else [m.strip() for m in spec.split(",") if m.strip()]
+        return cls(
+            output_dir=environ.get("RAG_PROFILE_DIR", "profiles"),
+            modes=modes,
+            every=int(environ.get("RAG_PROFILE_EVERY", "1")),
+            sample_interval=float(environ.get("RAG_PROFILE_INTERVAL_MS", "5")) / 1000.0
+        )
+    
+    def label(self, stage: Optional[str]) -> Optional[str]:
+        """
+        Marca la etapa del pipeline que ejecuta el hilo actual (raíz de los
+        stacks muestreados).
+        
+        Returns:
+            La etapa anterior, para restaurarla al terminar
+        """
+        thread_id = threading.get_ident()
+        previous = self._labels.get(thread_id)
+        if stage is None:
+            self._labels.pop(thread_id, None)
+        else:
+            self._labels[thread_id] = stage
+        return previous
+    
+    def _should_profile(self, stage: str) -> bool:
+        with self._lock:
+            self._calls[stage] += 1
+            return (self._calls[stage] - 1) % self.every == 0
+    
+    @contextmanager
+    def profile(self, stage: str) -> Iterator[None]:
+        """
+        Perfila el bloque con los modos configurados.
+        
+        Args:
+            stage: Nombre de la etapa (prefijo de los archivos)
+        """
+        if not self._should_profile(stage):
+            yield
+            return
+        thread_id = threading.get_ident()
+        if self._busy.acquire(blocking=False):
+            self._owner = thread_id
+            try:
+                with self._capture(stage, self.modes):
+                    yield
+            finally:
+                self._owner = None
+                self._busy.release()
+            return
+        
+        if "stacks" in self.modes and self._owner != thread_id:
+            # Otro hilo tiene cProfile/tracemalloc: el stack de este se puede muestrear igual
+            with self._lock:
+                self._stacks_only += 1
+            with self._capture(stage, frozenset({"stacks"})):
+                yield
+            return
+        with self._lock:
+            self._skipped += 1
+        yield
+    
+    @contextmanager
+    def _capture(self, stage: str, modes: FrozenSet[str]) -> Iterator[None]:
+        """Captura el bloque con `modes` y escribe los archivos al terminar."""
+        base = self.output_dir / f"{stage}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(self._sequence):05d}"
+        profiler = cProfile.Profile() if "cprofile" in modes else None
+        sampler = None
+        started_tracemalloc = False
+        before = None
+        if "tracemalloc" in modes:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.tracemalloc_frames)
+                started_tracemalloc = True
+            before = tracemalloc.take_snapshot()
+        if "stacks" in modes:
+            sampler = StackSampler(threading.get_ident(), self.sample_interval, self._labels).start()
+        if profiler is not None:
+            profiler.enable()
+        
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            if sampler is not None:
+                sampler.stop()
+            after = tracemalloc.take_snapshot() if before is not None else None
+            if started_tracemalloc:
+                tracemalloc.stop()
+            # Un error al escribir el perfil no debe reemplazar la excepción
+            # (o el resultado) de la llamada perfilada
+            try:
+                self._write(base, profiler, sampler, before, after)
+            except Exception as e:
+                logger.warning("No se pudo escribir el perfil %s: %s", base, e)
+            else:
+                with self._lock:
+                    self._profiled[stage] += 1
+    
+    def _write(
+        self,
+        base: Path,
+        profiler: Optional[cProfile.Profile],
+        sampler: Optional[StackSampler],
+        before: Optional[tracemalloc.Snapshot],
+        after: Optional[tracemalloc.Snapshot]
+    ) -> None:
+        """Escribe los archivos de una llamada perfilada."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        if profiler is not None:
+            profiler.dump_stats(f"{base}.pstats")
+            summary = io.StringIO()
+            pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(40)
+            Path(f"{base}.txt").write_text(summary.getvalue(), encoding="utf-8")
+        if after is not None:
+            after.dump(f"{base}.tracemalloc")
+            lines = [str(stat) for stat in after.compare_to(before, "lineno")[:30]]
+            Path(f"{base}-alloc.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+        if sampler is not None:
+            Path(f"{base}.folded").write_text(sampler.folded(), encoding="utf-8")
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna llamadas vistas y perfiladas por etapa.
+        
+        Returns:
+            Diccionario con calls, profiled, skipped, stacks_only y output_dir
+        """
+        with self._lock:
+            return {
+                "calls": dict(self._calls),
+                "profiled": dict(self._profiled),
+                "skipped": self._skipped,
+                "stacks_only": self._stacks_only,
+                "output_dir": str(self.output_dir),
+            }
+
+
+def _profiler_from_env() -> Optional[Profiler]:
+    """Profiler.from_env() para el arranque: un valor inválido no impide importar."""
+    try:
+        return Profiler.from_env()
+    except ValueError as e:
+        logger.warning("Perfilado desactivado, configuración RAG_PROFILE* inválida: %s", e)
+        return None
+
+
+_PROFILER: Optional[Profiler] = _profiler_from_env()
+
+
+def get_profiler() -> Optional[Profiler]:
+    """Retorna el Profiler activo (None si el perfilado está desactivado)."""
+    return _PROFILER
+
+
+def configure_profiling(profiler: Optional[Profiler]) -> Optional[Profiler]:
+    """
+    Activa (o desactiva con None) el perfilado para todo el proceso.
+    
+    Args:
+        profiler: Profiler a usar
+        
+    Returns:
+        El Profiler que estaba activo
+    """
+    global _PROFILER
+    previous, _PROFILER = _PROFILER, profiler
+    return previous
+
+
+def profiled(stage: str) -> Callable[[F], F]:
+    """
+    Decorador que perfila cada llamada de la función como `stage` cuando el
+    perfilado está activo. Desactivado, solo agrega una comparación.
+    
+    En funciones generadoras el perfil abarca la iteración completa (del
+    primer next() hasta agotar o cerrar el generador), no solo su creación.
+    
+    Args:
+        stage: Nombre de la etapa (prefijo de los archivos)
+    """
+    def decorator(fn: F) -> F:
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def generator_wrapper(*args, **kwargs):
+                profiler = _PROFILER
+                if profiler is None:
+                    return fn(*args, **kwargs)
+                return _profile_iteration(profiler, stage, fn(*args, **kwargs))
+            return generator_wrapper  # type: ignore[return-value]
+        
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            profiler = _PROFILER
+            if profiler is None:
+                return fn(*args, **kwargs)
+            with profiler.profile(stage):
+                return fn(*args, **kwargs)
+        return wrapper  # type: ignore[return-value]
+    return decorator
+
+
+def _profile_iteration(profiler: Profiler, stage: str, generator: Iterator[Any]) -> Iterator[Any]:
+    """Recorre `generator` dentro de profiler.profile(stage)."""
+    with profiler.profile(stage):
+        return (yield from generator)
@@ -1,6 +1,9 @@
 from .models import RecipeDocument, Chunk
-from .loader import load_recipes_from_json, recipes_to_chunks
+from .loader import load_recipes_from_json, recipes_to_chunks, recipes_to_multi_vector_chunks
 from .pipeline import RAGPipeline
+from .tracing import QueryTrace, QueryResult, PipelineHook, LatencyHistogram, WarmupReport
+from .ingredients import IngredientIndex, IngredientConstraints, IngredientFilter
+from .evaluation import LabelledQuery, EvaluationReport, RetrievalEvaluator, load_labelled_queries
 
 # Re-exportar componentes de sub-módulos
 from .embeddings import (
@@ -11,11 +14,18 @@ from .embeddings import (
 from .vector_store import (
     VectorStore,
     ScoredChunk,
+    DocumentFilter,
     VectorStoreBackend,
     create_vector_store,
     InMemoryVectorStore,
-    ChromaDBVectorStore
+    MultiVectorStore
 )
+from ..lazy import lazy_exports
+
+# ChromaDB se importa recién al acceder al nombre
+__getattr__ = lazy_exports(globals(), {
+    "ChromaDBVectorStore": ".vector_store.chromadb_store:ChromaDBVectorStore",
+})
 
 __all__ = [
     # Models
@@ -24,8 +34,24 @@ __all__ = [
     # Loader
     "load_recipes_from_json",
     "recipes_to_chunks",
+    "recipes_to_multi_vector_chunks",
     # Pipeline
     "RAGPipeline",
+    # Ingredientes
+    "IngredientIndex",
+    "IngredientConstraints",
+    "IngredientFilter",
+    # Tracing
+    "QueryTrace",
+    "QueryResult",
+    "PipelineHook",
+    "LatencyHistogram",
+    "WarmupReport",
+    # Evaluation
+    "LabelledQuery",
+    "EvaluationReport",
+    "RetrievalEvaluator",
+    "load_labelled_queries",
     # Embeddings
     "EmbeddingModel",
     "EmbeddingBackend",
@@ -33,8 +59,10 @@ __all__ = [
     # Vector Store
     "VectorStore",
     "ScoredChunk",
+    "DocumentFilter",
     "VectorStoreBackend",
     "create_vector_store",
     "InMemoryVectorStore",
+    "MultiVectorStore",
     "ChromaDBVectorStore",
 ]
\ No newline at end of file
@@ -0,0 +1,76 @@
+"""
+Diversificación del contexto recuperado con Maximal Marginal Relevance (MMR).
+"""
+from typing import List, Sequence
+import numpy as np
+from .vector_store.base import ScoredChunk
+
+
+def mmr_select(
+    query_embedding: Sequence[float],
+    candidates: List[ScoredChunk],
+    k: int,
+    lambda_mult: float = 0.5
+) -> List[ScoredChunk]:
+    """
+    Elige k candidatos con MMR: en cada paso, el que maximiza
+    lambda * rel(c) - (1 - lambda) * max sim(c, elegidos).
+    
+    La relevancia es el score que asignó el vector store, normalizado a
+    [0, 1] (min-max entre los candidatos), así respeta rankings que no son
+    el coseno con la query (RRF de hybrid, rerankeo de two_stage). Los
+    embeddings solo se usan para la redundancia: cosenos entre pares de
+    candidatos en un solo producto matricial (m x m). La selección greedy
+    mantiene, por candidato, su similitud máxima con los ya elegidos y la
+    actualiza con la fila del último elegido, así cada paso es O(m)
+    vectorizado.
+    
+    Args:
+        query_embedding: Vector de embedding de la consulta (los candidatos
+                         deben tener su misma dimensión)
+        candidates: Candidatos ordenados por score (ej: top fetch_k de search())
+        k: Cantidad de candidatos a elegir
+        lambda_mult: Peso de la relevancia (1.0 = solo relevancia, 0.0 = solo diversidad)
+        
+    Returns:
+        Los ScoredChunk elegidos, en orden de selección y con su score
+        original. Si algún candidato no tiene embedding o la dimensión no
+        coincide con la query, retorna los primeros k sin reordenar
+        
+    Raises:
+        ValueError: Si lambda_mult no está entre 0 y 1
+        
+    Referencias:
+    - MMR: https://www.cs.cmu.edu/~jgc/publication/The_Use_MMR_Diversity_Based_LTMIR_1998.pdf
+    """
+    if not 0.0 <= lambda_mult <= 1.0:
+        raise ValueError(f"lambda_mult debe estar entre 0 y 1, recibido: {lambda_mult}")
+    
+    if k <= 0 or not candidates:
+        return []
+    dimension = len(query_embedding)
+    if len(candidates) <= 1 or any(len(scored.chunk.embedding) != dimension for scored in candidates):
+        return candidates[:k]
+    
+    scores = np.fromiter((scored.score for scored in candidates), dtype=np.float64, count=len(candidates))
+    spread = scores.max() - scores.min()
+    relevance = (scores - scores.min()) / spread if spread > 0 else np.ones(len(candidates))
+    
+    # Las vistas de la matriz del store se apilan sin pasar por listas de Python
+    vectors = np.stack([np.asarray(scored.chunk.embedding, dtype=np.float32) for scored in candidates])
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    pairwise = vectors @ vectors.T
+    
+    selected = [int(np.argmax(relevance))]
+    available = np.ones(len(candidates), dtype=bool)
+    available[selected[0]] = False
+    redundancy = pairwise[selected[0]].copy()
+    for _ in range(min(k, len(candidates)) - 1):
+        marginal = lambda_mult * relevance - (1.0 - lambda_mult) * redundancy
+        marginal[~available] = -np.inf
+        chosen = int(np.argmax(marginal))
+        selected.append(chosen)
+        available[chosen] = False
+        np.maximum(redundancy, pairwise[chosen], out=redundancy)
+    
+    return [candidates[i] for i in selected]
@@ -1,28 +1,24 @@
 from .base import EmbeddingModel, EmbeddingBase
 from .fake import FakeEmbeddingModel
-
-# Importación opcional de OpenAI (puede no estar instalado)
-try:
-    from .openai import OpenAIEmbeddingModel
-    _OPENAI_AVAILABLE = True
-except ImportError:
-    OpenAIEmbeddingModel = None  # type: ignore
-    _OPENAI_AVAILABLE = False
-
-# Importación opcional de Ollama (puede no estar instalado)
-try:
-    from .ollama import OllamaEmbeddingModel
-    _OLLAMA_AVAILABLE = True
-except ImportError:
-    OllamaEmbeddingModel = None  # type: ignore
-    _OLLAMA_AVAILABLE = False
+from .cache import EmbeddingCache
+from .coalescing import SingleFlightEmbeddingModel
 
 from .factory import create_embedding_model, EmbeddingBackend
+from ...lazy import lazy_exports
+
+# Importación diferida de los backends con dependencias opcionales (openai,
+# requests): se importan al acceder al nombre (valen None si no están instalados)
+__getattr__ = lazy_exports(globals(), {
+    "OpenAIEmbeddingModel": ".openai:OpenAIEmbeddingModel",
+    "OllamaEmbeddingModel": ".ollama:OllamaEmbeddingModel",
+})
 
 __all__ = [
     "EmbeddingModel",
     "EmbeddingBase",
     "FakeEmbeddingModel",
+    "EmbeddingCache",
+    "SingleFlightEmbeddingModel",
     "OpenAIEmbeddingModel",
     "OllamaEmbeddingModel",
     "create_embedding_model",
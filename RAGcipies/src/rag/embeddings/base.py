@@ -4,6 +4,33 @@ class EmbeddingBase(ABC):
     @abstractmethod
     def embed(self, text: str) -> list[float]:
         pass
+    
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        """
+        Genera embeddings para varios textos.
+        
+        La implementación por defecto llama a embed() por cada texto; los
+        backends con API de lotes la sobreescriben con una sola llamada.
+        
+        Args:
+            texts: Textos a convertir en embeddings
+            
+        Returns:
+            Un embedding por texto, en el mismo orden
+        """
+        return [self.embed(text) for text in texts]
+    
+    def warmup(self) -> None:
+        """
+        Precarga el modelo para que la primera consulta no pague el tiempo de carga.
+        
+        La implementación por defecto no hace nada (modelos en proceso o APIs
+        remotas); los backends con modelos locales la sobreescriben.
+        
+        Raises:
+            RuntimeError: Si el backend no pudo precargar el modelo
+        """
+        pass
 
 # Alias para mantener compatibilidad
 EmbeddingModel = EmbeddingBase
\ No newline at end of file
@@ -0,0 +1,165 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, List, Optional, Tuple, Any
+from .base import EmbeddingModel
+
+
+def normalize_query(text: str, casefold: bool = False) -> str:
+    """
+    Normaliza el texto de una consulta para usarlo como clave de cache.
+    Colapsa espacios en blanco, de modo que "receta  con pollo " y
+    "receta con pollo" compartan la misma entrada. Las mayúsculas solo se
+    ignoran con casefold=True: los modelos de embeddings distinguen
+    mayúsculas, así que "Pollo" y "pollo" pueden tener vectores distintos.
+    
+    Args:
+        text: Texto original de la consulta
+        casefold: Si es True, también pasa a minúsculas
+        
+    Returns:
+        Texto normalizado
+    """
+    normalized = " ".join(text.split())
+    return normalized.casefold() if casefold else normalized
+
+
+def model_cache_key(model: EmbeddingModel) -> str:
+    """
+    Identificador del modelo de embeddings para la clave de cache.
+    Combina la clase y el nombre del modelo que calcula los vectores (sin
+    los wrappers como SingleFlightEmbeddingModel, que exponen el modelo
+    envuelto en `inner`), así dos backends distintos nunca comparten
+    vectores y un mismo backend comparte entradas con o sin wrapper.
+    
+    Args:
+        model: Modelo de embeddings
+        
+    Returns:
+        Clave del modelo (ej: "OllamaEmbeddingModel:nomic-embed-text")
+    """
+    while getattr(model, "inner", None) is not None:
+        model = model.inner
+    return f"{model.__class__.__name__}:{getattr(model, 'model', 'default')}"
+
+
+class EmbeddingCache:
+    """
+    Cache LRU acotado y thread-safe de embeddings de consultas.
+    
+    Las claves son (modelo, query normalizada); al superar max_size se
+    descarta la entrada usada hace más tiempo. Los vectores se guardan
+    como tuplas inmutables y se devuelve una copia en cada hit, así un
+    caller no puede modificar el valor cacheado.
+    """
+    
+    def __init__(self, max_size: int = 1024, casefold: bool = False):
+        """
+        Args:
+            max_size: Número máximo de embeddings a mantener en cache
+            casefold: Si es True, las queries que solo difieren en mayúsculas
+                      comparten entrada (ver normalize_query)
+            
+        Raises:
+            ValueError: Si max_size no es positivo
+        """
+        if max_size <= 0:
+            raise ValueError(f"max_size debe ser mayor a 0, recibido: {max_size}")
+        
+        self.max_size = max_size
+        self.casefold = casefold
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, ...]]" = OrderedDict()
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+    
+    def get(self, model_key: str, text: str) -> Optional[List[float]]:
+        """
+        Busca el embedding de una consulta.
+        
+        Args:
+            model_key: Clave del modelo (ver model_cache_key)
+            text: Texto de la consulta (se normaliza internamente)
+            
+        Returns:
+            Copia del embedding cacheado o None si no está
+        """
+        key = (model_key, normalize_query(text, self.casefold))
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+        return list(vector)
+    
+    def put(self, model_key: str, text: str, embedding: List[float]) -> None:
+        """
+        Guarda el embedding de una consulta, desalojando la entrada LRU si hace falta.
+        
+        Args:
+            model_key: Clave del modelo (ver model_cache_key)
+            text: Texto de la consulta (se normaliza internamente)
+            embedding: Vector a cachear
+        """
+        key = (model_key, normalize_query(text, self.casefold))
+        vector = tuple(embedding)
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+    
+    def get_or_compute(self, model: EmbeddingModel, text: str) -> Tuple[List[float], bool]:
+        """
+        Retorna el embedding cacheado o lo calcula con el modelo y lo guarda.
+        
+        El cálculo se hace fuera del lock: dos misses concurrentes de la
+        misma query pueden calcular el embedding dos veces, pero nunca
+        bloquean al resto de las consultas.
+        
+        Args:
+            model: Modelo de embeddings a usar en caso de miss
+            text: Texto de la consulta
+            
+        Returns:
+            Tupla (embedding, cache_hit)
+        """
+        model_key = model_cache_key(model)
+        cached = self.get(model_key, text)
+        if cached is not None:
+            return cached, True
+        
+        embedding = model.embed(text)
+        self.put(model_key, text, embedding)
+        return embedding, False
+    
+    def clear(self) -> None:
+        """Vacía el cache (las métricas acumuladas se conservan)."""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna métricas del cache.
+        
+        Returns:
+            Diccionario con hits, misses, evictions, size, max_size y hit_rate
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+            }
+    
+    def __len__(self) -> int:
+        """Retorna el número de embeddings cacheados."""
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,54 @@
+from typing import Any, Dict, List, Optional
+from ...concurrency.singleflight import SingleFlight
+from .base import EmbeddingModel
+
+
+class SingleFlightEmbeddingModel(EmbeddingModel):
+    """
+    Wrapper que une llamadas concurrentes a embed() con el mismo texto en
+    una sola llamada al modelo (ver SingleFlight).
+    
+    Complementa al EmbeddingCache: el cache sirve las queries repetidas una
+    vez calculadas, y el single-flight evita que una ráfaga de la misma query
+    dispare N llamadas antes de que el cache tenga el valor.
+    """
+    
+    def __init__(self, model: EmbeddingModel, timeout: Optional[float] = None):
+        """
+        Args:
+            model: Modelo de embeddings a envolver
+            timeout: Segundos máximos que una llamada espera a otra idéntica en curso
+                     (None = sin límite)
+        """
+        self.inner = model
+        self.model = getattr(model, "model", "default")
+        self.timeout = timeout
+        self._flight: SingleFlight[List[float]] = SingleFlight()
+    
+    def embed(self, text: str) -> List[float]:
+        """
+        Genera el embedding del texto, compartiendo la llamada si ya hay una en curso.
+        
+        Args:
+            text: Texto a convertir en embedding
+            
+        Returns:
+            Vector de embedding (cada caller recibe su propia copia)
+            
+        Raises:
+            TimeoutError: Si se supera el timeout esperando la llamada en curso
+        """
+        embedding, _ = self._flight.do(text, lambda: self.inner.embed(text), timeout=self.timeout)
+        return list(embedding)
+    
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Delega en el modelo envuelto (los lotes ya se deduplican en el pipeline)."""
+        return self.inner.embed_batch(texts)
+    
+    def warmup(self) -> None:
+        """Precarga el modelo envuelto."""
+        self.inner.warmup()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Retorna las métricas del coalescing (ver SingleFlight.stats)."""
+        return self._flight.stats()
@@ -1,31 +1,29 @@
 from enum import Enum
 from typing import Type
+import os
+from ...lazy import LazyRegistry
 from .base import EmbeddingModel
-from .fake import FakeEmbeddingModel
-from .openai import OpenAIEmbeddingModel
-
-# Importación opcional de Ollama embeddings
-try:
-    from .ollama import OllamaEmbeddingModel
-    _OLLAMA_AVAILABLE = True
-except ImportError:
-    OllamaEmbeddingModel = None  # type: ignore
-    _OLLAMA_AVAILABLE = False
 
 class EmbeddingBackend(str, Enum):
     FAKE = "fake"
     OPENAI = "openai"
     OLLAMA = "ollama"  # ✨ NUEVO
 
-# Registry: mapea cada backend a su clase correspondiente (Strategy Pattern)
-_EMBEDDING_REGISTRY: dict[EmbeddingBackend, Type[EmbeddingModel]] = {
-    EmbeddingBackend.FAKE: FakeEmbeddingModel,
-    EmbeddingBackend.OPENAI: OpenAIEmbeddingModel,
-}
+# Registry: mapea cada backend a su clase correspondiente (Strategy Pattern).
+# Las clases se importan recién en el primer create_embedding_model de cada
+# backend, así usar FAKE no importa openai ni requests
+_EMBEDDING_REGISTRY: LazyRegistry[Type[EmbeddingModel]] = LazyRegistry(__package__, {
+    EmbeddingBackend.FAKE: ".fake:FakeEmbeddingModel",
+    EmbeddingBackend.OPENAI: ".openai:OpenAIEmbeddingModel",
+    EmbeddingBackend.OLLAMA: ".ollama:OllamaEmbeddingModel",
+})
 
-# Agregar Ollama si está disponible
-if _OLLAMA_AVAILABLE:
-    _EMBEDDING_REGISTRY[EmbeddingBackend.OLLAMA] = OllamaEmbeddingModel
+# Paquete a instalar si falta la dependencia de un backend (ImportError.name
+# puede ser None, ej: si el import falla dentro del paquete)
+_BACKEND_PACKAGES = {
+    EmbeddingBackend.OPENAI: "openai",
+    EmbeddingBackend.OLLAMA: "requests",
+}
 
 def create_embedding_model(backend: EmbeddingBackend, **kwargs) -> EmbeddingModel:
     """
@@ -41,9 +39,16 @@ def create_embedding_model(backend: EmbeddingBackend, **kwargs) -> EmbeddingMode
         Una instancia del modelo de embeddings correspondiente
         
     Raises:
-        ValueError: Si el backend no está registrado
+        ValueError: Si el backend no está registrado o su dependencia no está instalada
     """
-    embedding_class = _EMBEDDING_REGISTRY.get(backend)
+    try:
+        embedding_class = _EMBEDDING_REGISTRY.get(backend)
+    except ImportError as e:
+        package = e.name or _BACKEND_PACKAGES.get(backend, backend.value)
+        raise ValueError(
+            f"Embedding backend {backend.value} is not available: {e}. "
+            f"Install the missing package with: pip install {package}"
+        )
     
     if embedding_class is None:
         available = ", ".join(b.value for b in _EMBEDDING_REGISTRY.keys())
@@ -52,4 +57,13 @@ def create_embedding_model(backend: EmbeddingBackend, **kwargs) -> EmbeddingMode
             f"Available backends: {available}"
         )
     
+    # Para Ollama, compartir la URL y el keep_alive configurados para el LLM
+    if backend == EmbeddingBackend.OLLAMA:
+        base_url = os.getenv("OLLAMA_BASE_URL")
+        if base_url and "base_url" not in kwargs:
+            kwargs["base_url"] = base_url
+        keep_alive = os.getenv("OLLAMA_KEEP_ALIVE")
+        if keep_alive and "keep_alive" not in kwargs:
+            kwargs["keep_alive"] = int(keep_alive) if keep_alive.lstrip("-").isdigit() else keep_alive
+    
     return embedding_class(**kwargs)
\ No newline at end of file
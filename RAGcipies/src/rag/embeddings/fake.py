@@ -1,22 +1,80 @@
 import hashlib
-import math
 from typing import List
+import numpy as np
+from ...metrics.backends import embedding_metrics
 from .base import EmbeddingModel
 
 
+# Constantes de splitmix64 para expandir el hash a más de 32 dimensiones
+_GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+
+
 class FakeEmbeddingModel(EmbeddingModel):
     """
     Embedding determinista y liviano.
     No usa APIs externas y siempre da el mismo resultado
     para el mismo texto.
+    
+    Con dimension <= 32 cada componente es un byte del SHA-256 del texto
+    (la dimensión por defecto, 8, conserva los vectores históricos). Para
+    dimensiones mayores el hash se usa como semilla de splitmix64, calculado
+    de forma vectorizada para todo el lote: embed_matrix genera corpus
+    sintéticos grandes (benchmarks) sin un bucle Python por componente.
     """
 
+    def __init__(self, dimension: int = 8):
+        """
+        Args:
+            dimension: Dimensión de los vectores generados
+            
+        Raises:
+            ValueError: Si dimension no es positiva
+        """
+        if dimension <= 0:
+            raise ValueError(f"dimension debe ser mayor a 0, recibido: {dimension}")
+        self.dimension = dimension
+        self._metrics = embedding_metrics(self)
+    
     def embed(self, text: str) -> List[float]:
-        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        with self._metrics.call(1):
+            return self.embed_matrix([text])[0].tolist()
+    
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        with self._metrics.call(len(texts)):
+            return self.embed_matrix(texts).tolist()
+    
+    def embed_matrix(self, texts: List[str]) -> np.ndarray:
+        """
+        Genera los embeddings de un lote como una matriz normalizada.
+        
+        Args:
+            texts: Textos a convertir en embeddings
+            
+        Returns:
+            Array float64 de forma (len(texts), dimension)
+        """
+        digests = np.frombuffer(
+            b"".join(hashlib.sha256(text.encode("utf-8")).digest() for text in texts),
+            dtype=np.uint8
+        ).reshape(len(texts), 32)
 
-        # Vector chico (8 dimensiones)
-        vector = [b / 255.0 for b in digest[:8]]
+        if self.dimension <= 32:
+            vectors = digests[:, :self.dimension] / 255.0
+        else:
+            seeds = digests[:, :8].copy().view("<u8")
+            counters = np.arange(1, self.dimension + 1, dtype=np.uint64)
+            with np.errstate(over="ignore"):
+                z = seeds + counters * _GOLDEN_GAMMA
+                z = (z ^ (z >> np.uint64(30))) * _MIX_1
+                z = (z ^ (z >> np.uint64(27))) * _MIX_2
+                z = z ^ (z >> np.uint64(31))
+            vectors = (z >> np.uint64(40)).astype(np.float64) / float(1 << 24)
 
         # Normalizamos
-        norm = math.sqrt(sum(x * x for x in vector)) or 1.0
-        return [x / norm for x in vector]
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
\ No newline at end of file
@@ -1,9 +1,15 @@
-from typing import List, Optional
+from typing import List, Optional, Union, Dict, Any
 import os
 import requests
+from ...metrics.backends import embedding_metrics
 from .base import EmbeddingModel
 
 
+# keep_alive del warm-up si no hay uno configurado: con el default del servidor
+# (~5 minutos) un servidor sin tráfico descarga el modelo recién precargado
+WARMUP_KEEP_ALIVE = "24h"
+
+
 class OllamaEmbeddingModel(EmbeddingModel):
     """
     Embedding usando Ollama (modelos locales).
@@ -18,7 +24,8 @@ class OllamaEmbeddingModel(EmbeddingModel):
         self,
         model: str = "nomic-embed-text",
         base_url: str = "http://localhost:11434",
-        timeout: int = 300
+        timeout: int = 300,
+        keep_alive: Optional[Union[str, int]] = None
     ):
         """
         Args:
@@ -30,12 +37,45 @@ class OllamaEmbeddingModel(EmbeddingModel):
                    - "all-minilm"
             base_url: URL base de la API de Ollama
             timeout: Timeout en segundos para las peticiones HTTP (default: 300 = 5 minutos)
+            keep_alive: Cuánto tiempo mantiene Ollama el modelo cargado tras cada request
+                        (ej: "30m", 3600, -1 = siempre). None usa el default del servidor
         """
         self.model = model
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
+        self.keep_alive = keep_alive
+        self._metrics = embedding_metrics(self)
         # No verificamos aquí, dejamos que falle en embed() con mejor mensaje
     
+    def _with_keep_alive(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Agrega keep_alive al body solo si está configurado."""
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        return payload
+    
+    def warmup(self) -> None:
+        """
+        Carga el modelo de embeddings en Ollama con una request mínima a
+        /api/embed, con el keep_alive configurado o, si no hay, WARMUP_KEEP_ALIVE.
+        
+        Raises:
+            RuntimeError: Si Ollama no está disponible o el modelo no está descargado
+        """
+        payload = self._with_keep_alive({"model": self.model, "input": ["warmup"]})
+        payload.setdefault("keep_alive", WARMUP_KEEP_ALIVE)
+        try:
+            response = requests.post(
+                f"{self.base_url}/api/embed",
+                json=payload,
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            raise RuntimeError(
+                f"Error al precargar el modelo de embeddings {self.model} en Ollama: {e}\n"
+                f"Asegúrate de que Ollama esté corriendo en {self.base_url}"
+            )
+    
     def embed(self, text: str) -> List[float]:
         """
         Genera un embedding para el texto dado usando Ollama.
@@ -53,44 +93,108 @@ class OllamaEmbeddingModel(EmbeddingModel):
         if not text or not text.strip():
             raise ValueError("El texto no puede estar vacío")
         
-        try:
-            response = requests.post(
-                f"{self.base_url}/api/embeddings",
-                json={
-                    "model": self.model,
-                    "prompt": text
-                },
-                timeout=self.timeout
-            )
-            
-            response.raise_for_status()
-            result = response.json()
-            
-            # Ollama retorna un diccionario con la clave "embedding"
-            embedding = result.get("embedding", [])
-            if not embedding:
-                raise RuntimeError("La respuesta de Ollama no contiene un embedding válido")
+        with self._metrics.call(1):
+            try:
+                response = requests.post(
+                    f"{self.base_url}/api/embeddings",
+                    json=self._with_keep_alive({
+                        "model": self.model,
+                        "prompt": text
+                    }),
+                    timeout=self.timeout
+                )
+                
+                response.raise_for_status()
+                result = response.json()
+                
+                # Ollama retorna un diccionario con la clave "embedding"
+                embedding = result.get("embedding", [])
+                if not embedding:
+                    raise RuntimeError("La respuesta de Ollama no contiene un embedding válido")
+                
+                return embedding
+            except requests.exceptions.RequestException as e:
+                error_msg = str(e)
+                
+                # Mensaje más claro si el modelo no está descargado
+                if "not found" in error_msg.lower() or "404" in error_msg.lower():
+                    raise RuntimeError(
+                        f"Modelo '{self.model}' no encontrado en Ollama.\n"
+                        f"Descárgalo primero con: ollama pull {self.model}\n"
+                        f"Modelos recomendados: nomic-embed-text, embeddinggemma, qwen3-embedding, all-minilm"
+                    )
+                else:
+                    raise RuntimeError(
+                        f"Error al generar embedding con Ollama: {error_msg}\n"
+                        f"Asegúrate de que:\n"
+                        f"  1. Ollama esté corriendo (ollama serve)\n"
+                        f"  2. El modelo {self.model} esté descargado (ollama pull {self.model})"
+                    )
+            except Exception as e:
+                raise RuntimeError(
+                    f"Error inesperado al generar embedding con Ollama: {e}\n"
+                    f"Asegúrate de que Ollama esté corriendo en {self.base_url}"
+                )
+    
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        Genera embeddings para varios textos en una sola llamada a /api/embed.
+        
+        Args:
+            texts: Textos a convertir en embeddings
             
-            return embedding
-        except requests.exceptions.RequestException as e:
-            error_msg = str(e)
+        Returns:
+            Un embedding por texto, en el mismo orden (L2-normalizados)
             
-            # Mensaje más claro si el modelo no está descargado
-            if "not found" in error_msg.lower() or "404" in error_msg.lower():
-                raise RuntimeError(
-                    f"Modelo '{self.model}' no encontrado en Ollama.\n"
-                    f"Descárgalo primero con: ollama pull {self.model}\n"
-                    f"Modelos recomendados: nomic-embed-text, embeddinggemma, qwen3-embedding, all-minilm"
+        Raises:
+            ValueError: Si algún texto está vacío
+            RuntimeError: Si hay un error al llamar a Ollama o el modelo no está descargado
+        """
+        if not texts:
+            return []
+        if any(not text or not text.strip() for text in texts):
+            raise ValueError("El texto no puede estar vacío")
+        
+        with self._metrics.call(len(texts)):
+            try:
+                response = requests.post(
+                    f"{self.base_url}/api/embed",
+                    json=self._with_keep_alive({
+                        "model": self.model,
+                        "input": texts
+                    }),
+                    timeout=self.timeout
                 )
-            else:
+                
+                response.raise_for_status()
+                result = response.json()
+                
+                # /api/embed retorna {"embeddings": [[...], ...]} en el orden de input
+                embeddings = result.get("embeddings", [])
+                if len(embeddings) != len(texts) or not all(embeddings):
+                    raise RuntimeError("La respuesta de Ollama no contiene embeddings válidos")
+                
+                return embeddings
+            except requests.exceptions.RequestException as e:
+                error_msg = str(e)
+                
+                if "not found" in error_msg.lower() or "404" in error_msg.lower():
+                    raise RuntimeError(
+                        f"Modelo '{self.model}' no encontrado en Ollama.\n"
+                        f"Descárgalo primero con: ollama pull {self.model}\n"
+                        f"Modelos recomendados: nomic-embed-text, embeddinggemma, qwen3-embedding, all-minilm"
+                    )
+                else:
+                    raise RuntimeError(
+                        f"Error al generar embedding con Ollama: {error_msg}\n"
+                        f"Asegúrate de que:\n"
+                        f"  1. Ollama esté corriendo (ollama serve)\n"
+                        f"  2. El modelo {self.model} esté descargado (ollama pull {self.model})"
+                    )
+            except RuntimeError:
+                raise
+            except Exception as e:
                 raise RuntimeError(
-                    f"Error al generar embedding con Ollama: {error_msg}\n"
-                    f"Asegúrate de que:\n"
-                    f"  1. Ollama esté corriendo (ollama serve)\n"
-                    f"  2. El modelo {self.model} esté descargado (ollama pull {self.model})"
-                )
-        except Exception as e:
-            raise RuntimeError(
-                f"Error inesperado al generar embedding con Ollama: {e}\n"
-                f"Asegúrate de que Ollama esté corriendo en {self.base_url}"
-            )
\ No newline at end of file
+                    f"Error inesperado al generar embedding con Ollama: {e}\n"
+                    f"Asegúrate de que Ollama esté corriendo en {self.base_url}"
+                )
\ No newline at end of file
@@ -1,6 +1,8 @@
-from typing import List
+from typing import List, Optional
 import os
 from openai import OpenAI
+from ...concurrency.ratelimit import RateLimiter, RateLimitExceeded, estimate_tokens, get_rate_limiter, rate_limits_from_env
+from ...metrics.backends import embedding_metrics
 from .base import EmbeddingModel
 
 
@@ -9,18 +11,30 @@ class OpenAIEmbeddingModel(EmbeddingModel):
     Embedding usando la API de OpenAI.
     Requiere OPENAI_API_KEY en las variables de entorno.
     
+    Las requests pasan por un RateLimiter compartido por API key y modelo
+    (configurable con OPENAI_EMBEDDING_RPM, OPENAI_EMBEDDING_TPM y
+    OPENAI_EMBEDDING_MAX_CONCURRENCY), así una ingesta masiva avanza al
+    ritmo de la cuota y los 429 se reintentan respetando el retry-after.
+    
     Referencias:
     - https://platform.openai.com/docs/api-reference/embeddings
     - https://platform.openai.com/docs/guides/embeddings
     """
     
-    def __init__(self, model: str = "text-embedding-3-small"):
+    def __init__(
+        self,
+        model: str = "text-embedding-3-small",
+        rate_limiter: Optional[RateLimiter] = None,
+        max_retries: int = 5
+    ):
         """
         Args:
             model: Modelo de embeddings a usar.
                    Opciones: "text-embedding-3-small" (1536 dims, recomendado),
                             "text-embedding-3-large" (3072 dims),
                             "text-embedding-ada-002" (1536 dims, legacy)
+            rate_limiter: Limitador a usar (default: el compartido de la API key y el modelo)
+            max_retries: Reintentos máximos ante 429
         """
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
@@ -29,8 +43,20 @@ class OpenAIEmbeddingModel(EmbeddingModel):
                 "Configúrala en las variables de entorno o en el archivo .env"
             )
         
-        self.client = OpenAI(api_key=api_key)
+        # El RateLimiter reintenta los 429 y los errores transitorios, no el SDK
+        self.client = OpenAI(api_key=api_key, max_retries=0)
         self.model = model
+        self.max_retries = max_retries
+        self.rate_limiter = rate_limiter or get_rate_limiter(
+            api_key, model, **rate_limits_from_env("OPENAI_EMBEDDING")
+        )
+        self._metrics = embedding_metrics(self)
+    
+    def _record_usage(self, response, estimated: int) -> None:
+        """Corrige el bucket de tokens/min con el usage real de la respuesta."""
+        usage = getattr(response, "usage", None)
+        if usage is not None and getattr(usage, "total_tokens", None):
+            self.rate_limiter.record_tokens(estimated, usage.total_tokens)
     
     def embed(self, text: str) -> List[float]:
         """
@@ -44,17 +70,66 @@ class OpenAIEmbeddingModel(EmbeddingModel):
             
         Raises:
             ValueError: Si el texto está vacío
+            RateLimitExceeded: Si la API sigue respondiendo 429 tras los reintentos
             RuntimeError: Si hay un error al llamar a la API
         """
         if not text or not text.strip():
             raise ValueError("El texto no puede estar vacío")
         
-        try:
-            response = self.client.embeddings.create(
-                model=self.model,
-                input=text
-            )
-            return response.data[0].embedding
-        except Exception as e:
-            raise RuntimeError(f"Error al generar embedding con OpenAI: {e}")
+        with self._metrics.call(1):
+            tokens = estimate_tokens(text)
+            try:
+                response = self.rate_limiter.call(
+                    lambda: self.client.embeddings.create(
+                        model=self.model,
+                        input=text
+                    ),
+                    tokens=tokens,
+                    max_retries=self.max_retries
+                )
+                self._record_usage(response, tokens)
+                return response.data[0].embedding
+            except RateLimitExceeded:
+                raise
+            except Exception as e:
+                raise RuntimeError(f"Error al generar embedding con OpenAI: {e}")
+    
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        Genera embeddings para varios textos en una sola llamada a la API.
+        
+        Args:
+            texts: Textos a convertir en embeddings
+            
+        Returns:
+            Un embedding por texto, en el mismo orden
+            
+        Raises:
+            ValueError: Si algún texto está vacío
+            RateLimitExceeded: Si la API sigue respondiendo 429 tras los reintentos
+            RuntimeError: Si hay un error al llamar a la API
+        """
+        if not texts:
+            return []
+        if any(not text or not text.strip() for text in texts):
+            raise ValueError("El texto no puede estar vacío")
+        
+        with self._metrics.call(len(texts)):
+            tokens = sum(estimate_tokens(text) for text in texts)
+            try:
+                response = self.rate_limiter.call(
+                    lambda: self.client.embeddings.create(
+                        model=self.model,
+                        input=texts
+                    ),
+                    tokens=tokens,
+                    max_retries=self.max_retries
+                )
+                self._record_usage(response, tokens)
+                # La API no garantiza el orden: usar el índice de cada item
+                return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+            except RateLimitExceeded:
+                raise
+            except Exception as e:
+                raise RuntimeError(f"Error al generar embedding con OpenAI: {e}")
 
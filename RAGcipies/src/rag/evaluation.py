@@ -0,0 +1,354 @@
+import json
+import math
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Union
+from .embeddings.base import EmbeddingModel
+from .models import Chunk
+from .vector_store.base import VectorStore, ScoredChunk
+from .vector_store.in_memory import InMemoryVectorStore
+
+
+@dataclass
+class LabelledQuery:
+    """
+    Consulta etiquetada para evaluar la recuperación.
+    
+    Attributes:
+        query: Texto de la consulta
+        relevant: Recetas relevantes (document_id -> relevancia graduada, mayor = más relevante)
+    """
+    query: str
+    relevant: Dict[str, float]
+
+
+@dataclass
+class EvaluationReport:
+    """
+    Calidad y costo de un vector store sobre un conjunto de consultas etiquetadas.
+    
+    Attributes:
+        name: Nombre de la configuración evaluada
+        queries: Cantidad de consultas evaluadas
+        recall_at_k: Recall de recetas relevantes en el top-k, por k
+        ndcg_at_k: nDCG con relevancia graduada, por k
+        mrr: Mean Reciprocal Rank de la primera receta relevante (dentro del k máximo)
+        baseline_recall_at_k: Fracción del top-k exacto (búsqueda exhaustiva) que
+                              también devuelve este store, por k (por id de
+                              chunk, o por receta si el store no conserva los
+                              ids, ej: MultiVectorStore)
+        index_seconds: Tiempo de add_chunks (sin tracemalloc)
+        index_memory_bytes: Memoria asignada al indexar, medida con tracemalloc
+                            en un store aparte (no incluye la memoria nativa de
+                            extensiones como ChromaDB)
+        latency_ms: p50/p99/media de search en milisegundos
+        queries_per_second: Throughput de search secuencial
+    """
+    name: str
+    queries: int
+    recall_at_k: Dict[int, float] = field(default_factory=dict)
+    ndcg_at_k: Dict[int, float] = field(default_factory=dict)
+    mrr: float = 0.0
+    baseline_recall_at_k: Dict[int, float] = field(default_factory=dict)
+    index_seconds: float = 0.0
+    index_memory_bytes: int = 0
+    latency_ms: Dict[str, float] = field(default_factory=dict)
+    queries_per_second: float = 0.0
+
+
+def load_labelled_queries(path: Union[str, Path]) -> List[LabelledQuery]:
+    """
+    Carga consultas etiquetadas desde un archivo JSON.
+    
+    Formato: lista de {"query": "...", "relevant": [...]} donde relevant es
+    una lista de ids de receta (relevancia 1) o un objeto {id: relevancia}.
+    
+    Args:
+        path: Ruta al archivo JSON
+        
+    Returns:
+        Lista de LabelledQuery
+        
+    Raises:
+        FileNotFoundError: Si el archivo no existe
+        ValueError: Si alguna entrada no tiene consulta o recetas relevantes
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Archivo no encontrado: {path}")
+    
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    
+    labelled = []
+    for i, item in enumerate(data):
+        relevant = item.get("relevant") or {}
+        if isinstance(relevant, list):
+            relevant = {str(doc_id): 1.0 for doc_id in relevant}
+        if not item.get("query") or not relevant:
+            raise ValueError(f"La entrada {i} debe tener 'query' y al menos una receta en 'relevant'")
+        labelled.append(LabelledQuery(
+            query=item["query"],
+            relevant={str(doc_id): float(grade) for doc_id, grade in relevant.items()}
+        ))
+    return labelled
+
+
+def ranked_document_ids(scored_chunks: Sequence[ScoredChunk]) -> List[str]:
+    """
+    Ids de receta en orden de ranking, sin repetidos (varios chunks de una
+    misma receta cuentan en la posición del primero).
+    
+    Args:
+        scored_chunks: Resultados de una búsqueda
+        
+    Returns:
+        Lista de document_id ordenada
+    """
+    seen = set()
+    ranked = []
+    for scored in scored_chunks:
+        doc_id = scored.chunk.document_id
+        if doc_id not in seen:
+            seen.add(doc_id)
+            ranked.append(doc_id)
+    return ranked
+
+
+def recall_at_k(ranked: Sequence[str], relevant: Dict[str, float], k: int) -> float:
+    """Fracción de las recetas relevantes que aparecen en el top-k."""
+    if not relevant:
+        return 0.0
+    return sum(1 for doc_id in ranked[:k] if doc_id in relevant) / len(relevant)
+
+
+def reciprocal_rank(ranked: Sequence[str], relevant: Dict[str, float]) -> float:
+    """1 / posición de la primera receta relevante (0 si no aparece)."""
+    for position, doc_id in enumerate(ranked, start=1):
+        if doc_id in relevant:
+            return 1.0 / position
+    return 0.0
+
+
+def ndcg_at_k(ranked: Sequence[str], relevant: Dict[str, float], k: int) -> float:
+    """nDCG@k con ganancia exponencial (2^rel - 1) y descuento log2."""
+    def dcg(grades: Sequence[float]) -> float:
+        return sum((2 ** grade - 1) / math.log2(position + 2) for position, grade in enumerate(grades))
+    
+    ideal = dcg(sorted(relevant.values(), reverse=True)[:k])
+    if ideal == 0:
+        return 0.0
+    return dcg([relevant.get(doc_id, 0.0) for doc_id in ranked[:k]]) / ideal
+
+
+def _percentile(sorted_samples: List[float], p: float) -> float:
+    """Percentil por rango más cercano sobre una lista ya ordenada."""
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, max(0, int(round(p / 100.0 * len(sorted_samples))) - 1))
+    return sorted_samples[index]
+
+
+def copy_chunks(chunks: Sequence[Chunk]) -> List[Chunk]:
+    """
+    Copia los chunks para indexarlos en otro store (los stores pueden
+    reemplazar el embedding por vistas propias o escribir la metadata).
+    """
+    return [
+        Chunk(
+            id=chunk.id,
+            document_id=chunk.document_id,
+            text=chunk.text,
+            embedding=list(chunk.embedding),
+            metadata=dict(chunk.metadata)
+        )
+        for chunk in chunks
+    ]
+
+
+class RetrievalEvaluator:
+    """
+    Evalúa vector stores con consultas etiquetadas contra una búsqueda exacta.
+    
+    Los embeddings del corpus (los chunks) y de las consultas se calculan una
+    sola vez; cada store se construye con una copia de los chunks, así todas
+    las configuraciones comparan exactamente los mismos vectores. La búsqueda
+    exhaustiva de InMemoryVectorStore es la referencia para
+    baseline_recall_at_k (cuánto del top-k exacto conserva un índice
+    aproximado, cuantizado o de menor dimensión).
+    """
+    
+    def __init__(
+        self,
+        embedding_model: EmbeddingModel,
+        chunks: Sequence[Chunk],
+        labelled_queries: Sequence[LabelledQuery],
+        k_values: Sequence[int] = (1, 3, 5, 10)
+    ):
+        """
+        Args:
+            embedding_model: Modelo para los embeddings de las consultas
+                             (el mismo que generó los de los chunks)
+            chunks: Corpus ya embebido
+            labelled_queries: Consultas con sus recetas relevantes
+            k_values: Cortes de ranking a reportar
+            
+        Raises:
+            ValueError: Si no hay chunks, consultas o valores de k válidos
+        """
+        if not chunks:
+            raise ValueError("No hay chunks para evaluar")
+        if not labelled_queries:
+            raise ValueError("No hay consultas etiquetadas para evaluar")
+        if not k_values or min(k_values) <= 0:
+            raise ValueError(f"k_values debe tener valores mayores a 0, recibido: {list(k_values)}")
+        
+        self.chunks = list(chunks)
+        self.labelled_queries = list(labelled_queries)
+        self.k_values = sorted(set(k_values))
+        self.max_k = self.k_values[-1]
+        self.query_embeddings = embedding_model.embed_batch([q.query for q in self.labelled_queries])
+        
+        baseline = InMemoryVectorStore()
+        baseline.add_chunks(copy_chunks(self.chunks))
+        exact = baseline.search_batch(self.query_embeddings, k=self.max_k)
+        self._baseline_ids = [[scored.chunk.id for scored in results] for results in exact]
+        self._baseline_documents = [ranked_document_ids(results) for results in exact]
+    
+    def evaluate(self, name: str, store_factory: Callable[[], VectorStore]) -> EvaluationReport:
+        """
+        Construye un store, indexa el corpus y mide calidad, latencia y memoria.
+        
+        La memoria se mide indexando el corpus en un segundo store con
+        tracemalloc activo: trazar cada asignación hace mucho más lento a
+        add_chunks y no debe contar en index_seconds.
+        
+        Args:
+            name: Nombre de la configuración (para el reporte)
+            store_factory: Función sin argumentos que crea el store vacío
+            
+        Returns:
+            EvaluationReport de la configuración
+        """
+        index_memory = self._index_memory(store_factory)
+        
+        chunks = copy_chunks(self.chunks)
+        store = store_factory()
+        started = time.perf_counter()
+        store.add_chunks(chunks)
+        index_seconds = time.perf_counter() - started
+        
+        latencies = []
+        results = []
+        for labelled, embedding in zip(self.labelled_queries, self.query_embeddings):
+            search_kwargs = {"query_text": labelled.query} if store.uses_query_text else {}
+            started = time.perf_counter()
+            results.append(store.search(embedding, k=self.max_k, **search_kwargs))
+            latencies.append(time.perf_counter() - started)
+        
+        # Un store que devuelve un chunk por documento (con otro id) se
+        # compara contra el ranking exacto de recetas, no el de chunks
+        by_chunk = store.preserves_chunk_ids
+        baseline = self._baseline_ids if by_chunk else self._baseline_documents
+        report = EvaluationReport(name=name, queries=len(self.labelled_queries))
+        for k in self.k_values:
+            recall, ndcg, agreement = 0.0, 0.0, 0.0
+            for labelled, scored, exact in zip(self.labelled_queries, results, baseline):
+                ranked = ranked_document_ids(scored)
+                recall += recall_at_k(ranked, labelled.relevant, k)
+                ndcg += ndcg_at_k(ranked, labelled.relevant, k)
+                expected = set(exact[:k])
+                returned = {s.chunk.id for s in scored[:k]} if by_chunk else set(ranked[:k])
+                if expected:
+                    agreement += len(expected & returned) / len(expected)
+                else:
+                    agreement += 1.0
+            report.recall_at_k[k] = recall / report.queries
+            report.ndcg_at_k[k] = ndcg / report.queries
+            report.baseline_recall_at_k[k] = agreement / report.queries
+        
+        report.mrr = sum(
+            reciprocal_rank(ranked_document_ids(scored), labelled.relevant)
+            for labelled, scored in zip(self.labelled_queries, results)
+        ) / report.queries
+        
+        ordered = sorted(latencies)
+        report.index_seconds = index_seconds
+        report.index_memory_bytes = max(0, index_memory)
+        report.latency_ms = {
+            "p50": _percentile(ordered, 50) * 1000,
+            "p99": _percentile(ordered, 99) * 1000,
+            "mean": sum(ordered) / len(ordered) * 1000,
+        }
+        report.queries_per_second = len(ordered) / sum(ordered) if sum(ordered) else 0.0
+        return report
+    
+    def _index_memory(self, store_factory: Callable[[], VectorStore]) -> int:
+        """Bytes que asigna add_chunks del corpus en un store nuevo (según tracemalloc)."""
+        chunks = copy_chunks(self.chunks)
+        store = store_factory()
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            store.add_chunks(chunks)
+            return tracemalloc.get_traced_memory()[0] - before
+        finally:
+            if not tracing:
+                tracemalloc.stop()
+    
+    def compare(self, store_factories: Dict[str, Callable[[], VectorStore]]) -> List[EvaluationReport]:
+        """
+        Evalúa varias configuraciones, precedidas por la búsqueda exacta.
+        
+        Args:
+            store_factories: Nombre -> función que crea el store
+            
+        Returns:
+            Un EvaluationReport por configuración (el primero es "exact")
+        """
+        reports = [self.evaluate("exact", InMemoryVectorStore)]
+        for name, factory in store_factories.items():
+            reports.append(self.evaluate(name, factory))
+        return reports
+
+
+def format_reports(reports: Sequence[EvaluationReport]) -> str:
+    """
+    Tabla de texto con calidad, latencia y memoria de cada configuración.
+    
+    Args:
+        reports: Reportes a mostrar
+        
+    Returns:
+        Tabla lista para imprimir
+    """
+    if not reports:
+        return ""
+    k_values = sorted(reports[0].recall_at_k)
+    header = ["config"]
+    header += [f"R@{k}" for k in k_values] + [f"nDCG@{k}" for k in k_values] + ["MRR"]
+    header += [f"exact@{k}" for k in k_values] + ["p50 ms", "p99 ms", "QPS", "index s", "index MB"]
+    rows = [header]
+    for report in reports:
+        row = [report.name]
+        row += [f"{report.recall_at_k[k]:.3f}" for k in k_values]
+        row += [f"{report.ndcg_at_k[k]:.3f}" for k in k_values]
+        row += [f"{report.mrr:.3f}"]
+        row += [f"{report.baseline_recall_at_k[k]:.3f}" for k in k_values]
+        row += [
+            f"{report.latency_ms['p50']:.3f}",
+            f"{report.latency_ms['p99']:.3f}",
+            f"{report.queries_per_second:.0f}",
+            f"{report.index_seconds:.3f}",
+            f"{report.index_memory_bytes / (1024 * 1024):.2f}",
+        ]
+        rows.append(row)
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    return "\n".join(
+        "  ".join(cell.ljust(width) if i == 0 else cell.rjust(width) for i, (cell, width) in enumerate(zip(row, widths)))
+        for row in rows
+    )
\ No newline at end of file
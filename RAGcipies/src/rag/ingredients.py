@@ -0,0 +1,382 @@
+"""
+Índice de ingredientes para restricciones duras en las consultas
+("algo dulce sin huevos", "pollo con papas").
+
+La búsqueda semántica solo aproxima estas restricciones: el embedding de
+"sin huevo" queda cerca de las recetas con huevo. IngredientIndex las
+resuelve de forma exacta sobre RecipeDocument.ingredients y las expone como
+DocumentFilter, que los vector stores aplican antes de rankear.
+"""
+import re
+from array import array
+from dataclasses import dataclass
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from .models import RecipeDocument
+from .text import SPANISH_STOPWORDS, tokenize
+from .vector_store.base import DocumentFilter
+
+
+_SEPARATOR_RE = re.compile(r"[,;\n]+")
+
+# Medidas que no identifican al ingrediente ("2 tazas de harina" -> "harina"),
+# ya en singular y sin tildes como las deja tokenize
+INGREDIENT_UNITS = frozenset("""
+g gr gramo kg kilo ml cc l litro taza cucharada cucharadita cda cdita pizca
+unidad chorrito puñado lata paquete
+""".split())
+
+_EXCLUDE = "sin"
+_INCLUDE = "con"
+_CONNECTORS = frozenset(("y", "e", "o", "u", "ni"))
+_MAX_PHRASE_TOKENS = 6
+_MAX_ALIGNMENTS = 8
+
+
+def _is_filler(token: str) -> bool:
+    """Stopwords, medidas y cantidades: no forman parte del nombre del ingrediente."""
+    return token in SPANISH_STOPWORDS or token in INGREDIENT_UNITS or any(c.isdigit() for c in token)
+
+
+def split_ingredients(ingredients: str) -> List[str]:
+    """
+    Separa el texto de ingredientes de una receta en ingredientes individuales.
+    
+    Args:
+        ingredients: Ingredientes separados por comas, punto y coma o líneas
+                     (formato de load_recipes_from_json)
+                     
+    Returns:
+        Lista de ingredientes sin vacíos
+    """
+    return [part.strip() for part in _SEPARATOR_RE.split(ingredients or "") if part.strip()]
+
+
+def ingredient_terms(ingredient: str) -> List[str]:
+    """
+    Normaliza un ingrediente a sus tokens: sin tildes, en singular y sin
+    stopwords, medidas ni cantidades.
+    
+    Args:
+        ingredient: Un ingrediente ("2 tazas de Harina integral")
+        
+    Returns:
+        Tokens del ingrediente (["harina", "integral"])
+    """
+    return [token for token in tokenize(ingredient, remove_stopwords=False) if not _is_filler(token)]
+
+
+@dataclass(frozen=True)
+class IngredientConstraints:
+    """
+    Restricciones de ingredientes de una consulta.
+    
+    Attributes:
+        include: Términos que la receta debe tener (todos)
+        exclude: Términos que la receta no puede tener (ninguno)
+    """
+    include: Tuple[str, ...] = ()
+    exclude: Tuple[str, ...] = ()
+    
+    def __bool__(self) -> bool:
+        return bool(self.include or self.exclude)
+    
+    def __str__(self) -> str:
+        parts = [f"con {term}" for term in self.include] + [f"sin {term}" for term in self.exclude]
+        return ", ".join(parts)
+
+
+class IngredientIndex:
+    """
+    Índice invertido de ingredientes con posting lists en bitsets.
+    
+    Cada receta ocupa una posición; cada término (token de un ingrediente y
+    el ingrediente completo si tiene varios tokens, ej: "salsa soja") guarda
+    las posiciones de las recetas que lo contienen. Al consultarlo, el
+    posting list se materializa como bitset empaquetado (1 bit por receta,
+    np.packbits) y se cachea: include/exclude son AND / AND NOT sobre
+    n / 8 bytes.
+    
+    Para aplicarlo en un vector store, mask() alinea una vez los
+    document_id de las filas del store con las posiciones del índice y
+    cachea esa alineación por lista; cada consulta después es un par de
+    operaciones vectorizadas.
+    
+    Los documentos que el índice no conoce no tienen ingredientes: pasan
+    las exclusiones y no pasan las inclusiones.
+    """
+    
+    def __init__(self, recipes: Iterable[RecipeDocument] = ()):
+        """
+        Args:
+            recipes: Recetas a indexar
+            
+        Raises:
+            ValueError: Si hay ids de receta repetidos
+        """
+        self._lock = Lock()
+        self._document_ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._postings: Dict[str, array] = {}
+        self._bitsets: Dict[str, np.ndarray] = {}
+        self._alignments: Dict[int, Tuple[Sequence[str], np.ndarray]] = {}
+        self.add(recipes)
+    
+    def add(self, recipes: Iterable[RecipeDocument]) -> None:
+        """
+        Indexa los ingredientes de las recetas.
+        
+        Args:
+            recipes: Recetas a indexar
+            
+        Raises:
+            ValueError: Si alguna receta ya está indexada o se repite
+        """
+        indexed = []
+        # Los ingredientes se repiten mucho entre recetas: se normaliza cada uno una vez
+        normalized: Dict[str, List[str]] = {}
+        for recipe in recipes:
+            terms = set()
+            for ingredient in split_ingredients(recipe.ingredients):
+                ingredient_key = ingredient.casefold()
+                cached = normalized.get(ingredient_key)
+                if cached is None:
+                    tokens = ingredient_terms(ingredient)
+                    cached = normalized[ingredient_key] = tokens + ([" ".join(tokens)] if len(tokens) > 1 else [])
+                terms.update(cached)
+            indexed.append((recipe.id, terms))
+        
+        with self._lock:
+            ids = [recipe_id for recipe_id, _ in indexed]
+            repeated = {recipe_id for recipe_id in ids if recipe_id in self._positions}
+            if repeated or len(set(ids)) != len(ids):
+                raise ValueError(f"Recetas repetidas en el índice de ingredientes: {sorted(repeated) or ids}")
+            
+            for recipe_id, terms in indexed:
+                position = len(self._document_ids)
+                self._document_ids.append(recipe_id)
+                self._positions[recipe_id] = position
+                for term in terms:
+                    postings = self._postings.get(term)
+                    if postings is None:
+                        postings = self._postings[term] = array("i")
+                    postings.append(position)
+            if indexed:
+                # Cambió el ancho de los bitsets y documentos desconocidos pueden ser nuevos
+                self._bitsets = {}
+                self._alignments = {}
+    
+    def __contains__(self, term: str) -> bool:
+        return term in self._postings
+    
+    @property
+    def vocabulary_size(self) -> int:
+        """Cantidad de términos distintos indexados."""
+        return len(self._postings)
+    
+    def __len__(self) -> int:
+        return len(self._document_ids)
+    
+    def parse(self, query: str) -> IngredientConstraints:
+        """
+        Extrae las restricciones "sin X" / "con X" de una consulta.
+        
+        Después de "sin" o "con" se toman los ingredientes conocidos por el
+        índice (el más largo posible, ej: "salsa de soja"), separados por
+        "y", "o", "ni" o comas, hasta la primera palabra que no sea un
+        ingrediente: "algo dulce sin huevo ni leche" excluye huevo y leche;
+        "con sabor a limón" no agrega nada porque "sabor" no es un ingrediente.
+        
+        Args:
+            query: Consulta del usuario
+            
+        Returns:
+            IngredientConstraints (vacío si la consulta no tiene restricciones)
+        """
+        tokens = tokenize(query, remove_stopwords=False)
+        include: List[str] = []
+        exclude: List[str] = []
+        target: Optional[List[str]] = None
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            if token in (_EXCLUDE, _INCLUDE):
+                target = exclude if token == _EXCLUDE else include
+                i += 1
+            elif target is None or token in _CONNECTORS:
+                i += 1
+            else:
+                term, i = self._match(tokens, i)
+                if term is None:
+                    target = None
+                elif term not in target:
+                    target.append(term)
+        return IngredientConstraints(include=tuple(include), exclude=tuple(exclude))
+    
+    def _match(self, tokens: List[str], start: int) -> Tuple[Optional[str], int]:
+        """Ingrediente más largo del índice que empieza en tokens[start] y la posición siguiente."""
+        best: Tuple[Optional[str], int] = (None, start + 1)
+        content: List[str] = []
+        for end in range(start, min(len(tokens), start + _MAX_PHRASE_TOKENS)):
+            token = tokens[end]
+            if token in (_EXCLUDE, _INCLUDE) or token in _CONNECTORS:
+                break
+            if _is_filler(token):
+                continue
+            content.append(token)
+            term = " ".join(content)
+            if term in self._postings:
+                best = (term, end + 1)
+        return best
+    
+    def _bitset(self, term: str, size: int) -> np.ndarray:
+        """Posting list de un término como bitset empaquetado (cacheado). Requiere el lock."""
+        bits = self._bitsets.get(term)
+        if bits is None:
+            present = np.zeros(size, dtype=bool)
+            postings = self._postings.get(term)
+            if postings is not None:
+                present[np.frombuffer(postings, dtype=np.int32)] = True
+            bits = self._bitsets[term] = np.packbits(present, bitorder="little")
+        return bits
+    
+    def matching(self, constraints: IngredientConstraints) -> np.ndarray:
+        """
+        Evalúa las restricciones contra todas las recetas indexadas.
+        
+        Args:
+            constraints: Restricciones a evaluar (los términos que el índice
+                         no conoce no excluyen nada y no incluyen nada)
+                         
+        Returns:
+            Array booleano con un valor por receta, en orden de indexado
+        """
+        with self._lock:
+            size = len(self._document_ids)
+            allowed = np.full((size + 7) // 8, 0xFF, dtype=np.uint8)
+            for term in constraints.include:
+                allowed &= self._bitset(term, size)
+            for term in constraints.exclude:
+                allowed &= ~self._bitset(term, size)
+        return np.unpackbits(allowed, count=size, bitorder="little").astype(bool)
+    
+    def matching_ids(self, constraints: IngredientConstraints) -> List[str]:
+        """
+        Retorna los ids de las recetas que cumplen las restricciones.
+        
+        Args:
+            constraints: Restricciones a evaluar
+            
+        Returns:
+            Ids de receta, en orden de indexado
+        """
+        with self._lock:
+            document_ids = list(self._document_ids)
+        allowed = self.matching(constraints)[:len(document_ids)]
+        return [document_ids[i] for i in np.flatnonzero(allowed)]
+    
+    def position(self, document_id: str) -> Optional[int]:
+        """Posición de una receta en el índice (None si no está indexada)."""
+        return self._positions.get(document_id)
+    
+    def align(self, document_ids: Sequence[str]) -> np.ndarray:
+        """
+        Posición en el índice de cada document_id (-1 si no está indexado).
+        
+        La alineación se cachea por lista: si la misma lista creció desde la
+        última llamada, solo se alinean los elementos nuevos. Los stores
+        pasan su lista de document_ids, que solo crece (ver
+        InMemoryVectorStore).
+        
+        Args:
+            document_ids: ID de documento de cada fila de un store
+            
+        Returns:
+            Array int64 con una posición por elemento de document_ids
+        """
+        with self._lock:
+            cached = self._alignments.get(id(document_ids))
+            if cached is not None and cached[0] is document_ids and len(cached[1]) == len(document_ids):
+                return cached[1]
+            previous = cached[1] if cached is not None and cached[0] is document_ids else np.empty(0, dtype=np.int64)
+            if len(previous) > len(document_ids):
+                previous = np.empty(0, dtype=np.int64)
+            
+            positions = self._positions
+            new = np.fromiter(
+                (positions.get(document_id, -1) for document_id in document_ids[len(previous):]),
+                dtype=np.int64, count=len(document_ids) - len(previous)
+            )
+            alignment = np.concatenate((previous, new))
+            self._alignments.pop(id(document_ids), None)
+            if len(self._alignments) >= _MAX_ALIGNMENTS:
+                self._alignments.pop(next(iter(self._alignments)))
+            # Se guarda la lista para que su id no se reutilice mientras está en cache
+            self._alignments[id(document_ids)] = (document_ids, alignment)
+            return alignment
+    
+    def filter(self, constraints: IngredientConstraints) -> "IngredientFilter":
+        """
+        Crea el DocumentFilter de las restricciones para pasar a search().
+        
+        Args:
+            constraints: Restricciones (ver parse)
+            
+        Returns:
+            IngredientFilter sobre este índice
+        """
+        return IngredientFilter(self, constraints)
+
+
+class IngredientFilter(DocumentFilter):
+    """
+    DocumentFilter de restricciones de ingredientes. Evalúa los bitsets una
+    sola vez al crearse; mask() es un acceso vectorizado por la alineación
+    cacheada del índice.
+    """
+    
+    def __init__(self, index: IngredientIndex, constraints: IngredientConstraints):
+        """
+        Args:
+            index: Índice de ingredientes
+            constraints: Restricciones a aplicar
+        """
+        self.index = index
+        self.constraints = constraints
+        # Una posición extra al final para los documentos desconocidos (alineación -1)
+        self._allowed = np.append(index.matching(constraints), not constraints.include)
+    
+    def allows(self, document_id: str) -> bool:
+        """
+        Indica si un documento cumple las restricciones.
+        
+        Args:
+            document_id: ID de la receta
+            
+        Returns:
+            True si la receta cumple las restricciones
+        """
+        position = self.index.position(document_id)
+        if position is None or position >= len(self._allowed) - 1:
+            return bool(self._allowed[-1])
+        return bool(self._allowed[position])
+    
+    def mask(self, document_ids: Sequence[str]) -> np.ndarray:
+        """
+        Evalúa las restricciones para los documentos de un store.
+        
+        Args:
+            document_ids: ID de documento de cada fila del store
+            
+        Returns:
+            Array booleano con un valor por elemento de document_ids
+        """
+        alignment = self.index.align(document_ids)
+        if len(self.index) >= len(self._allowed):
+            # Recetas indexadas después de crear el filtro: se tratan como desconocidas
+            alignment = np.where(alignment < len(self._allowed) - 1, alignment, -1)
+        return self._allowed[alignment]
+    
+    def __repr__(self) -> str:
+        return f"IngredientFilter({self.constraints})"
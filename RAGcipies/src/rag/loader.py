@@ -1,8 +1,9 @@
 import json
 from pathlib import Path
-from typing import List
+from typing import List, Sequence
 from .models import RecipeDocument, Chunk
 from .embeddings.factory import create_embedding_model, EmbeddingBackend
+from ..profiling import profiled
 
 
 def load_recipes_from_json(json_path: str) -> List[RecipeDocument]:
@@ -45,6 +46,7 @@ def load_recipes_from_json(json_path: str) -> List[RecipeDocument]:
     return recipes
 
 
+@profiled("recipes_to_chunks")
 def recipes_to_chunks(
     recipes: List[RecipeDocument],
     embedding_backend: EmbeddingBackend = EmbeddingBackend.FAKE
@@ -83,4 +85,73 @@ def recipes_to_chunks(
         )
         chunks.append(chunk)
     
-    return chunks
\ No newline at end of file
+    return chunks
+
+
+# Secciones de la receta que se embeben por separado en el modo multi-vector
+RECIPE_FIELDS = ("title", "ingredients", "instructions")
+
+
+@profiled("recipes_to_multi_vector_chunks")
+def recipes_to_multi_vector_chunks(
+    recipes: List[RecipeDocument],
+    embedding_backend: EmbeddingBackend = EmbeddingBackend.FAKE,
+    fields: Sequence[str] = RECIPE_FIELDS
+) -> List[Chunk]:
+    """
+    Convierte recetas en un Chunk por sección (título, ingredientes,
+    instrucciones), cada uno con su propio embedding y el mismo document_id.
+    
+    Así una consulta centrada en ingredientes ("algo con garbanzos") se
+    compara contra el vector de los ingredientes en lugar de uno diluido por
+    las instrucciones. Pensado para MultiVectorStore, que agrega los scores
+    por receta. Todas las secciones se embeben en una sola llamada a
+    embed_batch.
+    
+    Args:
+        recipes: Lista de recetas a convertir
+        embedding_backend: Backend de embeddings a usar
+        fields: Secciones a indexar (subconjunto de RECIPE_FIELDS)
+        
+    Returns:
+        Lista de Chunks con id "chunk_<receta>_<sección>" y metadata "field"
+        (la sección) y "parent_id" (el id del chunk de la receta completa)
+        
+    Raises:
+        ValueError: Si alguna sección no existe
+    """
+    unknown = set(fields) - set(RECIPE_FIELDS)
+    if unknown or not fields:
+        raise ValueError(
+            f"Secciones inválidas: {', '.join(sorted(unknown)) or '(ninguna)'}. "
+            f"Opciones: {', '.join(RECIPE_FIELDS)}"
+        )
+    
+    sections = []
+    for recipe in recipes:
+        field_texts = recipe.field_texts
+        for field in fields:
+            if field in field_texts:
+                sections.append((recipe, field, field_texts[field]))
+    if not sections:
+        return []
+    
+    embedding_model = create_embedding_model(embedding_backend)
+    embeddings = embedding_model.embed_batch([text for _, _, text in sections])
+    
+    return [
+        Chunk(
+            id=f"chunk_{recipe.id}_{field}",
+            document_id=recipe.id,
+            text=text,
+            embedding=embedding,
+            metadata={
+                "title": recipe.title,
+                "tags": recipe.tags,
+                "source": "recipes.json",
+                "field": field,
+                "parent_id": f"chunk_{recipe.id}",
+            }
+        )
+        for (recipe, field, text), embedding in zip(sections, embeddings)
+    ]
\ No newline at end of file
@@ -1,5 +1,6 @@
+from array import array
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence
 
 
 @dataclass
@@ -38,6 +39,20 @@ class RecipeDocument:
             f"Instrucciones:\n{self.instructions}"
         )
     
+    @property
+    def field_texts(self) -> Dict[str, str]:
+        """
+        Secciones de la receta para el indexado multi-vector (title,
+        ingredients, instructions), omitiendo las vacías. Unidas con "\n\n"
+        forman full_text.
+        """
+        sections = {
+            "title": self.title,
+            "ingredients": f"Ingredientes:\n{self.ingredients}" if self.ingredients else "",
+            "instructions": f"Instrucciones:\n{self.instructions}" if self.instructions else "",
+        }
+        return {name: text for name, text in sections.items() if text}
+    
     def has_tag(self, tag: str) -> bool:
         """
         Verifica si la receta tiene un tag específico.
@@ -51,24 +66,70 @@ class RecipeDocument:
         return tag.lower() in [t.lower() for t in self.tags]
 
 
-@dataclass
+def as_embedding_array(values: Sequence[float]) -> Sequence[float]:
+    """
+    Convierte un embedding a su representación compacta.
+    
+    Las listas y tuplas se copian a un array('f') (4 bytes por dimensión en
+    lugar de ~32 de una lista de floats de Python). Los arrays float32 y las
+    vistas sobre una matriz del vector store (memoryview, numpy) se guardan
+    tal cual, sin copiar.
+    
+    Args:
+        values: Vector de embedding
+        
+    Returns:
+        El vector como array('f') o la vista original
+    """
+    if isinstance(values, array):
+        return values if values.typecode == "f" else array("f", values)
+    if isinstance(values, (list, tuple)):
+        return array("f", values)
+    return values
+
+
 class Chunk:
     """
     Representa un fragmento (chunk) de texto con su embedding.
     Usado para almacenar y buscar en el vector store.
     
+    Usa __slots__ y guarda el embedding como array('f') (ver
+    as_embedding_array); el dict de metadata se crea recién al usarlo.
+    
     Attributes:
         id: Identificador único del chunk
         document_id: ID del documento original (RecipeDocument.id)
         text: Texto del chunk
-        embedding: Vector de embedding del texto
+        embedding: Vector de embedding del texto (array('f') o vista de solo lectura)
         metadata: Metadatos opcionales (score de similitud, posición, etc.)
     """
-    id: str
-    document_id: str
-    text: str
-    embedding: List[float]
-    metadata: Optional[dict] = field(default_factory=dict)
+    
+    __slots__ = ("id", "document_id", "text", "embedding", "_metadata")
+    
+    def __init__(
+        self,
+        id: str,
+        document_id: str,
+        text: str,
+        embedding: Sequence[float],
+        metadata: Optional[dict] = None
+    ):
+        self.id = id
+        self.document_id = document_id
+        self.text = text
+        self.embedding = as_embedding_array(embedding)
+        self._metadata = metadata or None
+    
+    @property
+    def metadata(self) -> dict:
+        """Metadatos del chunk (el dict se crea en el primer acceso)."""
+        if self._metadata is None:
+            self._metadata = {}
+        return self._metadata
+    
+    @metadata.setter
+    def metadata(self, value: Optional[dict]) -> None:
+        self._metadata = value or None
     
     @property
     def similarity_score(self) -> Optional[float]:
@@ -78,4 +139,25 @@ class Chunk:
         Returns:
             Score de similitud o None si no está disponible
         """
-        return self.metadata.get("similarity_score")
+        if not self._metadata:
+            return None
+        return self._metadata.get("similarity_score")
+    
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Chunk):
+            return NotImplemented
+        return (
+            self.id == other.id
+            and self.document_id == other.document_id
+            and self.text == other.text
+            and list(self.embedding) == list(other.embedding)
+            and (self._metadata or {}) == (other._metadata or {})
+        )
+    
+    __hash__ = None  # type: ignore  # mutable, igual que el dataclass anterior
+    
+    def __repr__(self) -> str:
+        return (
+            f"Chunk(id={self.id!r}, document_id={self.document_id!r}, "
+            f"text={self.text[:40]!r}, dims={len(self.embedding)})"
+        )
\ No newline at end of file
@@ -1,9 +1,26 @@
-from typing import Optional
+from typing import Optional, List, Dict, Any, Tuple, Iterator
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+import time
 from .embeddings.factory import create_embedding_model, EmbeddingBackend
+from .embeddings.cache import EmbeddingCache, model_cache_key, normalize_query
+from .embeddings.coalescing import SingleFlightEmbeddingModel
 from .vector_store.factory import create_vector_store, VectorStoreBackend
-from .vector_store.base import VectorStore
+from .vector_store.base import VectorStore, ScoredChunk, DocumentFilter
+from .ingredients import IngredientIndex
+from .diversity import mmr_select
+from ..concurrency.batching import MicroBatcher
+from .tracing import QueryTrace, QueryResult, PipelineHook, LatencyHistogramHook, WarmupReport
 from ..llm.prompt.builder import PromptBuilder
+from ..llm.prompt.tokens import TokenEstimator, CharRatioTokenEstimator
 from ..llm.factory import create_llm_client, LLMBackend
+from ..llm.coalescing import SingleFlightLLM
+from ..profiling import get_profiler, profiled
+
+
+# Candidatos extra por resultado cuando el vector store no acepta
+# DocumentFilter y las restricciones de ingredientes se aplican después
+POST_FILTER_FETCH_FACTOR = 4
 
 
 class RAGPipeline:
@@ -24,7 +41,19 @@ class RAGPipeline:
         top_k: int = 3,
         min_score: float = 0.0,
         include_scores_in_prompt: bool = False,
-        prompt_template_path: Optional[str] = None
+        prompt_template_path: Optional[str] = None,
+        embedding_cache_size: int = 1024,
+        hooks: Optional[List[PipelineHook]] = None,
+        token_estimator: Optional[TokenEstimator] = None,
+        batch_max_size: int = 0,
+        batch_max_wait_ms: float = 2.0,
+        max_context_tokens: Optional[int] = None,
+        split_system_prompt: bool = True,
+        warmup: bool = False,
+        single_flight: bool = False,
+        ingredient_index: Optional[IngredientIndex] = None,
+        mmr_lambda: Optional[float] = None,
+        mmr_fetch_k: Optional[int] = None
     ):
         """
         Inicializa el pipeline RAG.
@@ -37,14 +66,435 @@ class RAGPipeline:
             min_score: Score mínimo de similitud para filtrar resultados
             include_scores_in_prompt: Si True, incluye scores en el prompt
             prompt_template_path: Ruta al template YAML (opcional)
+            embedding_cache_size: Máximo de embeddings de queries a cachear (LRU).
+                                  0 desactiva el cache.
+            hooks: Callbacks de instrumentación (ver PipelineHook)
+            token_estimator: Estimador de tokens para medir el prompt
+                             (default: CharRatioTokenEstimator)
+            batch_max_size: Si es > 0, agrupa el embedding y la búsqueda de consultas
+                            concurrentes en lotes de hasta este tamaño (micro-batching).
+                            0 desactiva el batching.
+            batch_max_wait_ms: Milisegundos máximos que una consulta espera a que
+                               se complete su lote
+            max_context_tokens: Presupuesto de tokens para las recetas del contexto.
+                                Si se define, los chunks se empaquetan por score,
+                                se truncan por oraciones y se descartan documentos
+                                repetidos (None = sin límite)
+            split_system_prompt: Si True, envía las partes estáticas del template
+                                 como system prompt separado del contexto y la
+                                 pregunta, para que el backend reutilice su cache
+                                 de prefijo (KV cache en Ollama, prompt caching en OpenAI).
+                                 Solo aplica a clientes con supports_system_prompt;
+                                 el resto recibe el prompt completo
+            warmup: Si True, precarga los modelos y el índice al construir el
+                    pipeline (ver warmup()). El reporte queda en self.warmup_report
+            single_flight: Si True, las llamadas concurrentes idénticas a embed() y
+                           generate() comparten una sola llamada al backend
+                           (ver SingleFlight)
+            ingredient_index: Si se define, las restricciones "sin X" / "con X"
+                              de la consulta se aplican como filtro duro de la
+                              búsqueda: las recetas descartadas no llegan al
+                              prompt. Si el vector store no acepta DocumentFilter,
+                              se buscan más candidatos y se filtran los resultados
+            mmr_lambda: Si se define, los top_k chunks se eligen con Maximal
+                        Marginal Relevance entre mmr_fetch_k candidatos (ver
+                        mmr_select): 1.0 = solo relevancia, valores menores
+                        penalizan las recetas casi iguales a las ya elegidas.
+                        None desactiva el rerankeo
+            mmr_fetch_k: Candidatos a pedir al vector store para MMR
+                         (default: max(4 * top_k, 20))
+                         
+        Raises:
+            ValueError: Si mmr_lambda no está entre 0 y 1 o mmr_fetch_k es menor a top_k
         """
+        if mmr_lambda is not None and not 0.0 <= mmr_lambda <= 1.0:
+            raise ValueError(f"mmr_lambda debe estar entre 0 y 1, recibido: {mmr_lambda}")
+        if mmr_fetch_k is not None and mmr_fetch_k < top_k:
+            raise ValueError(f"mmr_fetch_k debe ser al menos top_k ({top_k}), recibido: {mmr_fetch_k}")
+        
         self.vector_store = vector_store
         self.embedding_model = create_embedding_model(embedding_backend)
         self.llm = create_llm_client(llm_backend)
+        if single_flight:
+            self.embedding_model = SingleFlightEmbeddingModel(self.embedding_model)
+            self.llm = SingleFlightLLM(self.llm)
         self.top_k = top_k
         self.min_score = min_score
-        self.prompt_builder = PromptBuilder(template_path=prompt_template_path)
+        self.ingredient_index = ingredient_index
+        self.mmr_lambda = mmr_lambda
+        self.mmr_fetch_k = mmr_fetch_k or max(4 * top_k, 20)
         self.include_scores_in_prompt = include_scores_in_prompt
+        self.split_system_prompt = split_system_prompt
+        self.embedding_cache: Optional[EmbeddingCache] = (
+            EmbeddingCache(max_size=embedding_cache_size) if embedding_cache_size > 0 else None
+        )
+        self.token_estimator = token_estimator or CharRatioTokenEstimator()
+        self.prompt_builder = PromptBuilder(
+            template_path=prompt_template_path,
+            max_context_tokens=max_context_tokens,
+            token_estimator=self.token_estimator
+        )
+        
+        # Histogramas de latencia por etapa (siempre activos, costo O(1) por etapa)
+        self.latency = LatencyHistogramHook()
+        self.hooks: List[PipelineHook] = [self.latency, *(hooks or [])]
+        
+        # Micro-batching de embedding + búsqueda para el modo servidor
+        self._retrieval_batcher: Optional[MicroBatcher] = None
+        if batch_max_size > 0:
+            self._retrieval_batcher = MicroBatcher(
+                self._retrieve_batch,
+                max_batch_size=batch_max_size,
+                max_wait_ms=batch_max_wait_ms,
+                name="rag-retrieval-batcher"
+            )
+        
+        self.warmup_report: Optional[WarmupReport] = None
+        if warmup:
+            self.warmup()
+    
+    def warmup(self) -> WarmupReport:
+        """
+        Precarga en paralelo el modelo de embeddings, el LLM y el índice del
+        vector store, para que la primera consulta no pague el tiempo de carga
+        (en Ollama, varios segundos por modelo).
+        
+        Los errores no se propagan: un componente que no se pudo precargar
+        se carga igual en la primera consulta, así que se reporta y se sigue.
+        
+        Returns:
+            WarmupReport con la duración de cada componente y los errores
+        """
+        components = {
+            "embedding": self.embedding_model.warmup,
+            "llm": self.llm.warmup,
+            "vector_store": self.vector_store.warmup,
+        }
+        report = WarmupReport()
+        
+        def run(name: str) -> None:
+            started = time.perf_counter()
+            try:
+                components[name]()
+            except Exception as e:
+                report.errors[name] = str(e) or e.__class__.__name__
+            report.component_seconds[name] = time.perf_counter() - started
+        
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(components), thread_name_prefix="rag-warmup") as executor:
+            list(executor.map(run, components))
+        report.total_seconds = time.perf_counter() - started
+        
+        self.warmup_report = report
+        return report
+    
+    def add_hook(self, hook: PipelineHook) -> None:
+        """
+        Registra un hook de instrumentación adicional.
+        
+        Args:
+            hook: Hook a notificar en cada consulta
+        """
+        self.hooks.append(hook)
+    
+    def _embed_query(self, user_query: str) -> Tuple[List[float], bool]:
+        """
+        Calcula el embedding de la query, reutilizando el cache si está activo.
+        
+        Args:
+            user_query: La pregunta del usuario
+            
+        Returns:
+            Tupla (embedding, cache_hit)
+        """
+        if self.embedding_cache is None:
+            return self.embedding_model.embed(user_query), False
+        
+        return self.embedding_cache.get_or_compute(self.embedding_model, user_query)
+    
+    @profiled("batch")
+    def _retrieve_batch(self, queries: List[str]) -> List[Tuple[List[ScoredChunk], bool, float]]:
+        """
+        Handler del micro-batcher: resuelve embedding y búsqueda de un lote de queries.
+        
+        Las queries en cache no se vuelven a calcular; las restantes (sin
+        duplicados) se envían en una sola llamada a embed_batch y todas
+        se buscan con una sola llamada a search_batch.
+        
+        Args:
+            queries: Consultas del lote
+            
+        Returns:
+            Por query: (scored_chunks, cache_hit, segundos de la búsqueda del lote)
+        """
+        embeddings: List[Optional[List[float]]] = [None] * len(queries)
+        cache_hits = [False] * len(queries)
+        model_key = model_cache_key(self.embedding_model)
+        casefold = self.embedding_cache is not None and self.embedding_cache.casefold
+        pending: Dict[str, List[int]] = {}
+        
+        for i, user_query in enumerate(queries):
+            if self.embedding_cache is not None:
+                cached = self.embedding_cache.get(model_key, user_query)
+                if cached is not None:
+                    embeddings[i] = cached
+                    cache_hits[i] = True
+                    continue
+            pending.setdefault(normalize_query(user_query, casefold), []).append(i)
+        
+        if pending:
+            texts = [queries[indexes[0]] for indexes in pending.values()]
+            vectors = self.embedding_model.embed_batch(texts)
+            for text, indexes, vector in zip(texts, pending.values(), vectors):
+                if self.embedding_cache is not None:
+                    self.embedding_cache.put(model_key, text, vector)
+                for i in indexes:
+                    embeddings[i] = vector
+        
+        search_kwargs = {"query_texts": queries} if self.vector_store.uses_query_text else {}
+        started = time.perf_counter()
+        document_filters = [self._document_filter(user_query) for user_query in queries]
+        post_filter = False
+        if any(document_filter is not None for document_filter in document_filters):
+            if self.vector_store.supports_document_filter:
+                search_kwargs["document_filters"] = document_filters
+            else:
+                post_filter = True
+        results = self.vector_store.search_batch(
+            embeddings, k=self._search_k(post_filter), min_score=self.min_score, **search_kwargs
+        )
+        results = [
+            self._select(scored_chunks, embedding, document_filter if post_filter else None)
+            for scored_chunks, embedding, document_filter in zip(results, embeddings, document_filters)
+        ]
+        search_seconds = time.perf_counter() - started
+        
+        return [
+            (scored_chunks, hit, search_seconds)
+            for scored_chunks, hit in zip(results, cache_hits)
+        ]
+    
+    def _document_filter(self, user_query: str) -> Optional[DocumentFilter]:
+        """
+        Filtro de ingredientes de la query (None si no hay ingredient_index
+        o la query no tiene restricciones "sin X" / "con X").
+        """
+        if self.ingredient_index is None:
+            return None
+        constraints = self.ingredient_index.parse(user_query)
+        return self.ingredient_index.filter(constraints) if constraints else None
+    
+    def _search_k(self, post_filter: bool) -> int:
+        """Candidatos a pedir al vector store (más si hay MMR o filtrado posterior)."""
+        k = self.mmr_fetch_k if self.mmr_lambda is not None else self.top_k
+        return k * POST_FILTER_FETCH_FACTOR if post_filter else k
+    
+    def _select(
+        self,
+        scored_chunks: List[ScoredChunk],
+        query_embedding: List[float],
+        document_filter: Optional[DocumentFilter]
+    ) -> List[ScoredChunk]:
+        """
+        Reduce los candidatos del vector store a top_k: aplica el filtro de
+        documentos si el store no lo aceptó y, con mmr_lambda, elige por MMR.
+        """
+        if document_filter is not None:
+            scored_chunks = [scored for scored in scored_chunks if document_filter.allows(scored.chunk.document_id)]
+        if self.mmr_lambda is not None:
+            return mmr_select(query_embedding, scored_chunks, self.top_k, self.mmr_lambda)
+        return scored_chunks[:self.top_k]
+    
+    def batch_stats(self) -> Dict[str, Any]:
+        """
+        Retorna las métricas del micro-batcher de recuperación.
+        
+        Returns:
+            Diccionario con batches, items y avg_batch_size
+            (vacío si el batching está desactivado)
+        """
+        if self._retrieval_batcher is None:
+            return {}
+        return self._retrieval_batcher.stats()
+    
+    def close(self) -> None:
+        """Libera los recursos de fondo del pipeline (hilo del micro-batcher)."""
+        if self._retrieval_batcher is not None:
+            self._retrieval_batcher.close()
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        Retorna las métricas del cache de embeddings de queries.
+        
+        Returns:
+            Diccionario con hits, misses, evictions, size, max_size y hit_rate
+            (vacío si el cache está desactivado)
+        """
+        if self.embedding_cache is None:
+            return {}
+        return self.embedding_cache.stats()
+    
+    def coalescing_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Retorna las métricas del single-flight de embeddings y LLM.
+        
+        Returns:
+            Diccionario componente -> stats (vacío si single_flight está desactivado)
+        """
+        stats = {}
+        if isinstance(self.embedding_model, SingleFlightEmbeddingModel):
+            stats["embedding"] = self.embedding_model.stats()
+        if isinstance(self.llm, SingleFlightLLM):
+            stats["llm"] = self.llm.stats()
+        return stats
+    
+    def latency_summary(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Retorna los percentiles de latencia por etapa.
+        
+        Returns:
+            Diccionario etapa -> {count, p50, p95, p99} (en segundos)
+        """
+        return self.latency.summary()
+    
+    @contextmanager
+    def _stage(self, trace: QueryTrace, stage: str) -> Iterator[None]:
+        """
+        Mide una etapa del pipeline y notifica a los hooks al terminarla.
+        Si la etapa falla, la registra en trace.failed_stage y propaga el error.
+        """
+        # Con el perfilado activo, la etapa es la raíz de los stacks muestreados
+        profiler = get_profiler()
+        previous = profiler.label(stage) if profiler is not None else None
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            trace.failed_stage = stage
+            raise
+        finally:
+            if profiler is not None:
+                profiler.label(previous)
+        self._record_stage(trace, stage, time.perf_counter() - started)
+    
+    def _record_stage(self, trace: QueryTrace, stage: str, seconds: float) -> None:
+        """Registra la duración de una etapa en la traza y notifica a los hooks."""
+        trace.stage_seconds[stage] = seconds
+        for hook in self.hooks:
+            hook.on_stage_end(stage, seconds, trace)
+    
+    def _start_trace(self, user_query: str) -> QueryTrace:
+        """Valida la query, crea la traza y notifica el inicio a los hooks."""
+        if not user_query or not user_query.strip():
+            raise ValueError("La consulta del usuario no puede estar vacía")
+        
+        trace = QueryTrace(query=user_query)
+        for hook in self.hooks:
+            hook.on_query_start(trace)
+        return trace
+    
+    def _finish_trace(self, trace: QueryTrace, started: float) -> None:
+        """Cierra la traza de una consulta exitosa y notifica a los hooks."""
+        trace.total_seconds = time.perf_counter() - started
+        for hook in self.hooks:
+            hook.on_query_end(trace)
+    
+    def _fail_trace(self, trace: QueryTrace, started: float, error: BaseException) -> None:
+        """Cierra la traza de una consulta fallida y notifica a los hooks."""
+        trace.error = str(error) or error.__class__.__name__
+        trace.total_seconds = time.perf_counter() - started
+        for hook in self.hooks:
+            hook.on_query_error(trace.failed_stage or "embedding", error, trace)
+    
+    def _retrieve_and_build(
+        self,
+        user_query: str,
+        trace: QueryTrace
+    ) -> Tuple[List[ScoredChunk], str, Dict[str, Any]]:
+        """
+        Ejecuta las etapas 1 a 3: embedding, búsqueda y construcción del prompt.
+        
+        Args:
+            user_query: La pregunta del usuario
+            trace: Traza a completar
+            
+        Returns:
+            Tupla (scored_chunks, prompt, llm_kwargs). llm_kwargs contiene el
+            system prompt cuando split_system_prompt está activo y el LLM lo acepta
+        """
+        if self._retrieval_batcher is not None:
+            scored_chunks = self._retrieve_batched(user_query, trace)
+        else:
+            scored_chunks = self._retrieve(user_query, trace)
+        
+        # Paso 3: Construir el prompt con contexto
+        with self._stage(trace, "prompt"):
+            llm_kwargs: Dict[str, Any] = {}
+            if self.split_system_prompt and getattr(self.llm, "supports_system_prompt", False):
+                parts, packed = self.prompt_builder.build_parts(
+                    query=user_query,
+                    scored_chunks=scored_chunks,
+                    include_scores=self.include_scores_in_prompt
+                )
+                prompt = parts.user
+                llm_kwargs["system"] = parts.system
+                full_prompt = f"{parts.system}\n\n{parts.user}"
+            else:
+                prompt, packed = self.prompt_builder.build_with_report(
+                    query=user_query,
+                    scored_chunks=scored_chunks,
+                    include_scores=self.include_scores_in_prompt
+                )
+                full_prompt = prompt
+            if packed is not None:
+                scored_chunks = packed.scored_chunks
+                trace.context_tokens_saved = packed.tokens_saved
+            trace.prompt_chars = len(full_prompt)
+            trace.prompt_tokens = self.token_estimator.count(full_prompt)
+        
+        return scored_chunks, prompt, llm_kwargs
+    
+    def _retrieve(self, user_query: str, trace: QueryTrace) -> List[ScoredChunk]:
+        """Etapas 1 y 2 para una sola query."""
+        # Paso 1: Convertir query a embedding (con cache LRU)
+        with self._stage(trace, "embedding"):
+            query_embedding, trace.cache_hit = self._embed_query(user_query)
+        
+        # Paso 2: Buscar chunks similares en el vector store
+        with self._stage(trace, "search"):
+            search_kwargs = {"query_text": user_query} if self.vector_store.uses_query_text else {}
+            document_filter = self._document_filter(user_query)
+            post_filter = document_filter is not None and not self.vector_store.supports_document_filter
+            if document_filter is not None and not post_filter:
+                search_kwargs["document_filter"] = document_filter
+            scored_chunks = self.vector_store.search(
+                query_embedding=query_embedding,
+                k=self._search_k(post_filter),
+                min_score=self.min_score,
+                **search_kwargs
+            )
+            scored_chunks = self._select(scored_chunks, query_embedding, document_filter if post_filter else None)
+            trace.chunks_retrieved = len(scored_chunks)
+        
+        return scored_chunks
+    
+    def _retrieve_batched(self, user_query: str, trace: QueryTrace) -> List[ScoredChunk]:
+        """
+        Etapas 1 y 2 a través del micro-batcher. La etapa "embedding" incluye
+        la espera del lote; "search" es la duración de la búsqueda del lote.
+        """
+        started = time.perf_counter()
+        try:
+            scored_chunks, trace.cache_hit, search_seconds = self._retrieval_batcher.submit(user_query)
+        except BaseException:
+            trace.failed_stage = "embedding"
+            raise
+        elapsed = time.perf_counter() - started
+        
+        self._record_stage(trace, "embedding", max(0.0, elapsed - search_seconds))
+        trace.chunks_retrieved = len(scored_chunks)
+        self._record_stage(trace, "search", search_seconds)
+        return scored_chunks
     
     def query(self, user_query: str) -> str:
         """
@@ -60,28 +510,76 @@ class RAGPipeline:
             ValueError: Si la query está vacía
             RuntimeError: Si hay un error en algún paso del pipeline
         """
-        if not user_query or not user_query.strip():
-            raise ValueError("La consulta del usuario no puede estar vacía")
+        return self.query_detailed(user_query).answer
+    
+    @profiled("query")
+    def query_detailed(self, user_query: str) -> QueryResult:
+        """
+        Igual que query(), pero retorna también el contexto recuperado
+        y la traza con tiempos por etapa, tamaño del prompt y cache hits.
         
-        # Paso 1: Convertir query a embedding
-        query_embedding = self.embedding_model.embed(user_query)
+        Args:
+            user_query: La pregunta del usuario en lenguaje natural
         
-        # Paso 2: Buscar chunks similares en el vector store
-        scored_chunks = self.vector_store.search(
-            query_embedding=query_embedding,
-            k=self.top_k,
-            min_score=self.min_score
-        )
+        Returns:
+            QueryResult con la respuesta, los chunks y la traza
         
-        # Paso 3: Construir el prompt con contexto
-        prompt = self.prompt_builder.build(
-            query=user_query,
-            scored_chunks=scored_chunks,
-            include_scores=self.include_scores_in_prompt
-        )
+        Raises:
+            ValueError: Si la query está vacía
+            RuntimeError: Si hay un error en algún paso del pipeline
+        """
+        trace = self._start_trace(user_query)
+        started = time.perf_counter()
+        try:
+            scored_chunks, prompt, llm_kwargs = self._retrieve_and_build(user_query, trace)
+            
+            # Paso 4: Generar respuesta con el LLM
+            with self._stage(trace, "generation"):
+                response = self.llm.generate(prompt, **llm_kwargs)
+            
+            # Paso 5: Retornar la respuesta
+            with self._stage(trace, "response"):
+                result = QueryResult(answer=response, scored_chunks=scored_chunks, trace=trace)
+        except Exception as e:
+            self._fail_trace(trace, started, e)
+            raise
+        
+        self._finish_trace(trace, started)
+        return result
+    
+    @profiled("query_stream")
+    def query_stream(self, user_query: str) -> Iterator[str]:
+        """
+        Igual que query(), pero emite la respuesta del LLM en fragmentos
+        a medida que se genera (ver LLMBase.generate_stream).
+        
+        Si el consumidor cierra el generador antes de terminar (ej: el cliente
+        HTTP se desconecta), la consulta se registra como fallida en la etapa
+        de generación.
         
-        # Paso 4: Generar respuesta con el LLM
-        response = self.llm.generate(prompt)
+        Args:
+            user_query: La pregunta del usuario en lenguaje natural
+            
+        Yields:
+            Fragmentos de la respuesta
+            
+        Raises:
+            ValueError: Si la query está vacía
+            RuntimeError: Si hay un error en algún paso del pipeline
+        """
+        trace = self._start_trace(user_query)
+        started = time.perf_counter()
+        try:
+            _, prompt, llm_kwargs = self._retrieve_and_build(user_query, trace)
+            
+            with self._stage(trace, "generation"):
+                for piece in self.llm.generate_stream(prompt, **llm_kwargs):
+                    yield piece
+            
+            with self._stage(trace, "response"):
+                pass
+        except BaseException as e:
+            self._fail_trace(trace, started, e)
+            raise
         
-        # Paso 5: Retornar la respuesta
-        return response
\ No newline at end of file
+        self._finish_trace(trace, started)
\ No newline at end of file
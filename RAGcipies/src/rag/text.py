@@ -0,0 +1,75 @@
+"""
+Normalización y tokenización de texto en español para el índice léxico.
+"""
+import re
+import unicodedata
+from typing import List
+
+
+_TOKEN_RE = re.compile(r"[a-z0-9ñ]+")
+_VOWELS = "aeiou"
+
+# Palabras funcionales sin valor para el ranking. "sin" no está: "sin horno"
+# o "sin tacc" son parte de lo que se busca
+SPANISH_STOPWORDS = frozenset("""
+a al algo algun alguna algunas alguno algunos ante antes como con cual cuales cuando de del desde donde
+e el ella ellas ellos en entre era es esa esas ese eso esos esta estas este esto estos fue ha hay
+la las le les lo los mas me mi mis muy ni no nos o os otra otro para pero poco por porque que
+quiero se si sobre son su sus tambien te tengo tiene tu un una unas uno unos y ya yo receta recetas
+""".split())
+
+
+def strip_accents(text: str) -> str:
+    """
+    Pasa a minúsculas y quita tildes y diéresis, conservando la ñ.
+    
+    Args:
+        text: Texto original
+        
+    Returns:
+        Texto normalizado ("Limón y PIÑA" -> "limon y piña")
+    """
+    text = text.casefold().replace("ñ", "\0")
+    decomposed = unicodedata.normalize("NFD", text)
+    stripped = "".join(c for c in decomposed if unicodedata.category(c) != "Mn")
+    return stripped.replace("\0", "ñ")
+
+
+def stem(token: str) -> str:
+    """
+    Stemming liviano de plurales en español: "huevos" -> "huevo",
+    "limones" -> "limon", "nueces" -> "nuez". No intenta reducir
+    conjugaciones ni derivaciones.
+    
+    Args:
+        token: Token ya normalizado (ver strip_accents)
+        
+    Returns:
+        Token en singular
+    """
+    if len(token) <= 3 or not token.endswith("s"):
+        return token
+    after_vowel = len(token) > 4 and token[-4] in _VOWELS
+    if token.endswith("ces") and after_vowel:
+        return token[:-3] + "z"
+    if token.endswith("es") and after_vowel and token[-3] in "lnrdj":
+        return token[:-2]
+    return token[:-1]
+
+
+def tokenize(text: str, remove_stopwords: bool = True) -> List[str]:
+    """
+    Convierte un texto en tokens normalizados (sin tildes, en singular y,
+    opcionalmente, sin stopwords).
+    
+    Args:
+        text: Texto a tokenizar
+        remove_stopwords: Si es True, descarta SPANISH_STOPWORDS
+        
+    Returns:
+        Lista de tokens en orden de aparición
+    """
+    tokens = _TOKEN_RE.findall(strip_accents(text))
+    if remove_stopwords:
+        tokens = [token for token in tokens if token not in SPANISH_STOPWORDS]
+    return [stem(token) for token in tokens]
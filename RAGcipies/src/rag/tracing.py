@@ -0,0 +1,195 @@
+from collections import deque
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Deque, Dict, List, Optional, Any
+from .vector_store.base import ScoredChunk
+
+
+# Etapas documentadas del pipeline, en orden de ejecución
+STAGES = ("embedding", "search", "prompt", "generation", "response")
+
+
+@dataclass
+class QueryTrace:
+    """
+    Traza de una ejecución de RAGPipeline.query.
+    
+    Attributes:
+        query: La consulta del usuario
+        stage_seconds: Tiempo de pared (segundos) de cada etapa ejecutada
+        total_seconds: Tiempo total de la consulta
+        chunks_retrieved: Número de chunks devueltos por el vector store
+        prompt_chars: Tamaño del prompt en caracteres
+        prompt_tokens: Tamaño estimado del prompt en tokens
+        context_tokens_saved: Tokens de contexto recortados por el presupuesto
+        cache_hit: True si el embedding de la query salió del cache
+        error: Mensaje del error si la consulta falló
+        failed_stage: Etapa en la que falló la consulta (None si no falló)
+    """
+    query: str
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+    total_seconds: float = 0.0
+    chunks_retrieved: int = 0
+    prompt_chars: int = 0
+    prompt_tokens: int = 0
+    context_tokens_saved: int = 0
+    cache_hit: bool = False
+    error: Optional[str] = None
+    failed_stage: Optional[str] = None
+
+
+@dataclass
+class QueryResult:
+    """
+    Resultado completo de una consulta: respuesta, contexto y traza.
+    
+    Attributes:
+        answer: La respuesta generada por el LLM
+        scored_chunks: Chunks recuperados usados como contexto
+        trace: Mediciones de la ejecución
+    """
+    answer: str
+    scored_chunks: List[ScoredChunk]
+    trace: QueryTrace
+
+
+@dataclass
+class WarmupReport:
+    """
+    Resultado de RAGPipeline.warmup.
+    
+    Attributes:
+        component_seconds: Duración de la precarga de cada componente
+                           ("embedding", "llm", "vector_store")
+        total_seconds: Tiempo de pared del warm-up completo (los componentes
+                       se precargan en paralelo)
+        errors: Mensaje de error de cada componente que falló
+    """
+    component_seconds: Dict[str, float] = field(default_factory=dict)
+    total_seconds: float = 0.0
+    errors: Dict[str, str] = field(default_factory=dict)
+    
+    @property
+    def ok(self) -> bool:
+        """True si todos los componentes se precargaron sin errores."""
+        return not self.errors
+
+
+class PipelineHook:
+    """
+    Interfaz de callbacks para instrumentar el pipeline.
+    
+    Todos los métodos son no-op por defecto: una subclase sobreescribe solo
+    los eventos que le interesan. Los hooks se ejecutan en el hilo de la
+    consulta, por lo que deben ser rápidos y no lanzar excepciones.
+    """
+    
+    def on_query_start(self, trace: QueryTrace) -> None:
+        """Se llama antes de la primera etapa."""
+        pass
+    
+    def on_stage_end(self, stage: str, seconds: float, trace: QueryTrace) -> None:
+        """Se llama al terminar cada etapa (ver STAGES)."""
+        pass
+    
+    def on_query_end(self, trace: QueryTrace) -> None:
+        """Se llama cuando la consulta terminó correctamente."""
+        pass
+    
+    def on_query_error(self, stage: str, error: Exception, trace: QueryTrace) -> None:
+        """Se llama cuando una etapa lanza una excepción (antes de propagarla)."""
+        pass
+
+
+class LatencyHistogram:
+    """
+    Histograma de latencias en proceso con ventana deslizante.
+    
+    Guarda las últimas `window` muestras en un deque acotado (registrar
+    es O(1)); los percentiles se calculan ordenando la ventana al leer.
+    """
+    
+    def __init__(self, window: int = 2048):
+        """
+        Args:
+            window: Cantidad máxima de muestras recientes a conservar
+        """
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._count = 0
+        self._lock = Lock()
+    
+    def record(self, seconds: float) -> None:
+        """Registra una muestra de latencia en segundos."""
+        with self._lock:
+            self._samples.append(seconds)
+            self._count += 1
+    
+    def percentile(self, p: float) -> float:
+        """
+        Calcula el percentil p (0-100) de la ventana actual.
+        
+        Args:
+            p: Percentil a calcular (ej: 50, 95, 99)
+            
+        Returns:
+            Latencia en segundos (0.0 si no hay muestras)
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+        return _percentile(samples, p)
+    
+    def summary(self) -> Dict[str, float]:
+        """
+        Retorna count, p50, p95 y p99 de la ventana actual.
+        
+        Returns:
+            Diccionario con las métricas del histograma
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+            count = self._count
+        return {
+            "count": count,
+            "p50": _percentile(samples, 50),
+            "p95": _percentile(samples, 95),
+            "p99": _percentile(samples, 99),
+        }
+
+
+def _percentile(sorted_samples: List[float], p: float) -> float:
+    """Percentil por rango más cercano sobre una lista ya ordenada."""
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, max(0, int(round(p / 100.0 * len(sorted_samples))) - 1))
+    return sorted_samples[index]
+
+
+class LatencyHistogramHook(PipelineHook):
+    """
+    Hook que alimenta un LatencyHistogram por etapa más uno para el total.
+    RAGPipeline lo instala siempre para exponer p50/p95/p99.
+    """
+    
+    def __init__(self, window: int = 2048):
+        """
+        Args:
+            window: Tamaño de la ventana de cada histograma
+        """
+        self.histograms: Dict[str, LatencyHistogram] = {
+            stage: LatencyHistogram(window) for stage in (*STAGES, "total")
+        }
+    
+    def on_stage_end(self, stage: str, seconds: float, trace: QueryTrace) -> None:
+        self.histograms[stage].record(seconds)
+    
+    def on_query_end(self, trace: QueryTrace) -> None:
+        self.histograms["total"].record(trace.total_seconds)
+    
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Retorna el resumen de cada histograma.
+        
+        Returns:
+            Diccionario etapa -> {count, p50, p95, p99}
+        """
+        return {stage: hist.summary() for stage, hist in self.histograms.items()}
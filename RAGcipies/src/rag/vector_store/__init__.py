@@ -1,20 +1,34 @@
-from .base import VectorStore, ScoredChunk
+from ...lazy import lazy_exports
+from .base import VectorStore, ScoredChunk, DocumentFilter
 from .in_memory import InMemoryVectorStore
-
-# Importación opcional de ChromaDB (puede no estar instalado)
-try:
-    from .chromadb_store import ChromaDBVectorStore
-    _CHROMADB_AVAILABLE = True
-except ImportError:
-    ChromaDBVectorStore = None  # type: ignore
-    _CHROMADB_AVAILABLE = False
-
+from .multi_vector import MultiVectorStore
+from .bm25 import BM25Index
+from .hybrid import HybridVectorStore
+from .rerank import Reranker, ExactCosineReranker
+from .two_stage import TwoStageVectorStore
+from .memory import MemoryUsage, EMBEDDING_MODES, estimate_vector_bytes
 from .factory import create_vector_store, VectorStoreBackend
 
+# Importación diferida de ChromaDB: se importa al acceder al nombre
+# (vale None si no está instalado)
+__getattr__ = lazy_exports(globals(), {
+    "ChromaDBVectorStore": ".chromadb_store:ChromaDBVectorStore",
+})
+
 __all__ = [
     "VectorStore",
     "ScoredChunk",
+    "DocumentFilter",
     "InMemoryVectorStore",
+    "MultiVectorStore",
+    "BM25Index",
+    "HybridVectorStore",
+    "Reranker",
+    "ExactCosineReranker",
+    "TwoStageVectorStore",
+    "MemoryUsage",
+    "EMBEDDING_MODES",
+    "estimate_vector_bytes",
     "ChromaDBVectorStore",
     "create_vector_store",
     "VectorStoreBackend",
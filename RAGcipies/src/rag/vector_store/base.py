@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Sequence
+import numpy as np
 from ..models import Chunk
+from .memory import MemoryUsage
 
 
 class ScoredChunk:
@@ -11,6 +13,9 @@ class ScoredChunk:
         chunk: El chunk encontrado
         score: Score de similitud (0.0 a 1.0 para cosine similarity)
     """
+    
+    __slots__ = ("chunk", "score")
+    
     def __init__(self, chunk: Chunk, score: float):
         self.chunk = chunk
         self.score = score
@@ -19,12 +24,67 @@ class ScoredChunk:
         return f"ScoredChunk(chunk_id={self.chunk.id}, score={self.score:.4f})"
 
 
+class DocumentFilter(ABC):
+    """
+    Restricción dura sobre los documentos que puede devolver una búsqueda
+    (ej: recetas sin un ingrediente, ver IngredientIndex).
+    
+    Los stores con supports_document_filter la aplican antes de rankear:
+    los chunks de documentos descartados nunca entran al top-k.
+    """
+    
+    @abstractmethod
+    def allows(self, document_id: str) -> bool:
+        """
+        Indica si un documento pasa el filtro.
+        
+        Args:
+            document_id: ID del documento (RecipeDocument.id)
+            
+        Returns:
+            True si el documento puede aparecer en los resultados
+        """
+        pass
+    
+    def mask(self, document_ids: Sequence[str]) -> np.ndarray:
+        """
+        Versión vectorizada de allows() para los documentos de un store.
+        
+        Args:
+            document_ids: ID de documento de cada fila del store
+            
+        Returns:
+            Array booleano con un valor por elemento de document_ids
+            
+        Note:
+            La implementación por defecto llama a allows() por elemento. Las
+            subclases la sobreescriben para reutilizar trabajo entre consultas.
+        """
+        return np.fromiter((self.allows(document_id) for document_id in document_ids),
+                           dtype=bool, count=len(document_ids))
+
+
 class VectorStore(ABC):
     """
     Clase base abstracta para implementaciones de VectorStore.
     Define la interfaz común para almacenar y buscar chunks con embeddings.
+    
+    Attributes:
+        uses_query_text: Si es True, search/search_batch aceptan también el
+                         texto de la consulta (query_text/query_texts) y
+                         RAGPipeline se lo pasa (ej: búsqueda híbrida con BM25)
+        supports_document_filter: Si es True, search/search_batch aceptan un
+                                  DocumentFilter (document_filter/document_filters)
+                                  y lo aplican antes de rankear
+        preserves_chunk_ids: Si es True, los resultados son chunks con el
+                             mismo id con que se agregaron (False si arma
+                             chunks nuevos, ej: uno por documento)
     """
     
+    uses_query_text = False
+    supports_document_filter = False
+    preserves_chunk_ids = True
+    
     @abstractmethod
     def add_chunks(self, chunks: List[Chunk]) -> None:
         """
@@ -55,6 +115,39 @@ class VectorStore(ABC):
         """
         pass
     
+    def search_batch(
+        self,
+        query_embeddings: List[List[float]],
+        k: int = 3,
+        min_score: float = 0.0
+    ) -> List[List[ScoredChunk]]:
+        """
+        Busca los k chunks más similares para varias queries a la vez.
+        
+        Args:
+            query_embeddings: Vectores de embedding de las consultas
+            k: Número de resultados a retornar por query (top-k)
+            min_score: Score mínimo de similitud (filtra resultados con score menor)
+            
+        Returns:
+            Una lista de ScoredChunk por query, en el mismo orden
+            
+        Note:
+            La implementación por defecto llama a search() por cada query.
+            Los backends que soportan consultas múltiples la sobreescriben.
+        """
+        return [self.search(query_embedding, k=k, min_score=min_score) for query_embedding in query_embeddings]
+    
+    def warmup(self) -> None:
+        """
+        Prepara el índice para la primera búsqueda (ej: cargar desde disco
+        las páginas del índice persistido).
+        
+        Note:
+            Implementación opcional. Por defecto no hace nada.
+        """
+        pass
+    
     def delete(self, ids: List[str]) -> bool:
         """
         Elimina chunks por IDs.
@@ -70,6 +163,22 @@ class VectorStore(ABC):
         """
         return False
     
+    def memory_usage(self) -> MemoryUsage:
+        """
+        Retorna la memoria usada por el store, desglosada por componente
+        (vectores, texto, metadata, índice, ids y disco). Con
+        MemoryUsage.project/projections se estima el uso con más chunks y
+        con otras representaciones de los embeddings (float32, int8, PQ).
+        
+        Returns:
+            MemoryUsage del store
+            
+        Note:
+            Implementación opcional. Por defecto solo informa la cantidad
+            de chunks, con todos los tamaños en 0.
+        """
+        return MemoryUsage(backend=type(self).__name__, chunks=len(self))
+    
     def __len__(self) -> int:
         """
         Retorna el número de chunks almacenados.
@@ -0,0 +1,273 @@
+import math
+import sys
+from array import array
+from collections import Counter
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Set, Tuple
+import numpy as np
+from ..models import Chunk
+from ..text import tokenize
+from .base import DocumentFilter
+
+
+class BM25Index:
+    """
+    Índice invertido BM25 en memoria sobre el texto de los chunks.
+    
+    Cada término guarda sus postings en dos arrays compactos (posición del
+    chunk como int32 y frecuencia como float32, 8 bytes por aparición)
+    que crecen con add(). Antes de buscar, los términos modificados se
+    copian a arrays de NumPy inmutables, así la búsqueda no toma el lock
+    ni bloquea los add() y el score de cada término es una operación
+    vectorizada sobre sus postings.
+    
+    remove() marca los chunks como borrados (sus postings dejan de puntuar)
+    y reconstruye el índice recién cuando los borrados superan
+    compact_ratio del total, así borrar de a pocos chunks no re-tokeniza
+    todo el corpus. Hasta la compactación, el idf cuenta los borrados. La
+    reconstrucción corre sin el lock (una a la vez) y al terminar re-aplica
+    los add() y remove() que llegaron mientras tanto.
+    
+    Referencias:
+    - Okapi BM25: https://en.wikipedia.org/wiki/Okapi_BM25
+    """
+    
+    def __init__(
+        self,
+        k1: float = 1.2,
+        b: float = 0.75,
+        tokenizer: Callable[[str], List[str]] = tokenize,
+        compact_ratio: float = 0.25
+    ):
+        """
+        Args:
+            k1: Saturación de la frecuencia del término
+            b: Normalización por largo del chunk (0 = ninguna, 1 = total)
+            tokenizer: Función texto -> tokens (default: tokenizador en español)
+            compact_ratio: Fracción de chunks borrados que dispara la reconstrucción
+            
+        Raises:
+            ValueError: Si k1 es negativo o b no está entre 0 y 1
+        """
+        if k1 < 0:
+            raise ValueError(f"k1 no puede ser negativo, recibido: {k1}")
+        if not 0.0 <= b <= 1.0:
+            raise ValueError(f"b debe estar entre 0 y 1, recibido: {b}")
+        
+        self.k1 = k1
+        self.b = b
+        self.tokenizer = tokenizer
+        self.compact_ratio = compact_ratio
+        self._lock = Lock()
+        self._compacting = Lock()
+        self._chunks: List[Optional[Chunk]] = []  # None = borrado
+        self._document_ids: List[str] = []  # solo crece; se reemplaza al compactar
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._lengths = array("f")
+        self._total_length = 0
+        self._dirty: Set[str] = set()
+        self._frozen: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._frozen_lengths = np.empty(0, dtype=np.float32)
+        self._positions: Dict[str, int] = {}
+        self._deleted: Set[int] = set()
+        self._frozen_alive: Optional[np.ndarray] = None
+    
+    def add(self, chunks: List[Chunk]) -> None:
+        """
+        Indexa el texto de los chunks.
+        
+        Args:
+            chunks: Chunks a indexar (se guardan por referencia)
+        """
+        tokenized = [Counter(self.tokenizer(chunk.text)) for chunk in chunks]
+        with self._lock:
+            for chunk, counts in zip(chunks, tokenized):
+                position = len(self._chunks)
+                self._chunks.append(chunk)
+                self._document_ids.append(chunk.document_id)
+                self._positions[chunk.id] = position
+                length = sum(counts.values())
+                self._lengths.append(length)
+                self._total_length += length
+                for term, frequency in counts.items():
+                    postings = self._postings.get(term)
+                    if postings is None:
+                        postings = self._postings[term] = (array("i"), array("f"))
+                    postings[0].append(position)
+                    postings[1].append(frequency)
+                    self._dirty.add(term)
+    
+    def remove(self, ids: List[str]) -> bool:
+        """
+        Quita chunks por id.
+        
+        Args:
+            ids: Ids de chunks a quitar
+            
+        Returns:
+            True si se quitó alguno
+        """
+        with self._lock:
+            removed = self._mark_removed(ids)
+            if not removed or len(self._deleted) <= self.compact_ratio * len(self._chunks):
+                return removed
+            # Si ya hay una compactación en curso, re-aplica también este borrado
+            if not self._compacting.acquire(blocking=False):
+                return True
+            keep = [(position, chunk) for position, chunk in enumerate(self._chunks) if chunk is not None]
+            cutoff = len(self._chunks)
+        
+        try:
+            # Reconstruir aparte y reemplazar de una vez: las búsquedas concurrentes
+            # ven el índice anterior o el nuevo, nunca uno a medio armar
+            rebuilt = BM25Index(self.k1, self.b, self.tokenizer, self.compact_ratio)
+            rebuilt.add([chunk for _, chunk in keep])
+            with self._lock:
+                # Cambios que llegaron durante la reconstrucción
+                rebuilt._mark_removed([chunk.id for position, chunk in keep if self._chunks[position] is None])
+                rebuilt.add([chunk for chunk in self._chunks[cutoff:] if chunk is not None])
+                self._chunks, self._postings = rebuilt._chunks, rebuilt._postings
+                self._document_ids = rebuilt._document_ids
+                self._lengths, self._total_length = rebuilt._lengths, rebuilt._total_length
+                self._positions, self._deleted = rebuilt._positions, rebuilt._deleted
+                self._dirty = set(self._postings)
+                self._frozen = {}
+                self._frozen_lengths = np.empty(0, dtype=np.float32)
+                self._frozen_alive = None
+        finally:
+            self._compacting.release()
+        return True
+    
+    def _mark_removed(self, ids: List[str]) -> bool:
+        """Marca chunks como borrados (con el lock tomado). Retorna True si había alguno."""
+        removed = False
+        for chunk_id in ids:
+            position = self._positions.pop(chunk_id, None)
+            if position is None:
+                continue
+            self._deleted.add(position)
+            # Soltar el chunk: su embedding puede ser una vista que retiene la matriz de otro store
+            self._chunks[position] = None
+            self._total_length -= int(self._lengths[position])
+            self._frozen_alive = None
+            removed = True
+        return removed
+    
+    def clear(self) -> None:
+        """Vacía el índice."""
+        with self._lock:
+            self._reset()
+    
+    def _reset(self) -> None:
+        self._chunks = []
+        self._document_ids = []
+        self._postings = {}
+        self._lengths = array("f")
+        self._total_length = 0
+        self._dirty = set()
+        self._frozen = {}
+        self._frozen_lengths = np.empty(0, dtype=np.float32)
+        self._positions = {}
+        self._deleted = set()
+        self._frozen_alive = None
+    
+    def _snapshot(self):
+        """Congela los términos modificados y retorna una vista consistente del índice."""
+        with self._lock:
+            if self._dirty:
+                frozen = dict(self._frozen)
+                for term in self._dirty:
+                    positions, frequencies = self._postings[term]
+                    frozen[term] = (np.array(positions, dtype=np.int32), np.array(frequencies, dtype=np.float32))
+                self._frozen = frozen
+                self._dirty = set()
+            if len(self._frozen_lengths) != len(self._lengths):
+                self._frozen_lengths = np.array(self._lengths, dtype=np.float32)
+            n = len(self._chunks)
+            if self._deleted and (self._frozen_alive is None or len(self._frozen_alive) != n):
+                alive = np.ones(n, dtype=bool)
+                alive[list(self._deleted)] = False
+                self._frozen_alive = alive
+            alive = self._frozen_alive if self._deleted else None
+            live = n - len(self._deleted)
+            average = self._total_length / live if live else 0.0
+            return (self._chunks[:n], self._frozen, self._frozen_lengths[:n], average, alive, live,
+                    self._document_ids)
+    
+    def scores(
+        self,
+        query: str,
+        document_filter: Optional[DocumentFilter] = None
+    ) -> Tuple[List[Chunk], np.ndarray]:
+        """
+        Calcula el score BM25 de la consulta contra todos los chunks.
+        
+        Args:
+            query: Texto de la consulta
+            document_filter: Filtro de documentos (los descartados quedan en 0)
+            
+        Returns:
+            Tupla (chunks, scores) con un score por chunk (0 si no comparte términos)
+        """
+        chunks, postings, lengths, average, alive, n, document_ids = self._snapshot()
+        scores = np.zeros(len(chunks), dtype=np.float32)
+        if not chunks or average == 0:
+            return chunks, scores
+        
+        normalization = self.k1 * (1.0 - self.b + self.b * lengths / average)
+        for term in set(self.tokenizer(query)):
+            term_postings = postings.get(term)
+            if term_postings is None:
+                continue
+            positions, frequencies = term_postings
+            idf = math.log(1.0 + (n - len(positions) + 0.5) / (len(positions) + 0.5))
+            scores[positions] += idf * frequencies * (self.k1 + 1.0) / (frequencies + normalization[positions])
+        if alive is not None:
+            scores[~alive] = 0.0
+        if document_filter is not None:
+            scores[~document_filter.mask(document_ids)[:len(chunks)]] = 0.0
+        return chunks, scores
+    
+    def search(
+        self,
+        query: str,
+        k: int = 10,
+        document_filter: Optional[DocumentFilter] = None
+    ) -> List[Tuple[Chunk, float]]:
+        """
+        Busca los k chunks con mayor score BM25.
+        
+        Args:
+            query: Texto de la consulta
+            k: Número de resultados
+            document_filter: Filtro de documentos (los descartados no se devuelven)
+            
+        Returns:
+            Lista de (chunk, score) ordenada por score descendente, solo con
+            chunks que comparten al menos un término con la consulta
+        """
+        chunks, scores = self.scores(query, document_filter)
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        top = candidates[np.lexsort((candidates, -scores[candidates]))]
+        return [(chunks[i], float(scores[i])) for i in top]
+    
+    def memory_bytes(self) -> int:
+        """Bytes de postings, largos, diccionario de términos e ids (sin los chunks)."""
+        with self._lock:
+            total = sys.getsizeof(self._postings) + self._lengths.itemsize * len(self._lengths)
+            total += sys.getsizeof(self._document_ids)
+            for term, (positions, frequencies) in self._postings.items():
+                total += sys.getsizeof(term) + sys.getsizeof(positions) + sys.getsizeof(frequencies)
+            total += sum(p.nbytes + f.nbytes for p, f in self._frozen.values())
+            total += sys.getsizeof(self._positions) + sum(sys.getsizeof(i) for i in self._positions)
+            return total
+    
+    @property
+    def vocabulary_size(self) -> int:
+        """Cantidad de términos distintos indexados."""
+        return len(self._postings)
+    
+    def __len__(self) -> int:
+        return len(self._chunks) - len(self._deleted)
@@ -1,8 +1,11 @@
 from typing import List, Optional, Callable
 import chromadb
+import numpy as np
 from chromadb.config import Settings
+from ...profiling import profiled
 from ..models import Chunk
 from .base import VectorStore, ScoredChunk
+from .memory import MemoryUsage, directory_bytes
 
 
 class ChromaDBVectorStore(VectorStore):
@@ -12,6 +15,11 @@ class ChromaDBVectorStore(VectorStore):
     Adecuado para datasets grandes (>10k chunks) y cuando se necesita persistencia.
     ChromaDB maneja automáticamente la indexación y optimización de búsquedas.
     
+    Con include_embeddings=True la query pide también los embeddings a la
+    colección: cada chunk devuelto expone su vector como una vista de solo
+    lectura del bloque float32 de la respuesta (sin copias por chunk), para
+    que las etapas posteriores (ej: MMR, reranking) no tengan que recalcularlo.
+    
     Referencias:
     - ChromaDB Docs: https://docs.trychroma.com/
     - ChromaDB Python Client: https://github.com/chroma-core/chroma
@@ -21,7 +29,8 @@ class ChromaDBVectorStore(VectorStore):
         self,
         collection_name: str = "recipes",
         persist_directory: Optional[str] = None,
-        embedding_function: Optional[Callable] = None
+        embedding_function: Optional[Callable] = None,
+        include_embeddings: bool = False
     ):
         """
         Inicializa el ChromaDB vector store.
@@ -31,6 +40,8 @@ class ChromaDBVectorStore(VectorStore):
             persist_directory: Directorio para persistencia. Si es None, usa modo en memoria.
                               Si es un string, guarda en disco en ese directorio.
             embedding_function: Función opcional para generar embeddings (no usado en search directo)
+            include_embeddings: Si es True, search/search_batch devuelven los chunks
+                                con su embedding (vista de solo lectura)
         """
         # Configurar cliente de ChromaDB
         if persist_directory:
@@ -51,8 +62,14 @@ class ChromaDBVectorStore(VectorStore):
             )
         
         self.collection_name = collection_name
+        self.persist_directory = persist_directory
         self.embedding_function = embedding_function
+        self.include_embeddings = include_embeddings
+        self._include = ["documents", "metadatas", "distances"]
+        if include_embeddings:
+            self._include.append("embeddings")
     
+    @profiled("add_chunks")
     def add_chunks(self, chunks: List[Chunk]) -> None:
         """
         Agrega chunks al vector store de ChromaDB.
@@ -68,12 +85,12 @@ class ChromaDBVectorStore(VectorStore):
         
         # Validar que todos los chunks tengan embeddings
         for chunk in chunks:
-            if not chunk.embedding:
+            if len(chunk.embedding) == 0:
                 raise ValueError(f"Chunk {chunk.id} no tiene embedding")
         
         # Convertir Chunk a formato ChromaDB
         ids = [chunk.id for chunk in chunks]
-        embeddings = [chunk.embedding for chunk in chunks]
+        embeddings = [np.asarray(chunk.embedding, dtype=np.float32) for chunk in chunks]
         documents = [chunk.text for chunk in chunks]
         
         # Preparar metadatos: incluir document_id y metadata del chunk
@@ -127,7 +144,7 @@ class ChromaDBVectorStore(VectorStore):
         Raises:
             ValueError: Si query_embedding está vacío o k es inválido
         """
-        if not query_embedding:
+        if len(query_embedding) == 0:
             raise ValueError("query_embedding no puede estar vacío")
         
         if k <= 0:
@@ -140,17 +157,72 @@ class ChromaDBVectorStore(VectorStore):
         results = self.collection.query(
             query_embeddings=[query_embedding],
             n_results=k,
-            include=["documents", "metadatas", "distances"]
+            include=self._include
+        )
+        
+        return self._to_scored_chunks(results, 0, min_score)
+    
+    def search_batch(
+        self,
+        query_embeddings: List[List[float]],
+        k: int = 3,
+        min_score: float = 0.0
+    ) -> List[List[ScoredChunk]]:
+        """
+        Busca los k chunks más similares para varias queries en una sola
+        consulta a la colección de ChromaDB.
+        
+        Args:
+            query_embeddings: Vectores de embedding de las consultas
+            k: Número de resultados a retornar por query (top-k)
+            min_score: Score mínimo de similitud (filtra resultados con score menor)
+            
+        Returns:
+            Una lista de ScoredChunk por query, en el mismo orden
+            
+        Raises:
+            ValueError: Si algún query_embedding está vacío o k es inválido
+        """
+        if not query_embeddings:
+            return []
+        
+        if any(len(query_embedding) == 0 for query_embedding in query_embeddings):
+            raise ValueError("query_embedding no puede estar vacío")
+        
+        if k <= 0:
+            raise ValueError(f"k debe ser mayor a 0, recibido: {k}")
+        
+        results = self.collection.query(
+            query_embeddings=query_embeddings,
+            n_results=k,
+            include=self._include
         )
         
-        # Convertir resultados de ChromaDB a ScoredChunk
+        return [
+            self._to_scored_chunks(results, i, min_score)
+            for i in range(len(query_embeddings))
+        ]
+    
+    def _to_scored_chunks(self, results: dict, query_index: int, min_score: float) -> List[ScoredChunk]:
+        """
+        Convierte los resultados de ChromaDB de una query a ScoredChunk.
+        
+        Args:
+            results: Respuesta de collection.query
+            query_index: Índice de la query dentro de la respuesta
+            min_score: Score mínimo de similitud
+            
+        Returns:
+            Lista de ScoredChunk ordenados por score descendente
+        """
         scored_chunks = []
         
-        if results["ids"] and len(results["ids"][0]) > 0:
-            ids = results["ids"][0]
-            documents = results["documents"][0]
-            metadatas = results["metadatas"][0]
-            distances = results["distances"][0]
+        if results["ids"] and len(results["ids"][query_index]) > 0:
+            ids = results["ids"][query_index]
+            documents = results["documents"][query_index]
+            metadatas = results["metadatas"][query_index]
+            distances = results["distances"][query_index]
+            embeddings = self._embedding_rows(results, query_index)
             
             for i, (chunk_id, text, metadata, distance) in enumerate(
                 zip(ids, documents, metadatas, distances)
@@ -166,15 +238,12 @@ class ChromaDBVectorStore(VectorStore):
                 # Extraer document_id del metadata
                 document_id = metadata.pop("document_id", chunk_id)
                 
-                # Reconstruir Chunk
-                # Necesitamos el embedding, pero ChromaDB no lo retorna por defecto
-                # Para obtenerlo, necesitaríamos hacer otra query o almacenarlo
-                # Por ahora, creamos un Chunk sin embedding (se puede mejorar después)
+                # Reconstruir Chunk (sin embedding salvo con include_embeddings)
                 chunk = Chunk(
                     id=chunk_id,
                     document_id=document_id,
                     text=text,
-                    embedding=[],  # ChromaDB no retorna embeddings en query
+                    embedding=embeddings[i] if embeddings is not None else [],
                     metadata=metadata
                 )
                 
@@ -185,6 +254,87 @@ class ChromaDBVectorStore(VectorStore):
         
         return scored_chunks
     
+    @staticmethod
+    def _embedding_rows(results: dict, query_index: int) -> Optional[np.ndarray]:
+        """
+        Convierte el bloque de embeddings de una query a una matriz float32
+        de solo lectura; cada fila se entrega como vista, sin copiarla.
+        
+        Args:
+            results: Respuesta de collection.query
+            query_index: Índice de la query dentro de la respuesta
+            
+        Returns:
+            Matriz (n_results, dims) o None si la respuesta no trae embeddings
+        """
+        embeddings = results.get("embeddings")
+        if embeddings is None or len(embeddings) <= query_index:
+            return None
+        block = np.asarray(embeddings[query_index], dtype=np.float32)
+        block.flags.writeable = False
+        return block
+    
+    def warmup(self) -> None:
+        """
+        Ejecuta una búsqueda con un embedding ya almacenado para que ChromaDB
+        cargue el índice HNSW (y, en modo persistente, lo lea desde disco)
+        antes de la primera consulta real.
+        """
+        sample = self.collection.peek(limit=1)
+        embeddings = sample.get("embeddings")
+        if embeddings is None or len(embeddings) == 0:
+            return
+        self.collection.query(
+            query_embeddings=[list(embeddings[0])],
+            n_results=1,
+            include=["distances"]
+        )
+    
+    def memory_usage(self, batch_size: int = 5000) -> MemoryUsage:
+        """
+        Retorna la memoria usada por la colección.
+        
+        Texto, metadata e ids se miden en bytes UTF-8 leyendo la colección por
+        lotes. Los vectores (float32) y el grafo HNSW (2*M vecinos int32 en la
+        capa 0 y M en las superiores, ver hnswlib) se estiman a partir de la
+        cantidad y la dimensión. En modo persistente, disk_bytes es el tamaño
+        real del directorio (SQLite + segmentos del índice).
+        
+        Args:
+            batch_size: Chunks leídos por llamada a collection.get
+            
+        Returns:
+            MemoryUsage de la colección
+        """
+        count = self.collection.count()
+        usage = MemoryUsage(
+            backend="chromadb",
+            chunks=count,
+            disk_bytes=directory_bytes(self.persist_directory) if self.persist_directory else None
+        )
+        if count == 0:
+            return usage
+        
+        sample = self.collection.peek(limit=1).get("embeddings")
+        if sample is not None and len(sample) > 0:
+            usage.dimension = len(sample[0])
+            usage.vectors_bytes = count * usage.dimension * 4
+        
+        for offset in range(0, count, batch_size):
+            page = self.collection.get(include=["documents", "metadatas"], limit=batch_size, offset=offset)
+            for chunk_id, text, metadata in zip(page["ids"], page["documents"], page["metadatas"]):
+                usage.text_bytes += len((text or "").encode("utf-8"))
+                usage.metadata_bytes += sum(
+                    len(str(key).encode("utf-8")) + len(str(value).encode("utf-8"))
+                    for key, value in (metadata or {}).items()
+                )
+                # id + label interno del índice (8 bytes)
+                usage.id_map_bytes += len(chunk_id.encode("utf-8")) + 8
+        
+        m = int((self.collection.metadata or {}).get("hnsw:M", 16))
+        usage.index_bytes = count * (2 * m * 4 + 4) + (count // m) * (m * 4 + 4)
+        return usage
+    
     def delete(self, ids: List[str]) -> bool:
         """
         Elimina chunks por IDs de ChromaDB.
@@ -1,31 +1,27 @@
 from enum import Enum
 from typing import Type, Optional
+from ...lazy import LazyRegistry
 from .base import VectorStore
-from .in_memory import InMemoryVectorStore
-
-# Importación opcional de ChromaDB
-try:
-    from .chromadb_store import ChromaDBVectorStore
-    _CHROMADB_AVAILABLE = True
-except ImportError:
-    ChromaDBVectorStore = None  # type: ignore
-    _CHROMADB_AVAILABLE = False
 
 
 class VectorStoreBackend(str, Enum):
     """Backends disponibles para VectorStore."""
     IN_MEMORY = "in_memory"
     CHROMADB = "chromadb"
+    MULTI_VECTOR = "multi_vector"
+    HYBRID = "hybrid"
+    TWO_STAGE = "two_stage"
 
 
-# Registry: mapea cada backend a su clase correspondiente (Strategy Pattern)
-_VECTOR_STORE_REGISTRY: dict[VectorStoreBackend, Type[VectorStore]] = {
-    VectorStoreBackend.IN_MEMORY: InMemoryVectorStore,
-}
-
-# Agregar ChromaDB solo si está disponible
-if _CHROMADB_AVAILABLE and ChromaDBVectorStore is not None:
-    _VECTOR_STORE_REGISTRY[VectorStoreBackend.CHROMADB] = ChromaDBVectorStore
+# Registry: mapea cada backend a su clase correspondiente (Strategy Pattern).
+# ChromaDB se importa recién al crear el primer store de ese backend
+_VECTOR_STORE_REGISTRY: LazyRegistry[Type[VectorStore]] = LazyRegistry(__package__, {
+    VectorStoreBackend.IN_MEMORY: ".in_memory:InMemoryVectorStore",
+    VectorStoreBackend.CHROMADB: ".chromadb_store:ChromaDBVectorStore",
+    VectorStoreBackend.MULTI_VECTOR: ".multi_vector:MultiVectorStore",
+    VectorStoreBackend.HYBRID: ".hybrid:HybridVectorStore",
+    VectorStoreBackend.TWO_STAGE: ".two_stage:TwoStageVectorStore",
+})
 
 
 def create_vector_store(
@@ -43,7 +39,27 @@ def create_vector_store(
                 - collection_name: str = "recipes"
                 - persist_directory: Optional[str] = None
                 - embedding_function: Optional[Callable] = None
-            - Para IN_MEMORY: no requiere parámetros adicionales
+                - include_embeddings: bool = False
+            - Para IN_MEMORY:
+                - initial_capacity: int = 256
+            - Para MULTI_VECTOR (chunks de recipes_to_multi_vector_chunks):
+                - aggregation: str = "max"  ("max" o "weighted_sum")
+                - field_weights: Optional[Dict[str, float]] = None
+                - initial_capacity: int = 256
+            - Para HYBRID (vector store + BM25 con Reciprocal Rank Fusion):
+                - vector_store: VectorStore | str | None = None  (default: in_memory)
+                - vector_store_kwargs: Optional[dict] = None
+                - rrf_k: int = 60
+                - fetch_k: Optional[int] = None
+                - k1: float = 1.2
+                - b: float = 0.75
+            - Para TWO_STAGE (candidatos aproximados + rerankeo exacto):
+                - candidate_store: VectorStore | str | None = None  (default: in_memory)
+                - candidate_store_kwargs: Optional[dict] = None
+                - candidate_dims: Optional[int] = None  (None = dims // 4; 0 = sin proyectar)
+                - candidates: int = 200
+                - reranker: Optional[Reranker] = None  (default: ExactCosineReranker)
+                - seed: int = 0
     
     Returns:
         Una instancia del VectorStore correspondiente
@@ -65,20 +81,23 @@ def create_vector_store(
         ...     collection_name="recipes"
         ... )
     """
-    vector_store_class = _VECTOR_STORE_REGISTRY.get(backend)
+    try:
+        vector_store_class = _VECTOR_STORE_REGISTRY.get(backend)
+    except ImportError as e:
+        error_msg = f"Vector store backend {backend.value} is not available: {e}"
+        if backend == VectorStoreBackend.CHROMADB:
+            error_msg += (
+                "\nNote: ChromaDB backend requires 'chromadb' package. "
+                "Install it with: pip install chromadb"
+            )
+        raise ValueError(error_msg)
     
     if vector_store_class is None:
         available = ", ".join(b.value for b in _VECTOR_STORE_REGISTRY.keys())
-        error_msg = (
+        raise ValueError(
             f"Invalid vector store backend: {backend.value}. "
             f"Available backends: {available}"
         )
-        if backend == VectorStoreBackend.CHROMADB and not _CHROMADB_AVAILABLE:
-            error_msg += (
-                "\nNote: ChromaDB backend requires 'chromadb' package. "
-                "Install it with: pip install chromadb"
-            )
-        raise ValueError(error_msg)
     
     # Crear instancia con los parámetros específicos del backend
     return vector_store_class(**kwargs)
@@ -0,0 +1,248 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from ..models import Chunk
+from .base import VectorStore, ScoredChunk, DocumentFilter
+from .bm25 import BM25Index
+from .memory import MemoryUsage
+
+
+class HybridVectorStore(VectorStore):
+    """
+    Búsqueda híbrida: combina un vector store con un índice léxico BM25
+    sobre el texto de los chunks mediante Reciprocal Rank Fusion (RRF).
+    
+    Los términos exactos ("garbanzos", "sin tacc") que la búsqueda por
+    embeddings pierde, sobre todo con modelos chicos, los recupera BM25; los
+    sinónimos y paráfrasis los recupera la búsqueda vectorial. Cada lista
+    aporta 1 / (rrf_k + posición) por chunk y el resultado se ordena por la
+    suma. El score se normaliza a [0, 1] (1 = primero en todas las listas);
+    los scores originales quedan en la metadata (vector_score, bm25_score)
+    de una copia del chunk, así dos consultas no se pisan los scores.
+    
+    La búsqueda léxica necesita el texto de la consulta: RAGPipeline lo pasa
+    en query_text porque uses_query_text es True. Sin texto, la búsqueda es
+    solo vectorial.
+    
+    Acepta DocumentFilter si el vector store interno los acepta: se aplican
+    en las dos listas antes de fusionar.
+    
+    Referencias:
+    - RRF: https://plg.uwaterloo.ca/~gvcormac/cormacksigir09-rrf.pdf
+    """
+    
+    uses_query_text = True
+    
+    def __init__(
+        self,
+        vector_store: Union[VectorStore, str, None] = None,
+        vector_store_kwargs: Optional[Dict[str, Any]] = None,
+        rrf_k: int = 60,
+        fetch_k: Optional[int] = None,
+        k1: float = 1.2,
+        b: float = 0.75
+    ):
+        """
+        Args:
+            vector_store: Store para la búsqueda vectorial, o el nombre de un
+                          VectorStoreBackend a crear (default: in_memory). Debe
+                          devolver los chunks con el mismo id con que se agregaron
+            vector_store_kwargs: Parámetros para crear el store por nombre
+            rrf_k: Constante de RRF (mayor = menos peso a las primeras posiciones)
+            fetch_k: Candidatos por lista antes de fusionar (default: max(4 * k, 20))
+            k1: Parámetro k1 de BM25
+            b: Parámetro b de BM25
+            
+        Raises:
+            ValueError: Si rrf_k o fetch_k no son positivos, o si el vector
+                        store no conserva los ids (ej: multi_vector)
+        """
+        if rrf_k <= 0:
+            raise ValueError(f"rrf_k debe ser mayor a 0, recibido: {rrf_k}")
+        if fetch_k is not None and fetch_k <= 0:
+            raise ValueError(f"fetch_k debe ser mayor a 0, recibido: {fetch_k}")
+        
+        if vector_store is None or isinstance(vector_store, str):
+            from .factory import create_vector_store, VectorStoreBackend
+            backend = VectorStoreBackend(vector_store or VectorStoreBackend.IN_MEMORY.value)
+            vector_store = create_vector_store(backend, **(vector_store_kwargs or {}))
+        if not vector_store.preserves_chunk_ids:
+            # RRF fusiona por id: con ids distintos las dos listas nunca coinciden
+            raise ValueError(
+                f"{type(vector_store).__name__} no devuelve los ids agregados y no se puede fusionar con BM25"
+            )
+        
+        self.vector_store = vector_store
+        self.supports_document_filter = vector_store.supports_document_filter
+        self.lexical = BM25Index(k1=k1, b=b)
+        self.rrf_k = rrf_k
+        self.fetch_k = fetch_k
+    
+    def add_chunks(self, chunks: List[Chunk]) -> None:
+        """
+        Agrega chunks al vector store y al índice BM25.
+        
+        Args:
+            chunks: Lista de chunks a agregar
+            
+        Raises:
+            ValueError: Si la lista está vacía o algún chunk no tiene embedding
+        """
+        self.vector_store.add_chunks(chunks)
+        self.lexical.add(chunks)
+    
+    def _fetch_k(self, k: int) -> int:
+        return self.fetch_k or max(4 * k, 20)
+    
+    def search(
+        self,
+        query_embedding: List[float],
+        k: int = 3,
+        min_score: float = 0.0,
+        query_text: Optional[str] = None,
+        document_filter: Optional[DocumentFilter] = None
+    ) -> List[ScoredChunk]:
+        """
+        Busca los k chunks más relevantes fusionando búsqueda vectorial y BM25.
+        
+        Args:
+            query_embedding: Vector de embedding de la consulta
+            k: Número de resultados a retornar (top-k)
+            min_score: Score mínimo de similitud para los candidatos vectoriales
+                       (los candidatos léxicos no se filtran)
+            query_text: Texto de la consulta para BM25 (None = solo vectorial)
+            document_filter: Filtro de documentos (ver supports_document_filter)
+            
+        Returns:
+            Lista de ScoredChunk ordenados por score RRF normalizado
+            
+        Raises:
+            ValueError: Si query_embedding está vacío o k es inválido
+        """
+        return self.search_batch(
+            [query_embedding], k=k, min_score=min_score,
+            query_texts=None if query_text is None else [query_text],
+            document_filters=None if document_filter is None else [document_filter]
+        )[0]
+    
+    def search_batch(
+        self,
+        query_embeddings: List[List[float]],
+        k: int = 3,
+        min_score: float = 0.0,
+        query_texts: Optional[Sequence[Optional[str]]] = None,
+        document_filters: Optional[Sequence[Optional[DocumentFilter]]] = None
+    ) -> List[List[ScoredChunk]]:
+        """
+        Busca varias queries: una sola llamada a search_batch del vector store
+        y una búsqueda BM25 por query.
+        
+        Args:
+            query_embeddings: Vectores de embedding de las consultas
+            k: Número de resultados a retornar por query (top-k)
+            min_score: Score mínimo de similitud para los candidatos vectoriales
+            query_texts: Texto de cada consulta, en el mismo orden (None = solo vectorial)
+            document_filters: Filtro de documentos de cada query, en el mismo
+                              orden (None = sin filtro)
+                              
+        Returns:
+            Una lista de ScoredChunk por query, en el mismo orden
+            
+        Raises:
+            ValueError: Si algún query_embedding está vacío, k es inválido,
+                        query_texts no tiene un texto por query o el vector
+                        store interno no acepta document_filters
+        """
+        if k <= 0:
+            raise ValueError(f"k debe ser mayor a 0, recibido: {k}")
+        if query_texts is not None and len(query_texts) != len(query_embeddings):
+            raise ValueError(
+                f"query_texts debe tener un texto por query: {len(query_texts)} != {len(query_embeddings)}"
+            )
+        filter_kwargs = {}
+        if document_filters is not None:
+            if not self.supports_document_filter:
+                raise ValueError(
+                    f"{type(self.vector_store).__name__} no acepta document_filters"
+                )
+            filter_kwargs["document_filters"] = document_filters
+        if query_texts is None or not any(query_texts):
+            return self.vector_store.search_batch(query_embeddings, k=k, min_score=min_score, **filter_kwargs)
+        
+        fetch_k = self._fetch_k(k)
+        vector_results = self.vector_store.search_batch(
+            query_embeddings, k=fetch_k, min_score=min_score, **filter_kwargs
+        )
+        filters = document_filters if document_filters is not None else [None] * len(query_embeddings)
+        return [
+            self._fuse(vector, self.lexical.search(text, k=fetch_k, document_filter=document_filter) if text else [], k)
+            for vector, text, document_filter in zip(vector_results, query_texts, filters)
+        ]
+    
+    def _fuse(
+        self,
+        vector: List[ScoredChunk],
+        lexical: List[Tuple[Chunk, float]],
+        k: int
+    ) -> List[ScoredChunk]:
+        """Reciprocal Rank Fusion de los candidatos vectoriales y léxicos."""
+        fused: Dict[str, List[Any]] = {}  # id -> [chunk, rrf, vector_score, bm25_score]
+        for rank, scored in enumerate(vector, start=1):
+            fused[scored.chunk.id] = [scored.chunk, 1.0 / (self.rrf_k + rank), scored.score, None]
+        for rank, (chunk, score) in enumerate(lexical, start=1):
+            entry = fused.setdefault(chunk.id, [chunk, 0.0, None, None])
+            entry[1] += 1.0 / (self.rrf_k + rank)
+            entry[3] = score
+        
+        lists = 1 + bool(lexical)
+        best = lists / (self.rrf_k + 1.0)
+        ranked = sorted(fused.values(), key=lambda entry: -entry[1])[:k]
+        
+        results = []
+        for chunk, rrf, vector_score, bm25_score in ranked:
+            score = rrf / best
+            metadata = dict(chunk._metadata or {})
+            metadata.update({
+                "similarity_score": score,
+                "vector_score": vector_score,
+                "bm25_score": bm25_score,
+            })
+            # Los scores son de esta consulta: van en una copia, no en el chunk almacenado
+            copy = Chunk(id=chunk.id, document_id=chunk.document_id, text=chunk.text,
+                         embedding=chunk.embedding, metadata=metadata)
+            results.append(ScoredChunk(chunk=copy, score=score))
+        return results
+    
+    def warmup(self) -> None:
+        """Precarga el vector store y congela los postings del índice BM25."""
+        self.vector_store.warmup()
+        self.lexical.scores("")
+    
+    def delete(self, ids: List[str]) -> bool:
+        """
+        Elimina chunks por IDs del vector store y del índice BM25.
+        
+        Args:
+            ids: Lista de IDs de chunks a eliminar
+            
+        Returns:
+            True si se eliminaron chunks, False en caso contrario
+        """
+        deleted = self.vector_store.delete(ids)
+        removed = self.lexical.remove(ids)
+        return deleted or removed
+    
+    def memory_usage(self) -> MemoryUsage:
+        """
+        Retorna la memoria del vector store más la del índice BM25 (en
+        index_bytes; los chunks se comparten por referencia).
+        
+        Returns:
+            MemoryUsage del store
+        """
+        usage = self.vector_store.memory_usage()
+        usage.backend = f"hybrid({usage.backend})"
+        usage.index_bytes += self.lexical.memory_bytes()
+        return usage
+    
+    def __len__(self) -> int:
+        """Retorna el número de chunks almacenados."""
+        return len(self.vector_store)
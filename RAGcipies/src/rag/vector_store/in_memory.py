@@ -1,7 +1,12 @@
-from typing import List, Tuple
+from threading import Lock
+from typing import List, Optional, Sequence, Tuple
 import math
+import sys
+import numpy as np
+from ...profiling import profiled
 from ..models import Chunk
-from .base import VectorStore, ScoredChunk
+from .base import VectorStore, ScoredChunk, DocumentFilter
+from .memory import MemoryUsage, object_bytes
 
 
 class InMemoryVectorStore(VectorStore):
@@ -10,36 +15,145 @@ class InMemoryVectorStore(VectorStore):
     Usa cosine similarity para encontrar los chunks más similares.
     
     Adecuado para datasets pequeños/medianos (<10k chunks).
-    No requiere dependencias externas más allá de Python estándar.
+    
+    Los embeddings viven en una única matriz float32 (n x dims) propiedad del
+    store; la búsqueda es un producto matriz-vector vectorizado con NumPy.
+    El `embedding` de cada chunk almacenado se reemplaza por una vista de
+    solo lectura de su fila: los resultados de búsqueda exponen el vector
+    sin copiarlo y nadie puede modificar el índice a través de ellos.
+    delete compacta la matriz en el mismo buffer y re-apunta los chunks que
+    quedan: una vista guardada desde antes de un delete puede quedar
+    apuntando a otra fila (copiarla si hay que conservarla).
     
     Referencias:
     - Cosine Similarity: https://en.wikipedia.org/wiki/Cosine_similarity
     - Vector Search: https://www.pinecone.io/learn/vector-search/
     """
     
-    def __init__(self) -> None:
-        """Inicializa un vector store vacío."""
+    supports_document_filter = True
+    
+    def __init__(self, initial_capacity: int = 256) -> None:
+        """
+        Inicializa un vector store vacío.
+        
+        Args:
+            initial_capacity: Filas reservadas al crear la matriz (crece x2 al llenarse)
+        """
         self._chunks: List[Chunk] = []
+        # document_id de cada fila; solo crece con add_chunks y se reemplaza al
+        # borrar, así los DocumentFilter pueden cachear su máscara por lista
+        self._document_ids: List[str] = []
+        self._initial_capacity = max(1, initial_capacity)
+        self._matrix: Optional[np.ndarray] = None
+        self._norms: Optional[np.ndarray] = None
+        # Aumenta en cada delete: las búsquedas que corrieron mientras se
+        # compactaba la matriz se repiten
+        self._generation = 0
+        self._lock = Lock()
+    
+    @property
+    def dimension(self) -> Optional[int]:
+        """Dimensión de los embeddings almacenados (None si el store está vacío)."""
+        return None if self._matrix is None else self._matrix.shape[1]
+    
+    def embeddings(self) -> np.ndarray:
+        """
+        Retorna la matriz de embeddings como vista de solo lectura (sin copiar).
+        
+        Returns:
+            Array float32 de forma (len(self), dims); vacío si no hay chunks
+        """
+        n = len(self._chunks)
+        if self._matrix is None:
+            return np.empty((0, 0), dtype=np.float32)
+        view = self._matrix[:n]
+        view.flags.writeable = False
+        return view
+    
+    def _ensure_capacity(self, rows: int, dims: int) -> None:
+        """Reserva lugar para `rows` filas más, duplicando la matriz si hace falta."""
+        n = len(self._chunks)
+        if self._matrix is None:
+            capacity = max(self._initial_capacity, rows)
+            self._matrix = np.zeros((capacity, dims), dtype=np.float32)
+            self._norms = np.zeros(capacity, dtype=np.float32)
+            return
+        
+        if n + rows <= self._matrix.shape[0]:
+            return
+        capacity = max(self._matrix.shape[0] * 2, n + rows)
+        matrix = np.zeros((capacity, dims), dtype=np.float32)
+        norms = np.zeros(capacity, dtype=np.float32)
+        matrix[:n] = self._matrix[:n]
+        norms[:n] = self._norms[:n]
+        self._matrix, self._norms = matrix, norms
+        self._rebind_views(0)
     
+    def _rebind_views(self, start: int) -> None:
+        """Apunta el embedding de los chunks desde `start` a su fila de la matriz actual."""
+        readonly = self._matrix.view()
+        readonly.flags.writeable = False
+        for index in range(start, len(self._chunks)):
+            self._chunks[index].embedding = readonly[index]
+    
+    @staticmethod
+    def _unbound(chunk: Chunk) -> Chunk:
+        """Retorna el chunk, o una copia si su embedding ya es una vista de otro store."""
+        embedding = chunk.embedding
+        if not isinstance(embedding, np.ndarray) or embedding.flags.writeable:
+            return chunk
+        metadata = dict(chunk._metadata) if chunk._metadata else None
+        return Chunk(id=chunk.id, document_id=chunk.document_id, text=chunk.text,
+                     embedding=embedding, metadata=metadata)
+    
+    @profiled("add_chunks")
     def add_chunks(self, chunks: List[Chunk]) -> None:
         """
         Agrega chunks al vector store.
         
+        Los embeddings se copian a la matriz del store y el `embedding` de
+        cada chunk pasa a ser una vista de solo lectura de su fila. Si el
+        chunk ya apunta a la matriz de otro store (su embedding es una vista
+        de solo lectura), se guarda una copia del chunk y el original no se
+        modifica: cada store sigue viendo sus propias filas.
+        
+        A diferencia de la versión con listas, que omitía en silencio al
+        buscar los chunks de otra dimensión, la matriz exige una dimensión
+        única y los lotes mezclados se rechazan al agregar.
+        
         Args:
             chunks: Lista de chunks a agregar
             
         Raises:
-            ValueError: Si la lista está vacía o algún chunk no tiene embedding
+            ValueError: Si la lista está vacía, algún chunk no tiene embedding
+                        o las dimensiones no coinciden con las ya almacenadas
         """
         if not chunks:
             raise ValueError("No se pueden agregar chunks vacíos")
         
         # Validar que todos los chunks tengan embeddings
         for chunk in chunks:
-            if not chunk.embedding:
+            if len(chunk.embedding) == 0:
                 raise ValueError(f"Chunk {chunk.id} no tiene embedding")
         
-        self._chunks.extend(chunks)
+        if len({len(chunk.embedding) for chunk in chunks}) != 1:
+            raise ValueError("Todos los chunks deben tener embeddings de la misma dimensión")
+        vectors = np.asarray([np.asarray(chunk.embedding, dtype=np.float32) for chunk in chunks])
+        chunks = [self._unbound(chunk) for chunk in chunks]
+        
+        with self._lock:
+            if self.dimension is not None and vectors.shape[1] != self.dimension:
+                raise ValueError(
+                    f"Dimensión de embedding incompatible: {vectors.shape[1]} != {self.dimension}"
+                )
+            self._ensure_capacity(len(chunks), vectors.shape[1])
+            start = len(self._chunks)
+            end = start + len(chunks)
+            self._matrix[start:end] = vectors
+            self._norms[start:end] = np.linalg.norm(vectors, axis=1)
+            self._chunks.extend(chunks)
+            self._document_ids.extend(chunk.document_id for chunk in chunks)
+            self._rebind_views(start)
     
     def add_chunk(self, chunk: Chunk) -> None:
         """
@@ -51,9 +165,9 @@ class InMemoryVectorStore(VectorStore):
         Raises:
             ValueError: Si el chunk no tiene embedding
         """
-        if not chunk.embedding:
+        if len(chunk.embedding) == 0:
             raise ValueError(f"Chunk {chunk.id} no tiene embedding")
-        self._chunks.append(chunk)
+        self.add_chunks([chunk])
     
     @staticmethod
     def _cosine_similarity(a: List[float], b: List[float]) -> float:
@@ -96,11 +210,24 @@ class InMemoryVectorStore(VectorStore):
         
         return dot_product / (norm_a * norm_b)
     
+    def _snapshot(self) -> Tuple[List[Chunk], Optional[np.ndarray], Optional[np.ndarray], List[str]]:
+        """
+        Vista consistente (chunks, matriz, normas, document_ids) para buscar
+        sin tomar el lock. document_ids es la lista del store (puede crecer
+        después): se usan sus primeros len(chunks) elementos.
+        """
+        with self._lock:
+            n = len(self._chunks)
+            if self._matrix is None:
+                return self._chunks[:n], None, None, self._document_ids
+            return self._chunks[:n], self._matrix[:n], self._norms[:n], self._document_ids
+    
     def search(
         self, 
         query_embedding: List[float], 
         k: int = 3,
-        min_score: float = 0.0
+        min_score: float = 0.0,
+        document_filter: Optional[DocumentFilter] = None
     ) -> List[ScoredChunk]:
         """
         Busca los k chunks más similares al query embedding.
@@ -109,48 +236,116 @@ class InMemoryVectorStore(VectorStore):
             query_embedding: Vector de embedding de la consulta
             k: Número de resultados a retornar (top-k)
             min_score: Score mínimo de similitud (filtra resultados con score menor)
+            document_filter: Filtro de documentos (los chunks descartados no se rankean)
             
         Returns:
-            Lista de ScoredChunk ordenados por score descendente
+            Lista de ScoredChunk ordenados por score descendente. El embedding
+            de cada chunk es una vista de solo lectura de la matriz del store
             
         Raises:
-            ValueError: Si query_embedding está vacío o k es inválido
+            ValueError: Si query_embedding está vacío, su dimensión no coincide
+                        con la de los chunks o k es inválido
+        """
+        return self.search_batch(
+            [query_embedding], k=k, min_score=min_score,
+            document_filters=None if document_filter is None else [document_filter]
+        )[0]
+    
+    def _scores(self, queries: np.ndarray) -> Tuple[List[Chunk], Optional[np.ndarray], List[str]]:
+        """
+        Cosine similarity de las queries contra todos los chunks, sobre una
+        vista consistente (se repite si un delete compactó la matriz mientras
+        tanto).
+        
+        Raises:
+            ValueError: Si la dimensión de las queries no coincide con la de los chunks
         """
-        if not query_embedding:
+        while True:
+            generation = self._generation
+            chunks, matrix, norms, document_ids = self._snapshot()
+            if matrix is None:
+                return chunks, None, document_ids
+            if queries.shape[1] != matrix.shape[1]:
+                raise ValueError(
+                    f"Dimensión de la query incompatible: {queries.shape[1]} != {matrix.shape[1]}"
+                )
+            query_norms = np.linalg.norm(queries, axis=1)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                scores = (queries @ matrix.T) / np.outer(query_norms, norms)
+            if generation == self._generation:
+                return chunks, np.nan_to_num(scores, nan=0.0, posinf=0.0, neginf=0.0), document_ids
+    
+    def search_batch(
+        self,
+        query_embeddings: List[List[float]],
+        k: int = 3,
+        min_score: float = 0.0,
+        document_filters: Optional[Sequence[Optional[DocumentFilter]]] = None
+    ) -> List[List[ScoredChunk]]:
+        """
+        Busca los k chunks más similares para varias queries con un solo
+        producto matriz-matriz.
+        
+        Args:
+            query_embeddings: Vectores de embedding de las consultas
+            k: Número de resultados a retornar por query (top-k)
+            min_score: Score mínimo de similitud (filtra resultados con score menor)
+            document_filters: Filtro de documentos de cada query, en el mismo
+                              orden (None = sin filtro). Los chunks descartados
+                              quedan con score -inf antes del top-k
+                              
+        Returns:
+            Una lista de ScoredChunk por query, en el mismo orden
+            
+        Raises:
+            ValueError: Si algún query_embedding está vacío o tiene otra
+                        dimensión que los chunks, k es inválido o
+                        document_filters no tiene un filtro por query
+        """
+        if any(len(query) == 0 for query in query_embeddings):
             raise ValueError("query_embedding no puede estar vacío")
         
         if k <= 0:
             raise ValueError(f"k debe ser mayor a 0, recibido: {k}")
         
-        if not self._chunks:
-            return []  # Retornar lista vacía si no hay chunks
-        
-        # Calcular similitud para todos los chunks
-        scored: List[Tuple[Chunk, float]] = []
-        for chunk in self._chunks:
-            try:
-                score = self._cosine_similarity(query_embedding, chunk.embedding)
-                
-                # Filtrar por score mínimo
-                if score >= min_score:
-                    scored.append((chunk, score))
-            except ValueError as e:
-                # Si hay error de dimensión, saltar este chunk
-                # (podría loguear el error en producción)
-                continue
-        
-        # Ordenar por score descendente
-        scored.sort(key=lambda x: x[1], reverse=True)
-        
-        # Limitar a k resultados (o menos si hay menos chunks)
-        k = min(k, len(scored))
-        
-        # Crear ScoredChunk y actualizar metadata
-        results = []
-        for chunk, score in scored[:k]:
-            # Actualizar metadata del chunk con el score
-            chunk.metadata["similarity_score"] = score
-            results.append(ScoredChunk(chunk=chunk, score=score))
+        if document_filters is not None and len(document_filters) != len(query_embeddings):
+            raise ValueError(
+                f"document_filters debe tener un filtro por query: {len(document_filters)} != {len(query_embeddings)}"
+            )
+        
+        if not query_embeddings:
+            return []
+        if len({len(query) for query in query_embeddings}) > 1:
+            raise ValueError("Todas las queries deben tener la misma dimensión")
+        
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        chunks, scores, document_ids = self._scores(queries)
+        results: List[List[ScoredChunk]] = [[] for _ in query_embeddings]
+        if scores is None:
+            return results  # Retornar listas vacías si no hay chunks
+        
+        k = min(k, len(chunks))
+        for query_index in range(len(query_embeddings)):
+            row_scores = scores[query_index]
+            document_filter = document_filters[query_index] if document_filters is not None else None
+            if document_filter is not None:
+                row_scores[~document_filter.mask(document_ids)[:len(chunks)]] = -np.inf
+            # Top-k sin ordenar todo: argpartition + orden estable de los k candidatos
+            if k < len(chunks):
+                candidates = np.argpartition(-row_scores, k - 1)[:k]
+            else:
+                candidates = np.arange(len(chunks))
+            top = candidates[np.lexsort((candidates, -row_scores[candidates]))]
+            
+            for index in top:
+                score = float(row_scores[index])
+                # -inf = excluido por el filtro, aunque min_score sea -inf
+                if score < min_score or score == -np.inf:
+                    break
+                chunk = chunks[index]
+                # Actualizar metadata del chunk con el score
+                chunk.metadata["similarity_score"] = score
+                results[query_index].append(ScoredChunk(chunk=chunk, score=score))
         
         return results
     
@@ -164,15 +359,76 @@ class InMemoryVectorStore(VectorStore):
         Returns:
             True si se eliminaron chunks, False en caso contrario
         """
-        initial_count = len(self._chunks)
-        self._chunks = [c for c in self._chunks if c.id not in ids]
-        return len(self._chunks) < initial_count
+        ids = set(ids)
+        with self._lock:
+            n = len(self._chunks)
+            keep = np.fromiter((chunk.id not in ids for chunk in self._chunks), dtype=bool, count=n)
+            if keep.all():
+                return False
+            
+            # Compactar en el mismo buffer: cada tramo de filas que quedan se
+            # corre hacia arriba con una copia de slices (sin matriz nueva)
+            self._generation += 1
+            edges = np.flatnonzero(np.diff(np.r_[False, keep, False]))
+            target = first = int(np.argmin(keep))
+            for start, end in zip(edges[0::2], edges[1::2]):
+                if end <= first:
+                    continue
+                rows = end - start
+                self._matrix[target:target + rows] = self._matrix[start:end]
+                self._norms[target:target + rows] = self._norms[start:end]
+                target += rows
+            self._matrix[target:n] = 0.0
+            self._norms[target:n] = 0.0
+            self._chunks = [chunk for chunk, kept in zip(self._chunks, keep) if kept]
+            self._document_ids = [chunk.document_id for chunk in self._chunks]
+            self._rebind_views(first)
+            return True
+    
+    def memory_usage(self) -> MemoryUsage:
+        """
+        Retorna la memoria usada por el store.
+        
+        Los vectores son la matriz float32 completa (incluida la capacidad
+        reservada), el índice son las normas precalculadas y los ids cuentan
+        las listas de chunks y de document_ids, cada Chunk, su id y su
+        vista de la matriz. Texto
+        y metadata se miden como objetos de Python (sys.getsizeof).
+        
+        Returns:
+            MemoryUsage del store
+        """
+        with self._lock:
+            chunks = list(self._chunks)
+            document_ids = self._document_ids
+            matrix, norms = self._matrix, self._norms
+        
+        text_bytes = metadata_bytes = 0
+        id_map_bytes = sys.getsizeof(chunks) + sys.getsizeof(document_ids)
+        for chunk in chunks:
+            text_bytes += sys.getsizeof(chunk.text)
+            metadata_bytes += sys.getsizeof(chunk.document_id) + object_bytes(chunk._metadata)
+            id_map_bytes += sys.getsizeof(chunk) + sys.getsizeof(chunk.id) + sys.getsizeof(chunk.embedding)
+        
+        return MemoryUsage(
+            backend="in_memory",
+            chunks=len(chunks),
+            dimension=None if matrix is None else matrix.shape[1],
+            vectors_bytes=0 if matrix is None else matrix.nbytes,
+            text_bytes=text_bytes,
+            metadata_bytes=metadata_bytes,
+            index_bytes=0 if norms is None else norms.nbytes,
+            id_map_bytes=id_map_bytes
+        )
     
     def clear(self) -> None:
         """Limpia todos los chunks del vector store."""
-        self._chunks.clear()
+        with self._lock:
+            self._chunks = []
+            self._document_ids = []
+            self._matrix = None
+            self._norms = None
     
     def __len__(self) -> int:
         """Retorna el número de chunks almacenados."""
-        return len(self._chunks)
-
+        return len(self._chunks)
\ No newline at end of file
@@ -0,0 +1,198 @@
+import math
+import sys
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Union
+
+
+# Representaciones de los embeddings para las proyecciones de capacidad
+EMBEDDING_MODES = ("float32", "int8", "pq")
+
+# Centroides por subespacio en Product Quantization (códigos de 1 byte)
+PQ_CENTROIDS = 256
+
+
+def default_pq_subvectors(dimension: int) -> int:
+    """Subvectores de PQ por defecto: uno cada 8 dimensiones (mínimo 1)."""
+    return max(1, dimension // 8)
+
+
+def estimate_vector_bytes(
+    count: int,
+    dimension: int,
+    mode: str = "float32",
+    pq_subvectors: Optional[int] = None
+) -> int:
+    """
+    Bytes que ocupan `count` embeddings de `dimension` según su representación.
+    
+    - float32: 4 bytes por dimensión
+    - int8: 1 byte por dimensión + escala float32 por vector
+    - pq: 1 byte por subvector + codebooks (256 centroides float32 por subespacio)
+    
+    Args:
+        count: Cantidad de vectores
+        dimension: Dimensión de cada vector
+        mode: Una de EMBEDDING_MODES
+        pq_subvectors: Subvectores por vector en modo pq (default: dimension // 8)
+        
+    Returns:
+        Bytes estimados
+        
+    Raises:
+        ValueError: Si el modo no existe
+    """
+    if mode == "float32":
+        return count * dimension * 4
+    if mode == "int8":
+        return count * (dimension + 4)
+    if mode == "pq":
+        subvectors = pq_subvectors or default_pq_subvectors(dimension)
+        return count * subvectors + PQ_CENTROIDS * dimension * 4
+    raise ValueError(f"Modo de embedding inválido: {mode}. Opciones: {', '.join(EMBEDDING_MODES)}")
+
+
+def object_bytes(value: Any) -> int:
+    """
+    Tamaño aproximado de un objeto de Python incluyendo su contenido
+    (dicts, listas, tuplas y sets se recorren; los strings compartidos se
+    cuentan una vez por aparición).
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(object_bytes(k) + object_bytes(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(object_bytes(item) for item in value)
+    return size
+
+
+def directory_bytes(path: Union[str, Path]) -> int:
+    """Suma del tamaño de los archivos bajo `path` (0 si no existe)."""
+    path = Path(path)
+    if not path.exists():
+        return 0
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+@dataclass
+class MemoryUsage:
+    """
+    Memoria usada por un vector store, desglosada por componente.
+    
+    Attributes:
+        backend: Nombre del backend
+        chunks: Chunks almacenados
+        dimension: Dimensión de los embeddings (None si el store está vacío)
+        vectors_bytes: Embeddings (incluye la capacidad reservada sin usar)
+        text_bytes: Texto de los chunks
+        metadata_bytes: Metadata de los chunks (incluye document_id)
+        index_bytes: Estructuras de búsqueda (normas, grafo HNSW, ...)
+        id_map_bytes: Ids y mapeo id -> fila/objeto
+        disk_bytes: Tamaño en disco (None si el store no persiste)
+        embedding_mode: Representación actual de los embeddings
+    """
+    backend: str
+    chunks: int
+    dimension: Optional[int] = None
+    vectors_bytes: int = 0
+    text_bytes: int = 0
+    metadata_bytes: int = 0
+    index_bytes: int = 0
+    id_map_bytes: int = 0
+    disk_bytes: Optional[int] = None
+    embedding_mode: str = "float32"
+    
+    @property
+    def total_bytes(self) -> int:
+        """Memoria total (sin contar el disco)."""
+        return self.vectors_bytes + self.text_bytes + self.metadata_bytes + self.index_bytes + self.id_map_bytes
+    
+    def project(
+        self,
+        additional_chunks: int,
+        mode: Optional[str] = None,
+        pq_subvectors: Optional[int] = None
+    ) -> "MemoryUsage":
+        """
+        Proyecta el uso con `additional_chunks` chunks más.
+        
+        Texto, metadata, índice e ids crecen con el promedio por chunk
+        actual; los embeddings se recalculan para la representación pedida
+        (sin capacidad reservada), así se comparan float32, int8 y PQ sobre
+        el mismo corpus. El disco conserva su tamaño actual (que incluye un
+        costo fijo de SQLite y archivos del índice) y suma por cada chunk
+        nuevo su costo actual en memoria. Con un corpus de muestra chico los
+        promedios son poco representativos: conviene medir con al menos
+        algunos miles de chunks.
+        
+        Args:
+            additional_chunks: Chunks a sumar a los actuales
+            mode: Representación de los embeddings (default: la actual)
+            pq_subvectors: Subvectores por vector en modo pq
+            
+        Returns:
+            Un MemoryUsage nuevo con la proyección
+            
+        Raises:
+            ValueError: Si additional_chunks es negativo, el modo no existe
+                        o el store está vacío (no hay promedios de referencia)
+        """
+        if additional_chunks < 0:
+            raise ValueError(f"additional_chunks no puede ser negativo, recibido: {additional_chunks}")
+        mode = mode or self.embedding_mode
+        if mode not in EMBEDDING_MODES:
+            raise ValueError(f"Modo de embedding inválido: {mode}. Opciones: {', '.join(EMBEDDING_MODES)}")
+        if self.chunks == 0 or self.dimension is None:
+            raise ValueError("No se puede proyectar un store vacío")
+        
+        total = self.chunks + additional_chunks
+        
+        def scale(value: int) -> int:
+            return int(math.ceil(value * total / self.chunks))
+        
+        return replace(
+            self,
+            chunks=total,
+            vectors_bytes=estimate_vector_bytes(total, self.dimension, mode, pq_subvectors),
+            text_bytes=scale(self.text_bytes),
+            metadata_bytes=scale(self.metadata_bytes),
+            index_bytes=scale(self.index_bytes),
+            id_map_bytes=scale(self.id_map_bytes),
+            disk_bytes=None if self.disk_bytes is None else (
+                self.disk_bytes + int(math.ceil(additional_chunks * self.total_bytes / self.chunks))
+            ),
+            embedding_mode=mode
+        )
+    
+    def projections(
+        self,
+        additional_chunks: int,
+        modes: Sequence[str] = EMBEDDING_MODES,
+        pq_subvectors: Optional[int] = None
+    ) -> Dict[str, "MemoryUsage"]:
+        """
+        Proyecta el uso con `additional_chunks` más para cada representación.
+        
+        Returns:
+            Modo -> MemoryUsage proyectado
+        """
+        return {mode: self.project(additional_chunks, mode, pq_subvectors) for mode in modes}
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Campos y total_bytes, listo para serializar a JSON."""
+        return {**asdict(self), "total_bytes": self.total_bytes}
+    
+    def __str__(self) -> str:
+        mb = 1024 * 1024
+        lines = [
+            f"{self.backend}: {self.chunks} chunks, dim={self.dimension}, {self.embedding_mode}",
+            f"  vectores  {self.vectors_bytes / mb:10.2f} MB",
+            f"  texto     {self.text_bytes / mb:10.2f} MB",
+            f"  metadata  {self.metadata_bytes / mb:10.2f} MB",
+            f"  índice    {self.index_bytes / mb:10.2f} MB",
+            f"  ids       {self.id_map_bytes / mb:10.2f} MB",
+            f"  total     {self.total_bytes / mb:10.2f} MB",
+        ]
+        if self.disk_bytes is not None:
+            lines.append(f"  disco     {self.disk_bytes / mb:10.2f} MB")
+        return "\n".join(lines)
@@ -0,0 +1,344 @@
+from threading import Lock
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from ..models import Chunk
+from .base import VectorStore, ScoredChunk, DocumentFilter
+from .in_memory import InMemoryVectorStore
+from .memory import MemoryUsage
+
+
+class MultiVectorStore(VectorStore):
+    """
+    Vector store con varios vectores por documento (ej: título, ingredientes
+    e instrucciones de una receta, ver recipes_to_multi_vector_chunks).
+    
+    Cada búsqueda hace un único producto matriz-vector contra todos los
+    vectores, agrega los scores por document_id de forma vectorizada
+    (np.maximum.reduceat / np.add.reduceat sobre las filas agrupadas por
+    documento) y devuelve un resultado por documento. Los vectores extra
+    agregan filas a la matriz, no llamadas: la latencia crece como la de un
+    InMemoryVectorStore con esa cantidad de filas.
+    
+    Agregaciones:
+    - "max": score del documento = mejor score entre sus secciones
+    - "weighted_sum": promedio de los scores de sus secciones ponderado por
+      field_weights (las secciones sin peso valen 1.0)
+      
+    Cada resultado es un Chunk del documento completo: id = metadata
+    "parent_id" (o el document_id), texto = las secciones unidas con "\\n\\n"
+    en orden de inserción, embedding = vista de solo lectura del vector de la
+    sección con mejor score (un delete posterior puede moverla, como en
+    InMemoryVectorStore) y metadata "matched_field" con esa sección.
+    
+    Los DocumentFilter se aplican a los scores ya agregados por documento.
+    """
+    
+    AGGREGATIONS = ("max", "weighted_sum")
+    supports_document_filter = True
+    preserves_chunk_ids = False
+    
+    def __init__(
+        self,
+        aggregation: str = "max",
+        field_weights: Optional[Dict[str, float]] = None,
+        initial_capacity: int = 256
+    ):
+        """
+        Args:
+            aggregation: "max" o "weighted_sum"
+            field_weights: Peso de cada sección (metadata "field") para weighted_sum
+            initial_capacity: Filas reservadas al crear la matriz de vectores
+            
+        Raises:
+            ValueError: Si la agregación no existe o algún peso es negativo
+        """
+        if aggregation not in self.AGGREGATIONS:
+            raise ValueError(
+                f"Agregación inválida: {aggregation}. Opciones: {', '.join(self.AGGREGATIONS)}"
+            )
+        if field_weights and min(field_weights.values()) < 0:
+            raise ValueError(f"Los pesos no pueden ser negativos, recibido: {field_weights}")
+        
+        self.aggregation = aggregation
+        self.field_weights = dict(field_weights or {})
+        self._rows = InMemoryVectorStore(initial_capacity=initial_capacity)
+        self._lock = Lock()
+        self._documents: List[Tuple[str, str]] = []  # (document_id, parent_id)
+        self._document_ids: List[str] = []  # solo crece; se reemplaza al borrar
+        self._document_index: Dict[str, int] = {}
+        self._row_documents: List[int] = []
+        self._grouping: Optional[Tuple[Optional[np.ndarray], np.ndarray, np.ndarray, np.ndarray]] = None
+    
+    @property
+    def document_count(self) -> int:
+        """Cantidad de documentos distintos almacenados."""
+        return len(self._documents)
+    
+    def _register(self, chunks: List[Chunk]) -> None:
+        """Asigna cada chunk (fila) a su documento."""
+        for chunk in chunks:
+            index = self._document_index.get(chunk.document_id)
+            if index is None:
+                index = len(self._documents)
+                self._document_index[chunk.document_id] = index
+                parent_id = (chunk._metadata or {}).get("parent_id", chunk.document_id)
+                self._documents.append((chunk.document_id, parent_id))
+                self._document_ids.append(chunk.document_id)
+            self._row_documents.append(index)
+        self._grouping = None
+    
+    def add_chunks(self, chunks: List[Chunk]) -> None:
+        """
+        Agrega chunks (secciones) al store.
+        
+        Args:
+            chunks: Lista de chunks a agregar; los de un mismo documento
+                    comparten document_id
+                    
+        Raises:
+            ValueError: Si la lista está vacía, algún chunk no tiene embedding
+                        o las dimensiones no coinciden
+        """
+        with self._lock:
+            self._rows.add_chunks(chunks)
+            self._register(chunks)
+    
+    def _compute_grouping(self) -> Tuple[Optional[np.ndarray], np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Orden de las filas agrupadas por documento (None si ya lo están),
+        inicio de cada grupo, peso de cada fila en ese orden y suma de pesos
+        por documento.
+        """
+        row_documents = np.asarray(self._row_documents, dtype=np.int64)
+        order = np.argsort(row_documents, kind="stable")
+        grouped = row_documents[order]
+        starts = np.flatnonzero(np.r_[True, grouped[1:] != grouped[:-1]])
+        if np.array_equal(order, np.arange(len(order))):
+            order = None
+        
+        chunks = self._rows._chunks
+        weights = np.asarray(
+            [self.field_weights.get((chunk._metadata or {}).get("field"), 1.0) for chunk in chunks],
+            dtype=np.float32
+        )
+        if order is not None:
+            weights = weights[order]
+        totals = np.add.reduceat(weights, starts)
+        return order, starts, weights, totals
+    
+    def _snapshot(self):
+        """Vista consistente de filas, matriz, normas y agrupamiento."""
+        with self._lock:
+            chunks, matrix, norms, _ = self._rows._snapshot()
+            if matrix is None or not chunks:
+                return chunks, None, None, None, list(self._documents), self._document_ids
+            if self._grouping is None:
+                self._grouping = self._compute_grouping()
+            return chunks, matrix, norms, self._grouping, list(self._documents), self._document_ids
+    
+    def search(
+        self,
+        query_embedding: List[float],
+        k: int = 3,
+        min_score: float = 0.0,
+        document_filter: Optional[DocumentFilter] = None
+    ) -> List[ScoredChunk]:
+        """
+        Busca los k documentos más similares al query embedding.
+        
+        Args:
+            query_embedding: Vector de embedding de la consulta
+            k: Número de documentos a retornar (top-k)
+            min_score: Score mínimo del documento (después de agregar)
+            document_filter: Filtro de documentos (los descartados no se rankean)
+            
+        Returns:
+            Lista de ScoredChunk (uno por documento) ordenados por score descendente
+            
+        Raises:
+            ValueError: Si query_embedding está vacío o k es inválido
+        """
+        return self.search_batch(
+            [query_embedding], k=k, min_score=min_score,
+            document_filters=None if document_filter is None else [document_filter]
+        )[0]
+    
+    def search_batch(
+        self,
+        query_embeddings: List[List[float]],
+        k: int = 3,
+        min_score: float = 0.0,
+        document_filters: Optional[Sequence[Optional[DocumentFilter]]] = None
+    ) -> List[List[ScoredChunk]]:
+        """
+        Busca los k documentos más similares para varias queries con un solo
+        producto matriz-matriz y una agregación vectorizada.
+        
+        Args:
+            query_embeddings: Vectores de embedding de las consultas
+            k: Número de documentos a retornar por query (top-k)
+            min_score: Score mínimo del documento (después de agregar)
+            document_filters: Filtro de documentos de cada query, en el mismo
+                              orden (None = sin filtro)
+                              
+        Returns:
+            Una lista de ScoredChunk por query, en el mismo orden
+            
+        Raises:
+            ValueError: Si algún query_embedding está vacío, k es inválido o
+                        document_filters no tiene un filtro por query
+        """
+        if any(len(query) == 0 for query in query_embeddings):
+            raise ValueError("query_embedding no puede estar vacío")
+        
+        if k <= 0:
+            raise ValueError(f"k debe ser mayor a 0, recibido: {k}")
+        
+        if document_filters is not None and len(document_filters) != len(query_embeddings):
+            raise ValueError(
+                f"document_filters debe tener un filtro por query: {len(document_filters)} != {len(query_embeddings)}"
+            )
+        
+        results: List[List[ScoredChunk]] = [[] for _ in query_embeddings]
+        while True:
+            # Un delete compacta la matriz de las filas en el mismo buffer:
+            # si pasó mientras se calculaban los scores, se repite
+            generation = self._rows._generation
+            chunks, matrix, norms, grouping, documents, document_ids = self._snapshot()
+            if matrix is None or not query_embeddings:
+                return results
+            
+            # Las queries con otra dimensión no coinciden con ningún documento
+            valid = [i for i, query in enumerate(query_embeddings) if len(query) == matrix.shape[1]]
+            if not valid:
+                return results
+            
+            queries = np.asarray([query_embeddings[i] for i in valid], dtype=np.float32)
+            query_norms = np.linalg.norm(queries, axis=1)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                scores = (queries @ matrix.T) / np.outer(query_norms, norms)
+            if generation == self._rows._generation:
+                break
+        scores = np.nan_to_num(scores, nan=0.0, posinf=0.0, neginf=0.0)
+        
+        # Agrupar las filas por documento y agregar cada grupo
+        order, starts, weights, totals = grouping
+        if order is not None:
+            scores = scores[:, order]
+        if self.aggregation == "max":
+            document_scores = np.maximum.reduceat(scores, starts, axis=1)
+        else:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                document_scores = np.add.reduceat(scores * weights, starts, axis=1) / totals
+            document_scores = np.nan_to_num(document_scores, nan=0.0)
+        ends = np.r_[starts[1:], scores.shape[1]]
+        readonly = matrix.view()
+        readonly.flags.writeable = False
+        
+        n_documents = len(starts)
+        k = min(k, n_documents)
+        for row, query_index in enumerate(valid):
+            row_scores = document_scores[row]
+            document_filter = document_filters[query_index] if document_filters is not None else None
+            if document_filter is not None:
+                row_scores[~document_filter.mask(document_ids)[:n_documents]] = -np.inf
+            if k < n_documents:
+                candidates = np.argpartition(-row_scores, k - 1)[:k]
+            else:
+                candidates = np.arange(n_documents)
+            top = candidates[np.lexsort((candidates, -row_scores[candidates]))]
+            
+            for document in top:
+                score = float(row_scores[document])
+                # -inf = excluido por el filtro, aunque min_score sea -inf
+                if score < min_score or score == -np.inf:
+                    break
+                start, end = starts[document], ends[document]
+                positions = np.arange(start, end) if order is None else order[start:end]
+                best = int(positions[np.argmax(scores[row, start:end])])
+                chunk = self._document_chunk(documents[document], chunks, positions, best, readonly, score)
+                results[query_index].append(ScoredChunk(chunk=chunk, score=score))
+        
+        return results
+    
+    @staticmethod
+    def _document_chunk(
+        document: Tuple[str, str],
+        chunks: List[Chunk],
+        positions: np.ndarray,
+        best: int,
+        readonly: np.ndarray,
+        score: float
+    ) -> Chunk:
+        """Arma el Chunk de un documento a partir de sus secciones."""
+        document_id, parent_id = document
+        sections = [chunks[int(position)] for position in positions]
+        metadata = {
+            key: value for key, value in (sections[0]._metadata or {}).items()
+            if key not in ("field", "parent_id", "similarity_score")
+        }
+        metadata["matched_field"] = (chunks[best]._metadata or {}).get("field")
+        metadata["similarity_score"] = score
+        return Chunk(
+            id=parent_id,
+            document_id=document_id,
+            text="\n\n".join(section.text for section in sections),
+            embedding=readonly[best],
+            metadata=metadata
+        )
+    
+    def delete(self, ids: List[str]) -> bool:
+        """
+        Elimina secciones por id de chunk o documentos completos por su
+        parent_id/document_id.
+        
+        Args:
+            ids: Ids de secciones o de documentos
+            
+        Returns:
+            True si se eliminaron chunks, False en caso contrario
+        """
+        ids = set(ids)
+        with self._lock:
+            documents = {index for index, (document_id, parent_id) in enumerate(self._documents)
+                         if document_id in ids or parent_id in ids}
+            row_ids = [
+                chunk.id for chunk, document in zip(self._rows._chunks, self._row_documents)
+                if chunk.id in ids or document in documents
+            ]
+            if not row_ids or not self._rows.delete(row_ids):
+                return False
+            
+            self._documents, self._document_index, self._row_documents = [], {}, []
+            self._document_ids = []
+            self._register(self._rows._chunks)
+            return True
+    
+    def clear(self) -> None:
+        """Limpia todos los documentos del store."""
+        with self._lock:
+            self._rows.clear()
+            self._documents, self._document_index, self._row_documents = [], {}, []
+            self._document_ids = []
+            self._grouping = None
+    
+    def memory_usage(self) -> MemoryUsage:
+        """
+        Retorna la memoria usada por el store: la de las filas (ver
+        InMemoryVectorStore.memory_usage) más el agrupamiento por documento
+        en el índice.
+        
+        Returns:
+            MemoryUsage del store
+        """
+        usage = self._rows.memory_usage()
+        usage.backend = "multi_vector"
+        grouping = self._grouping
+        if grouping is not None:
+            usage.index_bytes += sum(array.nbytes for array in grouping if array is not None)
+        usage.id_map_bytes += 8 * (len(self._row_documents) + 2 * len(self._documents))
+        return usage
+    
+    def __len__(self) -> int:
+        """Retorna el número de secciones (vectores) almacenadas."""
+        return len(self._rows)
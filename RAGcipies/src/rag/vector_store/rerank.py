@@ -0,0 +1,98 @@
+from abc import ABC, abstractmethod
+from typing import List, Sequence
+import numpy as np
+from ..models import Chunk
+from .base import ScoredChunk
+
+
+class Reranker(ABC):
+    """
+    Segunda etapa de TwoStageVectorStore: vuelve a puntuar los candidatos
+    de la primera etapa (barata y aproximada) y elige los k mejores.
+    """
+    
+    @abstractmethod
+    def rerank(
+        self,
+        query_embedding: Sequence[float],
+        candidates: List[ScoredChunk],
+        k: int,
+        min_score: float = 0.0
+    ) -> List[ScoredChunk]:
+        """
+        Reordena los candidatos de una query.
+        
+        Args:
+            query_embedding: Vector de embedding de la consulta (precisión completa)
+            candidates: Candidatos de la primera etapa, con el chunk original
+                        (embedding en precisión completa) y el score aproximado
+            k: Número de resultados a retornar
+            min_score: Score mínimo (sobre el score nuevo)
+            
+        Returns:
+            Lista de ScoredChunk ordenados por el score nuevo, descendente
+        """
+        pass
+
+
+class ExactCosineReranker(Reranker):
+    """
+    Reranker por similitud del coseno exacta sobre los embeddings float32
+    de los candidatos: apila sus vectores (vistas sin copiar de la matriz
+    del store) y los puntúa con un solo producto matriz-vector.
+    
+    El score aproximado de la primera etapa queda en la metadata como
+    "candidate_score".
+    """
+    
+    def rerank(
+        self,
+        query_embedding: Sequence[float],
+        candidates: List[ScoredChunk],
+        k: int,
+        min_score: float = 0.0
+    ) -> List[ScoredChunk]:
+        """
+        Reordena los candidatos por coseno exacto con la query.
+        
+        Args:
+            query_embedding: Vector de embedding de la consulta
+            candidates: Candidatos de la primera etapa
+            k: Número de resultados a retornar
+            min_score: Score mínimo de similitud
+            
+        Returns:
+            Lista de ScoredChunk ordenados por coseno exacto, descendente.
+            Los candidatos sin embedding o con otra dimensión se descartan
+        """
+        dimension = len(query_embedding)
+        candidates = [scored for scored in candidates if len(scored.chunk.embedding) == dimension]
+        if k <= 0 or not candidates:
+            return []
+        
+        vectors = np.stack([np.asarray(scored.chunk.embedding, dtype=np.float32) for scored in candidates])
+        query = np.asarray(query_embedding, dtype=np.float32)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = (vectors @ query) / (np.linalg.norm(vectors, axis=1) * np.linalg.norm(query))
+        scores = np.nan_to_num(scores, nan=0.0, posinf=0.0, neginf=0.0)
+        
+        k = min(k, len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(candidates) else np.arange(len(candidates))
+        top = top[np.lexsort((top, -scores[top]))]
+        
+        results = []
+        for index in top:
+            score = float(scores[index])
+            if score < min_score:
+                break
+            chunk = candidates[index].chunk
+            metadata = dict(chunk._metadata or {})
+            metadata.update({
+                "similarity_score": score,
+                "candidate_score": candidates[index].score,
+            })
+            # Los scores son de esta consulta: van en una copia, no en el chunk almacenado
+            copy = Chunk(id=chunk.id, document_id=chunk.document_id, text=chunk.text,
+                         embedding=chunk.embedding, metadata=metadata)
+            results.append(ScoredChunk(chunk=copy, score=score))
+        return results
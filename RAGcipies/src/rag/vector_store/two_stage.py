@@ -0,0 +1,266 @@
+import sys
+from threading import Lock
+from typing import Any, Dict, List, Optional, Sequence, Union
+import numpy as np
+from ..models import Chunk
+from .base import VectorStore, ScoredChunk, DocumentFilter
+from .in_memory import InMemoryVectorStore
+from .memory import MemoryUsage
+from .rerank import Reranker, ExactCosineReranker
+
+
+class TwoStageVectorStore(VectorStore):
+    """
+    Búsqueda en dos etapas: una primera pasada barata y aproximada elige
+    `candidates` chunks y un Reranker (por defecto ExactCosineReranker) los
+    vuelve a puntuar con los embeddings en precisión completa.
+    
+    La primera etapa es cualquier VectorStore (candidate_store). Con el
+    in_memory por defecto, los vectores se proyectan a candidate_dims
+    dimensiones con una proyección aleatoria ortonormal (Johnson-Lindenstrauss,
+    sin entrenamiento, así admite agregados incrementales): la búsqueda
+    exhaustiva sobre la matriz reducida cuesta ~candidate_dims / dims de la
+    exacta y el rerankeo solo toca `candidates` filas. Con un índice ANN
+    (ej: vector_store="chromadb", HNSW) conviene candidate_dims=0 para no
+    proyectar y usar el rerankeo para recuperar la precisión de la primera
+    etapa.
+    
+    Los embeddings completos viven en un InMemoryVectorStore propio; los
+    chunks devueltos son copias de los originales (embedding = vista de esa
+    matriz) con el score aproximado en la metadata como "candidate_score".
+    
+    Referencias:
+    - Random projection: https://en.wikipedia.org/wiki/Random_projection
+    """
+    
+    def __init__(
+        self,
+        candidate_store: Union[VectorStore, str, None] = None,
+        candidate_store_kwargs: Optional[Dict[str, Any]] = None,
+        candidate_dims: Optional[int] = None,
+        candidates: int = 200,
+        reranker: Optional[Reranker] = None,
+        seed: int = 0
+    ):
+        """
+        Args:
+            candidate_store: Store de la primera etapa, o el nombre de un
+                             VectorStoreBackend a crear (default: in_memory).
+                             Debe devolver los chunks con el mismo id con que se
+                             agregaron
+            candidate_store_kwargs: Parámetros para crear el store por nombre
+            candidate_dims: Dimensión de los vectores de la primera etapa
+                            (None = dims // 4, mínimo 8; 0 = sin proyectar)
+            candidates: Candidatos por query que pasan al rerankeo
+            reranker: Segunda etapa (default: ExactCosineReranker)
+            seed: Semilla de la proyección aleatoria
+            
+        Raises:
+            ValueError: Si candidates no es positivo, candidate_dims es negativo
+                        o el store de la primera etapa no conserva los ids
+                        (ej: multi_vector)
+        """
+        if candidates <= 0:
+            raise ValueError(f"candidates debe ser mayor a 0, recibido: {candidates}")
+        if candidate_dims is not None and candidate_dims < 0:
+            raise ValueError(f"candidate_dims no puede ser negativo, recibido: {candidate_dims}")
+        
+        if candidate_store is None or isinstance(candidate_store, str):
+            from .factory import create_vector_store, VectorStoreBackend
+            backend = VectorStoreBackend(candidate_store or VectorStoreBackend.IN_MEMORY.value)
+            candidate_store = create_vector_store(backend, **(candidate_store_kwargs or {}))
+        if not candidate_store.preserves_chunk_ids:
+            # Los candidatos se buscan por id en el store exacto
+            raise ValueError(
+                f"{type(candidate_store).__name__} no devuelve los ids agregados y no sirve como primera etapa"
+            )
+        
+        self.candidate_store = candidate_store
+        self.uses_query_text = candidate_store.uses_query_text
+        self.supports_document_filter = candidate_store.supports_document_filter
+        self.reranker = reranker or ExactCosineReranker()
+        self.candidates = candidates
+        self.candidate_dims = candidate_dims
+        self.seed = seed
+        self._exact = InMemoryVectorStore()
+        self._by_id: Dict[str, Chunk] = {}
+        self._projection: Optional[np.ndarray] = None
+        self._lock = Lock()
+    
+    def _ensure_projection(self, dims: int) -> None:
+        """Crea la proyección (dims x candidate_dims, columnas ortonormales) en el primer add."""
+        if self._exact.dimension is not None:
+            return
+        target = self.candidate_dims if self.candidate_dims is not None else max(8, dims // 4)
+        if 0 < target < dims:
+            gaussian = np.random.default_rng(self.seed).standard_normal((dims, target))
+            self._projection = np.linalg.qr(gaussian)[0].astype(np.float32)
+    
+    def _project(self, vectors: np.ndarray) -> np.ndarray:
+        return vectors if self._projection is None else vectors @ self._projection
+    
+    def add_chunks(self, chunks: List[Chunk]) -> None:
+        """
+        Agrega chunks: el embedding completo al store exacto y la versión
+        proyectada al store de la primera etapa.
+        
+        Args:
+            chunks: Lista de chunks a agregar
+            
+        Raises:
+            ValueError: Si la lista está vacía, algún chunk no tiene embedding
+                        o las dimensiones no coinciden
+        """
+        if not chunks:
+            raise ValueError("No se pueden agregar chunks vacíos")
+        
+        with self._lock:
+            self._ensure_projection(len(chunks[0].embedding))
+            start = len(self._exact)
+            self._exact.add_chunks(chunks)
+            vectors = self._project(self._exact.embeddings()[start:start + len(chunks)])
+            self.candidate_store.add_chunks([
+                Chunk(id=chunk.id, document_id=chunk.document_id, text=chunk.text, embedding=vector,
+                      metadata=dict(chunk._metadata) if chunk._metadata else None)
+                for chunk, vector in zip(chunks, vectors)
+            ])
+            self._by_id.update((chunk.id, chunk) for chunk in chunks)
+    
+    def search(
+        self,
+        query_embedding: List[float],
+        k: int = 3,
+        min_score: float = 0.0,
+        query_text: Optional[str] = None,
+        document_filter: Optional[DocumentFilter] = None
+    ) -> List[ScoredChunk]:
+        """
+        Busca los k chunks más similares: candidatos aproximados y rerankeo.
+        
+        Args:
+            query_embedding: Vector de embedding de la consulta
+            k: Número de resultados a retornar (top-k)
+            min_score: Score mínimo del rerankeo
+            query_text: Texto de la consulta, si la primera etapa lo usa (ver uses_query_text)
+            document_filter: Filtro de documentos (ver supports_document_filter)
+            
+        Returns:
+            Lista de ScoredChunk ordenados por el score del reranker
+            
+        Raises:
+            ValueError: Si query_embedding está vacío o k es inválido
+        """
+        return self.search_batch(
+            [query_embedding], k=k, min_score=min_score,
+            query_texts=None if query_text is None else [query_text],
+            document_filters=None if document_filter is None else [document_filter]
+        )[0]
+    
+    def search_batch(
+        self,
+        query_embeddings: List[List[float]],
+        k: int = 3,
+        min_score: float = 0.0,
+        query_texts: Optional[Sequence[Optional[str]]] = None,
+        document_filters: Optional[Sequence[Optional[DocumentFilter]]] = None
+    ) -> List[List[ScoredChunk]]:
+        """
+        Busca varias queries: una llamada a search_batch de la primera etapa
+        con las queries proyectadas y un rerankeo por query.
+        
+        Args:
+            query_embeddings: Vectores de embedding de las consultas
+            k: Número de resultados a retornar por query (top-k)
+            min_score: Score mínimo del rerankeo
+            query_texts: Texto de cada consulta, si la primera etapa lo usa
+            document_filters: Filtro de documentos de cada query, si la primera
+                              etapa los acepta
+                              
+        Returns:
+            Una lista de ScoredChunk por query, en el mismo orden
+            
+        Raises:
+            ValueError: Si algún query_embedding está vacío, k es inválido o
+                        la primera etapa no acepta document_filters
+        """
+        if any(len(query) == 0 for query in query_embeddings):
+            raise ValueError("query_embedding no puede estar vacío")
+        
+        if k <= 0:
+            raise ValueError(f"k debe ser mayor a 0, recibido: {k}")
+        
+        search_kwargs: Dict[str, Any] = {}
+        if document_filters is not None:
+            if not self.supports_document_filter:
+                raise ValueError(f"{type(self.candidate_store).__name__} no acepta document_filters")
+            search_kwargs["document_filters"] = document_filters
+        if query_texts is not None and self.uses_query_text:
+            search_kwargs["query_texts"] = query_texts
+        
+        results: List[List[ScoredChunk]] = [[] for _ in query_embeddings]
+        dims = self._exact.dimension
+        # Las queries con otra dimensión no coinciden con ningún chunk
+        valid = [i for i, query in enumerate(query_embeddings) if len(query) == dims]
+        if not valid:
+            return results
+        if len(valid) < len(query_embeddings):
+            search_kwargs = {
+                name: [values[i] for i in valid] for name, values in search_kwargs.items()
+            }
+        
+        queries = np.asarray([query_embeddings[i] for i in valid], dtype=np.float32)
+        # La primera etapa no filtra por score: el score aproximado no es comparable con min_score
+        candidate_results = self.candidate_store.search_batch(
+            list(self._project(queries)), k=max(self.candidates, k), min_score=-np.inf, **search_kwargs
+        )
+        
+        by_id = self._by_id
+        for query_index, candidates in zip(valid, candidate_results):
+            originals = [
+                ScoredChunk(chunk=by_id[scored.chunk.id], score=scored.score)
+                for scored in candidates if scored.chunk.id in by_id
+            ]
+            results[query_index] = self.reranker.rerank(query_embeddings[query_index], originals, k, min_score)
+        return results
+    
+    def warmup(self) -> None:
+        """Precarga el store de la primera etapa."""
+        self.candidate_store.warmup()
+    
+    def delete(self, ids: List[str]) -> bool:
+        """
+        Elimina chunks por IDs de las dos etapas.
+        
+        Args:
+            ids: Lista de IDs de chunks a eliminar
+            
+        Returns:
+            True si se eliminaron chunks, False en caso contrario
+        """
+        with self._lock:
+            deleted = self._exact.delete(ids)
+            candidates_deleted = self.candidate_store.delete(ids)
+            for chunk_id in ids:
+                self._by_id.pop(chunk_id, None)
+            return deleted or candidates_deleted
+    
+    def memory_usage(self) -> MemoryUsage:
+        """
+        Retorna la memoria del store exacto más la de la primera etapa (sus
+        vectores, índice e ids en index_bytes; el texto se comparte por
+        referencia con el store exacto si la primera etapa es en memoria).
+        
+        Returns:
+            MemoryUsage del store
+        """
+        usage = self._exact.memory_usage()
+        candidate = self.candidate_store.memory_usage()
+        usage.backend = f"two_stage({candidate.backend})"
+        usage.index_bytes += candidate.vectors_bytes + candidate.index_bytes + candidate.id_map_bytes
+        usage.id_map_bytes += sys.getsizeof(self._by_id)
+        usage.disk_bytes = candidate.disk_bytes
+        return usage
+    
+    def __len__(self) -> int:
+        """Retorna el número de chunks almacenados."""
+        return len(self._exact)
@@ -0,0 +1,11 @@
+from .admission import AdmissionController, OverloadedError
+from .app import RAGServer
+from .stubs import LatencyDistribution, StubBackendServer
+
+__all__ = [
+    "AdmissionController",
+    "OverloadedError",
+    "LatencyDistribution",
+    "RAGServer",
+    "StubBackendServer",
+]
@@ -0,0 +1,103 @@
+from contextlib import contextmanager
+from threading import Lock, BoundedSemaphore
+from typing import Dict, Iterator
+
+
+class OverloadedError(RuntimeError):
+    """
+    La request fue rechazada por control de admisión (cola llena o
+    timeout esperando un worker). El servidor la traduce a HTTP 429.
+    """
+    
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Control de admisión con pool de workers y cola acotada.
+    
+    Como máximo `workers` requests ejecutan el pipeline al mismo tiempo y
+    otras `max_queue` pueden esperar un worker libre. Cuando la cola está
+    llena (el backend de LLM está saturado) las nuevas requests se rechazan
+    de inmediato en lugar de acumular latencia (load shedding).
+    """
+    
+    def __init__(self, workers: int = 4, max_queue: int = 16, queue_timeout: float = 30.0):
+        """
+        Args:
+            workers: Requests ejecutándose en paralelo como máximo
+            max_queue: Requests que pueden esperar un worker libre
+            queue_timeout: Segundos máximos de espera en la cola
+            
+        Raises:
+            ValueError: Si workers no es positivo o max_queue es negativo
+        """
+        if workers <= 0:
+            raise ValueError(f"workers debe ser mayor a 0, recibido: {workers}")
+        if max_queue < 0:
+            raise ValueError(f"max_queue no puede ser negativo, recibido: {max_queue}")
+        
+        self.workers = workers
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._slots = BoundedSemaphore(workers)
+        self._lock = Lock()
+        self._admitted = 0
+        self._rejected = 0
+    
+    def acquire(self) -> None:
+        """
+        Ocupa un worker, esperando en la cola si hace falta.
+        
+        Raises:
+            OverloadedError: Si la cola está llena o se agotó queue_timeout
+        """
+        with self._lock:
+            if self._admitted >= self.workers + self.max_queue:
+                self._rejected += 1
+                raise OverloadedError("Servidor saturado: cola de requests llena")
+            self._admitted += 1
+        
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            with self._lock:
+                self._admitted -= 1
+                self._rejected += 1
+            raise OverloadedError(
+                f"Servidor saturado: sin workers libres tras {self.queue_timeout:.1f}s"
+            )
+    
+    def release(self) -> None:
+        """Libera el worker ocupado por acquire()."""
+        self._slots.release()
+        with self._lock:
+            self._admitted -= 1
+    
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Context manager: acquire() al entrar y release() al salir."""
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Retorna el estado actual del control de admisión.
+        
+        Returns:
+            Diccionario con workers, max_queue, admitted (en ejecución + en cola),
+            queued y rejected
+        """
+        with self._lock:
+            admitted = self._admitted
+            rejected = self._rejected
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "admitted": admitted,
+            "queued": max(0, admitted - self.workers),
+            "rejected": rejected,
+        }
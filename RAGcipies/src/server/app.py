@@ -0,0 +1,227 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from typing import Any, Dict, Optional
+from dataclasses import asdict
+import json
+from ..rag.pipeline import RAGPipeline
+from ..metrics.registry import MetricsRegistry, REGISTRY
+from ..metrics.exposition import render, CONTENT_TYPE
+from ..metrics.pipeline import instrument_pipeline
+from .admission import AdmissionController, OverloadedError
+
+
+class RAGServer:
+    """
+    Servidor HTTP que comparte un único RAGPipeline entre todos los workers.
+    
+    Endpoints:
+    - POST /query         {"query": "...", "include_trace": false} -> JSON con la respuesta
+    - POST /query/stream  {"query": "..."} -> NDJSON en streaming ({"delta": ...} y {"done": true})
+    - GET  /healthz       estado del servidor y tamaño del vector store
+    - GET  /metrics       métricas en formato Prometheus
+    
+    Cada conexión corre en su propio hilo, pero solo `workers` ejecutan el
+    pipeline a la vez (ver AdmissionController); el resto espera en una cola
+    acotada o recibe 429 con Retry-After.
+    """
+    
+    def __init__(
+        self,
+        pipeline: RAGPipeline,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        workers: int = 4,
+        max_queue: int = 16,
+        queue_timeout: float = 30.0,
+        registry: MetricsRegistry = REGISTRY
+    ):
+        """
+        Args:
+            pipeline: Pipeline ya inicializado (vector store cargado)
+            host: Dirección a escuchar
+            port: Puerto a escuchar (0 = puerto libre asignado por el SO)
+            workers: Requests ejecutando el pipeline en paralelo
+            max_queue: Requests que pueden esperar un worker libre
+            queue_timeout: Segundos máximos de espera en la cola antes de responder 429
+            registry: Registro de métricas a exponer en /metrics
+        """
+        self.pipeline = pipeline
+        self.admission = AdmissionController(workers, max_queue, queue_timeout)
+        self.registry = registry
+        instrument_pipeline(pipeline, registry=registry)
+        self.rejected = registry.counter(
+            "rag_requests_rejected_total", "Requests rechazadas por saturación (HTTP 429)"
+        )
+        registry.gauge(
+            "rag_requests_queued", "Requests esperando un worker libre"
+        ).set_function(lambda: self.admission.stats()["queued"])
+        
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self._thread: Optional[Thread] = None
+    
+    @property
+    def address(self):
+        """Tupla (host, port) en la que escucha el servidor."""
+        return self.httpd.server_address
+    
+    def serve_forever(self) -> None:
+        """Atiende requests en el hilo actual hasta shutdown()."""
+        self.httpd.serve_forever()
+    
+    def start(self) -> "RAGServer":
+        """Atiende requests en un hilo daemon (útil para tests y notebooks)."""
+        self._thread = Thread(target=self.serve_forever, name="rag-server", daemon=True)
+        self._thread.start()
+        return self
+    
+    def shutdown(self) -> None:
+        """Detiene el servidor y libera el puerto."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+    
+    def _make_handler(self):
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            
+            def log_message(self, format, *args):
+                pass
+            
+            def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def _read_query(self) -> Optional[Dict[str, Any]]:
+                try:
+                    length = int(self.headers.get("Content-Length") or 0)
+                    if length < 0:
+                        raise ValueError(length)
+                except ValueError:
+                    # Sin un largo válido no se puede leer el body: cerrar la conexión
+                    self.close_connection = True
+                    self._send_json(400, {"error": "Content-Length inválido"}, headers={"Connection": "close"})
+                    return None
+                try:
+                    payload = json.loads(self.rfile.read(length) or b"{}")
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    self._send_json(400, {"error": "El body debe ser JSON válido"})
+                    return None
+                query = payload.get("query") if isinstance(payload, dict) else None
+                if not isinstance(query, str) or not query.strip():
+                    self._send_json(400, {"error": "El campo 'query' es obligatorio"})
+                    return None
+                return payload
+            
+            def _overloaded(self, error: OverloadedError):
+                server.rejected.inc()
+                self._send_json(
+                    429,
+                    {"error": str(error)},
+                    headers={"Retry-After": str(max(1, round(error.retry_after)))}
+                )
+            
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                if path == "/healthz":
+                    self._send_json(200, {
+                        "status": "ok",
+                        "chunks": len(server.pipeline.vector_store),
+                        "admission": server.admission.stats(),
+                    })
+                elif path == "/metrics":
+                    body = render(server.registry).encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", CONTENT_TYPE)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                else:
+                    self._send_json(404, {"error": f"Ruta no encontrada: {path}"})
+            
+            def do_POST(self):
+                path = self.path.split("?", 1)[0]
+                if path == "/query":
+                    self._handle_query()
+                elif path == "/query/stream":
+                    self._handle_stream()
+                else:
+                    self._send_json(404, {"error": f"Ruta no encontrada: {path}"})
+            
+            def _handle_query(self):
+                payload = self._read_query()
+                if payload is None:
+                    return
+                try:
+                    with server.admission.slot():
+                        result = server.pipeline.query_detailed(payload["query"])
+                except OverloadedError as e:
+                    self._overloaded(e)
+                    return
+                except Exception as e:
+                    # La consulta ya se validó en _read_query: cualquier error
+                    # (incluido un ValueError de un backend) es del servidor
+                    self._send_json(502, {"error": str(e)})
+                    return
+                
+                response = {
+                    "answer": result.answer,
+                    "sources": [
+                        {
+                            "chunk_id": sc.chunk.id,
+                            "document_id": sc.chunk.document_id,
+                            "title": (sc.chunk.metadata or {}).get("title"),
+                            "score": sc.score,
+                        }
+                        for sc in result.scored_chunks
+                    ],
+                }
+                if payload.get("include_trace"):
+                    response["trace"] = asdict(result.trace)
+                self._send_json(200, response)
+            
+            def _write_chunk(self, event: Dict[str, Any]):
+                data = (json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8")
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+            
+            def _handle_stream(self):
+                payload = self._read_query()
+                if payload is None:
+                    return
+                try:
+                    server.admission.acquire()
+                except OverloadedError as e:
+                    self._overloaded(e)
+                    return
+                
+                try:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+                    self.send_header("Transfer-Encoding", "chunked")
+                    self.end_headers()
+                    
+                    stream = server.pipeline.query_stream(payload["query"])
+                    try:
+                        for piece in stream:
+                            self._write_chunk({"delta": piece})
+                        self._write_chunk({"done": True})
+                    except (BrokenPipeError, ConnectionResetError):
+                        # El cliente se desconectó: cerrar el stream corta la generación
+                        stream.close()
+                        return
+                    except Exception as e:
+                        # Los headers ya se enviaron: el error viaja como evento
+                        self._write_chunk({"error": str(e)})
+                    self.wfile.write(b"0\r\n\r\n")
+                finally:
+                    server.admission.release()
+        
+        return Handler
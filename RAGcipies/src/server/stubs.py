@@ -0,0 +1,373 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from typing import Any, Dict, Iterator, List, Optional
+import json
+import math
+import random
+import time
+from ..rag.embeddings.fake import FakeEmbeddingModel
+
+
+class LatencyDistribution:
+    """
+    Distribución de latencias para los servidores stub.
+    
+    Se describe con un string "tipo:parámetros" (milisegundos):
+    - "fixed:50"            siempre 50 ms
+    - "uniform:20:80"       uniforme entre 20 y 80 ms
+    - "normal:50:10"        normal con media 50 y desvío 10 (recortada en 0)
+    - "exponential:50"      exponencial con media 50
+    - "lognormal:50:0.5"    lognormal con mediana 50 y sigma 0.5 (cola larga)
+    """
+    
+    KINDS = ("fixed", "uniform", "normal", "exponential", "lognormal")
+    
+    def __init__(self, kind: str = "fixed", a: float = 0.0, b: float = 0.0, seed: Optional[int] = None):
+        """
+        Args:
+            kind: Tipo de distribución (ver KINDS)
+            a: Primer parámetro en milisegundos (valor, mínimo, media o mediana)
+            b: Segundo parámetro (máximo, desvío o sigma según el tipo)
+            seed: Semilla para reproducir la secuencia de latencias
+            
+        Raises:
+            ValueError: Si el tipo no existe o los parámetros son negativos
+        """
+        if kind not in self.KINDS:
+            raise ValueError(f"Distribución inválida: {kind}. Opciones: {', '.join(self.KINDS)}")
+        if a < 0 or b < 0:
+            raise ValueError(f"Los parámetros de latencia no pueden ser negativos: {a}, {b}")
+        self.kind = kind
+        self.a = a
+        self.b = b
+        self._random = random.Random(seed)
+        self._lock = Lock()
+    
+    @classmethod
+    def parse(cls, spec: str, seed: Optional[int] = None) -> "LatencyDistribution":
+        """
+        Crea la distribución a partir de "tipo:parámetros" (un número solo equivale a "fixed:N").
+        
+        Args:
+            spec: Descripción de la distribución (ej: "lognormal:50:0.5")
+            seed: Semilla opcional
+            
+        Returns:
+            La distribución correspondiente
+            
+        Raises:
+            ValueError: Si el formato es inválido
+        """
+        parts = spec.strip().split(":")
+        if len(parts) == 1:
+            parts = ["fixed", parts[0]]
+        try:
+            values = [float(value) for value in parts[1:3]]
+        except ValueError:
+            raise ValueError(f"Distribución de latencia inválida: {spec!r}")
+        if not values:
+            raise ValueError(f"Distribución de latencia inválida: {spec!r}")
+        return cls(parts[0], values[0], values[1] if len(values) > 1 else 0.0, seed=seed)
+    
+    def sample(self) -> float:
+        """Retorna una latencia en segundos."""
+        with self._lock:
+            if self.kind == "fixed":
+                ms = self.a
+            elif self.kind == "uniform":
+                ms = self._random.uniform(self.a, max(self.a, self.b))
+            elif self.kind == "normal":
+                ms = self._random.gauss(self.a, self.b)
+            elif self.kind == "exponential":
+                ms = self._random.expovariate(1.0 / self.a) if self.a > 0 else 0.0
+            else:
+                ms = self.a * math.exp(self._random.gauss(0.0, self.b))
+        return max(0.0, ms) / 1000.0
+    
+    def __repr__(self) -> str:
+        return f"LatencyDistribution({self.kind}:{self.a:g}:{self.b:g})"
+
+
+class StubBackendServer:
+    """
+    Servidor HTTP local que imita las APIs de Ollama y OpenAI para
+    pruebas de carga sin GPU ni cuota.
+    
+    Endpoints:
+    - POST /api/embeddings        {"prompt": ...} -> {"embedding": [...]}
+    - POST /api/embed             {"input": [...]} -> {"embeddings": [[...], ...]}
+    - POST /api/generate          {"prompt": ..., "stream": bool} -> JSON o NDJSON
+    - POST /v1/embeddings         formato de embeddings de OpenAI
+    - POST /v1/chat/completions   formato de chat de OpenAI (stream por SSE)
+    - GET  /stats                 requests atendidas y errores inyectados
+    
+    Los embeddings son los de FakeEmbeddingModel (deterministas). Cada
+    request espera una latencia muestreada de su distribución y la
+    generación emite `response_tokens` tokens a `tokens_per_second`,
+    así el tiempo al primer token y el total se comportan como un modelo real.
+    Para apuntar el pipeline al stub: OLLAMA_BASE_URL=<url> o
+    OPENAI_BASE_URL=<url>/v1.
+    """
+    
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        embedding_latency: Optional[LatencyDistribution] = None,
+        generation_latency: Optional[LatencyDistribution] = None,
+        tokens_per_second: float = 50.0,
+        response_tokens: int = 64,
+        dimension: int = 768,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None
+    ):
+        """
+        Args:
+            host: Dirección a escuchar
+            port: Puerto a escuchar (0 = puerto libre asignado por el SO)
+            embedding_latency: Latencia de cada request de embeddings (default: 0)
+            generation_latency: Tiempo hasta el primer token (default: 0)
+            tokens_per_second: Velocidad de generación (0 = instantánea)
+            response_tokens: Tokens de cada respuesta generada
+            dimension: Dimensión de los embeddings
+            error_rate: Fracción de requests que responden 500 (0.0 - 1.0)
+            seed: Semilla para las latencias y los errores inyectados
+            
+        Raises:
+            ValueError: Si algún parámetro está fuera de rango
+        """
+        if tokens_per_second < 0:
+            raise ValueError(f"tokens_per_second no puede ser negativo, recibido: {tokens_per_second}")
+        if response_tokens <= 0:
+            raise ValueError(f"response_tokens debe ser mayor a 0, recibido: {response_tokens}")
+        if not 0.0 <= error_rate <= 1.0:
+            raise ValueError(f"error_rate debe estar entre 0 y 1, recibido: {error_rate}")
+        
+        self.embedding_latency = embedding_latency or LatencyDistribution()
+        self.generation_latency = generation_latency or LatencyDistribution()
+        self.tokens_per_second = tokens_per_second
+        self.response_tokens = response_tokens
+        self.error_rate = error_rate
+        self.embedder = FakeEmbeddingModel(dimension=dimension)
+        self._random = random.Random(seed)
+        self._lock = Lock()
+        self._requests: Dict[str, int] = {}
+        self._errors = 0
+        
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self._thread: Optional[Thread] = None
+    
+    @property
+    def address(self):
+        """Tupla (host, port) en la que escucha el servidor."""
+        return self.httpd.server_address
+    
+    @property
+    def url(self) -> str:
+        """URL base del servidor (ej: http://127.0.0.1:54321)."""
+        host, port = self.address[:2]
+        return f"http://{host}:{port}"
+    
+    def serve_forever(self) -> None:
+        """Atiende requests en el hilo actual hasta shutdown()."""
+        self.httpd.serve_forever()
+    
+    def start(self) -> "StubBackendServer":
+        """Atiende requests en un hilo daemon."""
+        self._thread = Thread(target=self.serve_forever, name="stub-backend", daemon=True)
+        self._thread.start()
+        return self
+    
+    def shutdown(self) -> None:
+        """Detiene el servidor y libera el puerto."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna las requests atendidas por ruta y los errores inyectados.
+        
+        Returns:
+            Diccionario con requests (ruta -> cantidad) y injected_errors
+        """
+        with self._lock:
+            return {"requests": dict(self._requests), "injected_errors": self._errors}
+    
+    def _record(self, path: str) -> bool:
+        """Cuenta la request y decide si se le inyecta un error."""
+        with self._lock:
+            self._requests[path] = self._requests.get(path, 0) + 1
+            failed = self.error_rate > 0 and self._random.random() < self.error_rate
+            if failed:
+                self._errors += 1
+            return failed
+    
+    def tokens(self) -> Iterator[str]:
+        """
+        Emite los tokens de una respuesta respetando tokens_per_second
+        (el primero después de la latencia de generación).
+        """
+        time.sleep(self.generation_latency.sample())
+        interval = 1.0 / self.tokens_per_second if self.tokens_per_second else 0.0
+        for i in range(self.response_tokens):
+            if i and interval:
+                time.sleep(interval)
+            yield f"palabra{i} "
+    
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        time.sleep(self.embedding_latency.sample())
+        return self.embedder.embed_batch(texts)
+    
+    def _make_handler(self):
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            
+            def log_message(self, format, *args):
+                pass
+            
+            def handle(self):
+                # Los clientes cierran conexiones keep-alive sin aviso (ej: al cortar un stream)
+                try:
+                    super().handle()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+            
+            def _send_json(self, status: int, payload: Dict[str, Any]):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def _start_chunked(self, content_type: str):
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+            
+            def _write_chunk(self, data: bytes):
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+            
+            def _end_chunked(self):
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+            
+            def do_GET(self):
+                if self.path.split("?", 1)[0] == "/stats":
+                    self._send_json(200, server.stats())
+                else:
+                    self._send_json(404, {"error": f"Ruta no encontrada: {self.path}"})
+            
+            def do_POST(self):
+                path = self.path.split("?", 1)[0]
+                routes = {
+                    "/api/embeddings": self._ollama_embeddings,
+                    "/api/embed": self._ollama_embed,
+                    "/api/generate": self._ollama_generate,
+                    "/v1/embeddings": self._openai_embeddings,
+                    "/v1/chat/completions": self._openai_chat,
+                }
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    payload = json.loads(self.rfile.read(length) or b"{}")
+                except json.JSONDecodeError:
+                    self._send_json(400, {"error": "El body debe ser JSON válido"})
+                    return
+                
+                handler = routes.get(path)
+                if handler is None:
+                    self._send_json(404, {"error": f"Ruta no encontrada: {path}"})
+                    return
+                if server._record(path):
+                    self._send_json(500, {"error": "Error inyectado por el servidor stub"})
+                    return
+                handler(payload)
+            
+            def _ollama_embeddings(self, payload: Dict[str, Any]):
+                self._send_json(200, {"embedding": server._embed([payload.get("prompt", "")])[0]})
+            
+            def _ollama_embed(self, payload: Dict[str, Any]):
+                texts = payload.get("input", [])
+                if isinstance(texts, str):
+                    texts = [texts]
+                self._send_json(200, {"model": payload.get("model"), "embeddings": server._embed(texts)})
+            
+            def _ollama_generate(self, payload: Dict[str, Any]):
+                model = payload.get("model")
+                if "prompt" not in payload:
+                    # Request de warm-up: carga el modelo sin generar
+                    self._send_json(200, {"model": model, "response": "", "done": True})
+                    return
+                if not payload.get("stream", True):
+                    self._send_json(200, {"model": model, "response": "".join(server.tokens()), "done": True})
+                    return
+                
+                self._start_chunked("application/x-ndjson")
+                for piece in server.tokens():
+                    self._write_chunk((json.dumps({"model": model, "response": piece, "done": False}) + "\n").encode("utf-8"))
+                self._write_chunk((json.dumps({"model": model, "response": "", "done": True}) + "\n").encode("utf-8"))
+                self._end_chunked()
+            
+            def _openai_embeddings(self, payload: Dict[str, Any]):
+                texts = payload.get("input", [])
+                if isinstance(texts, str):
+                    texts = [texts]
+                tokens = sum(len(text) // 4 + 1 for text in texts)
+                self._send_json(200, {
+                    "object": "list",
+                    "model": payload.get("model"),
+                    "data": [
+                        {"object": "embedding", "index": i, "embedding": vector}
+                        for i, vector in enumerate(server._embed(texts))
+                    ],
+                    "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+                })
+            
+            def _openai_chat(self, payload: Dict[str, Any]):
+                model = payload.get("model")
+                created = int(time.time())
+                prompt_tokens = sum(len(m.get("content") or "") // 4 + 1 for m in payload.get("messages", []))
+                if not payload.get("stream"):
+                    content = "".join(server.tokens())
+                    self._send_json(200, {
+                        "id": "chatcmpl-stub",
+                        "object": "chat.completion",
+                        "created": created,
+                        "model": model,
+                        "choices": [{
+                            "index": 0,
+                            "message": {"role": "assistant", "content": content},
+                            "finish_reason": "stop",
+                        }],
+                        "usage": {
+                            "prompt_tokens": prompt_tokens,
+                            "completion_tokens": server.response_tokens,
+                            "total_tokens": prompt_tokens + server.response_tokens,
+                        },
+                    })
+                    return
+                
+                def event(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> bytes:
+                    chunk = {
+                        "id": "chatcmpl-stub",
+                        "object": "chat.completion.chunk",
+                        "created": created,
+                        "model": model,
+                        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                    }
+                    return f"data: {json.dumps(chunk)}\n\n".encode("utf-8")
+                
+                self._start_chunked("text/event-stream")
+                self._write_chunk(event({"role": "assistant", "content": ""}))
+                for piece in server.tokens():
+                    self._write_chunk(event({"content": piece}))
+                self._write_chunk(event({}, finish_reason="stop"))
+                self._write_chunk(b"data: [DONE]\n\n")
+                self._end_chunked()
+        
+        return Handler
@@ -0,0 +1,107 @@
+"""
+Benchmark del tiempo de arranque: importa el paquete y construye un pipeline
+FAKE/DUMMY/IN_MEMORY en un proceso nuevo (varias veces) y verifica que no
+se hayan importado SDKs pesados.
+
+Uso:
+    python benchmarks/import_time.py                 # mediana de 5 procesos (presupuesto: 500 ms)
+    python benchmarks/import_time.py --budget-ms 300 # presupuesto más estricto
+    python benchmarks/import_time.py --budget-ms 0   # solo medir, sin presupuesto
+    python benchmarks/import_time.py --details       # top de módulos por -X importtime
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Módulos que un proceso FAKE/DUMMY/IN_MEMORY no debería importar
+HEAVY_MODULES = ("openai", "requests", "chromadb", "httpx", "tiktoken")
+
+# Presupuesto por defecto de la mediana: ~2.5x lo medido (~180 ms, la mitad es
+# numpy) para que la prueba no dependa de la máquina pero sí detecte que
+# volvió a importarse un SDK o un backend pesado
+DEFAULT_BUDGET_MS = 500.0
+
+SCENARIO = """
+import time
+started = time.perf_counter()
+from RAGcipies.src.rag.pipeline import RAGPipeline
+from RAGcipies.src.rag.vector_store import create_vector_store, VectorStoreBackend
+pipeline = RAGPipeline(create_vector_store(VectorStoreBackend.IN_MEMORY))
+elapsed = time.perf_counter() - started
+import json, sys
+print(json.dumps({"seconds": elapsed, "heavy": [m for m in HEAVY if m in sys.modules]}))
+"""
+
+
+def run_once() -> dict:
+    """Ejecuta el escenario en un intérprete nuevo y retorna su medición."""
+    code = f"HEAVY = {HEAVY_MODULES!r}\n{SCENARIO}"
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def import_time_details(top: int) -> list:
+    """Retorna los `top` módulos con mayor tiempo acumulado según -X importtime."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import RAGcipies.src.rag.pipeline"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_part, cumulative_us, name = line.split("|", 2)
+        rows.append((int(cumulative_us), int(self_part.split(":")[-1]), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Procesos a medir")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="Presupuesto de la mediana en milisegundos (exit 1 si se supera; 0 = sin presupuesto)")
+    parser.add_argument("--details", action="store_true", help="Mostrar el top de módulos por -X importtime")
+    args = parser.parse_args()
+    
+    results = [run_once() for _ in range(args.runs)]
+    timings_ms = [r["seconds"] * 1000 for r in results]
+    median_ms = statistics.median(timings_ms)
+    heavy = sorted({m for r in results for m in r["heavy"]})
+    
+    print(f"Arranque (import + RAGPipeline FAKE/DUMMY/IN_MEMORY), {args.runs} procesos:")
+    print(f"  mediana: {median_ms:.1f} ms   mín: {min(timings_ms):.1f} ms   máx: {max(timings_ms):.1f} ms")
+    print(f"  SDKs pesados importados: {', '.join(heavy) if heavy else 'ninguno'}")
+    
+    if args.details:
+        print("\nMódulos con mayor tiempo acumulado (-X importtime):")
+        for cumulative_us, self_us, name in import_time_details(15):
+            print(f"  {cumulative_us / 1000:8.1f} ms  (propio {self_us / 1000:6.1f} ms)  {name}")
+    
+    failed = bool(heavy)
+    if args.budget_ms and median_ms > args.budget_ms:
+        print(f"\n❌ La mediana ({median_ms:.1f} ms) supera el presupuesto de {args.budget_ms:.0f} ms")
+        failed = True
+    elif heavy:
+        print("\n❌ Se importaron SDKs que el escenario no usa")
+    else:
+        print("\n✓ Dentro del presupuesto")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,304 @@
+"""
+Generador de carga end-to-end: envía consultas a un QPS objetivo contra un
+RAGPipeline en proceso o contra el modo servidor (serve.py) y reporta
+throughput, latencias de cola y tasa de errores.
+
+Con --stub levanta StubBackendServer (APIs de Ollama y OpenAI con latencias
+y velocidad de tokens configurables) y apunta los backends a él, así se
+puede cargar el pipeline sin GPU ni cuota.
+
+La carga es de lazo abierto: las requests salen en su horario (constante o
+Poisson) aunque las anteriores no hayan terminado, y la latencia se mide
+desde el horario previsto, así la espera en el cliente también cuenta.
+
+Uso:
+    # Pipeline en proceso contra el stub de Ollama
+    python benchmarks/load_test.py --stub --embedding ollama --llm ollama --qps 20 --duration 30 \\
+        --generation-latency lognormal:200:0.6 --tokens-per-second 40
+        
+    # Modo servidor: stub en una terminal, serve.py apuntando a él y la carga en otra
+    python benchmarks/load_test.py --stub-only --stub-port 11434
+    OLLAMA_BASE_URL=http://127.0.0.1:11434 python serve.py --embedding ollama --llm ollama
+    python benchmarks/load_test.py --url http://127.0.0.1:8000 --qps 50 --stream
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from RAGcipies.src.server.stubs import LatencyDistribution, StubBackendServer  # noqa: E402
+
+DEFAULT_QUERIES = [
+    "algo vegano",
+    "receta con pollo",
+    "postre sin horno",
+    "cena rápida para dos",
+    "algo con arroz y verduras",
+    "receta sin gluten",
+    "sopa para el invierno",
+    "desayuno alto en proteínas",
+]
+
+
+class Outcome:
+    """Resultado de una request: latencia desde el horario previsto, TTFT y error."""
+    
+    __slots__ = ("latency", "ttft", "error")
+    
+    def __init__(self, latency: float, ttft: Optional[float] = None, error: Optional[str] = None):
+        self.latency = latency
+        self.ttft = ttft
+        self.error = error
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """p50/p90/p99/máximo/media en milisegundos."""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    
+    def pick(p: float) -> float:
+        return ordered[min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))] * 1000
+    
+    return {
+        "p50": pick(50),
+        "p90": pick(90),
+        "p99": pick(99),
+        "max": ordered[-1] * 1000,
+        "mean": statistics.fmean(ordered) * 1000,
+    }
+
+
+def pipeline_target(args: argparse.Namespace) -> Callable[[str, float], Outcome]:
+    """Construye un RAGPipeline en proceso y retorna la función que ejecuta una consulta."""
+    from RAGcipies.src.rag.embeddings.factory import EmbeddingBackend
+    from RAGcipies.src.rag.loader import load_recipes_from_json, recipes_to_chunks, recipes_to_multi_vector_chunks
+    from RAGcipies.src.rag.pipeline import RAGPipeline
+    from RAGcipies.src.rag.vector_store.factory import create_vector_store, VectorStoreBackend
+    from RAGcipies.src.llm.factory import LLMBackend
+    
+    embedding_backend = EmbeddingBackend(args.embedding)
+    store_backend = VectorStoreBackend(args.store)
+    vector_store = create_vector_store(store_backend)
+    to_chunks = recipes_to_multi_vector_chunks if store_backend == VectorStoreBackend.MULTI_VECTOR else recipes_to_chunks
+    vector_store.add_chunks(to_chunks(load_recipes_from_json(args.recipes), embedding_backend))
+    pipeline = RAGPipeline(
+        vector_store=vector_store,
+        embedding_backend=embedding_backend,
+        llm_backend=LLMBackend(args.llm),
+        top_k=args.top_k,
+        batch_max_size=args.batch_size,
+        single_flight=args.single_flight
+    )
+    
+    def run(query: str, scheduled: float) -> Outcome:
+        ttft = None
+        try:
+            if args.stream:
+                for _ in pipeline.query_stream(query):
+                    if ttft is None:
+                        ttft = time.perf_counter() - scheduled
+            else:
+                pipeline.query(query)
+        except Exception as e:
+            return Outcome(time.perf_counter() - scheduled, ttft, type(e).__name__)
+        return Outcome(time.perf_counter() - scheduled, ttft)
+    
+    return run
+
+
+def http_target(args: argparse.Namespace) -> Callable[[str, float], Outcome]:
+    """Retorna la función que envía una consulta a un RAGServer por HTTP."""
+    endpoint = args.url.rstrip("/") + ("/query/stream" if args.stream else "/query")
+    
+    def run(query: str, scheduled: float) -> Outcome:
+        request = urllib.request.Request(
+            endpoint,
+            data=json.dumps({"query": query}).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        ttft = None
+        try:
+            with urllib.request.urlopen(request, timeout=args.timeout) as response:
+                if args.stream:
+                    for line in response:
+                        event = json.loads(line)
+                        if "error" in event:
+                            return Outcome(time.perf_counter() - scheduled, ttft, "stream_error")
+                        if ttft is None and event.get("delta"):
+                            ttft = time.perf_counter() - scheduled
+                else:
+                    response.read()
+        except urllib.error.HTTPError as e:
+            return Outcome(time.perf_counter() - scheduled, ttft, f"http_{e.code}")
+        except Exception as e:
+            return Outcome(time.perf_counter() - scheduled, ttft, type(e).__name__)
+        return Outcome(time.perf_counter() - scheduled, ttft)
+    
+    return run
+
+
+def run_load(run: Callable[[str, float], Outcome], queries: List[str], args: argparse.Namespace) -> dict:
+    """Envía requests a lazo abierto durante args.duration segundos y agrega los resultados."""
+    rng = random.Random(args.seed)
+    total = int(args.qps * args.duration)
+    
+    # Horarios de envío relativos al inicio
+    offsets, t = [], 0.0
+    for _ in range(total):
+        offsets.append(t)
+        t += rng.expovariate(args.qps) if args.arrival == "poisson" else 1.0 / args.qps
+    
+    outcomes: List[Outcome] = []
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+    
+    def task(query: str, scheduled: float) -> None:
+        nonlocal in_flight
+        outcome = run(query, scheduled)
+        with lock:
+            outcomes.append(outcome)
+            in_flight -= 1
+    
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        for offset in offsets:
+            scheduled = started + offset
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            with lock:
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+            executor.submit(task, rng.choice(queries), scheduled)
+    elapsed = time.perf_counter() - started
+    
+    errors = Counter(o.error for o in outcomes if o.error)
+    ok = [o for o in outcomes if not o.error]
+    return {
+        "sent": total,
+        "completed": len(outcomes),
+        "ok": len(ok),
+        "errors": dict(errors),
+        "error_rate": sum(errors.values()) / len(outcomes) if outcomes else 0.0,
+        "elapsed_seconds": elapsed,
+        "offered_qps": args.qps,
+        "throughput_qps": len(ok) / elapsed if elapsed else 0.0,
+        "max_in_flight": max_in_flight,
+        "latency_ms": percentiles([o.latency for o in ok]),
+        "ttft_ms": percentiles([o.ttft for o in ok if o.ttft is not None]),
+    }
+
+
+def start_stub(args: argparse.Namespace) -> StubBackendServer:
+    """Levanta el stub y apunta los backends de Ollama/OpenAI a él."""
+    stub = StubBackendServer(
+        port=args.stub_port,
+        embedding_latency=LatencyDistribution.parse(args.embedding_latency, seed=args.seed),
+        generation_latency=LatencyDistribution.parse(args.generation_latency, seed=args.seed),
+        tokens_per_second=args.tokens_per_second,
+        response_tokens=args.response_tokens,
+        dimension=args.dimension,
+        seed=args.seed
+    ).start()
+    os.environ["OLLAMA_BASE_URL"] = stub.url
+    os.environ["OPENAI_BASE_URL"] = f"{stub.url}/v1"
+    os.environ.setdefault("OPENAI_API_KEY", "stub")
+    return stub
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_argument_group("objetivo")
+    target.add_argument("--url", default=None, help="URL de un RAGServer (si se omite, pipeline en proceso)")
+    target.add_argument("--embedding", default="fake", help="Backend de embeddings del pipeline en proceso")
+    target.add_argument("--llm", default="dummy", help="Backend de LLM del pipeline en proceso")
+    target.add_argument("--store", default="in_memory", help="Backend de vector store del pipeline en proceso")
+    target.add_argument("--recipes", default=str(ROOT / "RAGcipies" / "data" / "recipes.json"))
+    target.add_argument("--top-k", type=int, default=3)
+    target.add_argument("--batch-size", type=int, default=0, help="batch_max_size del pipeline")
+    target.add_argument("--single-flight", action="store_true")
+    
+    load = parser.add_argument_group("carga")
+    load.add_argument("--qps", type=float, default=10.0, help="Requests por segundo objetivo")
+    load.add_argument("--duration", type=float, default=10.0, help="Segundos de carga")
+    load.add_argument("--arrival", choices=["constant", "poisson"], default="poisson")
+    load.add_argument("--concurrency", type=int, default=64, help="Requests simultáneas máximas del cliente")
+    load.add_argument("--stream", action="store_true", help="Usar streaming y medir el tiempo al primer token")
+    load.add_argument("--timeout", type=float, default=120.0, help="Timeout HTTP por request")
+    load.add_argument("--queries-file", type=Path, default=None, help="Archivo con una consulta por línea")
+    load.add_argument("--seed", type=int, default=0)
+    load.add_argument("--output", type=Path, default=None, help="Guardar el reporte en JSON")
+    
+    stub = parser.add_argument_group("servidor stub")
+    stub.add_argument("--stub", action="store_true", help="Levantar el stub de Ollama/OpenAI")
+    stub.add_argument("--stub-only", action="store_true", help="Solo levantar el stub y esperar Ctrl+C")
+    stub.add_argument("--stub-port", type=int, default=0)
+    stub.add_argument("--embedding-latency", default="fixed:20", help="Distribución (ej: lognormal:20:0.5)")
+    stub.add_argument("--generation-latency", default="lognormal:150:0.5", help="Tiempo al primer token")
+    stub.add_argument("--tokens-per-second", type=float, default=50.0)
+    stub.add_argument("--response-tokens", type=int, default=64)
+    stub.add_argument("--dimension", type=int, default=768)
+    stub.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    
+    server = start_stub(args) if args.stub or args.stub_only else None
+    if args.stub_only:
+        server.error_rate = args.error_rate
+        print(f"🧪 Stub de Ollama/OpenAI en {server.url} (OpenAI: {server.url}/v1). Ctrl+C para salir")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
+        return 0
+    
+    queries = DEFAULT_QUERIES
+    if args.queries_file:
+        queries = [line.strip() for line in args.queries_file.read_text().splitlines() if line.strip()]
+    
+    run = http_target(args) if args.url else pipeline_target(args)
+    if server is not None:
+        # Los errores se inyectan recién al empezar la carga, no al indexar las recetas
+        server.error_rate = args.error_rate
+    print(f"🚦 {args.qps:g} QPS ({args.arrival}) durante {args.duration:g}s contra "
+          f"{args.url or f'pipeline {args.embedding}/{args.llm}/{args.store}'}...")
+    report = run_load(run, queries, args)
+    if server is not None:
+        report["stub"] = server.stats()
+        server.shutdown()
+    
+    latency = report["latency_ms"]
+    print(f"  enviadas {report['sent']}  ok {report['ok']}  errores {sum(report['errors'].values())} "
+          f"({report['error_rate']:.1%})  {dict(report['errors']) or ''}")
+    print(f"  throughput {report['throughput_qps']:.1f} QPS   máx. en vuelo {report['max_in_flight']}")
+    if latency:
+        print(f"  latencia p50 {latency['p50']:.1f} ms  p90 {latency['p90']:.1f} ms  "
+              f"p99 {latency['p99']:.1f} ms  máx {latency['max']:.1f} ms")
+    if report["ttft_ms"]:
+        print(f"  primer token p50 {report['ttft_ms']['p50']:.1f} ms  p99 {report['ttft_ms']['p99']:.1f} ms")
+    
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        settings = {key: str(value) if isinstance(value, Path) else value for key, value in vars(args).items()}
+        args.output.write_text(json.dumps({"settings": settings, "report": report}, indent=2, ensure_ascii=False))
+        print(f"  reporte guardado en {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Planificación de capacidad: indexa las recetas en cada vector store,
+reporta memory_usage() desglosado (vectores, texto, metadata, índice, ids y
+disco) y proyecta el uso con más chunks para float32, int8 y PQ.
+
+Con --dims los embeddings se regeneran con FakeEmbeddingModel de esa
+dimensión, para proyectar el modelo de producción (ej: 768 o 1536) sin
+levantar Ollama; texto y metadata siguen siendo los de las recetas reales.
+
+Uso:
+    python benchmarks/memory_usage.py --dims 768 --project 100000 1000000
+    python benchmarks/memory_usage.py --backends chromadb --persist-directory /tmp/chroma-mem --json
+"""
+import argparse
+import json
+import sys
+import tempfile
+import uuid
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from RAGcipies.src.rag.embeddings.fake import FakeEmbeddingModel  # noqa: E402
+from RAGcipies.src.rag.evaluation import copy_chunks  # noqa: E402
+from RAGcipies.src.rag.loader import load_recipes_from_json, recipes_to_chunks  # noqa: E402
+from RAGcipies.src.rag.models import Chunk  # noqa: E402
+from RAGcipies.src.rag.vector_store import create_vector_store, VectorStoreBackend, EMBEDDING_MODES  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recipes", default=str(ROOT / "RAGcipies" / "data" / "recipes.json"))
+    parser.add_argument("--backends", nargs="+", default=[b.value for b in VectorStoreBackend],
+                        help="Backends a medir (por defecto todos)")
+    parser.add_argument("--dims", type=int, default=None, help="Dimensión de los embeddings a simular")
+    parser.add_argument("--project", nargs="+", type=int, default=[10_000, 100_000, 1_000_000],
+                        help="Chunks adicionales para las proyecciones")
+    parser.add_argument("--pq-subvectors", type=int, default=None, help="Subvectores de PQ (default: dims // 8)")
+    parser.add_argument("--persist-directory", default=None,
+                        help="Directorio para ChromaDB (por defecto uno temporal, para medir el disco)")
+    parser.add_argument("--json", action="store_true", help="Imprimir el reporte como JSON")
+    args = parser.parse_args()
+    
+    chunks = recipes_to_chunks(load_recipes_from_json(args.recipes))
+    if args.dims:
+        vectors = FakeEmbeddingModel(dimension=args.dims).embed_matrix([chunk.text for chunk in chunks])
+        chunks = [
+            Chunk(id=c.id, document_id=c.document_id, text=c.text, embedding=vector, metadata=c.metadata)
+            for c, vector in zip(chunks, vectors.astype("float32"))
+        ]
+    
+    report = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend_name in args.backends:
+            backend = VectorStoreBackend(backend_name)
+            kwargs = {}
+            if backend == VectorStoreBackend.CHROMADB:
+                kwargs = {
+                    "collection_name": f"mem-{uuid.uuid4().hex[:12]}",
+                    "persist_directory": args.persist_directory or tmp,
+                }
+            store = create_vector_store(backend, **kwargs)
+            store.add_chunks(copy_chunks(chunks))
+            usage = store.memory_usage()
+            projections = {
+                additional: usage.projections(additional, EMBEDDING_MODES, args.pq_subvectors)
+                for additional in args.project
+            }
+            report[backend_name] = {
+                "current": usage.to_dict(),
+                "projections": {
+                    str(additional): {mode: p.to_dict() for mode, p in by_mode.items()}
+                    for additional, by_mode in projections.items()
+                },
+            }
+            if args.json:
+                continue
+            
+            print(f"📦 {usage}\n")
+            print(f"  {'+chunks':>10}  " + "  ".join(f"{mode + ' MB':>12}" for mode in EMBEDDING_MODES)
+                  + f"  {'disco MB':>12}")
+            for additional, by_mode in projections.items():
+                disk = by_mode["float32"].disk_bytes
+                print(f"  {additional:>10}  "
+                      + "  ".join(f"{by_mode[mode].total_bytes / (1024 * 1024):12.1f}" for mode in EMBEDDING_MODES)
+                      + f"  {'-' if disk is None else f'{disk / (1024 * 1024):.1f}':>12}")
+            print()
+    
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
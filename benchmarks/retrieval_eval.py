@@ -0,0 +1,89 @@
+"""
+Evaluación de calidad de recuperación vs. velocidad: indexa las recetas en
+una o más configuraciones de vector store y reporta recall@k, nDCG@k y MRR
+sobre consultas etiquetadas, junto con la coincidencia con la búsqueda
+exacta (exact@k; por receta en los stores que devuelven un resultado por
+receta, como multi_vector), latencia de search y memoria del índice.
+
+Cada --store es "backend" o "backend:{json con kwargs}", opcionalmente con
+un nombre: "nombre=backend:{...}". Así se comparan parámetros de indexado
+en un solo comando.
+
+Uso:
+    python benchmarks/retrieval_eval.py --embedding ollama --store in_memory --store chromadb
+    python benchmarks/retrieval_eval.py --store 'chroma-emb=chromadb:{"include_embeddings": true}' --k 1 3 5
+    python benchmarks/retrieval_eval.py --output /tmp/eval.json
+    python benchmarks/retrieval_eval.py --multi-vector --store in_memory --store multi_vector \
+        --store 'wsum=multi_vector:{"aggregation": "weighted_sum"}'
+"""
+import argparse
+import json
+import sys
+import uuid
+from dataclasses import asdict
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from RAGcipies.src.rag.embeddings.factory import create_embedding_model, EmbeddingBackend  # noqa: E402
+from RAGcipies.src.rag.evaluation import RetrievalEvaluator, format_reports, load_labelled_queries  # noqa: E402
+from RAGcipies.src.rag.loader import load_recipes_from_json, recipes_to_chunks, recipes_to_multi_vector_chunks  # noqa: E402
+from RAGcipies.src.rag.vector_store import create_vector_store, VectorStoreBackend, VectorStore  # noqa: E402
+
+
+def parse_store(spec: str) -> Tuple[str, Callable[[], VectorStore]]:
+    """Convierte "nombre=backend:{kwargs}" en (nombre, factory)."""
+    name, _, rest = spec.partition("=") if "=" in spec.split(":", 1)[0] else ("", "", spec)
+    backend_name, _, raw_kwargs = rest.partition(":")
+    backend = VectorStoreBackend(backend_name)
+    kwargs = json.loads(raw_kwargs) if raw_kwargs else {}
+    
+    def factory() -> VectorStore:
+        store_kwargs = dict(kwargs)
+        if backend == VectorStoreBackend.CHROMADB:
+            # Colección nueva por evaluación para no mezclar corridas
+            store_kwargs.setdefault("collection_name", f"eval-{uuid.uuid4().hex[:12]}")
+        return create_vector_store(backend, **store_kwargs)
+    
+    return name or rest, factory
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", default=str(ROOT / "RAGcipies" / "data" / "eval_queries.json"),
+                        help="JSON con consultas etiquetadas")
+    parser.add_argument("--recipes", default=str(ROOT / "RAGcipies" / "data" / "recipes.json"))
+    parser.add_argument("--embedding", choices=[b.value for b in EmbeddingBackend],
+                        default=EmbeddingBackend.FAKE.value)
+    parser.add_argument("--store", action="append", default=None,
+                        help="Configuración a evaluar (repetible); por defecto todos los backends")
+    parser.add_argument("--k", nargs="+", type=int, default=[1, 3, 5])
+    parser.add_argument("--multi-vector", action="store_true",
+                        help="Indexar un vector por sección de receta (título, ingredientes, instrucciones)")
+    parser.add_argument("--output", type=Path, default=None, help="Guardar los reportes en JSON")
+    args = parser.parse_args()
+    
+    embedding_backend = EmbeddingBackend(args.embedding)
+    to_chunks = recipes_to_multi_vector_chunks if args.multi_vector else recipes_to_chunks
+    chunks = to_chunks(load_recipes_from_json(args.recipes), embedding_backend)
+    labelled = load_labelled_queries(args.queries)
+    evaluator = RetrievalEvaluator(create_embedding_model(embedding_backend), chunks, labelled, k_values=args.k)
+    
+    specs = args.store or [backend.value for backend in VectorStoreBackend]
+    factories: Dict[str, Callable[[], VectorStore]] = dict(parse_store(spec) for spec in specs)
+    print(f"📊 {len(labelled)} consultas, {len(chunks)} chunks, embeddings {args.embedding}\n")
+    reports = evaluator.compare(factories)
+    print(format_reports(reports))
+    
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps([asdict(r) for r in reports], indent=2, ensure_ascii=False))
+        print(f"\nReportes guardados en {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+"""
+Microbenchmark de los vector stores: genera corpus sintéticos con
+FakeEmbeddingModel (modo vectorizado) y mide add_chunks, search y delete
+para cada VectorStoreBackend registrado.
+
+Cada combinación (backend, tamaño, dimensión) corre en un proceso nuevo,
+así el pico de RSS es el de ese caso y no arrastra memoria del anterior.
+El corpus y las queries son deterministas (mismos textos, mismos vectores),
+por lo que dos corridas en commits distintos son comparables; el JSON
+guarda el commit, las versiones y la máquina para saber qué se comparó.
+
+Uso:
+    python benchmarks/vector_search.py                          # 1k/10k/100k x 8/768/1536
+    python benchmarks/vector_search.py --sizes 1000000 --dims 768 --backends in_memory
+    python benchmarks/vector_search.py --baseline benchmarks/results/vector_search-abc1234.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+DEFAULT_DIMS = (8, 768, 1536)
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+
+
+def peak_rss_mb() -> float:
+    """Pico de RSS del proceso actual en MB (ru_maxrss es KB en Linux y bytes en macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def latency_summary(samples: List[float]) -> Dict[str, float]:
+    """p50/p99/media en milisegundos y throughput (operaciones por segundo)."""
+    ordered = sorted(samples)
+    
+    def pick(p: float) -> float:
+        return ordered[min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))]
+    
+    total = sum(samples)
+    return {
+        "count": len(samples),
+        "p50_ms": pick(50) * 1000,
+        "p99_ms": pick(99) * 1000,
+        "mean_ms": statistics.fmean(samples) * 1000,
+        "ops_per_second": len(samples) / total if total else 0.0,
+    }
+
+
+def run_case(backend_name: str, size: int, dims: int, args: argparse.Namespace) -> dict:
+    """Ejecuta un caso en este proceso y retorna sus métricas."""
+    from RAGcipies.src.rag.embeddings.fake import FakeEmbeddingModel
+    from RAGcipies.src.rag.models import Chunk
+    from RAGcipies.src.rag.vector_store import create_vector_store, VectorStoreBackend
+    
+    backend = VectorStoreBackend(backend_name)
+    kwargs = {}
+    if backend == VectorStoreBackend.CHROMADB:
+        kwargs["collection_name"] = f"bench-{size}-{dims}-{os.getpid()}"
+    store = create_vector_store(backend, **kwargs)
+    model = FakeEmbeddingModel(dimension=dims)
+    rss_before = peak_rss_mb()
+    
+    # add_chunks: el corpus se genera y se agrega por lotes (la generación no se mide)
+    add_seconds = 0.0
+    for start in range(0, size, args.batch_size):
+        ids = range(start, min(size, start + args.batch_size))
+        vectors = model.embed_matrix([f"receta sintética {i}" for i in ids]).astype("float32")
+        chunks = [
+            Chunk(id=f"c{i}", document_id=str(i // 4), text=f"receta sintética {i}", embedding=vector)
+            for i, vector in zip(ids, vectors)
+        ]
+        started = time.perf_counter()
+        store.add_chunks(chunks)
+        add_seconds += time.perf_counter() - started
+        del chunks, vectors
+    
+    # search: queries distintas a los textos del corpus, una llamada por query
+    # (los stores híbridos reciben también el texto, que comparte términos con todo el corpus)
+    texts = [f"consulta sintética {i}" for i in range(args.queries)]
+    queries = model.embed_matrix(texts).tolist()
+    store.warmup()
+    store.search(queries[0], k=args.k)
+    search_samples = []
+    for text, query in zip(texts, queries):
+        search_kwargs = {"query_text": text} if store.uses_query_text else {}
+        started = time.perf_counter()
+        store.search(query, k=args.k, **search_kwargs)
+        search_samples.append(time.perf_counter() - started)
+    
+    # delete: ids repartidos por todo el corpus, de a uno por llamada
+    step = max(1, size // args.deletes)
+    delete_samples = []
+    for i in range(0, min(size, step * args.deletes), step):
+        started = time.perf_counter()
+        store.delete([f"c{i}"])
+        delete_samples.append(time.perf_counter() - started)
+    
+    return {
+        "backend": backend_name,
+        "size": size,
+        "dims": dims,
+        "k": args.k,
+        "add": {
+            "seconds": add_seconds,
+            "vectors_per_second": size / add_seconds if add_seconds else 0.0,
+        },
+        "search": latency_summary(search_samples),
+        "delete": latency_summary(delete_samples),
+        "rss_mb": {"before_corpus": rss_before, "peak": peak_rss_mb()},
+    }
+
+
+def run_case_subprocess(backend: str, size: int, dims: int, args: argparse.Namespace) -> dict:
+    """Corre un caso en un intérprete nuevo; ante un error retorna el mensaje."""
+    command = [
+        sys.executable, __file__, "--case", f"{backend}:{size}:{dims}",
+        "--queries", str(args.queries), "--deletes", str(args.deletes),
+        "--k", str(args.k), "--batch-size", str(args.batch_size),
+    ]
+    completed = subprocess.run(command, cwd=ROOT, capture_output=True, text=True, timeout=args.timeout)
+    if completed.returncode != 0:
+        error = (completed.stderr.strip().splitlines() or ["sin salida"])[-1][:300]
+        return {"backend": backend, "size": size, "dims": dims, "error": error}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def environment() -> dict:
+    """Datos para saber qué se comparó: commit, versiones y máquina."""
+    import numpy
+    
+    def git(*command: str) -> Optional[str]:
+        try:
+            return subprocess.run(["git", *command], cwd=ROOT, capture_output=True,
+                                  text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    
+    return {
+        "commit": git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "python": platform.python_version(),
+        "numpy": numpy.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "system": platform.platform(),
+    }
+
+
+def case_key(case: dict) -> tuple:
+    return case["backend"], case["size"], case["dims"]
+
+
+def print_comparison(results: List[dict], baseline_path: Path) -> None:
+    """Imprime la relación actual/baseline de p50 de search, add y pico de RSS."""
+    baseline = {case_key(c): c for c in json.loads(baseline_path.read_text())["cases"] if "error" not in c}
+    print(f"\nComparación contra {baseline_path} (actual / baseline, <1 es mejor en latencia):")
+    for case in results:
+        previous = baseline.get(case_key(case))
+        if previous is None or "error" in case:
+            continue
+        search = case["search"]["p50_ms"] / previous["search"]["p50_ms"]
+        add = previous["add"]["vectors_per_second"] / case["add"]["vectors_per_second"]
+        rss = case["rss_mb"]["peak"] / previous["rss_mb"]["peak"]
+        print(f"  {case['backend']:>10} n={case['size']:>8} d={case['dims']:>5}  "
+              f"search p50 x{search:.2f}   add x{add:.2f}   RSS x{rss:.2f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=None,
+                        help="Backends a medir (por defecto todos los registrados)")
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES),
+                        help="Tamaños de corpus (ej: 1000 10000 100000 1000000)")
+    parser.add_argument("--dims", nargs="+", type=int, default=list(DEFAULT_DIMS), help="Dimensiones")
+    parser.add_argument("--queries", type=int, default=200, help="Búsquedas por caso")
+    parser.add_argument("--deletes", type=int, default=50, help="Llamadas a delete por caso")
+    parser.add_argument("--k", type=int, default=10, help="top-k de cada búsqueda")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Chunks por llamada a add_chunks")
+    parser.add_argument("--timeout", type=float, default=3600, help="Segundos máximos por caso")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="Archivo JSON de resultados (por defecto benchmarks/results/vector_search-<commit>.json)")
+    parser.add_argument("--baseline", type=Path, default=None, help="JSON de una corrida anterior para comparar")
+    parser.add_argument("--case", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.case:
+        backend, size, dims = args.case.split(":")
+        print(json.dumps(run_case(backend, int(size), int(dims), args)))
+        return 0
+    
+    from RAGcipies.src.rag.vector_store.factory import _VECTOR_STORE_REGISTRY
+    backends = args.backends or [backend.value for backend in _VECTOR_STORE_REGISTRY.keys()]
+    
+    env = environment()
+    results = []
+    for backend in backends:
+        for size in args.sizes:
+            for dims in args.dims:
+                case = run_case_subprocess(backend, size, dims, args)
+                results.append(case)
+                if "error" in case:
+                    print(f"{backend:>10} n={size:>8} d={dims:>5}  ❌ {case['error']}")
+                    continue
+                print(f"{backend:>10} n={size:>8} d={dims:>5}  "
+                      f"add {case['add']['vectors_per_second']:>10.0f} vec/s   "
+                      f"search p50 {case['search']['p50_ms']:8.3f} ms  p99 {case['search']['p99_ms']:8.3f} ms   "
+                      f"delete p50 {case['delete']['p50_ms']:8.3f} ms   "
+                      f"RSS {case['rss_mb']['peak']:8.1f} MB")
+    
+    output = args.output or RESULTS_DIR / f"vector_search-{env['commit'] or 'local'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    settings = {"queries": args.queries, "deletes": args.deletes, "k": args.k, "batch_size": args.batch_size}
+    output.write_text(json.dumps({"environment": env, "settings": settings, "cases": results}, indent=2))
+    print(f"\nResultados guardados en {output}")
+    
+    if args.baseline:
+        print_comparison(results, args.baseline)
+    return 1 if any("error" in case for case in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
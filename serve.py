@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Modo servidor: carga el vector store una sola vez y atiende consultas por HTTP.
+
+Ejemplos:
+    # Stub completo (sin servicios externos)
+    python serve.py --embedding fake --llm dummy --store in_memory
+    
+    # Ollama local con ChromaDB persistente
+    python serve.py --embedding ollama --llm ollama --store chromadb --workers 8
+    
+    curl -s localhost:8000/query -d '{"query": "algo vegano"}'
+    curl -sN localhost:8000/query/stream -d '{"query": "algo vegano"}'
+"""
+from dotenv import load_dotenv
+load_dotenv()
+
+import argparse
+import os
+from pathlib import Path
+
+from RAGcipies.src.rag.loader import load_recipes_from_json, recipes_to_chunks, recipes_to_multi_vector_chunks
+from RAGcipies.src.rag.vector_store.factory import (
+    create_vector_store,
+    VectorStoreBackend
+)
+from RAGcipies.src.rag.embeddings.factory import EmbeddingBackend
+from RAGcipies.src.rag.pipeline import RAGPipeline
+from RAGcipies.src.rag.ingredients import IngredientIndex
+from RAGcipies.src.llm.factory import LLMBackend
+from RAGcipies.src.server import RAGServer
+from RAGcipies.src.profiling import MODES, Profiler, configure_profiling
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Servidor HTTP de RAGcipies")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Consultas ejecutando el pipeline en paralelo")
+    parser.add_argument("--max-queue", type=int, default=16,
+                        help="Consultas que pueden esperar un worker (el resto recibe 429)")
+    parser.add_argument("--queue-timeout", type=float, default=30.0,
+                        help="Segundos máximos de espera en la cola")
+    parser.add_argument("--embedding", choices=[b.value for b in EmbeddingBackend],
+                        default=EmbeddingBackend.OLLAMA.value)
+    parser.add_argument("--llm", choices=[b.value for b in LLMBackend],
+                        default=LLMBackend.OLLAMA.value)
+    parser.add_argument("--store", choices=[b.value for b in VectorStoreBackend],
+                        default=VectorStoreBackend.IN_MEMORY.value)
+    parser.add_argument("--persist-dir", default=os.getenv("CHROMADB_PERSIST_DIR"),
+                        help="Directorio de persistencia de ChromaDB")
+    parser.add_argument("--recipes", default=str(Path(__file__).parent / "RAGcipies" / "data" / "recipes.json"))
+    parser.add_argument("--top-k", type=int, default=int(os.getenv("TOP_K", "3")))
+    parser.add_argument("--batch-size", type=int, default=16,
+                        help="Máximo de consultas por lote de embedding/búsqueda (0 = sin batching)")
+    parser.add_argument("--batch-wait-ms", type=float, default=2.0,
+                        help="Milisegundos máximos de espera para completar un lote")
+    parser.add_argument("--single-flight", action="store_true",
+                        help="Unir llamadas idénticas concurrentes a embeddings y LLM")
+    parser.add_argument("--ingredient-filters", action="store_true",
+                        help="Aplicar \"sin X\" / \"con X\" de las consultas como filtro duro de ingredientes")
+    parser.add_argument("--mmr-lambda", type=float, default=None,
+                        help="Diversificar el contexto con MMR (1.0 = solo relevancia; sin definir = desactivado)")
+    parser.add_argument("--mmr-fetch-k", type=int, default=None,
+                        help="Candidatos a recuperar antes de elegir con MMR (default: max(4 * top_k, 20))")
+    parser.add_argument("--warmup", action="store_true",
+                        help="Precargar modelos e índice antes de aceptar requests")
+    parser.add_argument("--profile", default=None,
+                        help="Perfilar ingesta y consultas: cprofile,tracemalloc,stacks o all (ver RAG_PROFILE)")
+    parser.add_argument("--profile-dir", default=os.getenv("RAG_PROFILE_DIR", "profiles"),
+                        help="Directorio de salida de los perfiles")
+    parser.add_argument("--profile-every", type=int, default=int(os.getenv("RAG_PROFILE_EVERY", "1")),
+                        help="Perfilar 1 de cada N llamadas por etapa")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.profile:
+        modes = MODES if args.profile == "all" else args.profile.split(",")
+        configure_profiling(Profiler(args.profile_dir, modes=modes, every=args.profile_every))
+        print(f"🔬 Perfilado activo ({args.profile}) en {args.profile_dir}/")
+    embedding_backend = EmbeddingBackend(args.embedding)
+    store_backend = VectorStoreBackend(args.store)
+    
+    # 1. Crear el vector store (una sola vez para todo el proceso)
+    print("💾 Creando vector store...")
+    store_kwargs = {}
+    if store_backend == VectorStoreBackend.CHROMADB and args.persist_dir:
+        store_kwargs["persist_directory"] = args.persist_dir
+    vector_store = create_vector_store(store_backend, **store_kwargs)
+    
+    # 2. Cargar recetas solo si el store está vacío (ChromaDB persistente ya puede tenerlas)
+    recipes = None
+    if len(vector_store) == 0:
+        print("📖 Cargando recetas y generando embeddings...")
+        recipes = load_recipes_from_json(args.recipes)
+        if store_backend == VectorStoreBackend.MULTI_VECTOR:
+            # Un vector por sección (título, ingredientes, instrucciones)
+            vector_store.add_chunks(recipes_to_multi_vector_chunks(recipes, embedding_backend))
+        else:
+            vector_store.add_chunks(recipes_to_chunks(recipes, embedding_backend))
+    print(f"✓ Vector store listo con {len(vector_store)} chunks")
+    
+    ingredient_index = None
+    if args.ingredient_filters:
+        ingredient_index = IngredientIndex(recipes or load_recipes_from_json(args.recipes))
+        print(f"🥚 Índice de ingredientes: {len(ingredient_index)} recetas, "
+              f"{ingredient_index.vocabulary_size} términos")
+    
+    # 3. Pipeline compartido por todos los workers
+    pipeline = RAGPipeline(
+        vector_store=vector_store,
+        embedding_backend=embedding_backend,
+        llm_backend=LLMBackend(args.llm),
+        top_k=args.top_k,
+        batch_max_size=args.batch_size,
+        batch_max_wait_ms=args.batch_wait_ms,
+        single_flight=args.single_flight,
+        ingredient_index=ingredient_index,
+        mmr_lambda=args.mmr_lambda,
+        mmr_fetch_k=args.mmr_fetch_k
+    )
+    
+    if args.warmup:
+        print("🔥 Precargando modelos e índice...")
+        report = pipeline.warmup()
+        for component, seconds in report.component_seconds.items():
+            status = f"⚠️  {report.errors[component]}" if component in report.errors else "✓"
+            print(f"   {component}: {seconds:.2f}s {status}")
+        print(f"✓ Warm-up completo en {report.total_seconds:.2f}s")
+    
+    server = RAGServer(
+        pipeline,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        max_queue=args.max_queue,
+        queue_timeout=args.queue_timeout
+    )
+    host, port = server.address[:2]
+    print(f"🚀 Escuchando en http://{host}:{port} ({args.workers} workers, cola {args.max_queue})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Deteniendo servidor...")
+        server.shutdown()
+        pipeline.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import threading
+import time
+import pytest
+
+from RAGcipies.src.concurrency.batching import MicroBatcher
+
+
+def run_concurrently(fn, args):
+    results = [None] * len(args)
+    errors = [None] * len(args)
+    
+    def worker(i, arg):
+        try:
+            results[i] = fn(arg)
+        except Exception as e:
+            errors[i] = e
+    
+    threads = [threading.Thread(target=worker, args=(i, a)) for i, a in enumerate(args)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    return results, errors
+
+
+def test_agrupa_llamadas_concurrentes():
+    calls = []
+    
+    def handler(items):
+        calls.append(list(items))
+        return [item * 2 for item in items]
+    
+    batcher = MicroBatcher(handler, max_batch_size=8, max_wait_ms=50)
+    try:
+        results, errors = run_concurrently(batcher.submit, list(range(8)))
+    finally:
+        batcher.close()
+    
+    assert results == [i * 2 for i in range(8)]
+    assert errors == [None] * 8
+    assert len(calls) < 8
+    assert sum(len(c) for c in calls) == 8
+    assert batcher.stats()["items"] == 8
+
+
+def test_respeta_max_batch_size():
+    sizes = []
+    
+    def handler(items):
+        sizes.append(len(items))
+        return items
+    
+    batcher = MicroBatcher(handler, max_batch_size=3, max_wait_ms=50)
+    try:
+        run_concurrently(batcher.submit, list(range(10)))
+    finally:
+        batcher.close()
+    
+    assert max(sizes) <= 3
+    assert sum(sizes) == 10
+
+
+def test_propaga_el_error_a_todos_los_callers():
+    def handler(items):
+        raise RuntimeError("backend caído")
+    
+    batcher = MicroBatcher(handler, max_batch_size=4, max_wait_ms=20)
+    try:
+        _, errors = run_concurrently(batcher.submit, [1, 2, 3])
+    finally:
+        batcher.close()
+    
+    assert all(isinstance(e, RuntimeError) and "backend caído" in str(e) for e in errors)
+
+
+def test_base_exception_del_handler_no_detiene_el_hilo():
+    def handler(items):
+        if items == [1]:
+            raise SystemExit("lote abortado")
+        return items
+    
+    batcher = MicroBatcher(handler, max_batch_size=4, max_wait_ms=1)
+    try:
+        with pytest.raises(SystemExit):
+            batcher.submit(1, timeout=5)
+        assert batcher.submit(2, timeout=5) == 2
+    finally:
+        batcher.close()
+
+
+def test_hilo_detenido_cierra_el_batcher():
+    batcher = MicroBatcher(lambda items: items, max_wait_ms=1)
+    batcher._queue.put(None)
+    batcher._thread.join(5)
+    
+    with pytest.raises(RuntimeError, match="cerrado"):
+        batcher.submit(1, timeout=5)
+
+
+def test_item_con_timeout_agotado_no_se_procesa():
+    release = threading.Event()
+    seen = []
+    
+    def handler(items):
+        seen.extend(items)
+        release.wait(5)
+        return items
+    
+    batcher = MicroBatcher(handler, max_batch_size=1, max_wait_ms=0)
+    try:
+        first = threading.Thread(target=batcher.submit, args=("lento",))
+        first.start()
+        while not seen:
+            time.sleep(0.001)
+        with pytest.raises(TimeoutError):
+            batcher.submit("abandonado", timeout=0.05)
+        release.set()
+        first.join(5)
+        assert batcher.submit("siguiente", timeout=5) == "siguiente"
+    finally:
+        release.set()
+        batcher.close()
+    
+    assert seen == ["lento", "siguiente"]
+
+
+def test_item_solo_no_espera_mas_que_max_wait():
+    batcher = MicroBatcher(lambda items: items, max_batch_size=64, max_wait_ms=5)
+    try:
+        started = time.perf_counter()
+        assert batcher.submit("a") == "a"
+        assert time.perf_counter() - started < 1.0
+    finally:
+        batcher.close()
+
+
+def test_submit_despues_de_close():
+    batcher = MicroBatcher(lambda items: items)
+    batcher.close()
+    
+    with pytest.raises(RuntimeError, match="cerrado"):
+        batcher.submit(1)
+
+
+def test_parametros_invalidos():
+    with pytest.raises(ValueError):
+        MicroBatcher(lambda items: items, max_batch_size=0)
+    with pytest.raises(ValueError):
+        MicroBatcher(lambda items: items, max_wait_ms=-1)
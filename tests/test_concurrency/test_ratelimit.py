@@ -0,0 +1,216 @@
+import threading
+import time
+import pytest
+from types import SimpleNamespace
+
+from RAGcipies.src.concurrency.ratelimit import (
+    TokenBucket,
+    RateLimiter,
+    RateLimitExceeded,
+    get_rate_limiter,
+    rate_limit_retry_after,
+    transient_error,
+)
+
+
+class FakeRateLimitError(Exception):
+    def __init__(self, headers=None):
+        super().__init__("429 Too Many Requests")
+        self.status_code = 429
+        self.response = SimpleNamespace(status_code=429, headers=headers or {})
+
+
+class FakeServerError(Exception):
+    status_code = 503
+
+
+class APIConnectionError(Exception):
+    pass
+
+
+def test_bucket_espera_la_recarga():
+    bucket = TokenBucket(rate_per_minute=600, capacity=2)  # 10 tokens/s
+    
+    assert bucket.acquire(1) < 0.01
+    assert bucket.acquire(1) < 0.01
+    waited = bucket.acquire(1)
+    
+    assert 0.05 < waited < 0.3
+
+
+def test_bucket_timeout():
+    bucket = TokenBucket(rate_per_minute=1, capacity=1)
+    bucket.acquire(1)
+    
+    with pytest.raises(TimeoutError):
+        bucket.acquire(1, timeout=0.05)
+
+
+def test_bucket_recorta_pedidos_mayores_que_la_capacidad():
+    bucket = TokenBucket(rate_per_minute=60, capacity=10)
+    
+    assert bucket.acquire(500) < 0.01
+    assert bucket.available() < 1
+
+
+def test_tope_de_concurrencia():
+    limiter = RateLimiter(max_concurrency=2)
+    active, peak = [0], [0]
+    lock = threading.Lock()
+    
+    def work():
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+    
+    threads = [threading.Thread(target=limiter.call, args=(work,)) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    
+    assert peak[0] == 2
+    assert limiter.stats()["requests"] == 6
+
+
+def test_reintenta_429_respetando_retry_after():
+    limiter = RateLimiter()
+    calls = []
+    
+    def flaky():
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            raise FakeRateLimitError({"retry-after-ms": "100"})
+        return "ok"
+    
+    assert limiter.call(flaky) == "ok"
+    assert calls[1] - calls[0] >= 0.09
+    stats = limiter.stats()
+    assert stats["rate_limited"] == 1
+    assert stats["retries"] == 1
+
+
+def test_agota_reintentos():
+    limiter = RateLimiter(base_backoff=0.001)
+    
+    def always_limited():
+        raise FakeRateLimitError()
+    
+    with pytest.raises(RateLimitExceeded, match="2 reintentos"):
+        limiter.call(always_limited, max_retries=2)
+    assert limiter.stats()["rate_limited"] == 3
+
+
+def test_otros_errores_no_se_reintentan():
+    limiter = RateLimiter()
+    calls = []
+    
+    def broken():
+        calls.append(1)
+        raise ValueError("otro error")
+    
+    with pytest.raises(ValueError):
+        limiter.call(broken)
+    assert len(calls) == 1
+
+
+def test_reintenta_errores_transitorios_con_backoff():
+    limiter = RateLimiter(base_backoff=0.001)
+    errors = [FakeServerError(), APIConnectionError()]
+    
+    def flaky():
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+    
+    assert limiter.call(flaky) == "ok"
+    stats = limiter.stats()
+    assert stats["transient_errors"] == 2 and stats["retries"] == 2
+    # Sin pausa global: los transitorios no cuentan como 429
+    assert stats["rate_limited"] == 0
+    
+    def always_down():
+        raise FakeServerError()
+    
+    with pytest.raises(FakeServerError):
+        limiter.call(always_down, transient_retries=1)
+
+
+def test_reserva_los_tokens_una_vez_por_request():
+    limiter = RateLimiter(tokens_per_minute=1000)
+    errors = [FakeRateLimitError({"retry-after-ms": "1"}), FakeServerError()]
+    
+    def flaky():
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+    
+    limiter.base_backoff = 0.001
+    assert limiter.call(flaky, tokens=100) == "ok"
+    assert 895 < limiter.tokens.available() < 910
+
+
+def test_stream_ocupa_el_slot_hasta_cerrarse():
+    limiter = RateLimiter(max_concurrency=1)
+    closed = []
+    
+    class Events:
+        def __iter__(self):
+            return iter(["a", "b", "c"])
+        
+        def close(self):
+            closed.append(True)
+    
+    stream = limiter.stream(Events)
+    assert next(stream) == "a"
+    assert limiter.stats()["in_flight"] == 1
+    assert not limiter._semaphore.acquire(blocking=False)
+    
+    stream.close()
+    assert closed == [True]
+    assert limiter.stats()["in_flight"] == 0
+    assert list(limiter.stream(Events)) == ["a", "b", "c"]
+
+
+def test_la_pausa_se_espera_sin_ocupar_el_lugar_de_concurrencia():
+    limiter = RateLimiter(max_concurrency=1)
+    limiter.record_rate_limited(retry_after=0.2)
+    entered = threading.Event()
+    
+    def paused():
+        with limiter.slot():
+            entered.set()
+    
+    thread = threading.Thread(target=paused)
+    thread.start()
+    time.sleep(0.05)
+    
+    # Durante la pausa el lugar sigue libre
+    assert not entered.is_set()
+    assert limiter._semaphore.acquire(blocking=False)
+    limiter._semaphore.release()
+    thread.join(5)
+    assert entered.is_set()
+
+
+def test_clasificacion_de_errores():
+    assert rate_limit_retry_after(FakeRateLimitError({"retry-after": "2"})) == (True, 2.0)
+    assert rate_limit_retry_after(FakeRateLimitError()) == (True, None)
+    assert rate_limit_retry_after(RuntimeError("boom")) == (False, None)
+    assert transient_error(FakeServerError())
+    assert transient_error(APIConnectionError()) and transient_error(TimeoutError())
+    assert not transient_error(FakeRateLimitError())
+    assert not transient_error(ValueError("bad request"))
+
+
+def test_limitador_compartido_por_key_y_modelo():
+    a = get_rate_limiter("sk-test", "gpt-4o-mini", max_concurrency=3)
+    b = get_rate_limiter("sk-test", "gpt-4o-mini")
+    c = get_rate_limiter("sk-test", "text-embedding-3-small")
+    
+    assert a is b
+    assert a is not c
+    assert b.max_concurrency == 3
@@ -0,0 +1,79 @@
+import threading
+import time
+import pytest
+
+from RAGcipies.src.concurrency.singleflight import SingleFlight
+
+
+def run_concurrently(n, target):
+    results, errors = [None] * n, [None] * n
+    
+    def worker(i):
+        try:
+            results[i] = target()
+        except Exception as e:
+            errors[i] = e
+    
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    return results, errors
+
+
+def test_llamadas_identicas_comparten_una_ejecucion():
+    flight = SingleFlight()
+    calls = []
+    
+    def slow():
+        calls.append(1)
+        time.sleep(0.1)
+        return "valor"
+    
+    results, errors = run_concurrently(8, lambda: flight.do("k", slow))
+    
+    assert len(calls) == 1
+    assert [r[0] for r in results] == ["valor"] * 8
+    assert sum(shared for _, shared in results) == 7
+    assert flight.stats()["shared"] == 7
+
+
+def test_claves_distintas_no_se_unen():
+    flight = SingleFlight()
+    
+    assert flight.do("a", lambda: 1) == (1, False)
+    assert flight.do("b", lambda: 2) == (2, False)
+    assert flight.stats()["executions"] == 2
+
+
+def test_error_se_propaga_a_todos():
+    flight = SingleFlight()
+    
+    def failing():
+        time.sleep(0.1)
+        raise RuntimeError("backend caído")
+    
+    _, errors = run_concurrently(4, lambda: flight.do("k", failing))
+    
+    assert all(isinstance(e, RuntimeError) for e in errors)
+    assert flight.in_flight() == 0
+    assert flight.do("k", lambda: "ok") == ("ok", False)
+
+
+def test_timeout_no_deja_waiters():
+    flight = SingleFlight()
+    release = threading.Event()
+    leader = threading.Thread(target=lambda: flight.do("k", lambda: release.wait(5)))
+    leader.start()
+    while flight.in_flight() == 0:
+        time.sleep(0.01)
+    
+    with pytest.raises(TimeoutError):
+        flight.do("k", lambda: None, timeout=0.05)
+    assert flight.stats()["waiting"] == 0
+    assert flight.stats()["timeouts"] == 1
+    
+    release.set()
+    leader.join(5)
+    assert flight.in_flight() == 0
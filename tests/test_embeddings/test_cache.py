@@ -0,0 +1,92 @@
+import threading
+import pytest
+
+from RAGcipies.src.rag.embeddings.cache import EmbeddingCache, normalize_query, model_cache_key
+from RAGcipies.src.rag.embeddings.coalescing import SingleFlightEmbeddingModel
+
+
+def test_normalize_query_colapsa_espacios():
+    assert normalize_query("  Receta   con\tPollo ") == "Receta con Pollo"
+    assert normalize_query("  Receta   con\tPollo ", casefold=True) == "receta con pollo"
+
+
+def test_model_cache_key_incluye_clase_y_modelo(fake_model, ollama_model):
+    assert model_cache_key(fake_model) == "FakeEmbeddingModel:default"
+    assert model_cache_key(ollama_model) == "OllamaEmbeddingModel:nomic-embed-text"
+    # Los wrappers comparten la clave del modelo que envuelven
+    assert model_cache_key(SingleFlightEmbeddingModel(ollama_model)) == "OllamaEmbeddingModel:nomic-embed-text"
+
+
+def test_get_or_compute_cachea_por_query_normalizada(fake_model):
+    cache = EmbeddingCache(max_size=4)
+    
+    emb1, hit1 = cache.get_or_compute(fake_model, "pollo al curry")
+    emb2, hit2 = cache.get_or_compute(fake_model, "  pollo al   curry")
+    _, hit3 = cache.get_or_compute(fake_model, "Pollo al CURRY")
+    
+    assert hit1 is False
+    assert hit2 is True
+    assert hit3 is False  # las mayúsculas cambian el embedding
+    assert emb1 == emb2
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_casefold_opcional(fake_model):
+    cache = EmbeddingCache(casefold=True)
+    cache.get_or_compute(fake_model, "pollo al curry")
+    
+    assert cache.get_or_compute(fake_model, "Pollo al CURRY")[1] is True
+
+
+def test_evicta_la_entrada_menos_usada():
+    cache = EmbeddingCache(max_size=2)
+    cache.put("m", "a", [1.0])
+    cache.put("m", "b", [2.0])
+    cache.get("m", "a")
+    cache.put("m", "c", [3.0])
+    
+    assert cache.get("m", "b") is None
+    assert cache.get("m", "a") == [1.0]
+    assert cache.get("m", "c") == [3.0]
+    assert cache.stats()["evictions"] == 1
+    assert len(cache) == 2
+
+
+def test_modelos_distintos_no_comparten_entradas():
+    cache = EmbeddingCache()
+    cache.put("modelo_a", "pollo", [1.0])
+    
+    assert cache.get("modelo_b", "pollo") is None
+
+
+def test_copia_devuelta_no_modifica_el_cache():
+    cache = EmbeddingCache()
+    cache.put("m", "pollo", [1.0, 2.0])
+    
+    vector = cache.get("m", "pollo")
+    vector.append(3.0)
+    
+    assert cache.get("m", "pollo") == [1.0, 2.0]
+
+
+def test_max_size_invalido():
+    with pytest.raises(ValueError, match="max_size"):
+        EmbeddingCache(max_size=0)
+
+
+def test_acceso_concurrente_respeta_limite():
+    cache = EmbeddingCache(max_size=16)
+    
+    def worker(offset):
+        for i in range(200):
+            cache.put("m", f"q{(i + offset) % 40}", [float(i)])
+            cache.get("m", f"q{i % 40}")
+    
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    
+    assert len(cache) == 16
@@ -1,3 +1,6 @@
+import pytest
+
+from RAGcipies.src.rag.embeddings import factory
 from RAGcipies.src.rag.embeddings.fake import FakeEmbeddingModel
 from RAGcipies.src.rag.embeddings.factory import (
     create_embedding_model,
@@ -26,3 +29,12 @@ def test_embedding_backend_enum():
     assert EmbeddingBackend.OPENAI.value == "openai"
     assert EmbeddingBackend.OLLAMA.value == "ollama"
 
+
+def test_dependencia_faltante_sugiere_el_paquete_del_backend(monkeypatch):
+    def missing(backend):
+        raise ImportError("cannot import name 'Session'")  # ImportError.name es None
+    
+    monkeypatch.setattr(factory._EMBEDDING_REGISTRY, "get", missing)
+    
+    with pytest.raises(ValueError, match="pip install requests$"):
+        create_embedding_model(EmbeddingBackend.OLLAMA)
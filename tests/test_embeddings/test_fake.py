@@ -1,5 +1,6 @@
 import pytest
 import math
+from RAGcipies.src.rag.embeddings.fake import FakeEmbeddingModel
 
 
 
@@ -66,3 +67,26 @@ def test_embed_texto_con_unicode(fake_model, sample_texts):
         assert len(embedding) > 0
         assert all(isinstance(x, float) for x in embedding)
 
+
+
+@pytest.mark.parametrize("dimension", [8, 32, 768, 1536])
+def test_dimension_configurable_y_normalizada(dimension):
+    model = FakeEmbeddingModel(dimension=dimension)
+    embedding = model.embed("pollo al curry")
+    
+    assert len(embedding) == dimension
+    assert abs(math.sqrt(sum(x * x for x in embedding)) - 1.0) < 1e-6
+
+
+def test_embed_batch_vectorizado_coincide_con_embed():
+    model = FakeEmbeddingModel(dimension=768)
+    texts = ["pollo al curry", "ensalada de frutas", ""]
+    
+    assert model.embed_batch(texts) == [model.embed(text) for text in texts]
+    assert model.embed_matrix(texts).shape == (3, 768)
+    assert model.embed_batch([]) == []
+
+
+def test_dimension_invalida():
+    with pytest.raises(ValueError):
+        FakeEmbeddingModel(dimension=0)
@@ -99,3 +99,36 @@ def test_embed_timeout_configurado(mock_ollama_post_success):
     
     call_args = mock_ollama_post_success.call_args
     assert call_args[1]["timeout"] == 60
+
+
+def test_embed_batch_usa_api_embed(ollama_model):
+    from unittest.mock import Mock, patch
+
+    with patch('RAGcipies.src.rag.embeddings.ollama.requests.post') as mock_post:
+        mock_response = Mock()
+        mock_response.json.return_value = {"embeddings": [[0.1, 0.2], [0.3, 0.4]]}
+        mock_response.raise_for_status = Mock()
+        mock_post.return_value = mock_response
+
+        result = ollama_model.embed_batch(["pollo", "arroz"])
+
+    assert result == [[0.1, 0.2], [0.3, 0.4]]
+    mock_post.assert_called_once()
+    assert mock_post.call_args[0][0] == "http://localhost:11434/api/embed"
+    assert mock_post.call_args[1]["json"] == {"model": "nomic-embed-text", "input": ["pollo", "arroz"]}
+
+
+def test_embed_batch_respuesta_incompleta(mock_ollama_post_empty_response, ollama_model):
+    with pytest.raises(RuntimeError, match="no contiene embeddings válidos"):
+        ollama_model.embed_batch(["pollo", "arroz"])
+
+
+def test_warmup_mantiene_el_modelo_cargado(mock_ollama_post_success, ollama_model):
+    from RAGcipies.src.rag.embeddings.ollama import OllamaEmbeddingModel, WARMUP_KEEP_ALIVE
+    
+    ollama_model.warmup()
+    assert mock_ollama_post_success.call_args[0][0] == "http://localhost:11434/api/embed"
+    assert mock_ollama_post_success.call_args[1]["json"]["keep_alive"] == WARMUP_KEEP_ALIVE
+    
+    OllamaEmbeddingModel(keep_alive="1h").warmup()
+    assert mock_ollama_post_success.call_args[1]["json"]["keep_alive"] == "1h"
@@ -0,0 +1,29 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+from RAGcipies.src.rag.embeddings.openai import OpenAIEmbeddingModel
+from RAGcipies.src.concurrency.ratelimit import RateLimiter
+
+
+def embeddings_response(vectors, total_tokens):
+    return SimpleNamespace(
+        data=[SimpleNamespace(index=i, embedding=vector) for i, vector in enumerate(vectors)],
+        usage=SimpleNamespace(total_tokens=total_tokens),
+    )
+
+
+@pytest.fixture
+def model(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    client = OpenAIEmbeddingModel(rate_limiter=RateLimiter(tokens_per_minute=10_000))
+    client.client = Mock()
+    return client
+
+
+def test_corrige_el_bucket_con_el_usage_real(model):
+    model.client.embeddings.create.return_value = embeddings_response([[1.0, 0.0], [0.0, 1.0]], 500)
+    
+    assert model.embed_batch(["pollo", "arroz"]) == [[1.0, 0.0], [0.0, 1.0]]
+    # Se reservaron pocos tokens estimados pero la API informó 500
+    assert model.rate_limiter.tokens.available() == pytest.approx(9_500, abs=20)
@@ -0,0 +1,119 @@
+import json
+import math
+import pytest
+
+from RAGcipies.src.rag.embeddings.fake import FakeEmbeddingModel
+from RAGcipies.src.rag.evaluation import (
+    LabelledQuery,
+    RetrievalEvaluator,
+    format_reports,
+    load_labelled_queries,
+    ndcg_at_k,
+    recall_at_k,
+    reciprocal_rank,
+)
+from RAGcipies.src.rag.models import Chunk
+from RAGcipies.src.rag.vector_store import InMemoryVectorStore, MultiVectorStore
+
+
+class TruncatingStore(InMemoryVectorStore):
+    """Store "aproximado" que solo devuelve el mejor resultado."""
+    
+    def search(self, query_embedding, k=3, min_score=0.0):
+        return super().search(query_embedding, k=1, min_score=min_score)
+
+
+@pytest.fixture
+def evaluator():
+    model = FakeEmbeddingModel()
+    texts = {"1": "pollo al horno", "2": "arroz con verduras", "3": "tarta de queso"}
+    chunks = [
+        Chunk(id=f"chunk_{doc_id}", document_id=doc_id, text=text, embedding=model.embed(text))
+        for doc_id, text in texts.items()
+    ]
+    # Cada consulta es el texto exacto de su receta: la búsqueda exacta la pone primera
+    queries = [LabelledQuery(query=text, relevant={doc_id: 1.0}) for doc_id, text in texts.items()]
+    return RetrievalEvaluator(model, chunks, queries, k_values=(1, 3))
+
+
+def test_metricas_de_ranking():
+    relevant = {"a": 2.0, "b": 1.0}
+    
+    assert recall_at_k(["x", "a", "b"], relevant, 2) == 0.5
+    assert reciprocal_rank(["x", "a", "b"], relevant) == 0.5
+    assert reciprocal_rank(["x", "y"], relevant) == 0.0
+    assert ndcg_at_k(["a", "b"], relevant, 2) == pytest.approx(1.0)
+    expected = (1 / math.log2(3) + 3 / math.log2(4)) / (3 + 1 / math.log2(3))
+    assert ndcg_at_k(["x", "b", "a"], relevant, 3) == pytest.approx(expected)
+
+
+def test_busqueda_exacta_es_perfecta(evaluator):
+    exact, = evaluator.compare({})
+    
+    assert exact.name == "exact"
+    assert exact.recall_at_k == {1: 1.0, 3: 1.0}
+    assert exact.mrr == 1.0
+    assert exact.baseline_recall_at_k == {1: 1.0, 3: 1.0}
+    assert exact.latency_ms["p50"] > 0
+
+
+def test_store_aproximado_pierde_recall_contra_el_exacto(evaluator):
+    report = evaluator.evaluate("truncado", TruncatingStore)
+    
+    assert report.recall_at_k[1] == 1.0
+    assert report.baseline_recall_at_k[1] == 1.0
+    assert report.baseline_recall_at_k[3] == pytest.approx(1 / 3)
+    assert "truncado" in format_reports([report])
+
+
+
+def test_store_multi_vector_se_compara_por_receta():
+    model = FakeEmbeddingModel()
+    texts = {"1": ["pollo al horno", "pollo, papas"], "2": ["arroz con verduras", "arroz, zanahoria"],
+             "3": ["tarta de queso", "queso, harina"]}
+    chunks = [
+        Chunk(id=f"chunk_{doc_id}_{i}", document_id=doc_id, text=text, embedding=model.embed(text),
+              metadata={"field": f"seccion_{i}"})
+        for doc_id, sections in texts.items()
+        for i, text in enumerate(sections)
+    ]
+    queries = [LabelledQuery(query=sections[0], relevant={doc_id: 1.0}) for doc_id, sections in texts.items()]
+    evaluator = RetrievalEvaluator(model, chunks, queries, k_values=(1, 3))
+    
+    report = evaluator.evaluate("multi_vector", MultiVectorStore)
+    
+    # Los ids de los resultados son de documento: por chunk el acuerdo sería 0
+    assert report.recall_at_k[1] == 1.0
+    assert report.baseline_recall_at_k == {1: 1.0, 3: 1.0}
+
+
+def test_load_labelled_queries(tmp_path):
+    path = tmp_path / "queries.json"
+    path.write_text(json.dumps([
+        {"query": "pollo", "relevant": ["1"]},
+        {"query": "vegano", "relevant": {"2": 2, "5": 1}},
+    ]))
+    
+    queries = load_labelled_queries(path)
+    
+    assert queries[0].relevant == {"1": 1.0}
+    assert queries[1].relevant == {"2": 2.0, "5": 1.0}
+
+
+def test_load_labelled_queries_invalidas(tmp_path):
+    path = tmp_path / "queries.json"
+    path.write_text(json.dumps([{"query": "pollo", "relevant": []}]))
+    
+    with pytest.raises(ValueError):
+        load_labelled_queries(path)
+    with pytest.raises(FileNotFoundError):
+        load_labelled_queries(tmp_path / "no_existe.json")
+
+
+def test_consultas_etiquetadas_del_repo_apuntan_a_recetas_existentes():
+    from pathlib import Path
+    data = Path(__file__).resolve().parents[2] / "RAGcipies" / "data"
+    recipe_ids = {recipe["id"] for recipe in json.loads((data / "recipes.json").read_text(encoding="utf-8"))}
+    
+    for labelled in load_labelled_queries(data / "eval_queries.json"):
+        assert set(labelled.relevant) <= recipe_ids
@@ -0,0 +1,72 @@
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+
+from RAGcipies.src.lazy import LazyRegistry, lazy_exports
+from RAGcipies.src.rag.vector_store import factory as vector_store_factory
+from RAGcipies.src.rag.vector_store.factory import create_vector_store, VectorStoreBackend
+
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def test_pipeline_fake_no_importa_sdks_pesados():
+    code = (
+        "import sys\n"
+        "from RAGcipies.src.rag.pipeline import RAGPipeline\n"
+        "from RAGcipies.src.rag.vector_store import create_vector_store, VectorStoreBackend\n"
+        "import RAGcipies.src.rag, RAGcipies.src.llm\n"
+        "RAGPipeline(create_vector_store(VectorStoreBackend.IN_MEMORY)).query('pollo')\n"
+        "print(','.join(m for m in ('openai', 'requests', 'chromadb', 'httpx', 'tiktoken') if m in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    
+    assert result.stdout.strip() == ""
+
+
+def test_arranque_dentro_del_presupuesto():
+    # benchmarks/import_time.py sale con 1 si se supera DEFAULT_BUDGET_MS o se importa un SDK pesado
+    result = subprocess.run(
+        [sys.executable, str(ROOT / "benchmarks" / "import_time.py"), "--runs", "3"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    
+    assert result.returncode == 0, result.stdout + result.stderr
+
+
+def test_registry_resuelve_en_el_primer_uso():
+    registry = LazyRegistry("RAGcipies.src.rag.vector_store", {"mem": ".in_memory:InMemoryVectorStore"})
+    
+    assert not registry.is_loaded("mem")
+    assert registry.get("mem").__name__ == "InMemoryVectorStore"
+    assert registry.is_loaded("mem")
+    assert registry.get("otro") is None
+
+
+def test_backend_sin_dependencia_instalada(monkeypatch):
+    registry = LazyRegistry(vector_store_factory.__package__, {
+        VectorStoreBackend.CHROMADB: "modulo_que_no_existe_xyz:Store",
+    })
+    monkeypatch.setattr(vector_store_factory, "_VECTOR_STORE_REGISTRY", registry)
+    
+    with pytest.raises(ValueError, match="pip install chromadb"):
+        create_vector_store(VectorStoreBackend.CHROMADB)
+
+
+def test_lazy_exports_devuelve_none_si_falta_la_dependencia():
+    namespace = {"__name__": "RAGcipies.src.rag"}
+    getattr_ = lazy_exports(namespace, {"Faltante": "modulo_que_no_existe_xyz:Clase"})
+    
+    assert getattr_("Faltante") is None
+    assert namespace["Faltante"] is None
+    with pytest.raises(AttributeError):
+        getattr_("OtroNombre")
+
+
+def test_exports_diferidos_siguen_disponibles():
+    from RAGcipies.src.rag.vector_store import ChromaDBVectorStore
+    from RAGcipies.src.llm import OllamaLLM
+    
+    assert ChromaDBVectorStore.__name__ == "ChromaDBVectorStore"
+    assert OllamaLLM.__name__ == "OllamaLLM"
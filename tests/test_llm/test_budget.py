@@ -0,0 +1,84 @@
+import pytest
+
+from RAGcipies.src.rag.models import Chunk
+from RAGcipies.src.rag.vector_store import ScoredChunk
+from RAGcipies.src.llm.prompt.budget import pack_context
+from RAGcipies.src.llm.prompt.builder import PromptBuilder
+from RAGcipies.src.llm.prompt.tokens import CharRatioTokenEstimator, TokenEstimator
+
+
+class WordEstimator(TokenEstimator):
+    def count(self, text):
+        return len(text.split())
+
+
+def scored(chunk_id, document_id, text, score):
+    return ScoredChunk(Chunk(id=chunk_id, document_id=document_id, text=text, embedding=[1.0]), score)
+
+
+@pytest.fixture
+def chunks():
+    return [
+        scored("c2", "2", "Arroz con verduras. Saltear todo. Servir caliente.", 0.7),
+        scored("c1", "1", "Pollo al curry con arroz basmati.", 0.9),
+        scored("c1b", "1", "Pollo al curry (duplicado).", 0.8),
+        scored("c3", "3", "Ensalada de frutas frescas.", 0.5),
+    ]
+
+
+def test_incluye_todo_si_entra(chunks):
+    packed = pack_context(chunks, max_tokens=1000, estimator=WordEstimator())
+    
+    assert [sc.chunk.id for sc in packed.scored_chunks] == ["c1", "c2", "c3"]
+    assert packed.duplicates_dropped == 1
+    assert packed.tokens_saved == 4  # el duplicado
+    assert packed.truncated_ids == []
+
+
+def test_trunca_en_limite_de_oracion_y_corta(chunks):
+    # c1 = 6 palabras, c2 = 7 palabras: quedan 5 para c2
+    packed = pack_context(chunks, max_tokens=11, estimator=WordEstimator(), min_chunk_tokens=2)
+    
+    ids = [sc.chunk.id for sc in packed.scored_chunks]
+    assert ids == ["c1", "c2"]
+    assert packed.scored_chunks[1].chunk.text == "Arroz con verduras. Saltear todo."
+    assert packed.scored_chunks[1].chunk.metadata["truncated"] is True
+    assert packed.truncated_ids == ["c2"]
+    assert packed.tokens_used == 11
+    # El chunk original del store no se modifica
+    assert chunks[0].chunk.text.endswith("Servir caliente.")
+    assert packed.tokens_saved == 6 + 7 + 4 + 4 - 11
+
+
+def test_no_trunca_si_queda_poco_presupuesto(chunks):
+    packed = pack_context(chunks, max_tokens=8, estimator=WordEstimator(), min_chunk_tokens=5)
+    
+    assert [sc.chunk.id for sc in packed.scored_chunks] == ["c1"]
+
+
+def test_saltea_el_chunk_que_no_se_puede_truncar():
+    chunks = [
+        scored("largo", "1", "x" * 400, 0.9),
+        scored("corto", "2", "corto.", 0.5),
+    ]
+    packed = pack_context(chunks, max_tokens=50, estimator=CharRatioTokenEstimator())
+    
+    # Sin límite de oración no se trunca, pero los siguientes que entran se incluyen
+    assert [sc.chunk.id for sc in packed.scored_chunks] == ["corto"]
+    assert packed.truncated_ids == []
+
+
+def test_presupuesto_invalido(chunks):
+    with pytest.raises(ValueError):
+        pack_context(chunks, max_tokens=0, estimator=WordEstimator())
+
+
+def test_builder_aplica_presupuesto(chunks):
+    estimator = CharRatioTokenEstimator()
+    unlimited = PromptBuilder().build("q", chunks)
+    prompt, packed = PromptBuilder(max_context_tokens=10, token_estimator=estimator).build_with_report("q", chunks)
+    
+    assert len(prompt) < len(unlimited)
+    assert "duplicado" not in prompt
+    assert packed.tokens_saved > 0
+
@@ -0,0 +1,14 @@
+import pytest
+
+from RAGcipies.src.llm import factory
+from RAGcipies.src.llm.factory import create_llm_client, LLMBackend
+
+
+def test_dependencia_faltante_sugiere_el_paquete_del_backend(monkeypatch):
+    def missing(backend):
+        raise ImportError("cannot import name 'OpenAI'")  # ImportError.name es None
+    
+    monkeypatch.setattr(factory._LLM_REGISTRY, "get", missing)
+    
+    with pytest.raises(ValueError, match="pip install openai$"):
+        create_llm_client(LLMBackend.OPENAI)
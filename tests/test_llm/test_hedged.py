@@ -0,0 +1,124 @@
+import threading
+import time
+import pytest
+
+from RAGcipies.src.llm.base import LLMClient
+from RAGcipies.src.llm.hedged import HedgedLLM
+from RAGcipies.src.llm.factory import create_llm_client, parse_hedged_backends, LLMBackend
+from RAGcipies.src.llm.ollama import OllamaLLM
+
+
+class FakeBackend(LLMClient):
+    def __init__(self, answer, delay=0.0, error=None):
+        self.answer = answer
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.closed = threading.Event()
+    
+    def generate(self, prompt, **kwargs):
+        return "".join(self.generate_stream(prompt, **kwargs))
+    
+    def generate_stream(self, prompt, **kwargs):
+        self.calls += 1
+        try:
+            time.sleep(self.delay)
+            if self.error:
+                raise RuntimeError(self.error)
+            for word in self.answer.split(" "):
+                yield word + " "
+                time.sleep(0.01)
+        finally:
+            self.closed.set()
+
+
+def test_primario_rapido_no_duplica():
+    primary, secondary = FakeBackend("hola"), FakeBackend("otro")
+    llm = HedgedLLM([primary, secondary], initial_hedge_delay=1.0)
+    
+    assert llm.generate("prompt") == "hola"
+    assert secondary.calls == 0
+    assert llm.stats()["hedges"] == 0
+
+
+def test_primario_lento_dispara_hedge_y_cancela_al_perdedor():
+    slow, fast = FakeBackend("lento con muchas palabras", delay=0.3), FakeBackend("rapido")
+    llm = HedgedLLM([slow, fast], initial_hedge_delay=0.05)
+    
+    started = time.monotonic()
+    assert llm.generate("prompt") == "rapido"
+    assert time.monotonic() - started < 0.3
+    
+    assert slow.closed.wait(2)
+    stats = llm.stats()
+    assert stats["hedges"] == 1
+    assert stats["wins"] == [0, 1]
+
+
+def test_fallback_en_error():
+    broken, backup = FakeBackend("x", error="host caído"), FakeBackend("respaldo")
+    llm = HedgedLLM([broken, backup], initial_hedge_delay=5.0)
+    
+    assert llm.generate("prompt") == "respaldo"
+    assert llm.stats()["fallbacks"] == 1
+
+
+def test_todos_fallan():
+    llm = HedgedLLM([FakeBackend("a", error="uno"), FakeBackend("b", error="dos")])
+    
+    with pytest.raises(RuntimeError, match="fallaron todos los backends.*uno.*dos"):
+        llm.generate("prompt")
+
+
+def test_deadline():
+    llm = HedgedLLM([FakeBackend("a", delay=1.0)], deadline=0.1)
+    
+    with pytest.raises(RuntimeError, match="deadline"):
+        llm.generate("prompt")
+    assert llm.stats()["deadline_exceeded"] == 1
+
+
+def test_hedge_delay_usa_el_percentil_observado():
+    llm = HedgedLLM([FakeBackend("a")], initial_hedge_delay=3.0, min_samples=5, min_hedge_delay=0.0)
+    assert llm.hedge_delay() == 3.0
+    
+    for _ in range(5):
+        llm.generate("prompt")
+    assert llm.hedge_delay() < 1.0
+
+
+def test_stream_emite_el_ganador():
+    slow, fast = FakeBackend("lento", delay=0.5), FakeBackend("uno dos tres")
+    llm = HedgedLLM([slow, fast], initial_hedge_delay=0.05)
+    
+    assert "".join(llm.generate_stream("prompt")).split() == ["uno", "dos", "tres"]
+
+
+def test_prompt_vacio():
+    with pytest.raises(ValueError, match="vacío"):
+        HedgedLLM([FakeBackend("a")]).generate("  ")
+
+
+def test_factory_desde_especificacion(monkeypatch):
+    monkeypatch.setenv("LLM_HEDGE_BACKENDS", "ollama:llama3@http://gpu-1:11434, ollama@http://gpu-2:11434,dummy")
+    monkeypatch.setenv("LLM_HEDGE_DEADLINE", "30")
+    
+    llm = create_llm_client(LLMBackend.HEDGED)
+    
+    assert isinstance(llm, HedgedLLM)
+    assert llm.deadline == 30.0
+    first, second, third = llm.backends
+    assert isinstance(first, OllamaLLM) and first.model == "llama3"
+    assert second.base_url == "http://gpu-2:11434"
+    assert third.__class__.__name__ == "DummyLLM"
+
+
+def test_especificacion_invalida():
+    with pytest.raises(ValueError, match="Backend inválido"):
+        parse_hedged_backends("ollama,claude")
+    with pytest.raises(ValueError, match="LLM_HEDGE_BACKENDS"):
+        parse_hedged_backends("")
+    with pytest.raises(ValueError, match="dummy no acepta model"):
+        parse_hedged_backends("dummy:x")
+    with pytest.raises(ValueError, match="openai no acepta base_url"):
+        parse_hedged_backends("openai@http://proxy:8080")
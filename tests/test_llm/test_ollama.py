@@ -0,0 +1,69 @@
+import pytest
+from unittest.mock import Mock, patch
+
+from RAGcipies.src.llm.ollama import OllamaLLM, WARMUP_KEEP_ALIVE
+from RAGcipies.src.llm.dummy import DummyLLM
+
+
+@pytest.fixture
+def mock_post():
+    response = Mock()
+    response.json.return_value = {"response": " Hola "}
+    response.raise_for_status = Mock()
+    with patch("RAGcipies.src.llm.ollama.requests.post", return_value=response) as post:
+        yield post
+
+
+def test_generate_envia_system_separado(mock_post):
+    llm = OllamaLLM(model="llama3")
+    
+    assert llm.generate("contexto y pregunta", system="Eres un chef") == "Hola"
+    payload = mock_post.call_args.kwargs["json"]
+    assert payload["system"] == "Eres un chef"
+    assert payload["prompt"] == "contexto y pregunta"
+
+
+def test_generate_sin_opciones_no_envia_campos_extra(mock_post):
+    OllamaLLM().generate("hola")
+    payload = mock_post.call_args.kwargs["json"]
+    
+    assert "system" not in payload
+    assert "keep_alive" not in payload
+    assert payload["options"] == {"temperature": 0.7}
+
+
+def test_keep_alive_y_num_ctx(mock_post):
+    OllamaLLM(keep_alive="30m", num_ctx=4096).generate("hola")
+    payload = mock_post.call_args.kwargs["json"]
+    
+    assert payload["keep_alive"] == "30m"
+    assert payload["options"]["num_ctx"] == 4096
+
+
+def test_warmup_mantiene_el_modelo_cargado(mock_post):
+    OllamaLLM(num_ctx=4096).warmup()
+    payload = mock_post.call_args.kwargs["json"]
+    
+    assert "prompt" not in payload
+    assert payload["keep_alive"] == WARMUP_KEEP_ALIVE
+    assert payload["options"]["num_ctx"] == 4096
+    
+    OllamaLLM(keep_alive=-1).warmup()
+    assert mock_post.call_args.kwargs["json"]["keep_alive"] == -1
+
+
+def test_factory_lee_keep_alive_de_env(monkeypatch):
+    from RAGcipies.src.llm.factory import create_llm_client, LLMBackend
+    monkeypatch.setenv("OLLAMA_KEEP_ALIVE", "-1")
+    monkeypatch.setenv("OLLAMA_NUM_CTX", "8192")
+    
+    llm = create_llm_client(LLMBackend.OLLAMA)
+    
+    assert llm.keep_alive == -1
+    assert llm.num_ctx == 8192
+
+
+def test_dummy_antepone_system():
+    response = DummyLLM().generate("pregunta", system="SISTEMA")
+    
+    assert "SISTEMA\n\npregunta" in response
@@ -0,0 +1,58 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+from RAGcipies.src.llm.openai import OpenAILLM
+from RAGcipies.src.concurrency.ratelimit import RateLimiter, RateLimitExceeded
+
+
+class FakeRateLimitError(Exception):
+    status_code = 429
+    response = SimpleNamespace(status_code=429, headers={"retry-after-ms": "10"})
+
+
+def completion(text, total_tokens=42):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=text))],
+        usage=SimpleNamespace(total_tokens=total_tokens),
+    )
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    client = OpenAILLM(rate_limiter=RateLimiter(tokens_per_minute=10_000), max_retries=2)
+    client.client = Mock()
+    return client
+
+
+def test_reintenta_429_y_devuelve_la_respuesta(llm):
+    llm.client.chat.completions.create.side_effect = [FakeRateLimitError(), completion(" hola ")]
+    
+    assert llm.generate("pregunta") == "hola"
+    assert llm.rate_limiter.stats()["retries"] == 1
+
+
+def test_429_persistente(llm):
+    llm.client.chat.completions.create.side_effect = FakeRateLimitError()
+    
+    with pytest.raises(RateLimitExceeded):
+        llm.generate("pregunta")
+
+
+def test_error_no_429_sigue_siendo_runtime_error(llm):
+    llm.client.chat.completions.create.side_effect = ValueError("bad request")
+    
+    with pytest.raises(RuntimeError, match="Error al generar respuesta con OpenAI"):
+        llm.generate("pregunta")
+
+
+def test_reintenta_errores_del_servidor(llm):
+    class ServerError(Exception):
+        status_code = 502
+    
+    llm.rate_limiter.base_backoff = 0.001
+    llm.client.chat.completions.create.side_effect = [ServerError(), completion(" hola ")]
+    
+    assert llm.generate("pregunta") == "hola"
+    assert llm.rate_limiter.stats()["transient_errors"] == 1
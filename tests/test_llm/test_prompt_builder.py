@@ -0,0 +1,124 @@
+import os
+import pytest
+from unittest.mock import patch
+
+from RAGcipies.src.llm.prompt import builder as builder_module
+from RAGcipies.src.llm.prompt.builder import PromptBuilder, build_prompt, clear_template_cache
+from RAGcipies.src.rag.models import Chunk
+from RAGcipies.src.rag.vector_store import ScoredChunk
+
+
+TEMPLATE = """
+system_instruction: "Sistema"
+instructions: "- Instrucción"
+context_header: "CONTEXTO:"
+no_context_message: "Sin contexto"
+include_scores: false
+chunk_separator: "\\n--\\n"
+"""
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    clear_template_cache()
+    yield
+    clear_template_cache()
+
+
+@pytest.fixture
+def template_file(tmp_path):
+    path = tmp_path / "prompt.yaml"
+    path.write_text(TEMPLATE, encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def scored_chunks():
+    return [
+        ScoredChunk(Chunk(id="c1", document_id="1", text="Pollo al curry", embedding=[1.0]), 0.91),
+        ScoredChunk(Chunk(id="c2", document_id="2", text="Arroz", embedding=[1.0]), 0.5),
+    ]
+
+
+def test_build_layout(template_file, scored_chunks):
+    prompt = PromptBuilder(str(template_file)).build("¿qué cocino?", scored_chunks, include_scores=True)
+    
+    assert prompt == (
+        "Sistema\n\n"
+        "CONTEXTO:\n\n"
+        "[Relevancia: 0.91]\nReceta 1:\nPollo al curry\n--\n"
+        "[Relevancia: 0.50]\nReceta 2:\nArroz\n\n"
+        "INSTRUCCIONES:\n- Instrucción\n\n"
+        "PREGUNTA DEL USUARIO:\n¿qué cocino?\n\n"
+        "RESPUESTA:"
+    )
+
+
+def test_build_sin_contexto(template_file):
+    prompt = PromptBuilder(str(template_file)).build("hola", [])
+    
+    assert prompt.startswith("Sistema\n\nSin contexto\n\nINSTRUCCIONES:")
+
+
+def test_template_se_parsea_una_sola_vez(template_file, scored_chunks):
+    with patch.object(builder_module.yaml, "safe_load", wraps=builder_module.yaml.safe_load) as safe_load:
+        for _ in range(5):
+            PromptBuilder(str(template_file))
+        for _ in range(5):
+            build_prompt("q", scored_chunks, template_path=str(template_file))
+    
+    assert safe_load.call_count == 1
+
+
+def test_recarga_cuando_el_archivo_cambia(template_file):
+    builder = PromptBuilder(str(template_file), reload_interval=0)
+    assert builder.build("q", []).startswith("Sistema")
+    
+    template_file.write_text(TEMPLATE.replace('"Sistema"', '"Nuevo sistema"'), encoding="utf-8")
+    stat = template_file.stat()
+    os.utime(template_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    
+    assert builder.build("q", []).startswith("Nuevo sistema")
+    assert builder.template["system_instruction"] == "Nuevo sistema"
+
+
+def test_sin_recarga(template_file):
+    builder = PromptBuilder(str(template_file), reload_interval=None)
+    template_file.write_text(TEMPLATE.replace('"Sistema"', '"Otro"'), encoding="utf-8")
+    stat = template_file.stat()
+    os.utime(template_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    
+    assert builder.build("q", []).startswith("Sistema")
+
+
+def test_template_inexistente(tmp_path):
+    with pytest.raises(FileNotFoundError, match="Template no encontrado"):
+        PromptBuilder(str(tmp_path / "no_existe.yaml"))
+
+
+def test_template_por_defecto():
+    prompt = PromptBuilder().build("algo vegano", [])
+    
+    assert prompt.startswith("Eres un asistente de cocina experto.")
+    assert prompt.endswith("algo vegano\n\nRESPUESTA:")
+
+
+def test_build_parts_system_estatico(template_file, scored_chunks):
+    builder = PromptBuilder(str(template_file))
+    parts_a, _ = builder.build_parts("pollo", scored_chunks)
+    parts_b, _ = builder.build_parts("otra pregunta", scored_chunks[:1])
+    
+    assert parts_a.system == parts_b.system
+    assert parts_a.system.startswith("Sistema")
+    assert "- Instrucción" in parts_a.system
+    assert "Pollo al curry" not in parts_a.system
+
+
+def test_build_parts_user_contiene_contexto_y_query(template_file, scored_chunks):
+    parts, packed = PromptBuilder(str(template_file)).build_parts("pollo", scored_chunks)
+    
+    assert packed is None
+    assert parts.user.startswith("CONTEXTO:")
+    assert "Pollo al curry" in parts.user
+    assert "- Instrucción" not in parts.user
+    assert parts.user.endswith("pollo\n\nRESPUESTA:")
@@ -0,0 +1,98 @@
+import threading
+from unittest.mock import patch
+
+from RAGcipies.src.concurrency.ratelimit import RateLimiter
+from RAGcipies.src.llm.dummy import DummyLLM
+from RAGcipies.src.llm.hedged import HedgedLLM
+from RAGcipies.src.metrics import REGISTRY
+from RAGcipies.src.rag.embeddings.fake import FakeEmbeddingModel
+from RAGcipies.src.rag.models import Chunk
+from RAGcipies.src.rag.pipeline import RAGPipeline
+from RAGcipies.src.rag.vector_store.in_memory import InMemoryVectorStore
+from tests.test_concurrency.test_ratelimit import FakeRateLimitError
+from tests.test_llm.test_hedged import FakeBackend
+
+
+def value(name, **labels):
+    metric = REGISTRY.get(name)
+    if metric is None:
+        return 0
+    return metric.labels(**labels).get() if labels else metric.get()
+
+
+def test_llm_cuenta_llamadas_del_backend():
+    labels = {"backend": "DummyLLM", "model": "unknown"}
+    before = value("llm_requests_total", **labels)
+    
+    DummyLLM().generate("hola")
+    
+    assert value("llm_requests_total", **labels) == before + 1
+    assert value("llm_request_duration_seconds", **labels)["count"] >= 1
+
+
+def test_micro_batching_cuenta_llamadas_reales_al_modelo():
+    model = FakeEmbeddingModel()
+    store = InMemoryVectorStore()
+    store.add_chunks([
+        Chunk(id=f"c{i}", document_id=f"r{i}", text=text, embedding=model.embed(text))
+        for i, text in enumerate(["pollo al curry", "ensalada de garbanzos", "torta vegana"])
+    ])
+    pipeline = RAGPipeline(vector_store=store, top_k=1, batch_max_size=8, batch_max_wait_ms=100)
+    labels = {"backend": "FakeEmbeddingModel", "model": "unknown"}
+    calls_before = value("embedding_requests_total", **labels)
+    texts_before = value("embedding_texts_total", **labels)
+    barrier = threading.Barrier(4)
+    
+    def worker(query):
+        barrier.wait()
+        pipeline.query(query)
+    
+    try:
+        with patch.object(pipeline.embedding_model, "embed_batch",
+                          wraps=pipeline.embedding_model.embed_batch) as embed_batch:
+            threads = [threading.Thread(target=worker, args=(q,))
+                       for q in ["pollo", "garbanzos", "vegana", "arroz"]]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join(5)
+    finally:
+        pipeline.close()
+    
+    # Una serie por llamada al backend, no por consulta
+    assert value("embedding_requests_total", **labels) - calls_before == embed_batch.call_count
+    assert embed_batch.call_count < 4
+    assert value("embedding_texts_total", **labels) - texts_before == 4
+
+
+def test_hedged_publica_fallbacks_y_errores_por_backend():
+    broken, backup = FakeBackend("x", error="host caído"), FakeBackend("respaldo")
+    llm = HedgedLLM([broken, backup], initial_hedge_delay=5.0)
+    labels = {"backend": "FakeBackend", "model": "unknown"}
+    errors_before = value("llm_hedged_attempt_errors_total", **labels)
+    wins_before = value("llm_hedged_wins_total", **labels)
+    fallbacks_before = value("llm_hedged_events_total", event="fallbacks")
+    
+    assert llm.generate("prompt").strip() == "respaldo"
+    
+    assert value("llm_hedged_attempt_errors_total", **labels) == errors_before + 1
+    assert value("llm_hedged_wins_total", **labels) == wins_before + 1
+    assert value("llm_hedged_events_total", event="fallbacks") == fallbacks_before + 1
+
+
+def test_rate_limiter_publica_429_y_reintentos():
+    limiter = RateLimiter(base_backoff=0.001, name="test-metricas")
+    calls = []
+    
+    def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise FakeRateLimitError({"retry-after-ms": "1"})
+        return "ok"
+    
+    assert limiter.call(flaky) == "ok"
+    
+    assert value("ratelimit_rate_limited_total", limiter="test-metricas") == 1
+    assert value("ratelimit_retries_total", limiter="test-metricas") == 1
+    assert value("ratelimit_requests_total", limiter="test-metricas") == 2
+    assert value("ratelimit_in_flight", limiter="test-metricas") == 0
@@ -0,0 +1,56 @@
+from urllib.request import urlopen
+
+from RAGcipies.src.metrics import MetricsRegistry, render, start_metrics_server, instrument_pipeline
+from RAGcipies.src.rag.models import Chunk
+from RAGcipies.src.rag.vector_store.in_memory import InMemoryVectorStore
+from RAGcipies.src.rag.pipeline import RAGPipeline
+
+
+def test_render_formato_prometheus():
+    registry = MetricsRegistry()
+    registry.counter("llm_errors_total", "Errores", ["backend"]).labels(backend='a"b').inc(2)
+    registry.histogram("lat_seconds", "Latencia", buckets=(0.5,)).observe(0.25)
+    
+    text = render(registry)
+    
+    assert "# TYPE llm_errors_total counter" in text
+    assert 'llm_errors_total{backend="a\\"b"} 2' in text
+    assert 'lat_seconds_bucket{le="0.5"} 1' in text
+    assert 'lat_seconds_bucket{le="+Inf"} 1' in text
+    assert "lat_seconds_sum 0.25" in text
+    assert "lat_seconds_count 1" in text
+
+
+def test_servidor_expone_metrics():
+    registry = MetricsRegistry()
+    registry.counter("rag_queries_total", "Consultas").inc()
+    server = start_metrics_server(port=0, registry=registry)
+    try:
+        port = server.server_address[1]
+        with urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+            body = response.read().decode("utf-8")
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+        assert "rag_queries_total 1" in body
+    finally:
+        server.shutdown()
+
+
+def test_instrument_pipeline():
+    store = InMemoryVectorStore()
+    store.add_chunks([Chunk(id="c1", document_id="r1", text="pollo", embedding=[1.0, 0.0])])
+    pipeline = RAGPipeline(vector_store=store)
+    pipeline.embedding_model.embed = lambda text: [1.0, 0.0]
+    registry = MetricsRegistry()
+    instrument_pipeline(pipeline, registry=registry)
+    
+    pipeline.query("pollo")
+    pipeline.query("pollo")
+    
+    assert registry.get("rag_queries_total").get() == 2
+    assert registry.get("rag_embedding_cache_misses_total").get() == 1
+    assert registry.get("rag_embedding_cache_hits_total").get() == 1
+    assert registry.get("rag_queries_in_flight").get() == 0
+    assert registry.get("rag_query_duration_seconds").get()["count"] == 2
+    text = render(registry)
+    assert 'rag_vector_store_chunks{store="InMemoryVectorStore"} 1' in text
+    assert 'rag_generations_total{backend="DummyLLM"} 2' in text
@@ -0,0 +1,84 @@
+import threading
+import pytest
+
+from RAGcipies.src.metrics.registry import Metric, MetricsRegistry
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+def test_counter_suma_incrementos_de_varios_hilos(registry):
+    counter = registry.counter("queries_total", "queries")
+    
+    def worker():
+        for _ in range(1000):
+            counter.inc()
+    
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    
+    assert counter.get() == 8000
+    # Las celdas de hilos terminados se pliegan sin perder el valor
+    assert counter.get() == 8000
+
+
+def test_counter_no_acepta_negativos(registry):
+    with pytest.raises(ValueError):
+        registry.counter("c", "c").inc(-1)
+
+
+def test_metric_es_abstracta():
+    with pytest.raises(TypeError):
+        Metric("m", "m")
+
+
+def test_registro_idempotente(registry):
+    assert registry.counter("c", "c") is registry.counter("c", "c")
+    with pytest.raises(ValueError, match="ya está registrada"):
+        registry.gauge("c", "c")
+
+
+def test_labels(registry):
+    errors = registry.counter("llm_errors_total", "errores", ["backend"])
+    errors.labels(backend="OllamaLLM").inc()
+    errors.labels("OllamaLLM").inc()
+    errors.labels(backend="OpenAILLM").inc()
+    
+    series = {labels["backend"]: value for labels, value in errors.series()}
+    assert series == {"OllamaLLM": 2, "OpenAILLM": 1}
+    with pytest.raises(ValueError):
+        errors.labels(model="x")
+    with pytest.raises(ValueError):
+        errors.inc()
+
+
+def test_gauge_inc_dec_set_y_funcion(registry):
+    gauge = registry.gauge("in_flight", "en curso")
+    gauge.inc()
+    gauge.inc()
+    gauge.dec()
+    assert gauge.get() == 1
+    
+    gauge.set(10)
+    gauge.inc()
+    assert gauge.get() == 11
+    
+    items = [1, 2, 3]
+    gauge.set_function(lambda: len(items))
+    assert gauge.get() == 3
+
+
+def test_histogram_buckets_acumulativos(registry):
+    hist = registry.histogram("latency_seconds", "latencia", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        hist.observe(value)
+    
+    snapshot = hist.get()
+    assert snapshot["buckets"] == [(0.1, 2), (1.0, 3), (float("inf"), 4)]
+    assert snapshot["count"] == 4
+    assert snapshot["sum"] == pytest.approx(2.65)
@@ -0,0 +1,77 @@
+import sys
+from array import array
+import pytest
+
+from RAGcipies.src.rag.models import Chunk, as_embedding_array
+from RAGcipies.src.rag.vector_store import ScoredChunk, InMemoryVectorStore
+
+
+def make_chunk(**kwargs):
+    values = {"id": "c1", "document_id": "1", "text": "Pollo al curry", "embedding": [0.5, 0.25, 1.0]}
+    values.update(kwargs)
+    return Chunk(**values)
+
+
+def test_embedding_compacto():
+    chunk = make_chunk()
+    
+    assert isinstance(chunk.embedding, array)
+    assert chunk.embedding.typecode == "f"
+    assert list(chunk.embedding) == [0.5, 0.25, 1.0]
+
+
+def test_slots_sin_dict_por_instancia():
+    chunk = make_chunk()
+    scored = ScoredChunk(chunk, 0.9)
+    
+    assert not hasattr(chunk, "__dict__")
+    assert not hasattr(scored, "__dict__")
+    with pytest.raises(AttributeError):
+        chunk.otro_atributo = 1
+
+
+def test_ocupa_menos_que_una_lista_de_floats():
+    values = [float(i) / 768 for i in range(768)]
+    compact = as_embedding_array(values)
+    list_bytes = sys.getsizeof(values) + sum(sys.getsizeof(v) for v in values)
+    
+    assert sys.getsizeof(compact) * 5 < list_bytes
+
+
+def test_metadata_se_crea_al_usarla():
+    chunk = make_chunk()
+    assert chunk.similarity_score is None
+    assert chunk._metadata is None
+    
+    chunk.metadata["similarity_score"] = 0.8
+    assert chunk.similarity_score == 0.8
+    assert make_chunk(metadata={"title": "Curry"}).metadata == {"title": "Curry"}
+
+
+def test_vistas_no_se_copian():
+    matrix = array("f", [1.0, 2.0, 3.0, 4.0])
+    view = memoryview(matrix)[2:]
+    chunk = make_chunk(embedding=view)
+    
+    assert chunk.embedding is view
+    assert list(chunk.embedding) == [3.0, 4.0]
+
+
+def test_igualdad_y_repr():
+    assert make_chunk() == make_chunk(embedding=(0.5, 0.25, 1.0))
+    assert make_chunk() != make_chunk(text="otro")
+    assert "c1" in repr(make_chunk())
+
+
+def test_in_memory_busca_con_embeddings_compactos():
+    store = InMemoryVectorStore()
+    store.add_chunks([
+        make_chunk(id="a", embedding=[1.0, 0.0]),
+        make_chunk(id="b", embedding=[0.6, 0.8]),
+        make_chunk(id="c", embedding=[0.0, 1.0]),
+    ])
+    
+    results = store.search([1.0, 0.0], k=2, min_score=0.5)
+    
+    assert [r.chunk.id for r in results] == ["a", "b"]
+    assert results[0].chunk.similarity_score == pytest.approx(1.0)
@@ -0,0 +1,36 @@
+import pytest
+from RAGcipies.src.rag.models import Chunk
+from RAGcipies.src.rag.embeddings.fake import FakeEmbeddingModel
+from RAGcipies.src.rag.vector_store.in_memory import InMemoryVectorStore
+from RAGcipies.src.rag.pipeline import RAGPipeline
+
+
+@pytest.fixture
+def recipe_texts():
+    return {
+        "r1": "Pollo al curry\n\nIngredientes:\npollo, curry, arroz",
+        "r2": "Ensalada de garbanzos\n\nIngredientes:\ngarbanzos, tomate, cebolla",
+        "r3": "Torta vegana\n\nIngredientes:\nharina, banana, azúcar",
+    }
+
+
+@pytest.fixture
+def vector_store(recipe_texts):
+    model = FakeEmbeddingModel()
+    store = InMemoryVectorStore()
+    store.add_chunks([
+        Chunk(
+            id=f"chunk_{doc_id}",
+            document_id=doc_id,
+            text=text,
+            embedding=model.embed(text),
+            metadata={"title": text.split("\n")[0]}
+        )
+        for doc_id, text in recipe_texts.items()
+    ])
+    return store
+
+
+@pytest.fixture
+def pipeline(vector_store):
+    return RAGPipeline(vector_store=vector_store, top_k=2)
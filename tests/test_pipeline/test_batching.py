@@ -0,0 +1,51 @@
+import threading
+from unittest.mock import patch
+
+from RAGcipies.src.rag.pipeline import RAGPipeline
+
+
+def test_queries_concurrentes_comparten_un_embed_batch(vector_store):
+    pipeline = RAGPipeline(vector_store=vector_store, top_k=2, batch_max_size=8, batch_max_wait_ms=100)
+    barrier = threading.Barrier(4)
+    results = {}
+    
+    def worker(query):
+        barrier.wait()
+        results[query] = pipeline.query_detailed(query)
+    
+    queries = ["receta con pollo", "algo vegano", "garbanzos", " receta  con pollo"]
+    try:
+        with patch.object(pipeline.embedding_model, "embed_batch",
+                          wraps=pipeline.embedding_model.embed_batch) as embed_batch, \
+             patch.object(pipeline.vector_store, "search_batch",
+                          wraps=pipeline.vector_store.search_batch) as search_batch:
+            threads = [threading.Thread(target=worker, args=(q,)) for q in queries]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join(5)
+    finally:
+        pipeline.close()
+    
+    assert set(results) == set(queries)
+    assert embed_batch.call_count < len(queries)
+    assert search_batch.call_count < len(queries)
+    # Las queries equivalentes se embeben una sola vez
+    assert sum(len(call.args[0]) for call in embed_batch.call_args_list) <= 3
+    for result in results.values():
+        assert result.trace.chunks_retrieved == 2
+        assert set(result.trace.stage_seconds) >= {"embedding", "search"}
+
+
+def test_resultado_batched_igual_al_directo(vector_store):
+    direct = RAGPipeline(vector_store=vector_store, top_k=2)
+    batched = RAGPipeline(vector_store=vector_store, top_k=2, batch_max_size=4)
+    try:
+        a = direct.query_detailed("algo vegano")
+        b = batched.query_detailed("algo vegano")
+    finally:
+        batched.close()
+    
+    assert [sc.chunk.id for sc in a.scored_chunks] == [sc.chunk.id for sc in b.scored_chunks]
+    assert a.answer == b.answer
+    assert batched.batch_stats()["items"] == 1
@@ -0,0 +1,64 @@
+from RAGcipies.src.llm.base import LLMClient
+from RAGcipies.src.llm.coalescing import SingleFlightLLM
+from RAGcipies.src.llm.dummy import DummyLLM
+from RAGcipies.src.llm.hedged import HedgedLLM
+from RAGcipies.src.rag.pipeline import RAGPipeline
+
+
+def test_pipeline_reporta_tokens_ahorrados(vector_store):
+    pipeline = RAGPipeline(vector_store=vector_store, top_k=3, max_context_tokens=12)
+    result = pipeline.query_detailed("receta con pollo")
+    
+    assert result.trace.context_tokens_saved > 0
+    assert result.trace.chunks_retrieved == 3
+    assert len(result.scored_chunks) < 3
+
+
+def test_sin_presupuesto_no_recorta(vector_store):
+    pipeline = RAGPipeline(vector_store=vector_store, top_k=3)
+    result = pipeline.query_detailed("receta con pollo")
+    
+    assert result.trace.context_tokens_saved == 0
+    assert len(result.scored_chunks) == 3
+
+
+def test_pipeline_envia_system_prompt_separado(vector_store):
+    pipeline = RAGPipeline(vector_store=vector_store, top_k=2)
+    calls = []
+    pipeline.llm.generate = lambda prompt, **kwargs: calls.append((prompt, kwargs)) or "ok"
+    
+    pipeline.query("receta con pollo")
+    pipeline.query("algo dulce")
+    
+    (prompt_a, kwargs_a), (prompt_b, kwargs_b) = calls
+    assert kwargs_a["system"] == kwargs_b["system"]
+    assert kwargs_a["system"].startswith("Eres un asistente de cocina experto.")
+    assert prompt_a.endswith("receta con pollo\n\nRESPUESTA:")
+
+
+def test_pipeline_sin_split_envia_prompt_plano(vector_store):
+    pipeline = RAGPipeline(vector_store=vector_store, top_k=2, split_system_prompt=False)
+    calls = []
+    pipeline.llm.generate = lambda prompt, **kwargs: calls.append((prompt, kwargs)) or "ok"
+    
+    result = pipeline.query_detailed("receta con pollo")
+    
+    prompt, kwargs = calls[0]
+    assert kwargs == {}
+    assert prompt.startswith("Eres un asistente de cocina experto.")
+    assert result.trace.prompt_chars == len(prompt)
+
+
+def test_llm_sin_system_recibe_prompt_plano(vector_store):
+    class PlainLLM(LLMClient):
+        def generate(self, prompt):
+            return prompt
+    
+    pipeline = RAGPipeline(vector_store=vector_store, top_k=2)
+    pipeline.llm = PlainLLM()
+    
+    answer = pipeline.query("pollo")
+    assert answer.startswith("Eres un asistente de cocina experto.")
+    assert "".join(pipeline.query_stream("pollo")) == answer
+    assert HedgedLLM([PlainLLM(), DummyLLM()]).supports_system_prompt is False
+    assert SingleFlightLLM(DummyLLM()).supports_system_prompt is True
@@ -0,0 +1,26 @@
+from unittest.mock import patch
+
+from RAGcipies.src.rag.pipeline import RAGPipeline
+
+
+def test_query_repetida_no_vuelve_a_calcular_embedding(pipeline):
+    with patch.object(pipeline.embedding_model, "embed", wraps=pipeline.embedding_model.embed) as embed:
+        pipeline.query("receta con pollo")
+        pipeline.query(" receta con  pollo")
+    
+    assert embed.call_count == 1
+    stats = pipeline.cache_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_cache_desactivado(vector_store):
+    pipeline = RAGPipeline(vector_store=vector_store, embedding_cache_size=0)
+    
+    with patch.object(pipeline.embedding_model, "embed", wraps=pipeline.embedding_model.embed) as embed:
+        pipeline.query("receta con pollo")
+        pipeline.query("receta con pollo")
+    
+    assert embed.call_count == 2
+    assert pipeline.embedding_cache is None
+    assert pipeline.cache_stats() == {}
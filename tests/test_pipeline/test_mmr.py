@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from RAGcipies.src.rag.models import Chunk
+from RAGcipies.src.rag.diversity import mmr_select
+from RAGcipies.src.rag.embeddings.fake import FakeEmbeddingModel
+from RAGcipies.src.rag.pipeline import RAGPipeline
+from RAGcipies.src.rag.vector_store.base import ScoredChunk
+from RAGcipies.src.rag.vector_store.in_memory import InMemoryVectorStore
+
+
+def scored(chunk_id, embedding, score=1.0):
+    return ScoredChunk(Chunk(id=chunk_id, document_id=chunk_id, text=chunk_id, embedding=embedding), score)
+
+
+def test_mmr_descarta_candidatos_redundantes():
+    candidates = [
+        scored("a", [1.0, 0.0, 0.0], 0.9),
+        scored("a_copia", [0.98, 0.05, 0.0], 0.89),
+        scored("b", [0.7, 0.7, 0.0], 0.7),
+        scored("c", [0.6, 0.0, 0.8], 0.68),
+    ]
+    query = [1.0, 0.0, 0.3]
+    
+    assert [s.chunk.id for s in mmr_select(query, candidates, k=2, lambda_mult=1.0)] == ["a", "a_copia"]
+    selected = mmr_select(query, candidates, k=3, lambda_mult=0.2)
+    assert [s.chunk.id for s in selected] == ["a", "c", "b"]
+    # Se devuelven los ScoredChunk originales, con su score
+    assert selected[0] is candidates[0]
+    
+    # Sin embeddings (ej: ChromaDB sin include_embeddings) no se reordena
+    without_embedding = [scored("x", []), *candidates]
+    assert mmr_select(query, without_embedding, k=2) == without_embedding[:2]
+    assert mmr_select(query, [], k=3) == []
+    with pytest.raises(ValueError):
+        mmr_select(query, candidates, k=2, lambda_mult=1.5)
+
+
+def test_mmr_usa_el_score_del_store_como_relevancia():
+    # Scores que no son el coseno con la query (ej: RRF de hybrid): lambda=1.0 conserva el orden
+    candidates = [
+        scored("lexico", [0.0, 1.0], 0.8),
+        scored("vectorial", [1.0, 0.0], 0.5),
+        scored("otro", [0.7, 0.7], 0.2),
+    ]
+    query = [1.0, 0.0]
+    
+    assert mmr_select(query, candidates, k=3, lambda_mult=1.0) == candidates
+    assert [s.chunk.id for s in mmr_select(query, candidates, k=2, lambda_mult=0.5)] == ["lexico", "vectorial"]
+    # Scores iguales: decide solo la redundancia
+    ties = [scored(s.chunk.id, list(s.chunk.embedding), 1.0) for s in candidates]
+    assert [s.chunk.id for s in mmr_select(query, ties, k=2, lambda_mult=0.5)] == ["lexico", "vectorial"]
+
+
+@pytest.mark.parametrize("batch_max_size", [0, 4])
+def test_pipeline_diversifica_el_contexto(batch_max_size):
+    model = FakeEmbeddingModel()
+    base = np.asarray(model.embed("Pollo al horno con papas"), dtype=np.float32)
+    other = np.asarray(model.embed("Ensalada de garbanzos"), dtype=np.float32)
+    store = InMemoryVectorStore()
+    store.add_chunks([
+        *(Chunk(id=f"pollo_{i}", document_id=f"pollo_{i}", text="Pollo al horno con papas",
+                embedding=base + 0.001 * i) for i in range(4)),
+        Chunk(id="garbanzos", document_id="garbanzos", text="Ensalada de garbanzos", embedding=other),
+    ])
+    query = "Pollo al horno con papas"
+    
+    plain = RAGPipeline(vector_store=store, top_k=2, batch_max_size=batch_max_size)
+    # garbanzos es el peor de los 5 candidatos (relevancia 0 tras normalizar)
+    # y los embeddings fake de 8 dimensiones se parecen mucho: lambda bajo
+    diverse = RAGPipeline(vector_store=store, top_k=2, mmr_lambda=0.1, mmr_fetch_k=5, batch_max_size=batch_max_size)
+    try:
+        plain_ids = [s.chunk.id for s in plain.query_detailed(query).scored_chunks]
+        diverse_ids = [s.chunk.id for s in diverse.query_detailed(query).scored_chunks]
+    finally:
+        plain.close()
+        diverse.close()
+    
+    assert all(chunk_id.startswith("pollo_") for chunk_id in plain_ids)
+    assert diverse_ids[0].startswith("pollo_") and diverse_ids[1] == "garbanzos"
+
+
+def test_pipeline_valida_parametros_mmr():
+    store = InMemoryVectorStore()
+    with pytest.raises(ValueError):
+        RAGPipeline(vector_store=store, mmr_lambda=-0.1)
+    with pytest.raises(ValueError):
+        RAGPipeline(vector_store=store, top_k=5, mmr_lambda=0.5, mmr_fetch_k=3)
+    assert RAGPipeline(vector_store=store, top_k=3, mmr_lambda=0.5).mmr_fetch_k == 20
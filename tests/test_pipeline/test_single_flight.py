@@ -0,0 +1,54 @@
+import threading
+import time
+
+from RAGcipies.src.rag.pipeline import RAGPipeline
+from RAGcipies.src.rag.embeddings.coalescing import SingleFlightEmbeddingModel
+from RAGcipies.src.llm.coalescing import SingleFlightLLM
+from RAGcipies.src.llm.dummy import DummyLLM
+
+
+def test_rafaga_de_la_misma_query_hace_una_sola_generacion(vector_store):
+    pipeline = RAGPipeline(vector_store=vector_store, embedding_cache_size=0, single_flight=True)
+    assert isinstance(pipeline.embedding_model, SingleFlightEmbeddingModel)
+    assert isinstance(pipeline.llm, SingleFlightLLM)
+    
+    calls = []
+    
+    def slow_generate(prompt, **kwargs):
+        calls.append(prompt)
+        time.sleep(0.2)
+        return "respuesta compartida"
+    
+    pipeline.llm.inner.generate = slow_generate
+    answers = []
+    threads = [
+        threading.Thread(target=lambda: answers.append(pipeline.query("receta con pollo")))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    
+    assert answers == ["respuesta compartida"] * 5
+    assert len(calls) == 1
+    assert pipeline.coalescing_stats()["llm"]["shared"] == 4
+
+
+def test_sin_single_flight_no_hay_stats(pipeline):
+    assert pipeline.coalescing_stats() == {}
+
+
+def test_argumentos_no_hasheables_no_se_unen():
+    calls = []
+    
+    class RecordingLLM(DummyLLM):
+        def generate(self, prompt, **kwargs):
+            calls.append(kwargs)
+            return "ok"
+    
+    llm = SingleFlightLLM(RecordingLLM())
+    
+    assert llm.generate("hola", stop=["\n"]) == "ok"
+    assert calls == [{"stop": ["\n"]}]
+    assert llm.stats()["executions"] == 0
@@ -0,0 +1,119 @@
+import pytest
+from unittest.mock import patch
+
+from RAGcipies.src.rag.tracing import (
+    STAGES,
+    PipelineHook,
+    LatencyHistogram,
+    QueryResult,
+)
+from RAGcipies.src.llm.prompt.tokens import CharRatioTokenEstimator
+
+
+class RecordingHook(PipelineHook):
+    def __init__(self):
+        self.events = []
+    
+    def on_query_start(self, trace):
+        self.events.append(("start", trace.query))
+    
+    def on_stage_end(self, stage, seconds, trace):
+        self.events.append(("stage", stage))
+    
+    def on_query_end(self, trace):
+        self.events.append(("end", trace.total_seconds))
+    
+    def on_query_error(self, stage, error, trace):
+        self.events.append(("error", stage))
+
+
+def test_query_detailed_retorna_traza_completa(pipeline):
+    result = pipeline.query_detailed("receta con pollo")
+    
+    assert isinstance(result, QueryResult)
+    assert result.answer.startswith("[Dummy LLM Response]")
+    trace = result.trace
+    assert list(trace.stage_seconds) == list(STAGES)
+    assert all(seconds >= 0 for seconds in trace.stage_seconds.values())
+    assert trace.total_seconds >= sum(trace.stage_seconds.values()) - 1e-9
+    assert trace.chunks_retrieved == len(result.scored_chunks) == 2
+    assert trace.prompt_chars > 0
+    assert trace.prompt_tokens == CharRatioTokenEstimator().count("x" * trace.prompt_chars)
+    assert trace.cache_hit is False
+    assert pipeline.query_detailed("receta con pollo").trace.cache_hit is True
+
+
+def test_hooks_reciben_eventos_en_orden(pipeline):
+    hook = RecordingHook()
+    pipeline.add_hook(hook)
+    
+    pipeline.query("algo vegano")
+    
+    assert hook.events[0] == ("start", "algo vegano")
+    assert [e[1] for e in hook.events if e[0] == "stage"] == list(STAGES)
+    assert hook.events[-1][0] == "end"
+
+
+def test_hook_recibe_error_con_la_etapa(pipeline):
+    hook = RecordingHook()
+    pipeline.add_hook(hook)
+    
+    with patch.object(pipeline.llm, "generate", side_effect=RuntimeError("caído")):
+        with pytest.raises(RuntimeError, match="caído"):
+            pipeline.query("algo vegano")
+    
+    assert hook.events[-1] == ("error", "generation")
+
+
+def test_latency_summary_por_etapa(pipeline):
+    for _ in range(5):
+        pipeline.query("receta con pollo")
+    
+    summary = pipeline.latency_summary()
+    assert set(summary) == {*STAGES, "total"}
+    assert summary["total"]["count"] == 5
+    assert summary["total"]["p50"] <= summary["total"]["p99"]
+
+
+def test_latency_histogram_percentiles():
+    hist = LatencyHistogram(window=100)
+    for ms in range(1, 101):
+        hist.record(ms / 1000.0)
+    
+    assert hist.percentile(50) == pytest.approx(0.050)
+    assert hist.percentile(95) == pytest.approx(0.095)
+    assert hist.percentile(99) == pytest.approx(0.099)
+    assert LatencyHistogram().percentile(99) == 0.0
+
+
+def test_latency_histogram_ventana_acotada():
+    hist = LatencyHistogram(window=10)
+    for i in range(50):
+        hist.record(float(i))
+    
+    summary = hist.summary()
+    assert summary["count"] == 50
+    assert summary["p50"] >= 40.0
+
+
+def test_query_stream_emite_fragmentos_y_traza(pipeline):
+    hook = RecordingHook()
+    pipeline.add_hook(hook)
+    
+    pieces = list(pipeline.query_stream("receta con pollo"))
+    
+    assert "".join(pieces).startswith("[Dummy LLM Response]")
+    assert [e[1] for e in hook.events if e[0] == "stage"] == list(STAGES)
+    assert hook.events[-1][0] == "end"
+
+
+def test_query_stream_cerrado_antes_de_terminar(pipeline):
+    hook = RecordingHook()
+    pipeline.add_hook(hook)
+    pipeline.llm.generate_stream = lambda prompt, **kwargs: iter(["a", "b", "c"])
+    
+    stream = pipeline.query_stream("receta con pollo")
+    next(stream)
+    stream.close()
+    
+    assert hook.events[-1] == ("error", "generation")
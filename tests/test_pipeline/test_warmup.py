@@ -0,0 +1,57 @@
+import threading
+import pytest
+from unittest.mock import Mock, patch
+
+from RAGcipies.src.rag.pipeline import RAGPipeline
+from RAGcipies.src.rag.embeddings.ollama import OllamaEmbeddingModel
+from RAGcipies.src.llm.ollama import OllamaLLM
+
+
+def test_warmup_reporta_componentes(vector_store):
+    pipeline = RAGPipeline(vector_store=vector_store)
+    report = pipeline.warmup()
+    
+    assert report.ok
+    assert set(report.component_seconds) == {"embedding", "llm", "vector_store"}
+    assert report.total_seconds >= 0.0
+    assert pipeline.warmup_report is report
+
+
+def test_warmup_en_el_constructor(vector_store):
+    pipeline = RAGPipeline(vector_store=vector_store, warmup=True)
+    
+    assert pipeline.warmup_report is not None
+    assert pipeline.warmup_report.ok
+
+
+def test_warmup_en_paralelo_y_sin_propagar_errores(vector_store):
+    pipeline = RAGPipeline(vector_store=vector_store)
+    barrier = threading.Barrier(2, timeout=5)
+    pipeline.embedding_model.warmup = lambda: barrier.wait()
+    pipeline.llm.warmup = lambda: barrier.wait()
+    pipeline.vector_store.warmup = Mock(side_effect=RuntimeError("índice no disponible"))
+    
+    report = pipeline.warmup()
+    
+    assert not report.ok
+    assert report.errors == {"vector_store": "índice no disponible"}
+    assert "embedding" not in report.errors
+
+
+def test_ollama_warmup_carga_modelos_con_keep_alive():
+    response = Mock()
+    response.raise_for_status = Mock()
+    with patch("requests.post", return_value=response) as post:
+        OllamaLLM(model="llama3", keep_alive="30m", num_ctx=4096).warmup()
+        OllamaEmbeddingModel(keep_alive=-1).warmup()
+    
+    llm_call, embed_call = post.call_args_list
+    assert llm_call.args[0].endswith("/api/generate")
+    assert llm_call.kwargs["json"] == {
+        "model": "llama3",
+        "stream": False,
+        "options": {"temperature": 0.7, "num_ctx": 4096},
+        "keep_alive": "30m",
+    }
+    assert embed_call.args[0].endswith("/api/embed")
+    assert embed_call.kwargs["json"]["keep_alive"] == -1
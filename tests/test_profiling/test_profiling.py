@@ -0,0 +1,152 @@
+import logging
+import pstats
+import time
+import pytest
+
+from RAGcipies.src.rag.models import Chunk
+from RAGcipies.src.rag.vector_store.in_memory import InMemoryVectorStore
+from RAGcipies.src.rag.pipeline import RAGPipeline
+from RAGcipies.src.profiling import Profiler, _profiler_from_env, configure_profiling, get_profiler, profiled
+
+
+@pytest.fixture
+def profiler(tmp_path):
+    profiler = Profiler(tmp_path / "profiles", sample_interval=0.001)
+    previous = configure_profiling(profiler)
+    yield profiler
+    configure_profiling(previous)
+
+
+@pytest.fixture
+def pipeline():
+    store = InMemoryVectorStore()
+    store.add_chunks([
+        Chunk(id="chunk_1", document_id="1", text="Pollo al curry", embedding=[1.0, 0.0]),
+    ])
+    pipeline = RAGPipeline(vector_store=store, top_k=1)
+    pipeline.embedding_model.embed = lambda text: (time.sleep(0.02), [1.0, 0.1])[1]
+    return pipeline
+
+
+def test_desactivado_no_escribe_nada(tmp_path):
+    assert get_profiler() is None
+    
+    @profiled("etapa")
+    def suma(a, b):
+        return a + b
+    
+    assert suma(1, 2) == 3
+    assert suma.__name__ == "suma"
+
+
+def test_query_deja_pstats_tracemalloc_y_stacks(profiler, pipeline):
+    pipeline.query("pollo")
+    
+    files = sorted(p.name for p in profiler.output_dir.glob("query-*"))
+    assert {name.split(".", 1)[-1] for name in files} == {"pstats", "txt", "tracemalloc", "folded"}
+    assert any(name.endswith("-alloc.txt") for name in files)
+    
+    stats = pstats.Stats(str(next(profiler.output_dir.glob("query-*.pstats"))))
+    assert any(func[2] == "query_detailed" for func in stats.stats)
+    
+    folded = next(profiler.output_dir.glob("query-*.folded")).read_text()
+    assert any(line.startswith("embedding;") for line in folded.splitlines())
+    assert profiler.stats()["profiled"] == {"add_chunks": 1, "query": 1}
+
+
+def test_add_chunks_y_every(tmp_path):
+    profiler = Profiler(tmp_path, modes=["cprofile"], every=2)
+    previous = configure_profiling(profiler)
+    try:
+        for i in range(3):
+            InMemoryVectorStore().add_chunks([Chunk(id=f"c{i}", document_id="1", text="x", embedding=[1.0])])
+    finally:
+        configure_profiling(previous)
+    
+    assert profiler.stats()["calls"] == {"add_chunks": 3}
+    assert profiler.stats()["profiled"] == {"add_chunks": 2}
+    assert len(list(tmp_path.glob("add_chunks-*.pstats"))) == 2
+    assert not list(tmp_path.glob("*.folded"))
+
+
+def test_llamadas_anidadas_no_se_perfilan_dos_veces(profiler):
+    @profiled("interna")
+    def interna():
+        return 1
+    
+    @profiled("externa")
+    def externa():
+        return interna()
+    
+    assert externa() == 1
+    assert profiler.stats()["profiled"] == {"externa": 1}
+    assert profiler.stats()["skipped"] == 1
+
+
+def test_from_env():
+    assert Profiler.from_env({}) is None
+    profiler = Profiler.from_env({"RAG_PROFILE": "cprofile,stacks", "RAG_PROFILE_EVERY": "5"})
+    assert profiler.modes == {"cprofile", "stacks"}
+    assert profiler.every == 5
+    assert Profiler.from_env({"RAG_PROFILE": "all"}).modes == {"cprofile", "tracemalloc", "stacks"}
+    with pytest.raises(ValueError):
+        Profiler.from_env({"RAG_PROFILE": "perf"})
+
+
+def test_from_env_invalido_desactiva_con_warning(monkeypatch, caplog):
+    monkeypatch.setenv("RAG_PROFILE", "cprofle")
+    with caplog.at_level(logging.WARNING, logger="RAGcipies.src.profiling"):
+        assert _profiler_from_env() is None
+    assert "cprofle" in caplog.text
+
+
+def test_error_al_escribir_no_oculta_la_excepcion(tmp_path, caplog):
+    blocked = tmp_path / "archivo"
+    blocked.write_text("no es un directorio")
+    profiler = Profiler(blocked / "profiles", modes=["cprofile"])
+    previous = configure_profiling(profiler)
+    
+    @profiled("etapa")
+    def falla():
+        raise KeyError("error real")
+    
+    @profiled("etapa")
+    def ok():
+        return 42
+    
+    try:
+        with caplog.at_level(logging.WARNING, logger="RAGcipies.src.profiling"):
+            with pytest.raises(KeyError, match="error real"):
+                falla()
+            assert ok() == 42
+    finally:
+        configure_profiling(previous)
+    
+    assert "No se pudo escribir el perfil" in caplog.text
+    assert profiler.stats()["profiled"] == {}
+
+
+def test_query_stream_perfila_la_iteracion(profiler, pipeline):
+    assert "".join(pipeline.query_stream("pollo"))
+    
+    stats = pstats.Stats(str(next(profiler.output_dir.glob("query_stream-*.pstats"))))
+    assert any(func[2] == "generate_stream" for func in stats.stats)
+    folded = next(profiler.output_dir.glob("query_stream-*.folded")).read_text()
+    assert any(line.startswith("embedding;") for line in folded.splitlines())
+
+
+def test_micro_batcher_se_muestrea_en_su_hilo(profiler):
+    store = InMemoryVectorStore()
+    store.add_chunks([Chunk(id="chunk_1", document_id="1", text="Pollo al curry", embedding=[1.0, 0.0])])
+    pipeline = RAGPipeline(vector_store=store, top_k=1, batch_max_size=4, batch_max_wait_ms=1)
+    pipeline.embedding_model.embed_batch = lambda texts: (time.sleep(0.02), [[1.0, 0.1] for _ in texts])[1]
+    try:
+        pipeline.query("pollo")
+    finally:
+        pipeline.close()
+    
+    # El hilo de la query tiene cProfile/tracemalloc; el lote solo muestrea su stack
+    assert profiler.stats()["profiled"]["batch"] == 1
+    assert profiler.stats()["stacks_only"] == 1
+    folded = next(profiler.output_dir.glob("batch-*.folded")).read_text()
+    assert "_retrieve_batch" in folded
@@ -0,0 +1,55 @@
+import threading
+import pytest
+
+from RAGcipies.src.server.admission import AdmissionController, OverloadedError
+
+
+def test_rechaza_cuando_la_cola_esta_llena():
+    admission = AdmissionController(workers=1, max_queue=0)
+    admission.acquire()
+    
+    with pytest.raises(OverloadedError, match="cola de requests llena"):
+        admission.acquire()
+    
+    admission.release()
+    admission.acquire()
+    admission.release()
+    assert admission.stats()["rejected"] == 1
+    assert admission.stats()["admitted"] == 0
+
+
+def test_timeout_en_la_cola():
+    admission = AdmissionController(workers=1, max_queue=1, queue_timeout=0.05)
+    admission.acquire()
+    
+    with pytest.raises(OverloadedError, match="sin workers libres"):
+        admission.acquire()
+    
+    assert admission.stats()["admitted"] == 1
+    admission.release()
+
+
+def test_request_en_cola_toma_el_worker_liberado():
+    admission = AdmissionController(workers=1, max_queue=1, queue_timeout=5)
+    admission.acquire()
+    acquired = threading.Event()
+    
+    def waiter():
+        with admission.slot():
+            acquired.set()
+    
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    assert not acquired.wait(0.05)
+    assert admission.stats()["queued"] == 1
+    
+    admission.release()
+    thread.join(timeout=5)
+    assert acquired.is_set()
+
+
+def test_parametros_invalidos():
+    with pytest.raises(ValueError):
+        AdmissionController(workers=0)
+    with pytest.raises(ValueError):
+        AdmissionController(max_queue=-1)
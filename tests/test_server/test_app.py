@@ -0,0 +1,155 @@
+import json
+import threading
+import pytest
+from http.client import HTTPConnection
+
+from RAGcipies.src.rag.models import Chunk
+from RAGcipies.src.rag.vector_store.in_memory import InMemoryVectorStore
+from RAGcipies.src.rag.pipeline import RAGPipeline
+from RAGcipies.src.metrics.registry import MetricsRegistry
+from RAGcipies.src.server import RAGServer
+
+
+@pytest.fixture
+def pipeline():
+    store = InMemoryVectorStore()
+    store.add_chunks([
+        Chunk(id="chunk_1", document_id="1", text="Pollo al curry", embedding=[1.0, 0.0],
+              metadata={"title": "Pollo al curry"}),
+        Chunk(id="chunk_2", document_id="2", text="Torta vegana", embedding=[0.0, 1.0],
+              metadata={"title": "Torta vegana"}),
+    ])
+    pipeline = RAGPipeline(vector_store=store, top_k=1)
+    pipeline.embedding_model.embed = lambda text: [1.0, 0.1]
+    return pipeline
+
+
+def make_server(pipeline, **kwargs):
+    return RAGServer(pipeline, port=0, registry=MetricsRegistry(), **kwargs).start()
+
+
+def request(server, method, path, payload=None):
+    conn = HTTPConnection(*server.address[:2], timeout=5)
+    body = json.dumps(payload) if payload is not None else None
+    conn.request(method, path, body=body, headers={"Content-Type": "application/json"})
+    response = conn.getresponse()
+    data = response.read().decode("utf-8")
+    conn.close()
+    return response, data
+
+
+def test_query_retorna_respuesta_y_fuentes(pipeline):
+    server = make_server(pipeline)
+    try:
+        response, data = request(server, "POST", "/query", {"query": "pollo", "include_trace": True})
+        payload = json.loads(data)
+        
+        assert response.status == 200
+        assert payload["answer"].startswith("[Dummy LLM Response]")
+        assert payload["sources"][0]["document_id"] == "1"
+        assert payload["sources"][0]["title"] == "Pollo al curry"
+        assert set(payload["trace"]["stage_seconds"]) == {
+            "embedding", "search", "prompt", "generation", "response"
+        }
+    finally:
+        server.shutdown()
+
+
+def test_query_stream_emite_ndjson(pipeline):
+    pipeline.llm.generate_stream = lambda prompt, **kwargs: iter(["Hola", " mundo"])
+    server = make_server(pipeline)
+    try:
+        response, data = request(server, "POST", "/query/stream", {"query": "pollo"})
+        events = [json.loads(line) for line in data.splitlines() if line]
+        
+        assert response.status == 200
+        assert events == [{"delta": "Hola"}, {"delta": " mundo"}, {"done": True}]
+    finally:
+        server.shutdown()
+
+
+def test_query_invalida(pipeline):
+    server = make_server(pipeline)
+    try:
+        response, _ = request(server, "POST", "/query", {"query": "  "})
+        assert response.status == 400
+        response, _ = request(server, "GET", "/nada")
+        assert response.status == 404
+    finally:
+        server.shutdown()
+
+
+@pytest.mark.parametrize("body, headers", [
+    ("{\"query\": \"pollo\"}".encode("latin-1") + b"\xe9", {}),
+    (b"{}", {"Content-Length": "abc"}),
+])
+def test_body_invalido_responde_400(pipeline, body, headers):
+    server = make_server(pipeline)
+    try:
+        conn = HTTPConnection(*server.address[:2], timeout=5)
+        conn.putrequest("POST", "/query")
+        conn.putheader("Content-Length", headers.get("Content-Length", str(len(body))))
+        conn.endheaders(body)
+        response = conn.getresponse()
+        response.read()
+        conn.close()
+        
+        assert response.status == 400
+    finally:
+        server.shutdown()
+
+
+def test_error_del_pipeline_no_es_400(pipeline):
+    def broken(prompt, **kwargs):
+        raise ValueError("respuesta inválida del backend")
+    
+    pipeline.llm.generate = broken
+    server = make_server(pipeline)
+    try:
+        response, data = request(server, "POST", "/query", {"query": "pollo"})
+        
+        assert response.status == 502
+        assert "respuesta inválida" in json.loads(data)["error"]
+    finally:
+        server.shutdown()
+
+
+def test_load_shedding_responde_429(pipeline):
+    release = threading.Event()
+    started = threading.Event()
+    
+    def slow_generate(prompt, **kwargs):
+        started.set()
+        release.wait(5)
+        return "ok"
+    
+    pipeline.llm.generate = slow_generate
+    server = make_server(pipeline, workers=1, max_queue=0)
+    try:
+        busy = threading.Thread(target=request, args=(server, "POST", "/query", {"query": "pollo"}))
+        busy.start()
+        assert started.wait(5)
+        
+        response, data = request(server, "POST", "/query", {"query": "pollo"})
+        assert response.status == 429
+        assert response.getheader("Retry-After") == "1"
+        
+        release.set()
+        busy.join(5)
+        _, metrics = request(server, "GET", "/metrics")
+        assert "rag_requests_rejected_total 1" in metrics
+    finally:
+        release.set()
+        server.shutdown()
+
+
+def test_healthz(pipeline):
+    server = make_server(pipeline)
+    try:
+        response, data = request(server, "GET", "/healthz")
+        payload = json.loads(data)
+        assert response.status == 200
+        assert payload["chunks"] == 2
+        assert payload["admission"]["workers"] == 4
+    finally:
+        server.shutdown()
@@ -0,0 +1,88 @@
+import time
+import pytest
+
+from RAGcipies.src.rag.embeddings.ollama import OllamaEmbeddingModel
+from RAGcipies.src.llm.ollama import OllamaLLM
+from RAGcipies.src.server.stubs import LatencyDistribution, StubBackendServer
+
+
+@pytest.fixture
+def stub():
+    server = StubBackendServer(tokens_per_second=0, response_tokens=5, dimension=16, seed=1).start()
+    yield server
+    server.shutdown()
+
+
+def test_parse_distribuciones():
+    assert LatencyDistribution.parse("25").sample() == pytest.approx(0.025)
+    uniform = LatencyDistribution.parse("uniform:10:20", seed=1)
+    assert all(0.010 <= uniform.sample() <= 0.020 for _ in range(100))
+    assert LatencyDistribution.parse("lognormal:50:0.5", seed=1).sample() > 0
+    with pytest.raises(ValueError):
+        LatencyDistribution.parse("gamma:1")
+    with pytest.raises(ValueError):
+        LatencyDistribution.parse("fixed:abc")
+
+
+def test_protocolo_embeddings_de_ollama(stub):
+    model = OllamaEmbeddingModel(base_url=stub.url)
+    
+    single = model.embed("pollo al curry")
+    batch = model.embed_batch(["pollo al curry", "torta vegana"])
+    
+    assert len(single) == 16
+    assert batch[0] == single
+    assert stub.stats()["requests"] == {"/api/embeddings": 1, "/api/embed": 1}
+
+
+def test_protocolo_generate_de_ollama(stub):
+    llm = OllamaLLM(base_url=stub.url)
+    
+    assert llm.generate("hola") == "palabra0 palabra1 palabra2 palabra3 palabra4"
+    assert list(llm.generate_stream("hola")) == [f"palabra{i} " for i in range(5)]
+    llm.warmup()
+
+
+def test_velocidad_de_tokens_y_latencia():
+    server = StubBackendServer(
+        generation_latency=LatencyDistribution("fixed", 50),
+        tokens_per_second=100,
+        response_tokens=6
+    ).start()
+    try:
+        started = time.perf_counter()
+        stream = OllamaLLM(base_url=server.url).generate_stream("hola")
+        next(stream)
+        first_token = time.perf_counter() - started
+        list(stream)
+        total = time.perf_counter() - started
+    finally:
+        server.shutdown()
+    
+    assert 0.05 <= first_token < 0.09
+    assert total >= 0.10
+
+
+def test_errores_inyectados(stub):
+    stub.error_rate = 1.0
+    
+    with pytest.raises(RuntimeError):
+        OllamaLLM(base_url=stub.url).generate("hola")
+    assert stub.stats()["injected_errors"] == 1
+
+
+def test_protocolo_de_openai(stub, monkeypatch):
+    pytest.importorskip("openai")
+    from RAGcipies.src.llm.openai import OpenAILLM
+    from RAGcipies.src.rag.embeddings.openai import OpenAIEmbeddingModel
+    from RAGcipies.src.concurrency.ratelimit import RateLimiter
+    
+    monkeypatch.setenv("OPENAI_API_KEY", "stub")
+    monkeypatch.setenv("OPENAI_BASE_URL", f"{stub.url}/v1")
+    llm = OpenAILLM(rate_limiter=RateLimiter())
+    embeddings = OpenAIEmbeddingModel(rate_limiter=RateLimiter())
+    
+    assert llm.generate("hola", system="sos un chef").startswith("palabra0")
+    assert "".join(llm.generate_stream("hola")) == "".join(f"palabra{i} " for i in range(5))
+    assert len(embeddings.embed("pollo")) == 16
+    assert len(embeddings.embed_batch(["pollo", "arroz"])) == 2
@@ -0,0 +1,139 @@
+import pytest
+
+from RAGcipies.src.rag.models import Chunk
+from RAGcipies.src.rag.embeddings.fake import FakeEmbeddingModel
+from RAGcipies.src.rag.pipeline import RAGPipeline
+from RAGcipies.src.rag.text import tokenize
+from RAGcipies.src.rag.vector_store import (
+    BM25Index,
+    HybridVectorStore,
+    InMemoryVectorStore,
+    VectorStoreBackend,
+    create_vector_store,
+)
+
+
+TEXTS = {
+    "r1": "Pollo al curry con arroz",
+    "r2": "Ensalada de garbanzos, tomate y cebolla",
+    "r3": "Torta vegana de banana sin huevos",
+    "r4": "Hummus de garbanzos con limones",
+}
+
+
+def make_chunks(embedding=None):
+    model = FakeEmbeddingModel()
+    return [
+        Chunk(id=f"chunk_{doc_id}", document_id=doc_id, text=text,
+              embedding=embedding or model.embed(text))
+        for doc_id, text in TEXTS.items()
+    ]
+
+
+def test_tokenize_espanol():
+    assert tokenize("Algo con GARBANZOS y limones") == ["garbanzo", "limon"]
+    assert tokenize("Galletitas sin huevos, nueces y azúcar") == ["galletita", "sin", "huevo", "nuez", "azucar"]
+    assert tokenize("Postres dulces") == ["postre", "dulce"]
+    assert tokenize("la receta de pollo", remove_stopwords=False) == ["la", "receta", "de", "pollo"]
+
+
+def test_bm25_busca_terminos_exactos():
+    index = BM25Index()
+    index.add(make_chunks())
+    
+    results = index.search("algo con garbanzos", k=5)
+    assert {chunk.id for chunk, _ in results[:2]} == {"chunk_r2", "chunk_r4"}
+    assert all(score > 0 for _, score in results)
+    assert index.search("pescado", k=5) == []
+    
+    assert index.remove(["chunk_r2"])
+    assert [chunk.id for chunk, _ in index.search("garbanzos", k=5)] == ["chunk_r4"]
+    assert not index.remove(["no-existe"])
+    assert len(index) == 3
+    
+    # Superar compact_ratio reconstruye el índice sin los borrados
+    assert index.remove(["chunk_r1"])
+    assert len(index) == len(index._chunks) == 2
+    assert [chunk.id for chunk, _ in index.search("garbanzos limones curry", k=5)] == ["chunk_r4"]
+
+
+def test_bm25_compactacion_conserva_cambios_concurrentes():
+    armed = []
+    
+    def tokenizer(text):
+        # Simula otro hilo que agrega y borra mientras se reconstruye el índice
+        if text == "gatillo" and armed:
+            armed.clear()
+            index.add([Chunk(id="nuevo", document_id="n", text="tarta de manzana", embedding=[1.0])])
+            assert index.remove(["c5"])
+        return tokenize(text)
+    
+    index = BM25Index(tokenizer=tokenizer, compact_ratio=0.25)
+    index.add([
+        Chunk(id=f"c{i}", document_id=str(i), text="gatillo" if i == 3 else f"sopa numero {i}", embedding=[1.0])
+        for i in range(8)
+    ])
+    armed.append(True)
+    
+    assert index.remove(["c0", "c1", "c2"])
+    assert not armed
+    assert len(index) == 5
+    assert [chunk.id for chunk, _ in index.search("tarta", k=5)] == ["nuevo"]
+    assert {chunk.id for chunk, _ in index.search("sopa", k=10)} == {"c4", "c6", "c7"}
+
+
+def test_hibrido_recupera_terminos_que_el_vector_pierde():
+    # Todos los embeddings iguales: la búsqueda vectorial no distingue recetas
+    store = HybridVectorStore()
+    store.add_chunks(make_chunks(embedding=[1.0, 0.0]))
+    
+    vector_only = store.search([1.0, 0.0], k=1)
+    hybrid = store.search([1.0, 0.0], k=2, query_text="hummus con limones")
+    
+    assert vector_only[0].chunk.id == "chunk_r1"
+    assert hybrid[0].chunk.id == "chunk_r4"
+    assert hybrid[0].score == pytest.approx((1 / 64 + 1 / 61) / (2 / 61))
+    assert hybrid[1].chunk.metadata["bm25_score"] is None
+    assert hybrid[0].chunk.metadata["vector_score"] == pytest.approx(1.0)
+    
+    batch = store.search_batch([[1.0, 0.0], [1.0, 0.0]], k=1, query_texts=["limones", None])
+    assert [r[0].chunk.id for r in batch] == ["chunk_r4", "chunk_r1"]
+    # Cada consulta tiene sus scores: la metadata de los chunks almacenados no cambia
+    assert hybrid[0].chunk.metadata["similarity_score"] == hybrid[0].score
+    assert "bm25_score" not in store.lexical.search("limones", k=1)[0][0].metadata
+    with pytest.raises(ValueError):
+        store.search_batch([[1.0, 0.0]], query_texts=["a", "b"])
+
+
+def test_hibrido_delete_memoria_y_factory():
+    store = create_vector_store(VectorStoreBackend.HYBRID, vector_store=InMemoryVectorStore(), rrf_k=10)
+    store.add_chunks(make_chunks())
+    
+    assert store.delete(["chunk_r4"])
+    assert len(store) == 3
+    assert all(r.chunk.id != "chunk_r4" for r in store.search([1.0] * 8, k=4, query_text="hummus garbanzos"))
+    usage = store.memory_usage()
+    assert usage.backend == "hybrid(in_memory)"
+    assert usage.index_bytes > InMemoryVectorStore().memory_usage().index_bytes
+    with pytest.raises(ValueError):
+        HybridVectorStore(rrf_k=0)
+    # multi_vector devuelve un chunk por documento: RRF nunca fusionaría por id
+    with pytest.raises(ValueError):
+        HybridVectorStore("multi_vector")
+
+
+def test_pipeline_pasa_el_texto_de_la_query():
+    store = HybridVectorStore()
+    store.add_chunks(make_chunks(embedding=[1.0, 0.0]))
+    pipeline = RAGPipeline(vector_store=store, top_k=1)
+    pipeline.embedding_model.embed = lambda text: [1.0, 0.0]
+    pipeline.embedding_model.embed_batch = lambda texts: [[1.0, 0.0] for _ in texts]
+    
+    assert pipeline.query_detailed("hummus con limones").scored_chunks[0].chunk.id == "chunk_r4"
+    
+    batched = RAGPipeline(vector_store=store, top_k=1, batch_max_size=4)
+    batched.embedding_model.embed_batch = lambda texts: [[1.0, 0.0] for _ in texts]
+    try:
+        assert batched.query_detailed("torta sin huevos").scored_chunks[0].chunk.id == "chunk_r3"
+    finally:
+        batched.close()
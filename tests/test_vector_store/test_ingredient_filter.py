@@ -0,0 +1,161 @@
+import pytest
+
+from RAGcipies.src.rag.models import Chunk, RecipeDocument
+from RAGcipies.src.rag.embeddings.fake import FakeEmbeddingModel
+from RAGcipies.src.rag.ingredients import IngredientIndex, IngredientConstraints, ingredient_terms
+from RAGcipies.src.rag.loader import recipes_to_multi_vector_chunks
+from RAGcipies.src.rag.pipeline import RAGPipeline
+from RAGcipies.src.rag.vector_store import (
+    HybridVectorStore,
+    InMemoryVectorStore,
+    MultiVectorStore,
+    VectorStore,
+)
+
+
+RECIPES = [
+    RecipeDocument(id="r1", title="Budín de banana", ingredients="harina, huevos, banana, azúcar", instructions="Hornear."),
+    RecipeDocument(id="r2", title="Galletitas de avena", ingredients="avena, banana, miel", instructions="Mezclar."),
+    RecipeDocument(id="r3", title="Arroz salteado", ingredients="arroz, 2 cucharadas de salsa de soja, huevo", instructions="Saltear."),
+    RecipeDocument(id="r4", title="Leche de coco casera", ingredients="coco rallado, agua", instructions="Licuar."),
+]
+
+
+def make_chunks(model=None):
+    return [
+        Chunk(id=f"chunk_{recipe.id}", document_id=recipe.id, text=recipe.full_text,
+              embedding=model.embed(recipe.full_text) if model else [1.0, float(i)])
+        for i, recipe in enumerate(RECIPES)
+    ]
+
+
+class NoFilterStore(VectorStore):
+    """Store sin supports_document_filter, para el filtrado posterior del pipeline."""
+    
+    def __init__(self):
+        self.inner = InMemoryVectorStore()
+        self.requested_k = []
+    
+    def add_chunks(self, chunks):
+        self.inner.add_chunks(chunks)
+    
+    def search(self, query_embedding, k=3, min_score=0.0):
+        self.requested_k.append(k)
+        return self.inner.search(query_embedding, k=k, min_score=min_score)
+    
+    def __len__(self):
+        return len(self.inner)
+
+
+def test_ingredient_terms_normaliza():
+    assert ingredient_terms("2 tazas de Harina integral") == ["harina", "integral"]
+    assert ingredient_terms("200g de limones") == ["limon"]
+
+
+def test_parse_restricciones():
+    index = IngredientIndex(RECIPES)
+    
+    assert index.parse("algo dulce sin huevos") == IngredientConstraints(exclude=("huevo",))
+    assert index.parse("arroz con salsa de soja y sin huevo ni miel") == IngredientConstraints(
+        include=("salsa soja",), exclude=("huevo", "miel")
+    )
+    # "sabor" no es un ingrediente: corta la restricción
+    assert not index.parse("algo con sabor a banana")
+    assert not index.parse("sin tacc")
+    assert str(index.parse("con banana sin harina")) == "con banana, sin harina"
+
+
+def test_bitsets_y_documentos_desconocidos():
+    index = IngredientIndex(RECIPES)
+    
+    assert index.matching_ids(IngredientConstraints(exclude=("huevo",))) == ["r2", "r4"]
+    assert index.matching_ids(IngredientConstraints(include=("banana",), exclude=("harina",))) == ["r2"]
+    # Un token excluye los ingredientes que lo contienen ("salsa de soja")
+    assert index.matching_ids(index.parse("sin salsa")) == ["r1", "r2", "r4"]
+    # "leche" solo aparece en un título, no en los ingredientes
+    assert not index.parse("sin leche")
+    
+    exclude = index.filter(IngredientConstraints(exclude=("huevo",)))
+    include = index.filter(IngredientConstraints(include=("banana",)))
+    assert exclude.allows("otro") and not include.allows("otro")
+    
+    document_ids = ["r1", "otro", "r2"]
+    assert exclude.mask(document_ids).tolist() == [False, True, True]
+    # La alineación se cachea por lista y solo se extiende con lo agregado
+    document_ids.append("r3")
+    assert include.mask(document_ids).tolist() == [True, False, True, False]
+    
+    with pytest.raises(ValueError):
+        index.add([RECIPES[0]])
+
+
+def test_in_memory_filtra_antes_del_top_k():
+    index = IngredientIndex(RECIPES)
+    store = InMemoryVectorStore()
+    store.add_chunks(make_chunks())
+    query = [1.0, 2.0]  # más cerca de r3 (con huevo)
+    
+    assert store.search(query, k=1)[0].chunk.document_id == "r3"
+    without_egg = index.filter(index.parse("sin huevo"))
+    results = store.search(query, k=4, document_filter=without_egg)
+    assert [scored.chunk.document_id for scored in results] == ["r4", "r2"]
+    
+    batch = store.search_batch([query, query], k=1, document_filters=[None, without_egg])
+    assert [results[0].chunk.document_id for results in batch] == ["r3", "r4"]
+    with pytest.raises(ValueError):
+        store.search_batch([query], k=1, document_filters=[None, None])
+    
+    # Los filtros siguen valiendo después de borrar (la lista de documentos se reemplaza)
+    store.delete(["chunk_r4"])
+    assert [s.chunk.document_id for s in store.search(query, k=4, document_filter=without_egg)] == ["r2"]
+
+
+def test_multi_vector_e_hibrido_filtran():
+    index = IngredientIndex(RECIPES)
+    model = FakeEmbeddingModel()
+    without_egg = index.filter(index.parse("sin huevo"))
+    
+    multi = MultiVectorStore()
+    multi.add_chunks(recipes_to_multi_vector_chunks(RECIPES))
+    query = model.embed("arroz salteado con huevo")
+    results = multi.search(query, k=4, document_filter=without_egg)
+    assert {scored.chunk.document_id for scored in results} == {"r2", "r4"}
+    
+    hybrid = HybridVectorStore()
+    hybrid.add_chunks(make_chunks())
+    assert hybrid.supports_document_filter
+    results = hybrid.search([1.0, 2.0], k=4, query_text="arroz con huevo", document_filter=without_egg)
+    assert {scored.chunk.document_id for scored in results} == {"r2", "r4"}
+    
+    no_filter = HybridVectorStore(NoFilterStore())
+    assert not no_filter.supports_document_filter
+    with pytest.raises(ValueError):
+        no_filter.search_batch([[1.0, 2.0]], document_filters=[without_egg])
+
+
+@pytest.mark.parametrize("batch_max_size", [0, 4])
+def test_pipeline_excluye_recetas_del_prompt(batch_max_size):
+    index = IngredientIndex(RECIPES)
+    store = InMemoryVectorStore()
+    store.add_chunks(make_chunks(FakeEmbeddingModel()))
+    pipeline = RAGPipeline(vector_store=store, top_k=4, ingredient_index=index, batch_max_size=batch_max_size)
+    try:
+        result = pipeline.query_detailed("algo dulce sin huevos")
+        assert {scored.chunk.document_id for scored in result.scored_chunks} == {"r2", "r4"}
+        assert "Budín" not in pipeline.prompt_builder.build("q", result.scored_chunks)
+        assert len(pipeline.query_detailed("algo dulce").scored_chunks) == 4
+    finally:
+        pipeline.close()
+
+
+def test_pipeline_filtra_despues_si_el_store_no_acepta_filtros():
+    index = IngredientIndex(RECIPES)
+    store = NoFilterStore()
+    store.add_chunks(make_chunks(FakeEmbeddingModel()))
+    pipeline = RAGPipeline(vector_store=store, top_k=2, ingredient_index=index)
+    
+    result = pipeline.query_detailed("algo con banana")
+    assert {scored.chunk.document_id for scored in result.scored_chunks} == {"r1", "r2"}
+    assert store.requested_k == [8]
+    pipeline.query_detailed("algo dulce")
+    assert store.requested_k[-1] == 2
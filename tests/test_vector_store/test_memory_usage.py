@@ -0,0 +1,105 @@
+import uuid
+import pytest
+
+from RAGcipies.src.rag.models import Chunk
+from RAGcipies.src.rag.vector_store import (
+    InMemoryVectorStore,
+    MemoryUsage,
+    VectorStore,
+    estimate_vector_bytes,
+)
+
+
+def make_chunks(count, dims=4, start=0):
+    return [
+        Chunk(
+            id=f"c{i}",
+            document_id=str(i // 2),
+            text=f"receta número {i} con tomate",
+            embedding=[float(i + 1)] + [1.0] * (dims - 1),
+            metadata={"title": f"Receta {i}", "tags": ["rápido", "vegano"]}
+        )
+        for i in range(start, start + count)
+    ]
+
+
+def test_in_memory_desglose():
+    store = InMemoryVectorStore(initial_capacity=8)
+    store.add_chunks(make_chunks(5))
+    usage = store.memory_usage()
+    
+    assert usage.backend == "in_memory"
+    assert usage.chunks == 5
+    assert usage.dimension == 4
+    assert usage.vectors_bytes == 8 * 4 * 4  # capacidad reservada
+    assert usage.index_bytes == 8 * 4
+    assert usage.text_bytes > 5 * len("receta número 0 con tomate")
+    assert usage.metadata_bytes > 0 and usage.id_map_bytes > 0
+    assert usage.disk_bytes is None
+    assert usage.total_bytes == sum([
+        usage.vectors_bytes, usage.text_bytes, usage.metadata_bytes, usage.index_bytes, usage.id_map_bytes
+    ])
+    
+    store.delete(["c0", "c1"])
+    assert store.memory_usage().text_bytes < usage.text_bytes
+
+
+def test_store_vacio_y_default_de_la_base():
+    usage = InMemoryVectorStore().memory_usage()
+    assert (usage.chunks, usage.dimension, usage.vectors_bytes, usage.index_bytes) == (0, None, 0, 0)
+    with pytest.raises(ValueError):
+        usage.project(10)
+    
+    class MinimalStore(VectorStore):
+        def add_chunks(self, chunks):
+            pass
+        
+        def search(self, query_embedding, k=3, min_score=0.0):
+            return []
+    
+    assert MinimalStore().memory_usage() == MemoryUsage(backend="MinimalStore", chunks=0)
+
+
+def test_proyeccion_por_modo():
+    usage = MemoryUsage(
+        backend="x", chunks=100, dimension=768, vectors_bytes=1, text_bytes=1000,
+        metadata_bytes=500, index_bytes=400, id_map_bytes=300, disk_bytes=2000
+    )
+    projected = usage.project(900)
+    
+    assert projected.chunks == 1000
+    assert projected.vectors_bytes == 1000 * 768 * 4
+    assert (projected.text_bytes, projected.metadata_bytes, projected.index_bytes) == (10000, 5000, 4000)
+    assert projected.disk_bytes == 2000 + 900 * 2201 // 100
+    assert usage.chunks == 100  # no modifica el original
+    
+    modes = usage.projections(99_900)
+    assert modes["int8"].vectors_bytes == 100_000 * (768 + 4)
+    assert modes["pq"].vectors_bytes == 100_000 * 96 + 256 * 768 * 4
+    assert modes["pq"].total_bytes < modes["int8"].total_bytes < modes["float32"].total_bytes
+    assert usage.project(0, "pq", pq_subvectors=48).vectors_bytes == estimate_vector_bytes(100, 768, "pq", 48)
+    
+    with pytest.raises(ValueError):
+        usage.project(10, "binary")
+    with pytest.raises(ValueError):
+        usage.project(-1)
+
+
+def test_chroma_memoria_y_disco(tmp_path):
+    pytest.importorskip("chromadb")
+    from RAGcipies.src.rag.vector_store.chromadb_store import ChromaDBVectorStore
+    
+    store = ChromaDBVectorStore(collection_name=f"mem-{uuid.uuid4().hex}", persist_directory=str(tmp_path))
+    store.add_chunks(make_chunks(7))
+    usage = store.memory_usage(batch_size=3)
+    
+    assert usage.backend == "chromadb"
+    assert (usage.chunks, usage.dimension) == (7, 4)
+    assert usage.vectors_bytes == 7 * 4 * 4
+    assert usage.text_bytes == sum(len(c.text.encode("utf-8")) for c in make_chunks(7))
+    assert usage.metadata_bytes > 0 and usage.index_bytes > 0
+    assert usage.id_map_bytes == sum(len(f"c{i}") + 8 for i in range(7))
+    assert usage.disk_bytes > 0
+    
+    in_memory = ChromaDBVectorStore(collection_name=f"mem-{uuid.uuid4().hex}")
+    assert in_memory.memory_usage().disk_bytes is None
@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+from RAGcipies.src.rag.models import Chunk, RecipeDocument
+from RAGcipies.src.rag.loader import recipes_to_multi_vector_chunks
+from RAGcipies.src.rag.vector_store import MultiVectorStore, VectorStoreBackend, create_vector_store
+
+
+def section(document_id, field, embedding):
+    return Chunk(
+        id=f"chunk_{document_id}_{field}",
+        document_id=document_id,
+        text=f"{field} de {document_id}",
+        embedding=embedding,
+        metadata={"title": f"Receta {document_id}", "field": field, "parent_id": f"chunk_{document_id}"}
+    )
+
+
+@pytest.fixture
+def chunks():
+    # La receta "1" tiene un título muy parecido a la query; la "2" es buena en todas sus secciones
+    return [
+        section("1", "title", [1.0, 0.0]),
+        section("1", "ingredients", [0.0, 1.0]),
+        section("2", "title", [0.8, 0.6]),
+        section("2", "ingredients", [0.8, 0.6]),
+    ]
+
+
+def test_max_un_resultado_por_documento(chunks):
+    store = MultiVectorStore()
+    store.add_chunks(chunks)
+    results = store.search([1.0, 0.0], k=5)
+    
+    assert [r.chunk.id for r in results] == ["chunk_1", "chunk_2"]
+    assert results[0].score == pytest.approx(1.0)
+    assert results[1].score == pytest.approx(0.8)
+    assert results[0].chunk.text == "title de 1\n\ningredients de 1"
+    assert results[0].chunk.metadata["matched_field"] == "title"
+    assert results[0].chunk.metadata["title"] == "Receta 1"
+    assert "field" not in results[0].chunk.metadata
+    assert np.shares_memory(results[0].chunk.embedding, store._rows.embeddings())
+    assert (len(store), store.document_count) == (4, 2)
+
+
+def test_weighted_sum(chunks):
+    store = MultiVectorStore(aggregation="weighted_sum", field_weights={"title": 1.0, "ingredients": 3.0})
+    store.add_chunks(chunks)
+    results = store.search([1.0, 0.0], k=2)
+    
+    assert [r.chunk.id for r in results] == ["chunk_2", "chunk_1"]
+    assert results[0].score == pytest.approx(0.8)
+    assert results[1].score == pytest.approx(0.25)
+
+
+def test_secciones_intercaladas_y_batch(chunks):
+    store = MultiVectorStore()
+    store.add_chunks([chunks[0], chunks[2]])
+    store.add_chunks([chunks[1], chunks[3]])
+    
+    batch = store.search_batch([[1.0, 0.0], [0.0, 1.0], [1.0]], k=1)
+    assert [r.chunk.id for r in batch[0]] == ["chunk_1"]
+    assert [r.chunk.id for r in batch[1]] == ["chunk_1"]
+    assert batch[1][0].chunk.metadata["matched_field"] == "ingredients"
+    assert batch[2] == []
+    assert batch[0][0].chunk.text == "title de 1\n\ningredients de 1"
+
+
+def test_delete_por_documento_o_seccion(chunks):
+    store = MultiVectorStore()
+    store.add_chunks(chunks)
+    
+    assert store.delete(["chunk_1_title"])
+    assert store.search([1.0, 0.0], k=1)[0].chunk.id == "chunk_2"
+    assert store.delete(["chunk_2"])
+    assert (len(store), store.document_count) == (1, 1)
+    assert not store.delete(["no-existe"])
+    assert store.memory_usage().backend == "multi_vector"
+
+
+def test_validaciones():
+    with pytest.raises(ValueError):
+        MultiVectorStore(aggregation="mean")
+    with pytest.raises(ValueError):
+        MultiVectorStore(field_weights={"title": -1.0})
+    assert MultiVectorStore().search([1.0, 0.0]) == []
+    assert isinstance(create_vector_store(VectorStoreBackend.MULTI_VECTOR), MultiVectorStore)
+
+
+def test_recipes_to_multi_vector_chunks():
+    recipe = RecipeDocument(id="7", title="Hummus", ingredients="garbanzos, tahini", instructions="Procesar", tags=["vegano"])
+    chunks = recipes_to_multi_vector_chunks([recipe])
+    
+    assert [c.id for c in chunks] == ["chunk_7_title", "chunk_7_ingredients", "chunk_7_instructions"]
+    assert {c.document_id for c in chunks} == {"7"}
+    assert chunks[1].metadata["field"] == "ingredients"
+    assert chunks[1].metadata["parent_id"] == "chunk_7"
+    assert "\n\n".join(c.text for c in chunks) == recipe.full_text
+    
+    store = MultiVectorStore()
+    store.add_chunks(chunks)
+    assert store.search(list(chunks[1].embedding), k=1)[0].chunk.text == recipe.full_text
+    
+    assert len(recipes_to_multi_vector_chunks([recipe], fields=["ingredients"])) == 1
+    with pytest.raises(ValueError):
+        recipes_to_multi_vector_chunks([recipe], fields=["tags"])
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from RAGcipies.src.rag.models import Chunk
+from RAGcipies.src.rag.vector_store import (
+    DocumentFilter,
+    ExactCosineReranker,
+    InMemoryVectorStore,
+    Reranker,
+    TwoStageVectorStore,
+    VectorStoreBackend,
+    create_vector_store,
+)
+
+
+def clustered_chunks(n=600, dims=64, clusters=30, seed=1):
+    """Embeddings con estructura (centros + ruido), como los de un modelo real."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dims))
+    vectors = centers[rng.integers(clusters, size=n)] + 0.5 * rng.standard_normal((n, dims))
+    return [
+        Chunk(id=f"chunk_{i}", document_id=f"doc_{i}", text=f"receta {i}", embedding=vector.tolist())
+        for i, vector in enumerate(vectors)
+    ], rng.standard_normal((20, dims)) + centers[rng.integers(clusters, size=20)]
+
+
+def test_two_stage_recupera_los_mismos_resultados_que_la_busqueda_exacta():
+    chunks, queries = clustered_chunks()
+    exact = InMemoryVectorStore()
+    exact.add_chunks(chunks)
+    store = create_vector_store(VectorStoreBackend.TWO_STAGE, candidate_dims=16, candidates=50)
+    store.add_chunks(chunks[:300])
+    store.add_chunks(chunks[300:])
+    assert isinstance(store, TwoStageVectorStore) and len(store) == 600
+    
+    expected = exact.search_batch(list(queries), k=5)
+    results = store.search_batch(list(queries), k=5)
+    hits = sum(
+        len({s.chunk.id for s in got} & {s.chunk.id for s in want})
+        for got, want in zip(results, expected)
+    )
+    assert hits / (5 * len(queries)) >= 0.95
+    
+    top = store.search(list(queries[0]), k=5)
+    assert [s.score for s in top] == pytest.approx([s.score for s in expected[0]], abs=1e-5)
+    # Se devuelven copias de los chunks, con el score aproximado en la metadata
+    assert len(top[0].chunk.embedding) == 64
+    assert "candidate_score" in top[0].chunk.metadata
+    assert top[0].chunk.metadata["similarity_score"] == pytest.approx(top[0].score)
+    stored = next(c for c in store._exact._chunks if c.id == top[0].chunk.id)
+    assert stored is not top[0].chunk and "candidate_score" not in stored.metadata
+
+
+def test_two_stage_reranker_configurable_y_sin_proyeccion():
+    class ReversedReranker(Reranker):
+        def rerank(self, query_embedding, candidates, k, min_score=0.0):
+            return list(reversed(candidates))[:k]
+    
+    chunks, queries = clustered_chunks(n=50, dims=16)
+    store = TwoStageVectorStore(candidate_dims=0, candidates=10, reranker=ReversedReranker())
+    store.add_chunks(chunks)
+    exact = InMemoryVectorStore()
+    exact.add_chunks(chunks)
+    
+    candidates = exact.search(list(queries[0]), k=10, min_score=-1.0)
+    assert [s.chunk.id for s in store.search(list(queries[0]), k=3)] == [s.chunk.id for s in candidates[::-1][:3]]
+    
+    reranked = ExactCosineReranker().rerank(list(queries[0]), candidates[::-1], k=3)
+    assert [s.chunk.id for s in reranked] == [s.chunk.id for s in candidates[:3]]
+    assert ExactCosineReranker().rerank([1.0, 0.0], candidates, k=3) == []
+
+
+def test_two_stage_delete_filtros_y_validaciones():
+    chunks, queries = clustered_chunks(n=40, dims=16)
+    store = TwoStageVectorStore(candidates=40)
+    store.add_chunks(chunks)
+    assert store.supports_document_filter and not store.uses_query_text
+    
+    top = store.search(list(queries[0]), k=1)[0].chunk.id
+    assert store.delete([top])
+    assert len(store) == 39
+    assert top not in {s.chunk.id for s in store.search(list(queries[0]), k=5)}
+    
+    class EvenDocuments(DocumentFilter):
+        def allows(self, document_id):
+            return int(document_id.split("_")[1]) % 2 == 0
+    
+    filtered = store.search(list(queries[0]), k=5, document_filter=EvenDocuments())
+    assert filtered and all(int(s.chunk.document_id.split("_")[1]) % 2 == 0 for s in filtered)
+    
+    assert store.search([1.0, 2.0], k=3) == []
+    usage = store.memory_usage()
+    assert usage.backend == "two_stage(in_memory)" and usage.index_bytes > 0
+    
+    with pytest.raises(ValueError):
+        TwoStageVectorStore(candidates=0)
+    with pytest.raises(ValueError):
+        TwoStageVectorStore(candidate_store="multi_vector")
+    with pytest.raises(ValueError):
+        store.search(list(queries[0]), k=0)
@@ -0,0 +1,110 @@
+import uuid
+import numpy as np
+import pytest
+
+from RAGcipies.src.rag.models import Chunk
+from RAGcipies.src.rag.vector_store import InMemoryVectorStore
+
+
+def make_chunks(vectors):
+    return [
+        Chunk(id=f"c{i}", document_id=str(i), text=f"receta {i}", embedding=vector)
+        for i, vector in enumerate(vectors)
+    ]
+
+
+@pytest.fixture
+def store():
+    store = InMemoryVectorStore(initial_capacity=2)
+    store.add_chunks(make_chunks([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.7, 0.7, 0.0]]))
+    return store
+
+
+def test_resultados_exponen_vistas_del_store(store):
+    results = store.search([1.0, 0.1, 0.0], k=2)
+    embedding = results[0].chunk.embedding
+    
+    assert isinstance(embedding, np.ndarray)
+    assert embedding.dtype == np.float32
+    assert np.shares_memory(embedding, store.embeddings())
+    with pytest.raises(ValueError):
+        embedding[0] = 5.0
+
+
+def test_busqueda_igual_que_antes(store):
+    results = store.search([1.0, 0.1, 0.0], k=3, min_score=0.5)
+    
+    assert [r.chunk.id for r in results] == ["c0", "c2"]
+    assert results[0].score == pytest.approx(1.0 / np.sqrt(1.01), rel=1e-5)
+    assert results[0].chunk.metadata["similarity_score"] == results[0].score
+
+
+def test_empates_conservan_orden_de_insercion():
+    store = InMemoryVectorStore()
+    store.add_chunks(make_chunks([[1.0, 0.0]] * 4))
+    
+    assert [r.chunk.id for r in store.search([1.0, 0.0], k=3)] == ["c0", "c1", "c2"]
+
+
+def test_search_batch_vectorizado(store):
+    batch = store.search_batch([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]], k=1)
+    
+    assert [r[0].chunk.id for r in batch] == ["c0", "c1"]
+
+
+def test_query_de_otra_dimension_es_un_error(store):
+    with pytest.raises(ValueError, match="Dimensión"):
+        store.search([1.0, 0.0], k=1)
+    with pytest.raises(ValueError):
+        store.search_batch([[1.0, 0.0, 0.0], [1.0, 0.0]], k=1)
+
+
+def test_dimension_incompatible_al_agregar(store):
+    with pytest.raises(ValueError):
+        store.add_chunks(make_chunks([[1.0, 0.0]]))
+
+
+def test_chunk_en_dos_stores_no_se_reapunta(store):
+    chunk = Chunk(id="x", document_id="x", text="receta x", embedding=[0.0, 0.0, 1.0])
+    other = InMemoryVectorStore()
+    other.add_chunks([chunk])
+    bound = chunk.embedding
+    
+    store.add_chunks([chunk])
+    
+    assert chunk.embedding is bound
+    assert np.shares_memory(chunk.embedding, other.embeddings())
+    copy = store.search([0.0, 0.0, 1.0], k=1)[0].chunk
+    assert copy is not chunk and copy.id == "x"
+    assert np.shares_memory(copy.embedding, store.embeddings())
+
+
+def test_delete_compacta_en_el_mismo_buffer(store):
+    store.add_chunks(make_chunks([[0.0, 0.0, 1.0]] * 2))  # c0, c1 otra vez: ids repetidos
+    chunks = {r.chunk.id: r.chunk for r in store.search([0.0, 1.0, 0.0], k=5)}
+    buffer = store._matrix
+    
+    assert store.delete(["c0"])
+    assert store._matrix is buffer
+    assert len(store) == 3
+    assert [list(row) for row in store.embeddings()] == [[0.0, 1.0, 0.0], [0.7, 0.7, 0.0], [0.0, 0.0, 1.0]]
+    assert not store._matrix[3:].any()
+    # Los chunks que quedan se re-apuntan a su nueva fila
+    assert list(chunks["c2"].embedding) == [0.7, 0.7, 0.0]
+    remaining = store.search([0.0, 1.0, 0.0], k=3)
+    assert [r.chunk.id for r in remaining] == ["c1", "c2", "c1"]
+    assert np.shares_memory(remaining[0].chunk.embedding, store.embeddings())
+
+
+def test_chroma_include_embeddings():
+    pytest.importorskip("chromadb")
+    from RAGcipies.src.rag.vector_store.chromadb_store import ChromaDBVectorStore
+    
+    store = ChromaDBVectorStore(collection_name=f"zc-{uuid.uuid4().hex}", include_embeddings=True)
+    store.add_chunks(make_chunks([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]]))
+    
+    result = store.search([1.0, 0.0, 0.0], k=2)
+    embedding = result[0].chunk.embedding
+    assert list(embedding) == [1.0, 0.0, 0.0]
+    assert not embedding.flags.writeable
+    assert result[1].chunk.embedding.base is embedding.base